@@ -0,0 +1,825 @@
+import re
+import json
+import logging
+
+from app.chunking import estimate_tokens
+from app.metrics import timed
+from app.rendering import render_chat_analysis, render_vtt_analysis
+from app.retrieval import LectureIndex
+from app.schemas import CHAT_SUBSECTIONS, ChatAnalysis, CurriculumScores, VTTAnalysis
+from app.vtt_parser import Transcript, read_transcript
+
+logger = logging.getLogger(__name__)
+
+def as_transcript(content):
+    """문자열 또는 업로드 스트림에서 읽은 Transcript를 Transcript로 변환"""
+    if isinstance(content, Transcript):
+        return content
+    return read_transcript((content or '').splitlines(), len((content or '').encode('utf-8')))
+
+@timed('split_vtt_content')
+def plan_vtt_chunks(content, planner, coarse=False):
+    """VTT 내용(문자열 또는 Transcript)을 토큰 예산에 맞춘 청크 분할 계획(ChunkPlan)으로 변환
+
+    WEBVTT 형식이면 헤더, 큐 번호, 타임스탬프를 제외한 발화만 화자별로 병합한 뒤
+    발화 단위로 청크를 채우고(청크마다 시간 범위 유지), 그 외 텍스트는 줄 단위로
+    나눕니다. planner는 BaseGPTClient 인스턴스이며 분할은 API 호출 없이 수행됩니다.
+    coarse면 청크 크기 상한 없이 컨텍스트가 허용하는 만큼 큰 청크로 나눕니다 (작업 예산 초과 시).
+    """
+    transcript = as_transcript(content)
+    if not transcript.cues:
+        logger.warning("분할할 텍스트가 비어있음")
+    plan = planner.plan_units(transcript.units(), 'vtt', coarse=coarse)
+    if transcript.is_vtt:
+        logger.info(f"VTT 자막 파싱 완료 (원문 {transcript.size}바이트 → 발화 {sum(len(c.text) for c in plan.chunks)}자)")
+    return plan
+
+@timed('split_chat_content')
+def plan_chat_chunks(content, planner, coarse=False):
+    """채팅 기록(문자열 또는 Transcript)을 줄 단위로 토큰 예산에 맞춘 청크 분할 계획으로 변환 (coarse는 plan_vtt_chunks 참고)"""
+    transcript = as_transcript(content)
+    if not transcript.cues:
+        logger.warning("분할할 텍스트가 비어있음")
+    return planner.plan_units(transcript.units(), 'chat', coarse=coarse)
+
+def parse_vtt_markdown(content):
+    """마크다운 형식(# 주요 내용 / # 키워드 / # 분석 / # 위험 발언)의 VTT 분석 결과를 VTTAnalysis로 변환"""
+    sections = {
+        '주요 내용': [],
+        '키워드': [],
+        '분석': [],
+        '위험 발언': []
+    }
+    current_category = None
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line or line == '---':
+            continue
+        if line.startswith('# '):
+            current_category = line[2:].strip()  # '#' 제거
+            continue
+        if current_category not in sections:
+            continue
+        if line.startswith('- '):
+            line = line[2:].strip()
+        if current_category == '키워드':
+            sections[current_category].extend(k.strip() for k in line.split(', ') if k.strip())
+        else:
+            sections[current_category].append(line)
+    
+    return VTTAnalysis(
+        summary=sections['주요 내용'],
+        keywords=sections['키워드'],
+        analysis=sections['분석'],
+        risks=sections['위험 발언']
+    )
+
+def parse_chat_markdown(content):
+    """마크다운 형식의 채팅 분석 결과를 ChatAnalysis로 변환"""
+    analysis = ChatAnalysis.from_dict({})
+    lists = {'주요 대화 주제': analysis.topics, '위험 발언 및 주의사항': analysis.risks, '종합 제언': analysis.recommendations}
+    sections = {title: (getattr(analysis, name), subsections) for name, (title, subsections) in CHAT_SUBSECTIONS.items()}
+    current_category = None
+    current_subcategory = None
+    
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line or line == '---':
+            continue
+        if line.startswith('# '):
+            current_category = line[2:].strip()  # '#' 제거
+            current_subcategory = None
+            continue
+        
+        # 하위 카테고리가 있는 섹션 처리 ("1. 긍정적 반응" 줄 아래의 "- " 항목)
+        if current_category in sections:
+            section, subsections = sections[current_category]
+            for key, subtitle in subsections:
+                if line.startswith(subtitle):
+                    current_subcategory = key
+                    break
+            if current_subcategory and line.startswith('- '):
+                section[current_subcategory].append(line[2:].strip())
+            continue
+        
+        if current_category in lists:
+            lists[current_category].append(line[2:].strip() if line.startswith('- ') else line)
+    
+    return ChatAnalysis.merge([analysis])
+
+def as_vtt_analysis(value):
+    """청크 분석 결과(VTTAnalysis, dict, 마크다운 문자열, None)를 VTTAnalysis로 변환"""
+    if isinstance(value, VTTAnalysis):
+        return value
+    if isinstance(value, dict):
+        return VTTAnalysis.from_dict(value)
+    return parse_vtt_markdown(value or '')
+
+def as_chat_analysis(value):
+    """청크 분석 결과(ChatAnalysis, dict, 마크다운 문자열, None)를 ChatAnalysis로 변환"""
+    if isinstance(value, ChatAnalysis):
+        return value
+    if isinstance(value, dict):
+        return ChatAnalysis.from_dict(value)
+    return parse_chat_markdown(value or '')
+
+@timed('combine_analysis_results')
+def combine_analysis_results(results):
+    """여러 청크의 VTT 분석 결과를 하나로 통합 (실패한 청크(None)는 제외)"""
+    return VTTAnalysis.merge([as_vtt_analysis(result) for result in results if result is not None])
+
+@timed('combine_chat_results')
+def combine_chat_results(results):
+    """여러 청크의 채팅 분석 결과를 하나로 통합 (실패한 청크(None)는 제외)"""
+    return ChatAnalysis.merge([as_chat_analysis(result) for result in results if result is not None])
+
+# 파싱 결과 형식이나 규칙이 바뀌면 올려서 등록된 커리큘럼을 다시 파싱하게 함
+CURRICULUM_PARSER_VERSION = 2
+
+# 엑셀 첫 열에서 헤더 행으로 보고 건너뛸 키워드
+CURRICULUM_HEADER_KEYWORDS = ['교과목명', '과목명', '교과목', '과목', 'subject']
+
+def parse_curriculum_sheet(df):
+    """엑셀 시트(header=None으로 읽은 DataFrame)에서 [{'과목명', '세부내용'}] 목록 추출
+
+    첫 번째 열이 비어 있지 않은 행은 새 과목(같은 행의 나머지 셀은 세부내용), 비어 있는 행은
+    현재 과목의 세부내용이며, 헤더로 보이는 행과 첫 과목 전의 행은 무시합니다. 행 단위로
+    순회하지 않고 열 단위 연산으로 셀을 문자열로 바꾸고 과목 번호를 매긴 뒤 한 번에 묶습니다.
+    """
+    if df.empty:
+        return []
+    import pandas as pd
+
+    # 각 셀을 문자열로 변환 (빈 셀은 'nan')
+    cells = df.astype(str).apply(lambda column: column.str.strip())
+    first = cells.iloc[:, 0]
+    subject_rows = first.ne('nan') & first.ne('')
+    header_pattern = '|'.join(keyword.lower() for keyword in CURRICULUM_HEADER_KEYWORDS)
+    header_rows = subject_rows & first.str.lower().str.contains(header_pattern, regex=True)
+    subject_rows &= ~header_rows
+    # 행마다 속한 과목 번호 (첫 과목 전의 행은 0)
+    group = subject_rows.cumsum()
+
+    # 비어 있지 않은 셀을 행 → 열 순서로 펼침 (과목 행의 첫 열은 과목명이므로 제외)
+    values = cells.where(cells.ne('nan'))
+    values.iloc[:, 0] = values.iloc[:, 0].where(~subject_rows)
+    values = values[(group > 0) & ~header_rows]
+    stacked = values.stack()
+    if stacked.empty:
+        return []
+    details = stacked.groupby(group.reindex(stacked.index.get_level_values(0)).to_numpy(), sort=True).agg(list)
+
+    names = pd.Series(first[subject_rows].to_numpy(), index=group[subject_rows].to_numpy())
+    return [{'과목명': names[number], '세부내용': items} for number, items in details.items()]
+
+@timed('process_curriculum_file')
+def process_curriculum_file(filepath, stream=None):
+    """커리큘럼 파일(엑셀 또는 JSON)을 처리하여 내용을 반환
+
+    stream(업로드 파일 객체)이 있으면 디스크에 저장하지 않고 바로 읽으며, 이때 filepath는
+    형식 판단용 파일명으로만 사용합니다.
+    """
+    ext = filepath.rsplit('.', 1)[1].lower() if '.' in filepath else ''
+    try:
+        if ext in ['xlsx', 'xls']:
+            import pandas as pd
+            
+            # 엑셀 파일의 모든 셀 데이터를 읽기
+            df = pd.read_excel(stream if stream is not None else filepath, header=None)
+            result = parse_curriculum_sheet(df)
+            
+            if not result:
+                raise ValueError('엑셀 파일에서 과목명과 세부내용을 추출할 수 없습니다.')
+                
+            return result
+            
+        elif ext == 'json':
+            import json
+            if stream is not None:
+                data = json.load(stream)
+            else:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            # JSON 형식 검증
+            if not isinstance(data, list):
+                raise ValueError('JSON 파일은 객체의 배열이어야 합니다.')
+            
+            result = []
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                
+                subject = item.get('subject') or item.get('과목명')
+                details = item.get('details') or item.get('세부내용')
+                
+                if subject and details:
+                    if isinstance(details, str):
+                        details = [details]
+                    elif not isinstance(details, list):
+                        continue
+                        
+                    result.append({
+                        '과목명': subject,
+                        '세부내용': [d for d in details if d]
+                    })
+            return result
+        else:
+            raise ValueError('지원하지 않는 파일 형식입니다')
+            
+    except Exception as e:
+        logger.error(f"커리큘럼 파일 처리 중 오류 발생: {str(e)}")
+        raise ValueError(f"커리큘럼 파일 처리 중 오류가 발생했습니다: {str(e)}")
+
+def collect_subject_details(curriculum_content):
+    """커리큘럼에서 과목명 목록과 과목별 세부내용을 추출"""
+    subjects = []
+    subject_details = {}
+    
+    for item in curriculum_content:
+        subject = None
+        details = None
+        
+        if 'subject' in item and 'details' in item:  # JSON 형식
+            subject = item['subject']
+            details = item['details']
+        elif '과목명' in item and '세부내용' in item:  # 엑셀 형식
+            subject = item['과목명']
+            details = item['세부내용']
+            
+        if subject and details:
+            if subject not in subjects:
+                subjects.append(subject)
+                subject_details[subject] = []
+            # 리스트가 아닌 경우 리스트로 변환
+            if isinstance(details, str):
+                details = [details]
+            subject_details[subject].extend(details)
+    
+    # 빈 세부내용 제외
+    for subject in subjects:
+        subject_details[subject] = [
+            str(detail).strip() for detail in subject_details[subject]
+            if detail and str(detail).strip() != 'nan'
+        ]
+    
+    return subjects, subject_details
+
+def extract_lecture_content(vtt_result):
+    """통합된 VTT 분석 결과에서 주요 내용과 분석 부분만 추출"""
+    analysis = as_vtt_analysis(vtt_result)
+    return '\n'.join(analysis.summary + analysis.analysis)
+
+def build_curriculum_prompt(detail_str, vtt_content):
+    """세부내용 하나에 대한 달성도 평가 프롬프트 생성"""
+    return f"""
+다음 강의 내용이 특정 교과 세부내용을 다루고 있는지 분석해주세요.
+
+[분석할 교과 세부내용]
+{detail_str}
+
+[강의 내용]
+{vtt_content}
+
+다음 형식으로 응답해주세요:
+1. 달성도 (0-100): 
+   - 이 강의가 해당 세부내용을 얼마나 다루었는지를 백분율로 표현
+   - 직접적이고 상세한 설명이 있으면 90-100점
+   - 직접적인 설명이 있으면 70-89점
+   - 관련 개념이나 응용사례를 다룬 경우 50-69점
+   - 간접적으로 연관된 내용을 다룬 경우 30-49점
+   - 약간의 관련성만 있는 경우 10-29점
+   - 매우 간접적이거나 미미한 관련성이 있는 경우 1-9점
+   - 전혀 다루지 않은 경우 0점
+
+2. 판단 근거:
+   - 강의 내용 중 이 세부내용과 관련된 부분을 구체적으로 설명
+   - 직접적인 언급이 없더라도 연관된 개념이나 사례가 있다면 설명
+   - 매우 간접적이거나 미미한 관련성도 포함하여 설명
+
+주의사항:
+- 형식적인 단어 매칭이 아닌 실질적인 내용의 연관성을 평가해주세요
+- 세부내용의 핵심 개념이나 목표가 조금이라도 다뤄졌다면 매우 관대하게 평가해주세요
+- 직접적인 설명이 아니더라도, 관련 개념이나 응용 사례가 포함되어 있다면 점수를 부여해주세요
+- 매우 간접적이거나 미미한 관련성이라도 발견된다면 최소 1점 이상을 부여해주세요
+- 강의 내용이 해당 세부내용의 일부분만 다루더라도 그 부분에 대해 적절한 점수를 부여해주세요
+"""
+
+def parse_achievement_score(analysis):
+    """분석 결과에서 달성도 점수(0-100)를 추출"""
+    detail_score = 0
+    
+    for line in analysis.split('\n'):
+        line = line.strip()
+        if '달성도' in line:
+            try:
+                # 달성도 숫자를 더 정확하게 추출
+                score_text = line.split(':')[1].strip() if ':' in line else line
+                # 첫 번째 숫자 찾기
+                score_match = re.search(r'\d+', score_text)
+                if score_match:
+                    detail_score = int(score_match.group())
+                    # 점수가 100을 초과하는 경우 100으로 제한
+                    detail_score = min(100, max(0, detail_score))
+                    logger.info(f"추출된 달성도 점수: {detail_score} (원본 텍스트: {line})")
+            except Exception as e:
+                logger.error(f"달성도 점수 파싱 오류: {str(e)} (라인: {line})")
+                detail_score = 0
+            break
+    
+    return detail_score
+
+def summarize_curriculum_match(subjects, subject_details, detail_scores):
+    """세부내용별 점수를 과목별 달성도 응답 형식으로 집계
+
+    detail_scores는 subjects 순서대로 펼친 세부내용 목록과 같은 순서의 점수 리스트입니다.
+    """
+    matched_subjects = []
+    details_matches = {}
+    scores = iter(detail_scores)
+    
+    for subject in subjects:
+        matched_details = []
+        matches_status = []
+        total_score = 0
+        valid_details_count = len(subject_details[subject])
+        
+        for detail_str in subject_details[subject]:
+            detail_score = next(scores)
+            # 세부내용 매칭 결과 저장
+            matched_details.append(detail_str)
+            matches_status.append(detail_score >= 20)  # 20% 이상이면 달성으로 판단
+            total_score += detail_score
+            logger.info(f"세부내용 '{detail_str}' 분석 완료 - 점수: {detail_score}")
+        
+        # 과목 전체 달성도 계산
+        if valid_details_count > 0:
+            # 평균 점수 계산 시 소수점 아래는 버림
+            achievement_rate = int(total_score / valid_details_count)
+            # 최소 1%는 보장하되, 실제 점수가 있는 경우에만
+            achievement_rate = max(1, achievement_rate) if total_score > 0 else 0
+            logger.info(f"과목 '{subject}' 전체 달성도 계산: {achievement_rate}% (총점: {total_score}, 유효 항목 수: {valid_details_count})")
+        else:
+            achievement_rate = 0
+            logger.info(f"과목 '{subject}'의 유효한 세부내용이 없음")
+        
+        matched_subjects.append({
+            'name': subject,
+            'achievement_rate': achievement_rate
+        })
+        
+        details_matches[subject] = {
+            'matches': matches_status,
+            'detail_texts': matched_details
+        }
+    
+    return {
+        'matched_subjects': matched_subjects,
+        'details_matches': details_matches
+    }
+
+def build_curriculum_batch_prompt(detail_strs, vtt_content):
+    """여러 세부내용의 달성도를 한 번에 평가하는 프롬프트 생성 (JSON 응답)"""
+    items = '\n'.join(f"{i}. {detail_str}" for i, detail_str in enumerate(detail_strs, 1))
+    return f"""
+다음 강의 내용이 아래 교과 세부내용 각각을 다루고 있는지 분석해주세요.
+
+[분석할 교과 세부내용]
+{items}
+
+[강의 내용]
+{vtt_content}
+
+각 세부내용의 달성도(0-100)를 다음 기준으로 평가해주세요:
+- 직접적이고 상세한 설명이 있으면 90-100점
+- 직접적인 설명이 있으면 70-89점
+- 관련 개념이나 응용사례를 다룬 경우 50-69점
+- 간접적으로 연관된 내용을 다룬 경우 30-49점
+- 약간의 관련성만 있는 경우 10-29점
+- 매우 간접적이거나 미미한 관련성이 있는 경우 1-9점
+- 전혀 다루지 않은 경우 0점
+
+주의사항:
+- 형식적인 단어 매칭이 아닌 실질적인 내용의 연관성을 평가해주세요
+- 세부내용의 핵심 개념이나 목표가 조금이라도 다뤄졌다면 매우 관대하게 평가해주세요
+- 매우 간접적이거나 미미한 관련성이라도 발견된다면 최소 1점 이상을 부여해주세요
+- 각 세부내용은 서로 독립적으로 평가해주세요
+
+다음 JSON 형식으로만 응답해주세요 (id는 위 세부내용 번호, rationale은 판단 근거 1-2문장):
+{{"items": [{{"id": 1, "score": 0, "rationale": ""}}]}}
+"""
+
+def plan_curriculum_batches(detail_strs, indices, detail_segments, segment_tokens, context_tokens,
+                            max_batch_size=25, item_output_tokens=150, safety_ratio=0.05):
+    """평가할 세부내용을 컨텍스트 길이에 맞는 묶음으로 나눔
+
+    묶음의 강의 내용은 각 세부내용에 해당하는 구간(detail_segments)의 합집합이며,
+    세부내용을 추가할 때마다 새로 필요한 구간, 세부내용 자체, 항목별 응답 토큰이
+    남은 토큰에 들어가는 만큼 한 묶음에 담습니다 (최대 max_batch_size개).
+    반환값은 (세부내용 번호 목록, 구간 번호 목록, 응답 토큰 상한) 목록입니다.
+    """
+    base_tokens = estimate_tokens(build_curriculum_batch_prompt([], ''))
+    available = context_tokens - base_tokens - int(context_tokens * safety_ratio)
+    
+    batches = []
+    current, segments = [], set()
+    used = 0
+    for index in indices:
+        new_segments = set(detail_segments[index]) - segments
+        # 번호와 줄바꿈을 포함한 항목 비용 + 항목별 응답 토큰 + 새로 필요한 구간
+        cost = (estimate_tokens(detail_strs[index]) + 2 + item_output_tokens +
+                sum(segment_tokens[i] for i in new_segments))
+        if current and (used + cost > available or len(current) >= max_batch_size):
+            batches.append((current, segments))
+            current, segments, used = [], set(), 0
+            new_segments = set(detail_segments[index])
+            cost = (estimate_tokens(detail_strs[index]) + 2 + item_output_tokens +
+                    sum(segment_tokens[i] for i in new_segments))
+        if cost > available:
+            logger.warning(f"세부내용 {index + 1}의 강의 구간이 길어 컨텍스트를 넘을 수 있습니다 (예상 토큰: {cost})")
+        current.append(index)
+        segments |= new_segments
+        used += cost
+    if current:
+        batches.append((current, segments))
+    
+    # 응답 JSON 틀 여유분 포함
+    return [(batch, sorted(segments), item_output_tokens * len(batch) + 50) for batch, segments in batches]
+
+def parse_batch_scores(response, count):
+    """묶음 평가 응답(CurriculumScores 또는 JSON 문자열)에서 (점수, 근거) 목록 추출 (누락되거나 잘못된 항목은 None)"""
+    scores = [None] * count
+    if not response:
+        return scores
+    if isinstance(response, CurriculumScores):
+        for item in response.items:
+            if 0 <= item.id - 1 < count:
+                scores[item.id - 1] = (item.score, item.rationale)
+        return scores
+    
+    try:
+        data = json.loads(response)
+    except ValueError:
+        # JSON 앞뒤에 설명이 붙은 경우 가장 바깥 객체만 파싱
+        match = re.search(r'\{.*\}', response, re.DOTALL)
+        if not match:
+            logger.error("묶음 평가 응답에서 JSON을 찾을 수 없음")
+            return scores
+        try:
+            data = json.loads(match.group())
+        except ValueError as e:
+            logger.error(f"묶음 평가 응답 JSON 파싱 오류: {str(e)}")
+            return scores
+    
+    items = data.get('items', []) if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return scores
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            position = int(item.get('id')) - 1
+            score = min(100, max(0, int(float(item.get('score')))))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= position < count:
+            scores[position] = (score, str(item.get('rationale') or ''))
+    return scores
+
+def transcript_segments(content, max_chars=400):
+    """원문 자막(문자열 또는 Transcript)을 검색용 구간(약 max_chars자)으로 나눔 (WEBVTT가 아니면 줄 단위)"""
+    lines = (text for text, _, _ in as_transcript(content).units(max_chars))
+    
+    segments = []
+    current = []
+    size = 0
+    for line in lines:
+        if not line:
+            continue
+        if current and size + len(line) > max_chars:
+            segments.append(' '.join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        segments.append(' '.join(current))
+    return segments
+
+def _curriculum_inputs(vtt_result, curriculum_content, transcript=None, top_k=5):
+    """과목/세부내용 목록, 강의 구간, 세부내용별 관련 구간, 바로 0점 처리할 세부내용 번호
+
+    강의 구간은 통합 분석 결과의 주요 내용/분석 문장과 원문 자막 구간(transcript)이며,
+    검색 인덱스는 한 번만 만들어 모든 과목의 세부내용에 재사용합니다. top_k가 0이면
+    검색 없이 모든 구간을 보냅니다.
+    """
+    subjects, subject_details = collect_subject_details(curriculum_content)
+    detail_strs = [detail_str for subject in subjects for detail_str in subject_details[subject]]
+    
+    segments = [line.strip() for line in extract_lecture_content(vtt_result).split('\n') if line.strip()]
+    segments.extend(transcript or [])
+    
+    if top_k <= 0:
+        detail_segments = [list(range(len(segments)))] * len(detail_strs)
+        return subjects, subject_details, detail_strs, segments, detail_segments, []
+    
+    index = LectureIndex(segments)
+    detail_segments = []
+    unmatched = []
+    for i, detail_str in enumerate(detail_strs):
+        selected, _ = index.search(detail_str, top_k)
+        detail_segments.append(selected)
+        if not selected:
+            unmatched.append(i)
+    logger.info(f"강의 구간 검색 완료 (세부내용 {len(detail_strs)}개 중 {len(unmatched)}개는 겹치는 내용이 없어 0점 처리)")
+    return subjects, subject_details, detail_strs, segments, detail_segments, unmatched
+
+def _batch_requests(detail_strs, indices, segments, detail_segments, client, batch_size, item_output_tokens):
+    segment_tokens = [estimate_tokens(segment) for segment in segments]
+    batches = plan_curriculum_batches(
+        detail_strs, indices, detail_segments, segment_tokens, client.context_tokens,
+        batch_size, item_output_tokens
+    )
+    requests = [
+        (build_curriculum_batch_prompt(
+            [detail_strs[i] for i in batch],
+            '\n'.join(segments[i] for i in segment_ids)
+        ), max_tokens)
+        for batch, segment_ids, max_tokens in batches
+    ]
+    logger.info(f"커리큘럼 묶음 평가 계획: 세부내용 {len(indices)}개 → 요청 {len(requests)}개")
+    return [batch for batch, _, _ in batches], requests
+
+def _batch_options(client):
+    """묶음 평가 응답 형식 (구조화 출력 클라이언트는 함수 호출, 그 외는 JSON 모드)"""
+    if getattr(client, 'structured_output', False):
+        return {'result_type': CurriculumScores}
+    return {'json_mode': True}
+
+def _collect_batch_scores(batches, responses, detail_scores):
+    """묶음 응답 점수를 세부내용 순서의 점수 목록에 채움 (누락 항목 번호 반환)"""
+    missing = []
+    for batch, response in zip(batches, responses):
+        for index, parsed in zip(batch, parse_batch_scores(response, len(batch))):
+            if parsed is None:
+                missing.append(index)
+                continue
+            detail_scores[index] = parsed[0]
+            logger.debug(f"세부내용 {index + 1} 판단 근거: {parsed[1]}")
+    if missing:
+        logger.warning(f"묶음 평가 응답에서 누락된 세부내용 {len(missing)}개를 개별 평가합니다")
+    return missing
+
+def _single_requests(indices, detail_strs, segments, detail_segments, client):
+    return [
+        (build_curriculum_prompt(detail_strs[i], '\n'.join(segments[s] for s in detail_segments[i])),
+         client.max_output_tokens)
+        for i in indices
+    ]
+
+def plan_curriculum_requests(client, curriculum_content, transcript=None, batch_size=25, item_output_tokens=150,
+                             top_k=5):
+    """API 호출 없이 예상한 커리큘럼 평가 요청 목록 ((프롬프트, 응답 토큰 상한) 목록, 작업 예산 계산용)
+
+    실제 평가는 통합 분석 결과의 요약 문장도 강의 구간에 포함하고 묶음 응답에서 빠진 세부내용을
+    다시 요청하므로, 원문 자막 구간만으로 계산한 이 목록은 근사치입니다.
+    """
+    match = CurriculumMatch(client, VTTAnalysis(), curriculum_content, batch_size, item_output_tokens, transcript,
+                            top_k)
+    return match.batch_requests() or match.single_requests()
+
+def _subject_reporter(subjects, subject_details, detail_scores, subject_callback):
+    """점수가 정해진 세부내용 번호를 받아, 모든 세부내용이 평가된 과목을 한 번씩 subject_callback으로 전달
+
+    전달되는 값은 최종 응답의 과목 항목(name, achievement_rate)과 세부 매칭 결과(matches,
+    detail_texts)를 합친 dict입니다.
+    """
+    ranges = []
+    start = 0
+    for subject in subjects:
+        ranges.append((subject, start, start + len(subject_details[subject])))
+        start += len(subject_details[subject])
+    scored = set()
+    reported = set()
+    
+    def report(indices):
+        scored.update(indices)
+        if subject_callback is None:
+            return
+        for subject, start, end in ranges:
+            if subject in reported or not all(i in scored for i in range(start, end)):
+                continue
+            reported.add(subject)
+            result = summarize_curriculum_match([subject], {subject: subject_details[subject]}, detail_scores[start:end])
+            subject_callback({**result['matched_subjects'][0], **result['details_matches'][subject]})
+    return report
+
+class CurriculumMatch:
+    """커리큘럼 매칭 한 건의 상태 (동기/비동기 버전이 공유하는 계획, 응답 반영, 결과 집계)
+
+    묶음 평가(batch_requests → batch_done) 후 응답에서 빠진 세부내용만 개별 평가
+    (single_requests → single_done)하고 result로 과목별 달성도를 집계합니다. 두 버전은 요청을
+    보내는 방식만 다릅니다.
+    """
+
+    def __init__(self, client, vtt_result, curriculum_content, batch_size=25, item_output_tokens=150,
+                 transcript=None, top_k=5, subject_callback=None):
+        (self.subjects, self.subject_details, self.detail_strs, self.segments, self.detail_segments,
+         unmatched) = _curriculum_inputs(vtt_result, curriculum_content, transcript, top_k)
+        self.client = client
+        self.batch_size = batch_size
+        self.item_output_tokens = item_output_tokens
+        self.detail_scores = [0] * len(self.detail_strs)
+        self.report = _subject_reporter(self.subjects, self.subject_details, self.detail_scores, subject_callback)
+        self.report(unmatched)
+        unmatched = set(unmatched)
+        self.pending = [i for i in range(len(self.detail_strs)) if i not in unmatched]
+        self.batches = []
+        self.missing = []
+
+    def batch_requests(self) -> list:
+        """묶음 평가 요청 목록 (batch_size가 1이거나 평가할 세부내용이 없으면 빈 목록)"""
+        if self.batch_size <= 1 or not self.pending:
+            return []
+        self.batches, requests = _batch_requests(
+            self.detail_strs, self.pending, self.segments, self.detail_segments, self.client, self.batch_size,
+            self.item_output_tokens
+        )
+        self.pending = []
+        return requests
+
+    def batch_options(self) -> dict:
+        return _batch_options(self.client)
+
+    def batch_done(self, position, response):
+        """묶음 응답 하나 반영 (complete_prompts의 result_callback)"""
+        batch = self.batches[position]
+        batch_missing = _collect_batch_scores([batch], [response], self.detail_scores)
+        self.missing.extend(batch_missing)
+        self.report(set(batch) - set(batch_missing))
+
+    def single_requests(self) -> list:
+        """개별 평가 요청 목록 (묶음 평가를 하지 않은 세부내용과 묶음 응답에서 빠진 세부내용)"""
+        self.pending = sorted(self.pending + self.missing)
+        self.missing = []
+        return _single_requests(self.pending, self.detail_strs, self.segments, self.detail_segments, self.client)
+
+    def single_done(self, position, analysis):
+        """개별 응답 하나 반영 (complete_prompts의 result_callback)"""
+        self.detail_scores[self.pending[position]] = parse_achievement_score(analysis or '')
+        self.report([self.pending[position]])
+
+    def result(self) -> dict:
+        return summarize_curriculum_match(self.subjects, self.subject_details, self.detail_scores)
+
+@timed('analyze_curriculum_match')
+def analyze_curriculum_match(api_client, vtt_result, curriculum_content, batch_size=25, item_output_tokens=150,
+                             transcript=None, top_k=5, subject_callback=None, budget=None):
+    """VTT 분석 결과와 커리큘럼을 매칭하여 분석
+
+    세부내용마다 관련 강의 구간만 골라 여러 세부내용을 한 요청에서 평가하고(batch_size가
+    1이면 하나씩), 응답에서 빠진 세부내용만 개별 요청으로 다시 평가합니다. 강의 구간과
+    겹치는 내용이 전혀 없는 세부내용은 API를 호출하지 않고 0점으로 처리합니다.
+    subject_callback은 과목의 모든 세부내용 점수가 정해지는 대로 과목별로 호출됩니다.
+    budget(JobBudget)을 넘어 보내지 않은 요청의 세부내용은 0점으로 남습니다.
+    """
+    match = CurriculumMatch(api_client, vtt_result, curriculum_content, batch_size, item_output_tokens,
+                            transcript, top_k, subject_callback)
+    requests = match.batch_requests()
+    if requests:
+        api_client.complete_prompts(requests, result_callback=match.batch_done, budget=budget,
+                                    **match.batch_options())
+    requests = match.single_requests()
+    if requests:
+        api_client.complete_prompts(requests, result_callback=match.single_done, budget=budget)
+    return match.result()
+
+@timed('analyze_curriculum_match')
+async def analyze_curriculum_match_async(async_client, vtt_result, curriculum_content, batch_size=25,
+                                         item_output_tokens=150, transcript=None, top_k=5, subject_callback=None,
+                                         budget=None):
+    """analyze_curriculum_match의 비동기 버전 (AsyncGPTAPIClient 사용)
+
+    검색 인덱스 생성과 응답 반영(subject_callback의 진행 채널 발행 포함)은 스레드 풀에서 수행합니다.
+    """
+    from starlette.concurrency import run_in_threadpool
+
+    match = await run_in_threadpool(CurriculumMatch, async_client, vtt_result, curriculum_content, batch_size,
+                                    item_output_tokens, transcript, top_k, subject_callback)
+    requests = match.batch_requests()
+    if requests:
+        await async_client.complete_prompts(requests, budget=budget, **match.batch_options(),
+                                            result_callback=lambda *args: run_in_threadpool(match.batch_done, *args))
+    requests = match.single_requests()
+    if requests:
+        await async_client.complete_prompts(requests, budget=budget,
+                                            result_callback=lambda *args: run_in_threadpool(match.single_done, *args))
+    return match.result()
+
+# 녹화 파일명의 날짜 (GMT20240115-..., 2024-01-15_..., 2024.01.15 등)
+LECTURE_DATE_PATTERN = re.compile(r'(20\d{2})[-_.]?(0[1-9]|1[0-2])[-_.]?(0[1-9]|[12]\d|3[01])')
+
+def lecture_day(filename, position):
+    """강의 날짜 표시 (파일명에 날짜가 있으면 YYYY-MM-DD, 없으면 업로드 순서로 'N일차')"""
+    match = LECTURE_DATE_PATTERN.search(filename or '')
+    if match:
+        return '-'.join(match.groups())
+    return f"{position + 1}일차"
+
+def curriculum_coverage_matrix(lectures):
+    """여러 강의의 커리큘럼 달성도를 과목 × 날짜 표로 집계
+
+    lectures는 (날짜, curriculum_result) 목록이며 같은 날짜의 강의는 과목별 최고 달성도를
+    사용합니다. coverage는 과목마다 어느 강의에서든 달성(20점 이상)으로 판단된 세부내용 비율(%)입니다.
+    날짜가 모두 YYYY-MM-DD면 날짜순, 아니면 업로드 순서로 정렬합니다.
+    """
+    days = list(dict.fromkeys(day for day, _ in lectures))
+    if all(LECTURE_DATE_PATTERN.fullmatch(day) for day in days):
+        days.sort()
+    subjects = []
+    rates = {}
+    covered = {}
+    for day, curriculum_result in lectures:
+        if not curriculum_result:
+            continue
+        for subject in curriculum_result['matched_subjects']:
+            name = subject['name']
+            if name not in rates:
+                subjects.append(name)
+                rates[name] = {}
+            rates[name][day] = max(rates[name].get(day, 0), subject['achievement_rate'])
+        for name, details in curriculum_result['details_matches'].items():
+            flags = covered.setdefault(name, [False] * len(details['matches']))
+            for i, matched in enumerate(details['matches'][:len(flags)]):
+                flags[i] = flags[i] or matched
+    return {
+        'days': days,
+        'subjects': subjects,
+        'matrix': [[rates[name].get(day) for day in days] for name in subjects],
+        'coverage': {name: int(100 * sum(flags) / len(flags)) if flags else 0
+                     for name, flags in covered.items()}
+    }
+
+def build_summary_prompt(content_list, max_length=800):
+    """여러 내용을 max_length자 이내로 통합하는 재요약 프롬프트"""
+    combined_content = "\n".join(content_list)
+    return f"""다음 내용을 {max_length}자 이내로 통합하여 요약해주세요. 
+        중요한 내용을 놓치지 않되, 반복되는 내용은 제거하고 핵심적인 내용만 남겨주세요.
+        각 요점은 새로운 줄에 '- '로 시작하도록 해주세요.
+        
+        내용:
+        {combined_content}"""
+
+def parse_summary_lines(summarized):
+    """재요약 응답에서 '- '로 시작하는 요점 목록 추출"""
+    return [line.strip()[2:] for line in summarized.split('\n') if line.strip().startswith('- ')]
+
+def summarize_content(api_client, content_list, max_length=800):
+    """여러 내용을 하나로 통합하여 재요약"""
+    if not content_list:
+        return []
+        
+    try:
+        # GPT API를 통해 재요약 (분석 틀 없이 프롬프트 그대로 요청)
+        prompt = build_summary_prompt(content_list, max_length)
+        summarized = api_client.complete_prompts([(prompt, api_client.max_output_tokens)])[0]
+        if summarized is None:
+            raise ValueError('재요약 응답이 없습니다')
+        # 결과를 리스트로 변환
+        return parse_summary_lines(summarized)
+    except Exception as e:
+        logger.error(f"재요약 중 오류 발생: {str(e)}")
+        return content_list  # 오류 발생 시 원본 내용 반환
+
+@timed('format_vtt_analysis')
+def format_vtt_analysis(content):
+    """VTT 분석 결과(VTTAnalysis, dict 또는 마크다운 문자열)를 HTML 형식으로 변환"""
+    analysis = as_vtt_analysis(content)
+    logger.debug(f"VTT 분석 결과 변환 (주요 내용 {len(analysis.summary)}개, 키워드 {len(analysis.keywords)}개, "
+                 f"위험 발언 {len(analysis.risks)}개)")
+    return render_vtt_analysis(analysis)
+
+@timed('format_chat_analysis')
+def format_chat_analysis(content):
+    """채팅 분석 결과(ChatAnalysis, dict 또는 마크다운 문자열)를 HTML 형식으로 변환"""
+    analysis = as_chat_analysis(content)
+    logger.debug(f"채팅 분석 결과 변환 (주제 {len(analysis.topics)}개, 위험 발언 {len(analysis.risks)}개)")
+    return render_chat_analysis(analysis)
+
+def format_analysis_result(content, analysis_type='chat'):
+    """분석 결과를 HTML 형식으로 변환"""
+    if analysis_type == 'vtt':
+        return format_vtt_analysis(content)
+    else:
+        return format_chat_analysis(content)
+
+def format_list_items(content):
+    """목록 항목을 HTML 형식으로 변환"""
+    items = []
+    for line in content.split(chr(10)):  # chr(10)은 '\n'과 동일
+        line = line.strip()
+        if line.startswith('- '):
+            items.append(f'<li>{line[2:].strip()}</li>')
+        elif line.startswith('• '):
+            items.append(f'<li>{line[2:].strip()}</li>')
+        elif line:  # 일반 텍스트인 경우
+            items.append(f'<li>{line}</li>')
+    return '\n'.join(items)
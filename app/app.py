@@ -1,13 +1,31 @@
 import os
+import time
 import logging
-import re
 from flask import Flask, request, jsonify, render_template, Response
-from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 from app.gpt_client import GPTAPIClient
+from app.config import Config
+from app.llm_cache import create_llm_cache
+from app.progress import (
+    get_progress_broker,
+    publish_progress,
+    is_valid_job_id,
+    parse_last_event_id,
+    format_sse
+)
+from app.tasks import start_vtt_workflow, start_vtt_batch_workflow, start_chat_workflow, get_job_status
+from app.ingest import ingest_transcript, UploadTooLargeError
+from app.result_store import get_result_store, make_result_key, curriculum_settings, render_result
+from app.pipeline import AnalysisRun, batch_completion_message, run_chat_analysis, run_vtt_analysis
+from app.live import LiveMonitor, get_live_store, parse_cue_batch
+from app.discord_notifier import create_discord_notifier
+from app.metrics import render_metrics, track_job
+from app.budget import BudgetExceededError, create_job_budget, plan_job
+from app.curriculum_registry import CurriculumNotFoundError, get_curriculum_registry
+from app.analysis import lecture_day, curriculum_coverage_matrix
 import json
-import queue
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # 환경 변수 로드
 load_dotenv()
@@ -21,30 +39,101 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB 제한
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH  # 요청 전체 크기 제한
 app.config['ALLOWED_EXTENSIONS'] = {'txt', 'vtt'}  # 허용된 파일 확장자
 
 # 업로드 폴더가 없으면 생성
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-# API 클라이언트 초기화
-try:
-    api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
-    api_client = GPTAPIClient(api_key)
-    
-    # API 연결 테스트
-    if not api_client.test_connection():
-        raise ConnectionError("API 연결 테스트 실패")
-    
-    logger.info("API 클라이언트 초기화 및 연결 테스트 성공")
-except Exception as e:
-    logger.error(f"API 클라이언트 초기화 실패: {str(e)}")
-    raise
+# LLM 응답 캐시 초기화 (같은 요청은 API를 다시 호출하지 않음)
+llm_cache = create_llm_cache(
+    Config.LLM_CACHE_BACKEND,
+    ttl_seconds=Config.LLM_CACHE_TTL_SECONDS,
+    max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+    sqlite_path=Config.LLM_CACHE_PATH,
+    redis_url=Config.REDIS_URL
+)
+
+# 분석 결과 저장소 (같은 자막/커리큘럼/프롬프트 설정의 분석은 저장된 결과로 응답)
+result_store = get_result_store()
+
+# 커리큘럼 등록소 (올린 커리큘럼을 파일 해시로 보관, 같은 파일은 다시 파싱하지 않음)
+curriculum_registry = get_curriculum_registry()
+
+# Discord 알림 전송 큐 (웹훅 URL이 없으면 None, 전송은 백그라운드 스레드에서 처리)
+discord_notifier = create_discord_notifier(
+    Config.DISCORD_WEBHOOK_URL,
+    coalesce_seconds=Config.DISCORD_COALESCE_SECONDS,
+    max_queue_size=Config.DISCORD_QUEUE_SIZE
+)
+
+# API 클라이언트와 실시간 강의 모니터는 처음 사용할 때 생성 (워커 기동 시 네트워크 요청 없음)
+_api_client = None
+_live_monitor = None
+_init_lock = threading.Lock()
+
+def get_api_client() -> GPTAPIClient:
+    """프로세스마다 한 번만 생성되는 API 클라이언트 (OPENAI_API_KEY가 없으면 ValueError)"""
+    global _api_client
+    if _api_client is None:
+        with _init_lock:
+            if _api_client is None:
+                api_key = os.getenv('OPENAI_API_KEY')
+                if not api_key:
+                    raise ValueError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
+                _api_client = GPTAPIClient(
+                    api_key,
+                    max_workers=Config.OPENAI_MAX_CONCURRENCY,
+                    requests_per_minute=Config.OPENAI_REQUESTS_PER_MINUTE,
+                    tokens_per_minute=Config.OPENAI_TOKENS_PER_MINUTE,
+                    cache=llm_cache,
+                    max_output_tokens=Config.OPENAI_MAX_OUTPUT_TOKENS,
+                    context_tokens=Config.OPENAI_CONTEXT_TOKENS,
+                    max_chunk_tokens=Config.CHUNK_MAX_TOKENS,
+                    structured_output=Config.OPENAI_STRUCTURED_OUTPUT,
+                    content_defined_chunks=Config.CHUNK_CONTENT_DEFINED,
+                    risk_prescreen=Config.RISK_PRESCREEN_ENABLED
+                )
+    return _api_client
 
-# 분석 진행 상황을 저장할 전역 큐
-progress_queue = queue.Queue()
+def get_live_monitor() -> LiveMonitor:
+    """실시간 강의 모드 (구간별 요약/위험 발언 분석과 Discord 알림)"""
+    global _live_monitor
+    if _live_monitor is None:
+        client = get_api_client()
+        with _init_lock:
+            if _live_monitor is None:
+                _live_monitor = LiveMonitor(
+                    client,
+                    get_live_store(),
+                    notifier=discord_notifier,
+                    window_minutes=Config.LIVE_WINDOW_MINUTES,
+                    max_workers=Config.LIVE_MAX_CONCURRENCY
+                )
+    return _live_monitor
+
+# /readyz 응답에 재사용하는 마지막 API 도달 확인 결과
+_readiness = {'ready': False, 'error': None, 'checked_at': None}
+_readiness_checked = 0.0
+_readiness_lock = threading.Lock()
+
+def check_readiness() -> dict:
+    """API 도달 여부 (READINESS_CACHE_SECONDS 동안은 마지막 확인 결과를 그대로 반환)"""
+    global _readiness, _readiness_checked
+    with _readiness_lock:
+        # 확인 중에 들어온 요청은 기다렸다가 같은 결과를 받으므로 동시에 여러 번 확인하지 않음
+        if _readiness['checked_at'] is not None and \
+                time.monotonic() - _readiness_checked < Config.READINESS_CACHE_SECONDS:
+            return dict(_readiness, cached=True)
+        try:
+            get_api_client().check_api(timeout=Config.READINESS_TIMEOUT_SECONDS)
+            ready, error = True, None
+        except Exception as e:
+            ready, error = False, str(e)
+            logger.warning(f"API 도달 확인 실패: {error}")
+        _readiness = {'ready': ready, 'error': error, 'checked_at': time.time()}
+        _readiness_checked = time.monotonic()
+        return dict(_readiness, cached=False)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
@@ -62,17 +151,165 @@ def chat_analysis():
     return render_template('chat_analysis.html')
 
 @app.route('/analysis-progress')
-def analysis_progress():
+@app.route('/analysis-progress/<job_id>')
+def analysis_progress(job_id=None):
+    """작업별 진행 상황 SSE 스트림 (Last-Event-ID 이후 이벤트부터 이어받기 지원)"""
+    job_id = job_id or request.args.get('job_id')
+    if not is_valid_job_id(job_id):
+        return jsonify({'error': '올바른 job_id가 필요합니다.'}), 400
+    
+    last_event_id = parse_last_event_id(
+        request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    )
+    broker = get_progress_broker()
+    
     def generate():
-        while True:
-            try:
-                progress = progress_queue.get(timeout=30)  # 30초 타임아웃
-                yield f"data: {json.dumps(progress)}\n\n"
-            except queue.Empty:
-                break
-    return Response(generate(), mimetype='text/event-stream')
+        yield "retry: 2000\n\n"
+        for event_id, data in broker.subscribe(job_id, last_event_id, idle_timeout=30):  # 30초 타임아웃
+            yield format_sse(event_id, data)
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/healthz')
+def healthz():
+    """프로세스 생존 확인 (외부 API와 저장소는 확인하지 않음)"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    """요청을 받을 준비 확인 (OpenAI API 도달 여부, 결과는 READINESS_CACHE_SECONDS 동안 재사용)"""
+    readiness = check_readiness()
+    return jsonify({'status': 'ready' if readiness['ready'] else 'unavailable', **readiness}), \
+        200 if readiness['ready'] else 503
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus 지표 (단계별 소요 시간, 재시도/실패/토큰 수, 처리 중 요청 수, 진행 상황 대기 이벤트 수)"""
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
+@app.route('/llm-cache/stats')
+def llm_cache_stats():
+    """LLM 응답 캐시 적중/미적중 통계"""
+    if llm_cache is None:
+        return jsonify({'backend': 'none'})
+    return jsonify(llm_cache.stats())
+
+@app.route('/notifications/stats')
+def notification_stats():
+    """Discord 알림 큐 길이, 전송/실패/재시도 횟수, 전송 지연 시간"""
+    if discord_notifier is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **discord_notifier.stats()})
+
+@app.route('/analyses')
+def list_analyses():
+    """저장된 분석 결과 목록 (?type=vtt|chat&limit=50&offset=0)"""
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    return jsonify({'analyses': result_store.list(request.args.get('type'), limit, offset)})
+
+@app.route('/analyses/<int:analysis_id>')
+def get_analysis(analysis_id):
+    """저장된 분석 결과 하나 (청크별 결과, 통합 결과, 달성도, 소요 시간과 화면용 응답)"""
+    record = result_store.get(analysis_id)
+    if record is None:
+        return jsonify({'error': '분석 결과를 찾을 수 없습니다.'}), 404
+    record['response'] = render_result(record)
+    return jsonify(record)
+
+@app.route('/curricula', methods=['POST'])
+def register_curriculum():
+    """커리큘럼 파일(curriculum_file) 등록 (새로 등록하면 201, 같은 파일이 이미 있으면 200)
+
+    응답의 id를 분석 요청의 curriculum_id로 보내면 커리큘럼 파일을 다시 올리지 않아도 됩니다.
+    """
+    curriculum_file = request.files.get('curriculum_file')
+    if curriculum_file is None or curriculum_file.filename == '':
+        return jsonify({'error': '커리큘럼 파일이 없습니다'}), 400
+    try:
+        summary, created = curriculum_registry.register(curriculum_file.filename, curriculum_file.stream.read())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(summary), 201 if created else 200
+
+@app.route('/curricula')
+def list_curricula():
+    """등록된 커리큘럼 목록 (?limit=50&offset=0)"""
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    return jsonify({'curricula': curriculum_registry.list(limit, offset)})
+
+@app.route('/curricula/<curriculum_id>')
+def get_curriculum(curriculum_id):
+    """등록된 커리큘럼 하나 (요약과 파싱 결과)"""
+    record = curriculum_registry.info(curriculum_id)
+    if record is None:
+        return jsonify({'error': '등록된 커리큘럼을 찾을 수 없습니다.'}), 404
+    return jsonify(record)
+
+@app.route('/curricula/<curriculum_id>', methods=['DELETE'])
+def delete_curriculum(curriculum_id):
+    """커리큘럼 등록 삭제"""
+    if not curriculum_registry.delete(curriculum_id):
+        return jsonify({'error': '등록된 커리큘럼을 찾을 수 없습니다.'}), 404
+    return jsonify({'deleted': curriculum_id})
+
+def request_curriculum():
+    """요청의 커리큘럼 (폼의 curriculum_id로 등록된 커리큘럼 또는 curriculum_file 업로드, 둘 다 없으면 None)
+
+    업로드한 파일도 등록소에 등록되므로 같은 파일을 다시 올리면 파싱하지 않습니다.
+    등록되지 않은 curriculum_id면 CurriculumNotFoundError.
+    """
+    curriculum_id = request.form.get('curriculum_id', '').strip()
+    if curriculum_id:
+        return curriculum_registry.get(curriculum_id)
+    curriculum_file = request.files.get('curriculum_file')
+    if curriculum_file is None or curriculum_file.filename == '':
+        return None
+    return curriculum_registry.parse_upload(curriculum_file.filename, curriculum_file.stream)
+
+@app.route('/live/<session_id>/cues', methods=['POST'])
+def live_cues(session_id):
+    """강의 중 자막 묶음 수신 (JSON {"cues": [...]} 또는 WEBVTT 조각)
+
+    LIVE_WINDOW_MINUTES 분량의 발화가 쌓일 때마다 구간 분석이 시작되며, 결과는
+    /analysis-progress/<session_id> 스트림과 /live/<session_id>로 확인합니다.
+    """
+    if not is_valid_job_id(session_id):
+        return jsonify({'error': '올바른 session_id가 필요합니다.'}), 400
+    try:
+        if request.is_json:
+            cues = parse_cue_batch(payload=request.get_json(silent=True))
+        else:
+            cues = parse_cue_batch(text=request.get_data(as_text=True))
+        return jsonify(get_live_monitor().ingest(session_id, cues)), 202
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"실시간 자막 처리 중 오류 발생: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/live/<session_id>')
+def live_status(session_id):
+    """실시간 세션 상태와 구간별 분석 결과"""
+    status = get_live_monitor().status(session_id) if is_valid_job_id(session_id) else None
+    if status is None:
+        return jsonify({'error': '세션을 찾을 수 없습니다.'}), 404
+    return jsonify(status)
+
+@app.route('/live/<session_id>/end', methods=['POST'])
+def live_end(session_id):
+    """실시간 세션 종료 (남은 발화를 마지막 구간으로 넘긴 뒤 세션 상태 반환, 분석이 모두 끝나면 finished)"""
+    status = get_live_monitor().end(session_id) if is_valid_job_id(session_id) else None
+    if status is None:
+        return jsonify({'error': '세션을 찾을 수 없습니다.'}), 404
+    return jsonify(status), 202
 
 @app.route('/analyze_chat', methods=['POST'])
+@track_job('chat')
 def analyze_chat():
     try:
         logger.info("채팅 분석 요청 수신")
@@ -87,814 +324,280 @@ def analyze_chat():
             return jsonify({'error': '채팅 파일이 없습니다'}), 400
             
         chat_file = request.files['file']
+        job_id = get_request_job_id()
         if chat_file.filename == '':
             logger.error("채팅 파일명이 비어있음")
             return jsonify({'error': '채팅 파일이 선택되지 않았습니다'}), 400
 
-        # 채팅 파일 처리
-        chat_filename = secure_filename(chat_file.filename)
-        chat_filepath = os.path.join(app.config['UPLOAD_FOLDER'], chat_filename)
-        chat_file.save(chat_filepath)
-        logger.info(f"채팅 파일 저장 완료: {chat_filepath}")
-        
         try:
-            # 채팅 파일 내용 읽기
-            with open(chat_filepath, 'r', encoding='utf-8') as f:
-                chat_content = f.read()
-            logger.info(f"채팅 파일 내용 읽기 성공 (길이: {len(chat_content)} 문자)")
+            # 업로드 스트림을 저장하지 않고 바로 줄 단위로 읽기 (같은 이름의 동시 업로드도 충돌 없음)
+            chat_content = ingest_transcript(chat_file.stream, Config.MAX_CONTENT_LENGTH)
+            api_client = get_api_client()
+            
+            # 같은 채팅을 같은 설정으로 분석한 결과가 있으면 API를 호출하지 않음
+            result_key = make_result_key(api_client, 'chat', chat_content)
+            stored = result_store.lookup(result_key)
+            if stored is not None:
+                update_progress(job_id, "저장된 분석 결과를 불러왔습니다", done=True)
+                return jsonify(render_result(stored))
+            
+            # API 호출 전에 청크 분할과 사용량 예상 (예산을 넘을 것으로 예상되면 JOB_BUDGET_MODE에 따라 처리)
+            started = time.perf_counter()
+            budget = create_job_budget()
+            plan, estimate = plan_job(api_client, 'chat', chat_content, result_store, budget=budget)
+            if estimate.action == 'abort':
+                raise BudgetExceededError(estimate)
             
-            # API를 통한 분석
-            chat_result = api_client.analyze_text(chat_content, 'chat')
-            logger.info("채팅 분석 완료")
+            # 작업 큐 사용 시 Celery 워커에 분석을 맡기고 task_id만 반환
+            if Config.TASK_QUEUE_ENABLED:
+                task_id = start_chat_workflow(chat_content, progress_job_id=job_id,
+                                              result_key=result_key, filename=chat_file.filename, plan=plan,
+                                              budget=budget)
+                return jsonify({'task_id': task_id, 'job_id': job_id, 'estimate': estimate.to_dict()}), 202
             
-            # 결과를 HTML 형식으로 변환
-            chat_html = format_analysis_result(chat_result, 'chat')
-            return jsonify({
-                'chat_result': chat_html
-            })
+            # API를 통한 분석 (청크 분석이 끝나는 대로 중간 결과를 진행 채널로 발행)
+            run = AnalysisRun('chat', chat_content, plan, budget, result_key, job_id, chat_file.filename,
+                              started, estimate)
+            return jsonify(run_chat_analysis(api_client, run))
             
+        except BudgetExceededError as e:
+            update_progress(job_id, str(e), done=True)
+            return jsonify({'error': str(e), 'estimate': e.estimate.to_dict()}), 413
+        except UploadTooLargeError as e:
+            logger.error(f"업로드 크기 초과: {str(e)}")
+            update_progress(job_id, str(e), done=True)
+            return jsonify({'error': str(e)}), 413
         except Exception as e:
             logger.error(f"처리 중 오류 발생: {str(e)}")
+            update_progress(job_id, f"분석 중 오류 발생: {str(e)}", done=True)
             return jsonify({'error': str(e)}), 500
-        finally:
-            # 임시 파일 삭제
-            try:
-                os.remove(chat_filepath)
-                logger.info("임시 파일 삭제 완료")
-            except Exception as e:
-                logger.warning(f"임시 파일 삭제 실패: {str(e)}")
                 
     except Exception as e:
         logger.error(f"요청 처리 중 예상치 못한 오류 발생: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/analyze_vtt', methods=['POST'])
+@track_job('vtt')
 def analyze_vtt():
     try:
         logger.info("VTT 분석 요청 수신")
+        job_id = get_request_job_id()
         
-        # 파일 처리 및 검증
-        if 'vtt_file' not in request.files or 'curriculum_file' not in request.files:
+        # 파일 처리 및 검증 (커리큘럼은 파일 대신 등록된 curriculum_id로 지정 가능)
+        if 'vtt_file' not in request.files:
             return jsonify({'error': '필요한 파일이 누락되었습니다.'}), 400
             
         vtt_file = request.files['vtt_file']
-        curriculum_file = request.files['curriculum_file']
         
-        if vtt_file.filename == '' or curriculum_file.filename == '':
+        if vtt_file.filename == '':
             return jsonify({'error': '파일이 선택되지 않았습니다.'}), 400
+        
+        curriculum_content = request_curriculum()
+        if curriculum_content is None:
+            return jsonify({'error': '커리큘럼 파일 또는 curriculum_id가 필요합니다.'}), 400
             
-        # 파일 저장
-        vtt_filename = secure_filename(vtt_file.filename)
-        curriculum_filename = secure_filename(curriculum_file.filename)
+        # VTT 업로드 스트림을 저장하지 않고 바로 발화 구간으로 파싱 (원문 전체를 메모리에 올리지 않음)
+        vtt_content = ingest_transcript(vtt_file.stream, Config.MAX_CONTENT_LENGTH)
+        api_client = get_api_client()
         
-        vtt_filepath = os.path.join(app.config['UPLOAD_FOLDER'], vtt_filename)
-        curriculum_filepath = os.path.join(app.config['UPLOAD_FOLDER'], curriculum_filename)
+        # 같은 자막과 커리큘럼을 같은 설정으로 분석한 결과가 있으면 API를 호출하지 않음
+        result_key = make_result_key(api_client, 'vtt', vtt_content, curriculum_content, **curriculum_settings())
+        stored = result_store.lookup(result_key)
+        if stored is not None:
+            update_progress(job_id, "저장된 분석 결과를 불러왔습니다", done=True)
+            return jsonify(render_result(stored))
         
-        vtt_file.save(vtt_filepath)
-        curriculum_file.save(curriculum_filepath)
+        # VTT 내용을 토큰 예산에 맞춰 청크로 분할하고 API 호출 전에 요청 수와 토큰 수 예상
+        # (작업 예산을 넘을 것으로 예상되면 JOB_BUDGET_MODE에 따라 더 큰 청크로 다시 나누거나 거절)
+        started = time.perf_counter()
+        budget = create_job_budget()
+        plan, estimate = plan_job(api_client, 'vtt', vtt_content, result_store, curriculum_content, budget)
+        if estimate.action == 'abort':
+            raise BudgetExceededError(estimate)
         
-        try:
-            # VTT 파일 내용 읽기
-            with open(vtt_filepath, 'r', encoding='utf-8') as f:
-                vtt_content = f.read()
-            
-            # VTT 내용을 청크로 분할
-            chunks = split_vtt_content(vtt_content)
-            total_chunks = len(chunks)
-            
-            # 각 청크 분석
-            analyzed_chunks = []
-            for i, chunk in enumerate(chunks, 1):
-                update_progress(f"청크 {i}/{total_chunks} 분석 중")
-                chunk_result = api_client.analyze_text(chunk, 'vtt')
-                analyzed_chunks.append(chunk_result)
-            
-            update_progress("커리큘럼 매칭 분석 중")
-            # 커리큘럼 파일 처리
-            curriculum_content = process_curriculum_file(curriculum_filepath)
-            
-            # 분석 결과 통합 및 매칭
-            combined_result = combine_analysis_results(analyzed_chunks)
-            curriculum_result = analyze_curriculum_match(combined_result, curriculum_content)
-            
-            # 결과를 HTML 형식으로 변환
-            vtt_html = format_analysis_result(combined_result, 'vtt')
-            
-            return jsonify({
-                'vtt_result': vtt_html,
-                'curriculum_result': curriculum_result
-            })
-            
-        finally:
-            # 임시 파일 삭제
-            try:
-                os.remove(vtt_filepath)
-                os.remove(curriculum_filepath)
-            except Exception as e:
-                logger.warning(f"임시 파일 삭제 실패: {str(e)}")
+        # 작업 큐 사용 시 Celery 워크플로우로 넘기고 task_id 반환
+        if Config.TASK_QUEUE_ENABLED:
+            task_id = start_vtt_workflow(vtt_content, curriculum_content, progress_job_id=job_id,
+                                         result_key=result_key, filename=vtt_file.filename, plan=plan, budget=budget)
+            return jsonify({'task_id': task_id, 'job_id': job_id, 'estimate': estimate.to_dict()}), 202
+        
+        # 청크 분석 → 위험 발언 분류 → 커리큘럼 매칭 → 결과 저장
+        run = AnalysisRun('vtt', vtt_content, plan, budget, result_key, job_id, vtt_file.filename, started, estimate)
+        return jsonify(run_vtt_analysis(api_client, run, curriculum_content))
                 
+    except BudgetExceededError as e:
+        update_progress(job_id, str(e), done=True)
+        return jsonify({'error': str(e), 'estimate': e.estimate.to_dict()}), 413
+    except CurriculumNotFoundError as e:
+        update_progress(job_id, str(e), done=True)
+        return jsonify({'error': str(e)}), 404
+    except UploadTooLargeError as e:
+        logger.error(f"업로드 크기 초과: {str(e)}")
+        update_progress(job_id, str(e), done=True)
+        return jsonify({'error': str(e)}), 413
     except Exception as e:
         logger.error(f"분석 중 오류 발생: {str(e)}")
+        update_progress(job_id, f"분석 중 오류 발생: {str(e)}", done=True)
         return jsonify({'error': str(e)}), 500
 
-def process_curriculum_file(filepath):
-    """커리큘럼 파일(엑셀 또는 JSON)을 처리하여 내용을 반환"""
-    ext = filepath.rsplit('.', 1)[1].lower()
+@app.route('/analyze_vtt/batch', methods=['POST'])
+@track_job('vtt_batch')
+def analyze_vtt_batch():
+    """여러 강의 자막(vtt_files)을 커리큘럼 하나(curriculum_file 또는 curriculum_id)로 한 번에 분석
+
+    커리큘럼은 한 번만 파싱해 모든 강의에 사용하고, 강의별 분석(저장된 결과 조회, 작업 예산
+    확인 포함)은 BATCH_MAX_CONCURRENCY개씩 동시에 수행합니다. 응답은 업로드 순서의 강의별
+    결과(lectures)와 과목 × 날짜 달성도 표(coverage)이며, 날짜는 폼의 days 목록(파일 순서)
+    또는 파일명의 날짜입니다. 작업 큐 사용 시에는 저장된 결과 조회와 예산 확인까지만 하고 나머지
+    강의를 Celery 워크플로우 하나로 넘긴 뒤 task_id를 반환하며(202), 같은 응답은 /status/<task_id>로 조회합니다.
+    """
+    job_id = get_request_job_id()
     try:
-        if ext in ['xlsx', 'xls']:
-            import pandas as pd
-            
-            # 엑셀 파일의 모든 셀 데이터를 읽기
-            df = pd.read_excel(filepath, header=None)
-            
-            # 결과를 저장할 리스트
-            result = []
-            current_subject = None
-            current_details = []
-            
-            # 첫 번째 행이 헤더인지 확인하고 제외할 키워드 목록
-            header_keywords = ['교과목명', '과목명', '교과목', '과목', 'subject']
-            
-            # 모든 행을 순회하면서 과목명과 세부내용 추출
-            for _, row in df.iterrows():
-                # 각 행의 모든 셀을 문자열로 변환하고 빈 셀 제거
-                row_values = [str(cell).strip() for cell in row if str(cell).strip() != 'nan']
-                if not row_values:  # 빈 행 무시
-                    continue
-                
-                # 첫 번째 열이 비어있지 않은 경우, 새로운 과목으로 간주
-                first_cell = str(row[0]).strip()
-                if first_cell != 'nan' and first_cell:
-                    # 헤더로 의심되는 행은 건너뛰기
-                    if any(keyword.lower() in first_cell.lower() for keyword in header_keywords):
-                        continue
-                        
-                    # 이전 과목의 정보가 있으면 저장
-                    if current_subject and current_details:
-                        result.append({
-                            '과목명': current_subject,
-                            '세부내용': current_details
-                        })
-                    # 새로운 과목 시작
-                    current_subject = first_cell
-                    current_details = []
-                    # 같은 행에 세부내용이 있는 경우
-                    if len(row_values) > 1:
-                        current_details.extend(row_values[1:])
-                else:
-                    # 첫 번째 열이 비어있는 경우, 현재 과목의 세부내용으로 추가
-                    if current_subject and row_values:
-                        current_details.extend(row_values)
-            
-            # 마지막 과목 정보 추가
-            if current_subject and current_details:
-                result.append({
-                    '과목명': current_subject,
-                    '세부내용': current_details
-                })
-            
-            if not result:
-                raise ValueError('엑셀 파일에서 과목명과 세부내용을 추출할 수 없습니다.')
-                
-            return result
-            
-        elif ext == 'json':
-            import json
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # JSON 형식 검증
-                if not isinstance(data, list):
-                    raise ValueError('JSON 파일은 객체의 배열이어야 합니다.')
-                
-                result = []
-                for item in data:
-                    if not isinstance(item, dict):
-                        continue
-                    
-                    subject = item.get('subject') or item.get('과목명')
-                    details = item.get('details') or item.get('세부내용')
-                    
-                    if subject and details:
-                        if isinstance(details, str):
-                            details = [details]
-                        elif not isinstance(details, list):
-                            continue
-                            
-                        result.append({
-                            '과목명': subject,
-                            '세부내용': [d for d in details if d]
-                        })
-                return result
-        else:
-            raise ValueError('지원하지 않는 파일 형식입니다')
-            
-    except Exception as e:
-        logger.error(f"커리큘럼 파일 처리 중 오류 발생: {str(e)}")
-        raise ValueError(f"커리큘럼 파일 처리 중 오류가 발생했습니다: {str(e)}")
-
-def analyze_curriculum_match(vtt_result, curriculum_content):
-    """VTT 분석 결과와 커리큘럼을 매칭하여 분석"""
-    # 커리큘럼에서 과목명과 세부내용 추출
-    subjects = []
-    subject_details = {}
-    
-    for item in curriculum_content:
-        subject = None
-        details = None
+        logger.info("VTT 일괄 분석 요청 수신")
+        vtt_files = [f for f in request.files.getlist('vtt_files') + request.files.getlist('vtt_file') if f.filename]
+        if not vtt_files:
+            return jsonify({'error': '필요한 파일이 누락되었습니다.'}), 400
+        if len(vtt_files) > Config.BATCH_MAX_LECTURES:
+            return jsonify({'error': f'한 번에 분석할 수 있는 강의는 최대 {Config.BATCH_MAX_LECTURES}개입니다.'}), 400
+        curriculum_content = request_curriculum()
+        if curriculum_content is None:
+            return jsonify({'error': '커리큘럼 파일 또는 curriculum_id가 필요합니다.'}), 400
         
-        if 'subject' in item and 'details' in item:  # JSON 형식
-            subject = item['subject']
-            details = item['details']
-        elif '과목명' in item and '세부내용' in item:  # 엑셀 형식
-            subject = item['과목명']
-            details = item['세부내용']
-            
-        if subject and details:
-            if subject not in subjects:
-                subjects.append(subject)
-                subject_details[subject] = []
-            # 리스트가 아닌 경우 리스트로 변환
-            if isinstance(details, str):
-                details = [details]
-            subject_details[subject].extend(details)
-    
-    # VTT 내용 분석
-    vtt_sections = vtt_result.split('---')
-    vtt_content = ""
-    for section in vtt_sections:
-        if '주요 내용' in section or '분석' in section:
-            vtt_content += section.replace('# 주요 내용', '').replace('# 분석', '')
-    
-    # 각 과목별 매칭 분석
-    matched_subjects = []
-    details_matches = {}
-    
-    for subject in subjects:
-        # 과목별 세부내용 분석
-        matched_details = []
-        matches_status = []
-        total_score = 0
-        valid_details_count = 0
+        days = request.form.getlist('days')
+        # 업로드는 요청 본문 하나의 스트림이므로 자막 파싱은 순서대로 수행
+        lectures = [
+            {'filename': f.filename,
+             'day': days[i] if i < len(days) and days[i] else lecture_day(f.filename, i),
+             'content': ingest_transcript(f.stream, Config.MAX_CONTENT_LENGTH)}
+            for i, f in enumerate(vtt_files)
+        ]
+        api_client = get_api_client()
+        settings = curriculum_settings()
         
-        # 각 세부내용에 대해 분석
-        for detail in subject_details[subject]:
-            if not detail or str(detail).strip() == 'nan':  # 빈 세부내용 제외
-                continue
-                
-            valid_details_count += 1
-            detail_str = str(detail).strip()
-            
-            # GPT API를 사용하여 세부내용과 VTT 내용의 매칭 분석
-            prompt = f"""
-다음 강의 내용이 특정 교과 세부내용을 다루고 있는지 분석해주세요.
-
-[분석할 교과 세부내용]
-{detail_str}
-
-[강의 내용]
-{vtt_content}
-
-다음 형식으로 응답해주세요:
-1. 달성도 (0-100): 
-   - 이 강의가 해당 세부내용을 얼마나 다루었는지를 백분율로 표현
-   - 직접적이고 상세한 설명이 있으면 90-100점
-   - 직접적인 설명이 있으면 70-89점
-   - 관련 개념이나 응용사례를 다룬 경우 50-69점
-   - 간접적으로 연관된 내용을 다룬 경우 30-49점
-   - 약간의 관련성만 있는 경우 10-29점
-   - 매우 간접적이거나 미미한 관련성이 있는 경우 1-9점
-   - 전혀 다루지 않은 경우 0점
-
-2. 판단 근거:
-   - 강의 내용 중 이 세부내용과 관련된 부분을 구체적으로 설명
-   - 직접적인 언급이 없더라도 연관된 개념이나 사례가 있다면 설명
-   - 매우 간접적이거나 미미한 관련성도 포함하여 설명
-
-주의사항:
-- 형식적인 단어 매칭이 아닌 실질적인 내용의 연관성을 평가해주세요
-- 세부내용의 핵심 개념이나 목표가 조금이라도 다뤄졌다면 매우 관대하게 평가해주세요
-- 직접적인 설명이 아니더라도, 관련 개념이나 응용 사례가 포함되어 있다면 점수를 부여해주세요
-- 매우 간접적이거나 미미한 관련성이라도 발견된다면 최소 1점 이상을 부여해주세요
-- 강의 내용이 해당 세부내용의 일부분만 다루더라도 그 부분에 대해 적절한 점수를 부여해주세요
-"""
-            
+        def analyze(lecture):
             try:
-                analysis = api_client.analyze_text(prompt, 'curriculum')
-                
-                # 분석 결과 파싱
-                lines = analysis.split('\n')
-                detail_score = 0
-                
-                for line in lines:
-                    line = line.strip()
-                    if '달성도' in line:
-                        try:
-                            # 달성도 숫자를 더 정확하게 추출
-                            score_text = line.split(':')[1].strip() if ':' in line else line
-                            # 첫 번째 숫자 찾기
-                            score_match = re.search(r'\d+', score_text)
-                            if score_match:
-                                detail_score = int(score_match.group())
-                                # 점수가 100을 초과하는 경우 100으로 제한
-                                detail_score = min(100, max(0, detail_score))
-                                logger.info(f"추출된 달성도 점수: {detail_score} (원본 텍스트: {line})")
-                        except Exception as e:
-                            logger.error(f"달성도 점수 파싱 오류: {str(e)} (라인: {line})")
-                            detail_score = 0
-                        break
-                
-                # 세부내용 매칭 결과 저장
-                matched_details.append(detail_str)
-                matches_status.append(detail_score >= 20)  # 20% 이상이면 달성으로 판단
-                total_score += detail_score
-                logger.info(f"세부내용 '{detail_str}' 분석 완료 - 점수: {detail_score}")
-                
+                result_key = make_result_key(api_client, 'vtt', lecture['content'], curriculum_content, **settings)
+                stored = result_store.lookup(result_key)
+                if stored is not None:
+                    return render_result(stored)
+                budget = create_job_budget()
+                plan, estimate = plan_job(api_client, 'vtt', lecture['content'], result_store, curriculum_content,
+                                          budget)
+                if estimate.action == 'abort':
+                    raise BudgetExceededError(estimate)
+                if Config.TASK_QUEUE_ENABLED:
+                    return {'queued': {'content': lecture['content'], 'result_key': result_key, 'plan': plan,
+                                       'budget': budget}}
+                run = AnalysisRun('vtt', lecture['content'], plan, budget, result_key,
+                                  filename=lecture['filename'], estimate=estimate)
+                return run_vtt_analysis(api_client, run, curriculum_content)
+            except BudgetExceededError as e:
+                return {'error': str(e), 'estimate': e.estimate.to_dict()}
             except Exception as e:
-                logger.error(f"세부내용 '{detail_str}' 분석 중 오류 발생: {str(e)}")
-                matched_details.append(detail_str)
-                matches_status.append(False)
-                total_score += 0
+                logger.error(f"강의 '{lecture['filename']}' 분석 중 오류 발생: {str(e)}")
+                return {'error': str(e)}
         
-        # 과목 전체 달성도 계산
-        if valid_details_count > 0:
-            # 평균 점수 계산 시 소수점 아래는 버림
-            achievement_rate = int(total_score / valid_details_count)
-            # 최소 1%는 보장하되, 실제 점수가 있는 경우에만
-            achievement_rate = max(1, achievement_rate) if total_score > 0 else 0
-            logger.info(f"과목 '{subject}' 전체 달성도 계산: {achievement_rate}% (총점: {total_score}, 유효 항목 수: {valid_details_count})")
-        else:
-            achievement_rate = 0
-            logger.info(f"과목 '{subject}'의 유효한 세부내용이 없음")
-        
-        matched_subjects.append({
-            'name': subject,
-            'achievement_rate': achievement_rate
-        })
+        update_progress(job_id, f"강의 0/{len(lectures)} 분석 중", stage='lectures')
+        results = [None] * len(lectures)
+        workers = max(1, min(Config.BATCH_MAX_CONCURRENCY, len(lectures)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vtt-batch') as executor:
+            futures = {executor.submit(analyze, lecture): i for i, lecture in enumerate(lectures)}
+            for completed, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                results[i] = {'filename': lectures[i]['filename'], 'day': lectures[i]['day'], **future.result()}
+                if 'queued' not in results[i]:
+                    update_progress(job_id, f"강의 {completed}/{len(lectures)} 분석 완료 ({lectures[i]['filename']})",
+                                    stage='lectures', lecture=i)
         
-        details_matches[subject] = {
-            'matches': matches_status,
-            'detail_texts': matched_details
-        }
-    
-    return {
-        'matched_subjects': matched_subjects,
-        'details_matches': details_matches
-    }
+        # 작업 큐 사용 시 강의별 워크플로우와 달성도 집계를 Celery에 넘기고 task_id 반환
+        if Config.TASK_QUEUE_ENABLED:
+            task_id = start_vtt_batch_workflow(results, curriculum_content, progress_job_id=job_id)
+            return jsonify({'task_id': task_id, 'job_id': job_id}), 202
+        coverage = curriculum_coverage_matrix([(r['day'], r.get('curriculum_result')) for r in results])
+        update_progress(job_id, batch_completion_message(results), done=True)
+        return jsonify({'lectures': results, 'coverage': coverage})
+    
+    except CurriculumNotFoundError as e:
+        update_progress(job_id, str(e), done=True)
+        return jsonify({'error': str(e)}), 404
+    except UploadTooLargeError as e:
+        logger.error(f"업로드 크기 초과: {str(e)}")
+        update_progress(job_id, str(e), done=True)
+        return jsonify({'error': str(e)}), 413
+    except Exception as e:
+        logger.error(f"일괄 분석 중 오류 발생: {str(e)}")
+        update_progress(job_id, f"분석 중 오류 발생: {str(e)}", done=True)
+        return jsonify({'error': str(e)}), 500
 
-def summarize_content(content_list, max_length=800):
-    """여러 내용을 하나로 통합하여 재요약"""
-    if not content_list:
-        return []
-        
-    # 모든 내용을 하나의 문자열로 결합
-    combined_content = "\n".join(content_list)
-    
+@app.route('/analyze_chat/dry-run', methods=['POST'])
+def analyze_chat_dry_run():
+    """채팅 분석 사전 예상치 (API를 호출하지 않음, 폼은 /analyze_chat과 같음)"""
+    chat_file = request.files.get('file')
+    if chat_file is None or chat_file.filename == '':
+        return jsonify({'error': '채팅 파일이 없습니다'}), 400
     try:
-        # GPT API를 통해 재요약
-        prompt = f"""다음 내용을 {max_length}자 이내로 통합하여 요약해주세요. 
-        중요한 내용을 놓치지 않되, 반복되는 내용은 제거하고 핵심적인 내용만 남겨주세요.
-        각 요점은 새로운 줄에 '- '로 시작하도록 해주세요.
-        
-        내용:
-        {combined_content}"""
-        
-        summarized = api_client.analyze_text(prompt, 'summarize')
-        # 결과를 리스트로 변환
-        return [line.strip()[2:] for line in summarized.split('\n') if line.strip().startswith('- ')]
+        chat_content = ingest_transcript(chat_file.stream, Config.MAX_CONTENT_LENGTH)
+        return jsonify(dry_run_report(get_api_client(), 'chat', chat_content))
+    except UploadTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
     except Exception as e:
-        logger.error(f"재요약 중 오류 발생: {str(e)}")
-        return content_list  # 오류 발생 시 원본 내용 반환
+        logger.error(f"채팅 분석 예상치 계산 중 오류 발생: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
-def format_vtt_analysis(content):
-    """VTT 분석 결과를 HTML 형식으로 변환"""
-    logger.info(f"VTT 분석 결과 변환 시작: {content}")
-    
-    # 섹션을 분리 (--- 구분자 기준)
-    sections = content.split('---')
-    logger.info(f"VTT 섹션 분할 결과: {sections}")
-    
-    # HTML 생성
-    html_content = ['<div class="analysis-result">']
-    
-    # 각 섹션의 내용을 저장할 딕셔너리
-    vtt_sections = {
-        '주요 내용': [],
-        '키워드': [],
-        '분석': [],
-        '위험 발언': []
-    }
-    
-    # 각 섹션 처리
-    for section in sections:
-        if not section.strip():
-            continue
-            
-        logger.info(f"처리 중인 VTT 섹션: {section}")
-        
-        # 각 섹션의 내용을 파싱
-        lines = section.strip().split('\n')
-        current_category = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            if line.startswith('# '):
-                current_category = line[2:].strip()  # '#' 제거
-                continue
-            
-            # VTT 분석 결과 처리
-            if current_category in vtt_sections:
-                if line.startswith('- '):
-                    vtt_sections[current_category].append(line[2:].strip())
-                else:
-                    vtt_sections[current_category].append(line.strip())
-    
-    # 주요 내용 섹션
-    if vtt_sections['주요 내용']:
-        html_content.extend([
-            '<div class="category-section">',
-            '    <h2 class="category-title">주요 내용</h2>',
-            '    <div class="main-topics">',
-            f'        <p>{". ".join(vtt_sections["주요 내용"])}</p>',
-            '    </div>',
-            '</div>'
-        ])
-    
-    # 키워드 섹션
-    if vtt_sections['키워드']:
-        html_content.extend([
-            '<div class="category-section">',
-            '    <h2 class="category-title">키워드</h2>',
-            '    <div class="main-topics">',
-            '        <ul class="keyword-list">'
-        ])
-        for keyword in vtt_sections['키워드']:
-            html_content.append(f'            <li>{keyword}</li>')
-        html_content.extend([
-            '        </ul>',
-            '    </div>',
-            '</div>'
-        ])
-    
-    # 분석 섹션
-    if vtt_sections['분석']:
-        html_content.extend([
-            '<div class="category-section">',
-            '    <h2 class="category-title">분석</h2>',
-            '    <div class="main-topics">',
-            f'        <p>{". ".join(vtt_sections["분석"])}</p>',
-            '    </div>',
-            '</div>'
-        ])
-    
-    # 위험 발언 섹션
-    has_real_risks = False
-    risk_items = []
-    
-    for risk in vtt_sections['위험 발언']:
-        # 위험 발언이 없다는 내용의 텍스트는 제외
-        if (risk and 
-            not risk.endswith('없습니다.') and 
-            not risk.startswith('특별한 주의사항이 없') and
-            not '발견되지 않' in risk and
-            not '확인되지 않' in risk and
-            not '포함되어 있지 않' in risk and
-            not '위험한 내용이 없' in risk and
-            not '특별한 위험' in risk and
-            not '부적절한 내용이 없' in risk):
-            risk_items.append(risk)
-            has_real_risks = True
-    
-    html_content.extend([
-        '<div class="category-section risk-section' + (' has-risks' if has_real_risks else ' no-risks') + '">',
-        '    <h2 class="category-title">위험 발언</h2>',
-        '    <div class="risk-summary">',
-        '        <div class="risk-icon">' + ('⚠️' if has_real_risks else '✅') + '</div>',
-        '        <p>' + ('다음과 같은 위험 발언이 감지되었습니다.' if has_real_risks else '위험 발언이 감지되지 않았습니다.') + '</p>',
-        '    </div>'
-    ])
-    
-    if has_real_risks:
-        html_content.extend([
-            '    <ul class="risk-list">'
-        ])
-        for risk in risk_items:
-            html_content.append(f'        <li>{risk}</li>')
-        html_content.append('    </ul>')
-    
-    html_content.append('</div>')
-    html_content.append('</div>')
-    return '\n'.join(html_content)
+@app.route('/analyze_vtt/dry-run', methods=['POST'])
+def analyze_vtt_dry_run():
+    """VTT 분석 사전 예상치 (API를 호출하지 않음, 폼은 /analyze_vtt와 같음)"""
+    vtt_file = request.files.get('vtt_file')
+    if vtt_file is None or vtt_file.filename == '':
+        return jsonify({'error': '필요한 파일이 누락되었습니다.'}), 400
+    try:
+        curriculum_content = request_curriculum()
+        if curriculum_content is None:
+            return jsonify({'error': '커리큘럼 파일 또는 curriculum_id가 필요합니다.'}), 400
+        vtt_content = ingest_transcript(vtt_file.stream, Config.MAX_CONTENT_LENGTH)
+        return jsonify(dry_run_report(get_api_client(), 'vtt', vtt_content, curriculum_content))
+    except CurriculumNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except UploadTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    except Exception as e:
+        logger.error(f"VTT 분석 예상치 계산 중 오류 발생: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
-def format_chat_analysis(content):
-    """채팅 분석 결과를 HTML 형식으로 변환"""
-    logger.info(f"채팅 분석 결과 변환 시작: {content}")
-    
-    # 섹션을 분리 (--- 구분자 기준)
-    sections = content.split('---')
-    logger.info(f"채팅 섹션 분할 결과: {sections}")
-    
-    # HTML 생성
-    html_content = ['<div class="analysis-result">']
-    
-    # 카테고리별로 내용을 저장할 딕셔너리
-    categories = {
-        '주요 대화 주제': [],
-        '수강생 감정/태도 분석': {
-            '1. 긍정적 반응': [],
-            '2. 부정적 반응': [],
-            '3. 질문/요청사항': []
-        },
-        '어려움/불만 상세 분석': {
-            '1. 학습적 어려움': [],
-            '2. 수업 진행 관련 문제': [],
-            '3. 기술적 문제': []
-        },
-        '개선 제안': {
-            '1. 학습 내용 개선': [],
-            '2. 수업 방식 개선': [],
-            '3. 기술적 지원 강화': []
-        },
-        '위험 발언 및 주의사항': [],
-        '종합 제언': []
+def dry_run_report(client, analysis_type, content, curriculum_content=None):
+    """분석 라우트가 API 호출 전에 계산하는 예상치와 예산 (저장된 결과가 있으면 API를 호출하지 않으므로 cached만 표시)"""
+    settings = curriculum_settings() if analysis_type == 'vtt' else {}
+    budget = create_job_budget()
+    report = {
+        'analysis_type': analysis_type,
+        'cached': False,
+        'budget': {'max_requests': budget.max_requests, 'max_tokens': budget.max_tokens,
+                   'mode': Config.JOB_BUDGET_MODE}
     }
-    
-    # 모든 섹션의 내용을 카테고리별로 분류
-    for section in sections:
-        if not section.strip():
-            continue
-            
-        lines = section.strip().split('\n')
-        current_category = None
-        current_subcategory = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            if line.startswith('# '):
-                current_category = line[2:].strip()  # '#' 제거
-                current_subcategory = None
-                continue
-                
-            # 하위 카테고리가 있는 섹션 처리
-            if current_category in ['수강생 감정/태도 분석', '어려움/불만 상세 분석', '개선 제안']:
-                subcategories = categories[current_category]
-                for subcat in subcategories.keys():
-                    if line.startswith(subcat):
-                        current_subcategory = subcat
-                        break
-                if current_subcategory and line.startswith('- '):
-                    # 중복 제거를 위해 이미 있는 항목은 추가하지 않음
-                    if line not in categories[current_category][current_subcategory]:
-                        categories[current_category][current_subcategory].append(line)
-                continue
-            
-            # 다른 카테고리 처리
-            if current_category in categories and isinstance(categories[current_category], list):
-                if line not in categories[current_category]:  # 중복 제거
-                    categories[current_category].append(line)
-    
-    # 주요 대화 주제 섹션
-    if categories['주요 대화 주제']:
-        # 주요 대화 주제를 하나의 문단으로 합치기
-        main_topics = []
-        for item in categories['주요 대화 주제']:
-            if item.startswith('- '):
-                main_topics.append(item[2:].strip())
-            else:
-                main_topics.append(item.strip())
-        
-        html_content.extend([
-            '<div class="category-section">',
-            '    <h2 class="category-title">주요 대화 주제</h2>',
-            '    <div class="main-topics">',
-            f'        <p>{". ".join(main_topics)}</p>',
-            '    </div>',
-            '</div>'
-        ])
-    
-    # 수강생 감정/태도 분석 섹션
-    if any(categories['수강생 감정/태도 분석'].values()):
-        html_content.extend([
-            '<div class="category-section">',
-            '    <h2 class="category-title">수강생 감정/태도 분석</h2>'
-        ])
-        
-        for subcategory, items in categories['수강생 감정/태도 분석'].items():
-            if items:  # 해당 하위 카테고리에 내용이 있는 경우에만 표시
-                html_content.extend([
-                    f'    <div class="subsection">',
-                    f'        <h3 class="subsection-title">{subcategory}</h3>',
-                    f'        <ul class="analysis-list">'
-                ])
-                for item in items:
-                    html_content.append(f'            <li>{item[2:]}</li>')  # '- ' 제거
-                html_content.extend([
-                    '        </ul>',
-                    '    </div>'
-                ])
-        
-        html_content.append('</div>')
-    
-    # 어려움/불만 상세 분석 섹션
-    if any(categories['어려움/불만 상세 분석'].values()):
-        html_content.extend([
-            '<div class="category-section">',
-            '    <h2 class="category-title">어려움/불만 상세 분석</h2>'
-        ])
-        
-        for subcategory, items in categories['어려움/불만 상세 분석'].items():
-            if items:  # 해당 하위 카테고리에 내용이 있는 경우에만 표시
-                html_content.extend([
-                    f'    <div class="subsection">',
-                    f'        <h3 class="subsection-title">{subcategory}</h3>',
-                    f'        <ul class="analysis-list">'
-                ])
-                for item in items:
-                    html_content.append(f'            <li>{item[2:]}</li>')  # '- ' 제거
-                html_content.extend([
-                    '        </ul>',
-                    '    </div>'
-                ])
-        
-        html_content.append('</div>')
-    
-    # 개선 제안 섹션
-    if any(categories['개선 제안'].values()):
-        html_content.extend([
-            '<div class="category-section">',
-            '    <h2 class="category-title">개선 제안</h2>'
-        ])
-        
-        for subcategory, items in categories['개선 제안'].items():
-            if items:  # 해당 하위 카테고리에 내용이 있는 경우에만 표시
-                html_content.extend([
-                    f'    <div class="subsection">',
-                    f'        <h3 class="subsection-title">{subcategory}</h3>',
-                    f'        <ul class="analysis-list">'
-                ])
-                for item in items:
-                    html_content.append(f'            <li>{item[2:]}</li>')  # '- ' 제거
-                html_content.extend([
-                    '        </ul>',
-                    '    </div>'
-                ])
-        
-        html_content.append('</div>')
-    
-    # 위험 발언 및 주의사항 섹션
-    risk_items = []
-    has_real_risks = False
-    
-    for item in categories['위험 발언 및 주의사항']:
-        item = item.strip()
-        # 위험 발언이 없다는 내용의 텍스트는 제외
-        if (item and 
-            not item.endswith('없습니다.') and 
-            not item.startswith('특별한 주의사항이 없') and
-            not '발견되지 않' in item and
-            not '확인되지 않' in item and
-            not '포함되어 있지 않' in item and
-            not '위험한 내용이 없' in item and
-            not '특별한 위험' in item and
-            not '부적절한 내용이 없' in item):
-            risk_items.append(item)
-            has_real_risks = True
-    
-    if has_real_risks and risk_items:  # 실제 위험 발언이 있는 경우에만
-        html_content.extend([
-            '<div class="category-section risk-section">',
-            '    <h2 class="category-title">위험 발언 및 주의사항</h2>',
-            '    <div class="risk-summary">',
-            '        <div class="risk-icon">⚠️</div>',
-            '        <p>채팅에서 다음과 같은 위험 발언이 감지되었습니다.</p>',
-            '    </div>',
-            '    <ul class="risk-list">'
-        ])
-        for item in risk_items:
-            html_content.append(f'        <li>{item}</li>')
-        html_content.extend([
-            '    </ul>',
-            '</div>'
-        ])
-    elif any(categories.values()):  # 다른 카테고리에 내용이 있는 경우에만
-        # 위험 발언이 없는 경우
-        html_content.extend([
-            '<div class="category-section risk-section safe">',
-            '    <h2 class="category-title">위험 발언 및 주의사항</h2>',
-            '    <div class="risk-summary">',
-            '        <div class="risk-icon">✅</div>',
-            '        <p>채팅에서 특별한 위험 발언이 감지되지 않았습니다.</p>',
-            '    </div>',
-            '</div>'
-        ])
-    
-    # 종합 제언 섹션
-    if categories['종합 제언']:
-        # 종합 제언을 하나의 문단으로 합치기
-        recommendations = []
-        for item in categories['종합 제언']:
-            if item.startswith('- '):
-                recommendations.append(item[2:].strip())
-            else:
-                recommendations.append(item.strip())
-        
-        html_content.extend([
-            '<div class="category-section">',
-            '    <h2 class="category-title">종합 제언</h2>',
-            '    <div class="main-topics">',
-            f'        <p>{". ".join(recommendations)}</p>',
-            '    </div>',
-            '</div>'
-        ])
-    
-    html_content.append('</div>')
-    return '\n'.join(html_content)
-
-def format_analysis_result(content, analysis_type='chat'):
-    """분석 결과를 HTML 형식으로 변환"""
-    if analysis_type == 'vtt':
-        return format_vtt_analysis(content)
-    else:
-        return format_chat_analysis(content)
-
-def format_list_items(content):
-    """목록 항목을 HTML 형식으로 변환"""
-    items = []
-    for line in content.split(chr(10)):  # chr(10)은 '\n'과 동일
-        line = line.strip()
-        if line.startswith('- '):
-            items.append(f'<li>{line[2:].strip()}</li>')
-        elif line.startswith('• '):
-            items.append(f'<li>{line[2:].strip()}</li>')
-        elif line:  # 일반 텍스트인 경우
-            items.append(f'<li>{line}</li>')
-    return '\n'.join(items)
-
-def update_progress(message):
-    """분석 진행 상황을 큐에 추가"""
-    progress_queue.put({'message': message})
-
-def split_vtt_content(content, chunk_size=5000):
-    """VTT 내용을 청크로 분할"""
-    words = content.split()
-    chunks = []
-    current_chunk = []
-    current_size = 0
-    
-    for word in words:
-        word_size = len(word) + 1  # 공백 포함
-        if current_size + word_size > chunk_size and current_chunk:
-            chunks.append(' '.join(current_chunk))
-            current_chunk = [word]
-            current_size = word_size
-        else:
-            current_chunk.append(word)
-            current_size += word_size
-    
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
-    
-    return chunks
-
-def combine_analysis_results(results):
-    """여러 청크의 분석 결과를 하나로 통합"""
-    combined = {
-        '주요 내용': [],
-        '키워드': set(),
-        '분석': [],
-        '위험 발언': []
-    }
-    
-    for result in results:
-        sections = result.split('---')
-        current_category = None
-        
-        for section in sections:
-            lines = section.strip().split('\n')
-            for line in lines:
-                line = line.strip()
-                if line.startswith('# '):
-                    current_category = line[2:].strip()
-                    continue
-                if line and current_category in combined:
-                    if current_category == '키워드':
-                        combined[current_category].update(line.split(', '))
-                    else:
-                        combined[current_category].append(line)
-    
-    # 키워드를 리스트로 변환하고 정렬
-    combined['키워드'] = sorted(list(combined['키워드']))
-    
-    # 결과를 문자열로 변환
-    return '\n---\n'.join([
-        f"# {category}\n" + '\n'.join(items if isinstance(items, list) else [items])
-        for category, items in combined.items()
-    ])
+    if result_store.lookup(make_result_key(client, analysis_type, content, curriculum_content, **settings)):
+        report['cached'] = True
+        return report
+    _, estimate = plan_job(client, analysis_type, content, result_store, curriculum_content, budget)
+    report['estimate'] = estimate.to_dict()
+    return report
+
+@app.route('/status/<task_id>')
+def task_status(task_id):
+    """Celery 분석 작업의 상태와 단계별 진행 상황 조회"""
+    try:
+        return jsonify(get_job_status(task_id))
+    except Exception as e:
+        logger.error(f"작업 상태 조회 실패: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def get_request_job_id():
+    """요청 폼의 job_id (클라이언트가 진행 상황 구독에 사용하는 id, 없거나 잘못되면 None)"""
+    job_id = request.form.get('job_id')
+    return job_id if is_valid_job_id(job_id) else None
+
+def update_progress(job_id, message, done=False, **extra):
+    """작업별 진행 상황 채널에 메시지 발행"""
+    publish_progress(job_id, message, done=done, **extra)
 
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""ASGI 진입점
+
+분석 라우트(/analyze_vtt, /analyze_chat)와 진행 상황 스트림(/analysis-progress)은
+AsyncGPTAPIClient를 사용하는 비동기 핸들러로 처리하고(작업 큐를 쓰면 Flask 라우트처럼 Celery
+워크플로우에 넘기고 task_id만 반환), 나머지 라우트는 기존 Flask 앱을
+그대로 마운트합니다. 워커 하나가 여러 분석 요청과 SSE 스트림을 동시에 처리할 수 있습니다.
+
+분석 파이프라인은 Flask 라우트와 같은 app.pipeline을 사용하며, 진행 상황 발행(Redis)이나
+저장소 접근처럼 막히는 작업은 스레드 풀에서 수행합니다.
+
+실행 예시:
+    SERVER_MODE=asgi gunicorn -c gunicorn_config.py
+"""
+import os
+import time
+import logging
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.wsgi import WSGIMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from app.app import (
+    app as flask_app,
+    llm_cache,
+    result_store,
+    curriculum_registry,
+    update_progress
+)
+from app.async_gpt_client import AsyncGPTAPIClient
+from app.config import Config
+from app.progress import get_progress_broker, is_valid_job_id, parse_last_event_id, format_sse
+from app.ingest import ingest_transcript, UploadTooLargeError
+from app.result_store import make_result_key, curriculum_settings, render_result
+from app.pipeline import AnalysisRun, run_chat_analysis_async, run_vtt_analysis_async
+from app.tasks import start_vtt_workflow, start_chat_workflow
+from app.metrics import track_job
+from app.budget import BudgetExceededError, create_job_budget, plan_job
+from app.curriculum_registry import CurriculumNotFoundError
+
+logger = logging.getLogger(__name__)
+
+# 비동기 API 클라이언트는 첫 분석 요청에서 생성 (워커 기동 시 openai 모듈을 가져오지 않음)
+_async_client = None
+
+def get_async_client() -> AsyncGPTAPIClient:
+    """워커마다 한 번만 생성되는 비동기 API 클라이언트 (OPENAI_API_KEY가 없으면 ValueError)"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncGPTAPIClient(
+            os.getenv('OPENAI_API_KEY'),
+            max_workers=Config.OPENAI_MAX_CONCURRENCY,
+            requests_per_minute=Config.OPENAI_REQUESTS_PER_MINUTE,
+            tokens_per_minute=Config.OPENAI_TOKENS_PER_MINUTE,
+            cache=llm_cache,
+            max_output_tokens=Config.OPENAI_MAX_OUTPUT_TOKENS,
+            context_tokens=Config.OPENAI_CONTEXT_TOKENS,
+            max_chunk_tokens=Config.CHUNK_MAX_TOKENS,
+            structured_output=Config.OPENAI_STRUCTURED_OUTPUT,
+            content_defined_chunks=Config.CHUNK_CONTENT_DEFINED,
+            risk_prescreen=Config.RISK_PRESCREEN_ENABLED
+        )
+    return _async_client
+
+async def close_async_client():
+    if _async_client is not None:
+        await _async_client.aclose()
+
+async def read_upload_transcript(upload):
+    """업로드 파일(스풀링된 임시 파일)을 스레드 풀에서 줄 단위로 읽어 발화 구간으로 파싱"""
+    return await run_in_threadpool(ingest_transcript, upload.file, Config.MAX_CONTENT_LENGTH)
+
+async def read_curriculum(form):
+    """폼의 커리큘럼 (등록된 curriculum_id 또는 curriculum_file 업로드를 스레드 풀에서 파싱, 둘 다 없으면 None)
+
+    업로드한 파일은 저장하지 않고 바로 읽으며, 등록소에 같은 파일이 있으면 파싱하지 않습니다.
+    """
+    curriculum_id = (form.get('curriculum_id') or '').strip()
+    if curriculum_id:
+        return await run_in_threadpool(curriculum_registry.get, curriculum_id)
+    upload = form.get('curriculum_file')
+    if not hasattr(upload, 'filename') or upload.filename == '':
+        return None
+    return await run_in_threadpool(curriculum_registry.parse_upload, upload.filename, upload.file)
+
+async def lookup_result(analysis_type, content, curriculum_content=None, **settings):
+    """결과 키를 만들고 저장된 결과를 스레드 풀에서 조회 ((결과 키, 저장된 결과 또는 None))"""
+    def lookup():
+        key = make_result_key(get_async_client(), analysis_type, content, curriculum_content, **settings)
+        return key, result_store.lookup(key)
+    return await run_in_threadpool(lookup)
+
+async def plan_budgeted_job(async_client, analysis_type, content, curriculum_content=None):
+    """스레드 풀에서 분할 계획과 예상치 계산 ((분할 계획, 예상치, 작업 예산), 예산 초과로 거절하면 BudgetExceededError)"""
+    budget = create_job_budget()
+    plan, estimate = await run_in_threadpool(
+        plan_job, async_client, analysis_type, content, result_store, curriculum_content, budget
+    )
+    if estimate.action == 'abort':
+        raise BudgetExceededError(estimate)
+    return plan, estimate, budget
+
+def queued_response(task_id, job_id, estimate):
+    """작업 큐에 넘긴 분석의 응답 (Flask 라우트와 같은 202 + task_id)"""
+    return JSONResponse({'task_id': task_id, 'job_id': job_id, 'estimate': estimate.to_dict()}, status_code=202)
+
+async def update_progress_async(job_id, message, done=False, **extra):
+    """진행 상황 발행 (Redis 발행이 이벤트 루프를 막지 않도록 스레드 풀에서 수행)"""
+    if job_id:
+        await run_in_threadpool(update_progress, job_id, message, done, **extra)
+
+async def budget_error_response(job_id, error):
+    await update_progress_async(job_id, str(error), done=True)
+    return JSONResponse({'error': str(error), 'estimate': error.estimate.to_dict()}, status_code=413)
+
+def form_job_id(form):
+    """폼의 job_id (없거나 잘못되면 None)"""
+    job_id = form.get('job_id')
+    return job_id if isinstance(job_id, str) and is_valid_job_id(job_id) else None
+
+async def analysis_progress(request):
+    """작업별 진행 상황 SSE 스트림 (Last-Event-ID 이후 이벤트부터 이어받기 지원)"""
+    job_id = request.path_params.get('job_id') or request.query_params.get('job_id')
+    if not is_valid_job_id(job_id):
+        return JSONResponse({'error': '올바른 job_id가 필요합니다.'}, status_code=400)
+
+    last_event_id = parse_last_event_id(
+        request.headers.get('last-event-id') or request.query_params.get('last_event_id')
+    )
+    broker = get_progress_broker()
+
+    async def generate():
+        yield "retry: 2000\n\n"
+        async for event_id, data in broker.subscribe_async(job_id, last_event_id, idle_timeout=30):
+            yield format_sse(event_id, data)
+    return StreamingResponse(generate(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@track_job('chat')
+async def analyze_chat(request):
+    job_id = None
+    try:
+        logger.info("채팅 분석 요청 수신 (ASGI)")
+        form = await request.form()
+        job_id = form_job_id(form)
+        chat_file = form.get('file')
+        if chat_file is None or not hasattr(chat_file, 'filename'):
+            logger.error("채팅 파일이 요청에 포함되지 않음")
+            return JSONResponse({'error': '채팅 파일이 없습니다'}, status_code=400)
+        if chat_file.filename == '':
+            logger.error("채팅 파일명이 비어있음")
+            return JSONResponse({'error': '채팅 파일이 선택되지 않았습니다'}, status_code=400)
+
+        chat_content = await read_upload_transcript(chat_file)
+        async_client = get_async_client()
+        result_key, stored = await lookup_result('chat', chat_content)
+        if stored is not None:
+            await update_progress_async(job_id, "저장된 분석 결과를 불러왔습니다", done=True)
+            return JSONResponse(render_result(stored))
+
+        started = time.perf_counter()
+        plan, estimate, budget = await plan_budgeted_job(async_client, 'chat', chat_content)
+        # 작업 큐 사용 시 Celery 워커에 분석을 맡기고 task_id만 반환 (웹 프로세스에서 API를 호출하지 않음)
+        if Config.TASK_QUEUE_ENABLED:
+            task_id = await run_in_threadpool(start_chat_workflow, chat_content, progress_job_id=job_id,
+                                              result_key=result_key, filename=chat_file.filename, plan=plan,
+                                              budget=budget)
+            return queued_response(task_id, job_id, estimate)
+        run = AnalysisRun('chat', chat_content, plan, budget, result_key, job_id, chat_file.filename, started,
+                          estimate)
+        return JSONResponse(await run_chat_analysis_async(async_client, run))
+
+    except BudgetExceededError as e:
+        return await budget_error_response(job_id, e)
+    except UploadTooLargeError as e:
+        await update_progress_async(job_id, str(e), done=True)
+        return JSONResponse({'error': str(e)}, status_code=413)
+    except Exception as e:
+        logger.error(f"요청 처리 중 예상치 못한 오류 발생: {str(e)}")
+        await update_progress_async(job_id, f"분석 중 오류 발생: {str(e)}", done=True)
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+@track_job('vtt')
+async def analyze_vtt(request):
+    job_id = None
+    try:
+        logger.info("VTT 분석 요청 수신 (ASGI)")
+        form = await request.form()
+        job_id = form_job_id(form)
+        vtt_file = form.get('vtt_file')
+
+        if not hasattr(vtt_file, 'filename'):
+            return JSONResponse({'error': '필요한 파일이 누락되었습니다.'}, status_code=400)
+        if vtt_file.filename == '':
+            return JSONResponse({'error': '파일이 선택되지 않았습니다.'}, status_code=400)
+
+        # 커리큘럼은 파일 대신 등록된 curriculum_id로 지정 가능
+        curriculum_content = await read_curriculum(form)
+        if curriculum_content is None:
+            return JSONResponse({'error': '커리큘럼 파일 또는 curriculum_id가 필요합니다.'}, status_code=400)
+        vtt_content = await read_upload_transcript(vtt_file)
+        async_client = get_async_client()
+        result_key, stored = await lookup_result('vtt', vtt_content, curriculum_content, **curriculum_settings())
+        if stored is not None:
+            await update_progress_async(job_id, "저장된 분석 결과를 불러왔습니다", done=True)
+            return JSONResponse(render_result(stored))
+
+        started = time.perf_counter()
+        plan, estimate, budget = await plan_budgeted_job(async_client, 'vtt', vtt_content, curriculum_content)
+        if Config.TASK_QUEUE_ENABLED:
+            task_id = await run_in_threadpool(start_vtt_workflow, vtt_content, curriculum_content,
+                                              progress_job_id=job_id, result_key=result_key,
+                                              filename=vtt_file.filename, plan=plan, budget=budget)
+            return queued_response(task_id, job_id, estimate)
+        run = AnalysisRun('vtt', vtt_content, plan, budget, result_key, job_id, vtt_file.filename, started, estimate)
+        return JSONResponse(await run_vtt_analysis_async(async_client, run, curriculum_content))
+
+    except BudgetExceededError as e:
+        return await budget_error_response(job_id, e)
+    except CurriculumNotFoundError as e:
+        await update_progress_async(job_id, str(e), done=True)
+        return JSONResponse({'error': str(e)}, status_code=404)
+    except UploadTooLargeError as e:
+        await update_progress_async(job_id, str(e), done=True)
+        return JSONResponse({'error': str(e)}, status_code=413)
+    except Exception as e:
+        logger.error(f"분석 중 오류 발생: {str(e)}")
+        await update_progress_async(job_id, f"분석 중 오류 발생: {str(e)}", done=True)
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+application = Starlette(
+    routes=[
+        Route('/analysis-progress', analysis_progress),
+        Route('/analysis-progress/{job_id}', analysis_progress),
+        Route('/analyze_chat', analyze_chat, methods=['POST']),
+        Route('/analyze_vtt', analyze_vtt, methods=['POST']),
+        # 그 외 페이지/정적 파일은 기존 Flask 앱이 처리
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ],
+    on_shutdown=[close_async_client]
+)
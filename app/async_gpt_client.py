@@ -0,0 +1,285 @@
+import json
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+from tenacity import retry, stop_after_attempt, wait_exponential
+from app.gpt_client import BaseGPTClient, estimate_tokens, function_cache_format, response_options, response_text
+from app.schemas import STRUCTURED_TYPES
+from app.rate_limiter import RateLimiter
+from app.llm_cache import BaseLLMCache, make_cache_key
+from app.metrics import (
+    count_retry, observe_stage, record_chunk_failure, record_llm_error, record_usage, timed
+)
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], Union[None, Awaitable[None]]]
+ResultCallback = Callable[[int, object], Union[None, Awaitable[None]]]
+
+async def _maybe_await(outcome):
+    """콜백이 코루틴 함수이면 완료될 때까지 대기 (일반 함수도 허용)"""
+    if asyncio.iscoroutine(outcome):
+        await outcome
+
+class AsyncGPTAPIClient(BaseGPTClient):
+    """httpx.AsyncClient 기반 GPT API 클라이언트
+
+    GPTAPIClient와 같은 메서드 구성을 가지며, 하나의 이벤트 루프에서 여러 분석 요청을
+    동시에 처리할 수 있도록 모든 API 호출을 비동기로 수행합니다.
+    """
+
+    def __init__(self, api_key, max_workers: int = 4,
+                 requests_per_minute: int = 3500, tokens_per_minute: int = 90000,
+                 cache: Optional[BaseLLMCache] = None, max_output_tokens: int = 2000,
+                 context_tokens: Optional[int] = None, max_chunk_tokens: Optional[int] = None,
+                 structured_output: bool = False, content_defined_chunks: bool = False,
+                 risk_prescreen: bool = False):
+        """비동기 GPT API 클라이언트 초기화"""
+        if not api_key:
+            raise ValueError("API 키가 제공되지 않았습니다.")
+
+        super().__init__(max_output_tokens, context_tokens, max_chunk_tokens, structured_output,
+                         content_defined_chunks, risk_prescreen)
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.cache = cache
+
+        import httpx
+        from openai import AsyncOpenAI
+
+        # httpx 비동기 클라이언트 설정 (동시 연결은 이벤트 루프에서 다중화됨)
+        http_client = httpx.AsyncClient(timeout=httpx.Timeout(120.0, connect=10.0))
+
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=http_client
+        )
+
+        self.logger.info(f"AsyncGPTAPIClient 초기화 완료 (모델: {self.model}, 요청당 동시 작업 수: {self.max_workers})")
+
+    async def make_request(self, prompt: str, max_tokens: int = 2000, use_cache: bool = True,
+                           json_mode: bool = False) -> Optional[str]:
+        """GPT API 요청 수행 (캐시에 같은 요청의 응답이 있으면 API를 호출하지 않음)
+
+        json_mode가 True이면 응답을 JSON 객체로 받도록 요청합니다 (프롬프트에 JSON 형식 안내 필요).
+        """
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = make_cache_key(self.model, prompt, self.temperature, max_tokens,
+                                       'json_object' if json_mode else None)
+            cached = await self._cache_call(self.cache.get, cache_key)
+            if cached is not None:
+                self.logger.info(f"캐시 적중 (프롬프트 길이: {len(prompt)} 문자)")
+                return cached
+        
+        result = await self._request_completion(prompt, max_tokens, json_mode)
+        if cache_key is not None:
+            await self._cache_call(self.cache.set, cache_key, result)
+        return result
+
+    async def make_structured_request(self, prompt: str, result_type, max_tokens: int = 2000,
+                                      use_cache: bool = True, function: Optional[dict] = None):
+        """GPTAPIClient.make_structured_request의 비동기 버전"""
+        function = function or result_type.FUNCTION
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = make_cache_key(self.model, prompt, self.temperature, max_tokens,
+                                       function_cache_format(function, result_type))
+            cached = await self._cache_call(self.cache.get, cache_key)
+            if cached is not None:
+                try:
+                    result = result_type.from_dict(json.loads(cached))
+                    self.logger.info(f"캐시 적중 (프롬프트 길이: {len(prompt)} 문자)")
+                    return result
+                except ValueError:
+                    pass
+
+        for attempt in range(1, 3):
+            raw = await self._request_completion(prompt, max_tokens, function=function)
+            try:
+                result = result_type.from_dict(json.loads(raw))
+                break
+            except ValueError as e:
+                if attempt == 2:
+                    raise ValueError(f"구조화 응답 검증 실패: {str(e)}")
+                self.logger.warning(f"구조화 응답 검증 실패, 다시 요청합니다: {str(e)}")
+                count_retry(reason='validation')
+
+        if cache_key is not None:
+            await self._cache_call(self.cache.set, cache_key, raw)
+        return result
+
+    async def _cache_call(self, func, *args):
+        """캐시 조회/저장을 스레드에서 수행 (캐시 오류는 요청 실패로 이어지지 않음)"""
+        try:
+            return await asyncio.to_thread(func, *args)
+        except Exception as e:
+            self.logger.warning(f"LLM 캐시 처리 실패: {str(e)}")
+            return None
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=count_retry,
+        reraise=True
+    )
+    async def _request_completion(self, prompt: str, max_tokens: int = 2000, json_mode: bool = False,
+                                  function: Optional[dict] = None) -> Optional[str]:
+        """GPT API 비동기 요청 수행 (function이 있으면 해당 함수 호출을 강제하고 인자 JSON을 반환)"""
+        self.logger.info(f"비동기 API 요청 시작 (프롬프트 길이: {len(prompt)} 문자)")
+
+        await self.rate_limiter.acquire_async(estimate_tokens(prompt) + max_tokens)
+
+        # 응답 형식 지정 (함수 호출 또는 JSON 모드)
+        options = response_options(json_mode, function)
+
+        try:
+            with observe_stage('make_request'):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    **options
+                )
+            record_usage(response)
+
+            if response and response.choices:
+                result = response_text(response.choices[0].message, function)
+                self.logger.info("비동기 API 요청 성공")
+                return result
+            else:
+                self.logger.error("API 응답이 비어있음")
+                raise Exception("API 응답이 비어있습니다")
+
+        except Exception as e:
+            self.logger.error(f"비동기 API 요청 실패: {str(e)}")
+            record_llm_error(e)
+            raise
+
+    @timed('analyze_text')
+    async def analyze_chunk(self, chunk: str, index: int, analysis_type: str = 'vtt',
+                            structured: Optional[bool] = None, budget=None):
+        """단일 청크 분석 (반환값과 budget은 GPTAPIClient.analyze_chunk와 같음)"""
+        if structured is None:
+            structured = self.structured_output
+        result_type = STRUCTURED_TYPES.get(analysis_type) if structured else None
+        if budget is not None and not budget.charge(self.chunk_request_tokens(chunk, analysis_type)):
+            return None if result_type else f"[청크 {index} 분석 생략: 작업 예산 초과]"
+        try:
+            if result_type:
+                return await self.make_structured_request(
+                    self.build_structured_prompt(chunk, analysis_type), result_type, max_tokens=self.max_output_tokens,
+                    function=self.chunk_function(analysis_type)
+                )
+            result = await self.make_request(self.build_prompt(chunk, analysis_type), max_tokens=self.max_output_tokens)
+            if result:
+                return result
+            record_chunk_failure(analysis_type)
+            return f"[청크 {index} 분석 실패]"
+        except Exception as e:
+            logger.error(f"청크 {index} 분석 중 오류 발생: {str(e)}")
+            record_chunk_failure(analysis_type)
+            if result_type:
+                return None
+            return f"[청크 {index} 분석 오류: {str(e)}]"
+
+    async def analyze_texts(self, texts: List[str], analysis_type: str = 'vtt',
+                            progress_callback: Optional[ProgressCallback] = None) -> List[str]:
+        """여러 텍스트를 동시에 분석 (GPTAPIClient.analyze_texts의 비동기 버전)
+
+        요청 하나가 동시에 보내는 API 호출 수는 max_workers로 제한됩니다.
+        progress_callback은 일반 함수나 코루틴 함수 모두 사용할 수 있습니다.
+        """
+        logger.info(f"비동기 텍스트 분석 시작 (유형: {analysis_type}, 텍스트 수: {len(texts)})")
+
+        jobs = self.plan_chunk_jobs(texts, analysis_type)
+        results = await self._run_jobs(jobs, analysis_type, progress_callback, structured=False)
+
+        logger.info("비동기 텍스트 분석 완료")
+        return self.group_chunk_results(jobs, results, len(texts))
+
+    async def analyze_chunks(self, chunks: List[str], analysis_type: str = 'vtt',
+                             progress_callback: Optional[ProgressCallback] = None,
+                             result_callback: Optional[ResultCallback] = None, budget=None) -> List[str]:
+        """이미 분할된 청크(ChunkPlan.texts)를 다시 나누지 않고 청크별로 분석 (GPTAPIClient.analyze_chunks 참고)"""
+        logger.info(f"비동기 청크 분석 시작 (유형: {analysis_type}, 청크 수: {len(chunks)})")
+        jobs = [(0, i, chunk) for i, chunk in enumerate(chunks, 1)]
+        results = await self._run_jobs(jobs, analysis_type, progress_callback, result_callback=result_callback,
+                                       budget=budget)
+        logger.info("비동기 청크 분석 완료")
+        return results
+
+    async def _run_jobs(self, jobs, analysis_type, progress_callback, structured=None, result_callback=None,
+                        budget=None):
+        """청크 작업 목록을 동시에 처리 (요청 하나의 동시 호출 수는 max_workers로 제한)"""
+        total = len(jobs)
+        semaphore = asyncio.Semaphore(self.max_workers)
+        completed = 0
+
+        async def run(job):
+            nonlocal completed
+            text_index, i, chunk = job
+            async with semaphore:
+                logger.info(f"청크 {i} 분석 중 (텍스트 {text_index + 1})")
+                result = await self.analyze_chunk(chunk, i, analysis_type, structured, budget)
+            completed += 1
+            if result_callback:
+                await _maybe_await(result_callback(i, result))
+            if progress_callback:
+                await _maybe_await(progress_callback(completed, total))
+            return result
+
+        # gather는 입력 순서대로 결과를 반환하므로 청크 순서가 유지됨
+        return list(await asyncio.gather(*(run(job) for job in jobs)))
+
+    async def complete_prompts(self, requests: List[Tuple[str, int]], json_mode: bool = False, result_type=None,
+                               result_callback: Optional[ResultCallback] = None, budget=None) -> list:
+        """GPTAPIClient.complete_prompts의 비동기 버전"""
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def request_one(request):
+            prompt, max_tokens = request
+            async with semaphore:
+                if budget is not None and not budget.charge(estimate_tokens(prompt) + max_tokens):
+                    return None
+                try:
+                    if result_type is not None:
+                        return await self.make_structured_request(prompt, result_type, max_tokens=max_tokens)
+                    return await self.make_request(prompt, max_tokens=max_tokens, json_mode=json_mode)
+                except Exception as e:
+                    logger.error(f"프롬프트 요청 실패: {str(e)}")
+                    return None
+
+        async def run(position, request):
+            result = await request_one(request)
+            if result_callback:
+                await _maybe_await(result_callback(position, result))
+            return result
+
+        return list(await asyncio.gather(*(run(position, request) for position, request in enumerate(requests))))
+
+    async def analyze_text(self, text: str, analysis_type: str = 'vtt') -> str:
+        """텍스트 분석을 수행"""
+        try:
+            return (await self.analyze_texts([text], analysis_type))[0]
+        except Exception as e:
+            logger.error(f"분석 중 예상치 못한 오류 발생: {str(e)}")
+            return f"분석 중 오류 발생: {str(e)}"
+
+    async def test_connection(self) -> bool:
+        """API 연결 테스트"""
+        try:
+            logger.info("비동기 API 연결 테스트 시작")
+            result = await self.make_request("안녕하세요", max_tokens=10, use_cache=False)
+            return bool(result)
+        except Exception as e:
+            logger.error(f"API 연결 테스트 실패: {str(e)}")
+            return False
+
+    async def aclose(self):
+        """내부 HTTP 연결 정리"""
+        await self.client.close()
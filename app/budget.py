@@ -0,0 +1,355 @@
+"""분석 작업 하나의 API 사용 예산과 사전 예상치
+
+분석을 시작하기 전에 API 호출 없이 청크 수, 요청 수, 토큰 수, 예상 비용과 소요 시간을
+계산하고(JobEstimate), 예산(JOB_MAX_REQUESTS, JOB_MAX_TOKENS)을 넘을 것으로 예상되면
+JOB_BUDGET_MODE에 따라 더 큰 청크로 다시 나눠 요청 수를 줄이거나(degrade) 분석을
+시작하지 않습니다(abort). 분석 중에는 요청을 보내기 전마다 예산을 차감(JobBudget.charge)하고,
+예산을 넘는 요청부터는 보내지 않아 그때까지의 결과만으로 응답합니다.
+"""
+import math
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+from app.config import Config
+from app.analysis import plan_chat_chunks, plan_curriculum_requests, plan_vtt_chunks, transcript_segments
+from app.chunking import ChunkPlan, estimate_tokens
+from app.result_store import chunk_hash, chunk_version
+from app.risk_screen import get_risk_screen
+from app.summary_tree import estimate_summary_requests
+
+logger = logging.getLogger(__name__)
+
+class BudgetExceededError(Exception):
+    """사전 예상치가 작업 예산을 넘어 분석을 시작하지 않음 (JOB_BUDGET_MODE=abort)"""
+
+    def __init__(self, estimate: 'JobEstimate'):
+        self.estimate = estimate
+        super().__init__(f"예상 API 사용량이 작업 예산을 넘습니다 ({', '.join(estimate.over_budget)})")
+
+class JobBudget:
+    """분석 작업 하나가 쓸 수 있는 API 요청 수와 토큰 수 (0이면 제한 없음)
+
+    토큰은 요청마다 입력 토큰과 응답 토큰 상한을 합친 값으로 차감하므로 실제 사용량보다
+    크거나 같습니다. 작업 풀의 여러 스레드(또는 코루틴)가 하나의 예산을 공유합니다.
+    hold로 단계별로 떼어 둔 몫(재요약, 위험 발언 분류/커리큘럼 평가 요청)은 앞 단계에서 쓰지
+    않고 release할 때마다 한 단계씩 풀리므로, 청크 분석에서 예산을 넘어도 분석한 청크만으로
+    이후 단계를 마칠 수 있습니다.
+    """
+
+    def __init__(self, max_requests: int = 0, max_tokens: int = 0):
+        self.max_requests = max(0, max_requests)
+        self.max_tokens = max(0, max_tokens)
+        self.used_requests = 0
+        self.used_tokens = 0
+        self.skipped_requests = 0
+        self.held = []
+        self._lock = threading.Lock()
+
+    def over_limits(self, requests: int, tokens: int) -> List[str]:
+        """요청 수/토큰 수가 예산을 넘으면 넘은 항목 설명 목록"""
+        reasons = []
+        if self.max_requests and requests > self.max_requests:
+            reasons.append(f"요청 {requests}개 > 예산 {self.max_requests}개")
+        if self.max_tokens and tokens > self.max_tokens:
+            reasons.append(f"토큰 {tokens} > 예산 {self.max_tokens}")
+        return reasons
+
+    def hold(self, *stages: Tuple[int, int]):
+        """다음 단계들에서 쓸 (요청 수, 토큰 수) 몫을 단계 순서대로 떼어 둠"""
+        with self._lock:
+            self.held = [tuple(stage) for stage in stages]
+
+    def release(self):
+        """떼어 둔 몫 중 다음 단계의 몫을 다시 쓸 수 있게 함"""
+        with self._lock:
+            self.held = self.held[1:]
+
+    @property
+    def held_requests(self) -> int:
+        return sum(requests for requests, _ in self.held)
+
+    @property
+    def held_tokens(self) -> int:
+        return sum(tokens for _, tokens in self.held)
+
+    def charge(self, tokens: int) -> bool:
+        """요청 하나를 보내기 전에 예산 차감 (예산을 넘으면 차감하지 않고 False)"""
+        with self._lock:
+            if self.over_limits(self.used_requests + self.held_requests + 1,
+                                self.used_tokens + self.held_tokens + tokens):
+                if not self.skipped_requests:
+                    logger.warning(f"작업 예산 초과로 남은 요청을 보내지 않습니다 "
+                                   f"(사용: 요청 {self.used_requests}개, 토큰 {self.used_tokens})")
+                self.skipped_requests += 1
+                return False
+            self.used_requests += 1
+            self.used_tokens += tokens
+            return True
+
+    @property
+    def exceeded(self) -> bool:
+        return self.skipped_requests > 0
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                'max_requests': self.max_requests,
+                'max_tokens': self.max_tokens,
+                'used_requests': self.used_requests,
+                'used_tokens': self.used_tokens,
+                'skipped_requests': self.skipped_requests,
+                'exceeded': self.skipped_requests > 0
+            }
+
+# 사용량을 확인하고 한도 안이면 차감하고 1 (한도를 넘으면 생략한 요청 수를 늘리고 -생략한 요청 수)
+CHARGE_SCRIPT = """
+local used_requests = tonumber(redis.call('HGET', KEYS[1], 'used_requests') or '0')
+local used_tokens = tonumber(redis.call('HGET', KEYS[1], 'used_tokens') or '0')
+local max_requests, max_tokens = tonumber(ARGV[1]), tonumber(ARGV[2])
+local held_requests, held_tokens, tokens = tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+local allowed = 1
+if (max_requests > 0 and used_requests + held_requests + 1 > max_requests) or
+        (max_tokens > 0 and used_tokens + held_tokens + tokens > max_tokens) then
+    allowed = -redis.call('HINCRBY', KEYS[1], 'skipped_requests', 1)
+else
+    redis.call('HINCRBY', KEYS[1], 'used_requests', 1)
+    redis.call('HINCRBY', KEYS[1], 'used_tokens', tokens)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+return allowed
+"""
+
+class RedisJobBudget(JobBudget):
+    """사용량을 Redis(job_id별 해시)에 두어 Celery 작업 사이에서 공유하는 작업 예산
+
+    청크 분석, 결과 통합, 커리큘럼 매칭 작업은 서로 다른 워커 프로세스에서 실행되므로 사용량과
+    생략한 요청 수는 Redis에서 원자적으로 차감하고, 한도와 떼어 둔 몫은 작업 인자로 넘깁니다. 떼어 둔 몫은 작업 단계마다 정해지며 release는 이 작업 안에서만 적용됩니다.
+    """
+
+    def __init__(self, client, job_id: str, max_requests: int = 0, max_tokens: int = 0,
+                 held: Optional[List[Tuple[int, int]]] = None, ttl_seconds: int = 24 * 3600):
+        self.client = client
+        self.job_id = job_id
+        self.key = f'job_budget:{job_id}'
+        self.ttl_seconds = ttl_seconds
+        self.max_requests = max(0, max_requests)
+        self.max_tokens = max(0, max_tokens)
+        self.held = [tuple(stage) for stage in held or []]
+        self._lock = threading.Lock()
+        self._charge = client.register_script(CHARGE_SCRIPT)
+
+    def _counts(self) -> Tuple[int, int, int]:
+        values = self.client.hmget(self.key, 'used_requests', 'used_tokens', 'skipped_requests')
+        return tuple(int(value or 0) for value in values)
+
+    @property
+    def used_requests(self) -> int:
+        return self._counts()[0]
+
+    @property
+    def used_tokens(self) -> int:
+        return self._counts()[1]
+
+    @property
+    def skipped_requests(self) -> int:
+        return self._counts()[2]
+
+    def charge(self, tokens: int) -> bool:
+        with self._lock:
+            held_requests, held_tokens = self.held_requests, self.held_tokens
+        allowed = self._charge(keys=[self.key], args=[self.max_requests, self.max_tokens, held_requests,
+                                                      held_tokens, tokens, self.ttl_seconds])
+        if allowed == -1:
+            logger.warning(f"작업 예산 초과로 남은 요청을 보내지 않습니다 (작업: {self.job_id})")
+        return allowed > 0
+
+    def summary(self) -> dict:
+        used_requests, used_tokens, skipped_requests = self._counts()
+        return {
+            'max_requests': self.max_requests,
+            'max_tokens': self.max_tokens,
+            'used_requests': used_requests,
+            'used_tokens': used_tokens,
+            'skipped_requests': skipped_requests,
+            'exceeded': skipped_requests > 0
+        }
+
+def stage_seconds(requests: List[Tuple[int, int]], concurrency: int, latency: float,
+                  requests_per_minute: int, tokens_per_minute: int) -> float:
+    """(입력 토큰, 응답 토큰 상한) 요청 목록을 동시에 처리할 때의 예상 소요 시간(초)
+
+    동시 처리 수만큼씩 latency초가 걸리는 시간과, 한도 버킷(처음에는 가득 참)을 넘는
+    요청 수/토큰 수를 채우는 데 걸리는 시간 중 큰 값입니다.
+    """
+    if not requests:
+        return 0.0
+    waves = math.ceil(len(requests) / max(1, concurrency)) * latency
+    tokens = sum(prompt + output for prompt, output in requests)
+    request_wait = max(0, len(requests) - requests_per_minute) / requests_per_minute * 60
+    token_wait = max(0, tokens - tokens_per_minute) / tokens_per_minute * 60
+    return max(waves, request_wait, token_wait)
+
+class JobEstimate:
+    """API 호출 전에 계산한 분석 작업 하나의 예상 사용량
+
+    chunk_requests, summary_requests, curriculum_requests, risk_requests는 (입력 토큰, 응답 토큰
+    상한) 목록이며, 저장된 결과를 재사용하는 청크는 포함하지 않습니다. 재요약 요청과 커리큘럼
+    요청은 청크 분석 결과 없이 계산한 근사치이고, 위험 발언 분류 요청은 사전 선별에 걸린 구간의
+    요청입니다.
+    """
+
+    def __init__(self, analysis_type: str, plan: ChunkPlan, reused_chunks: int,
+                 chunk_requests: List[Tuple[int, int]], curriculum_requests: List[Tuple[int, int]],
+                 risk_requests: Optional[List[Tuple[int, int]]] = None,
+                 summary_requests: Optional[List[Tuple[int, int]]] = None):
+        self.analysis_type = analysis_type
+        self.plan = plan
+        self.reused_chunks = reused_chunks
+        self.chunk_requests = chunk_requests
+        self.summary_requests = summary_requests or []
+        self.curriculum_requests = curriculum_requests
+        self.risk_requests = risk_requests or []
+        self.over_budget = []
+        self.degraded = False
+        self.action = 'run'
+
+    @property
+    def later_requests(self) -> List[Tuple[int, int]]:
+        """청크 분석 뒤에 보내는 요청 (재요약, 위험 발언 분류, 커리큘럼 평가)"""
+        return self.summary_requests + self.risk_requests + self.curriculum_requests
+
+    def held_stages(self) -> List[Tuple[int, int]]:
+        """청크 분석 동안 떼어 둘 단계별 (요청 수, 토큰 수) 몫 (재요약, 위험 발언 분류와 커리큘럼 평가 순서)"""
+        stages = [self.summary_requests, self.risk_requests + self.curriculum_requests]
+        return [(len(requests), sum(map(sum, requests))) for requests in stages]
+
+    @property
+    def requests(self) -> int:
+        return len(self.chunk_requests) + len(self.later_requests)
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(prompt for prompt, _ in self.chunk_requests + self.later_requests)
+
+    @property
+    def max_output_tokens(self) -> int:
+        return sum(output for _, output in self.chunk_requests + self.later_requests)
+
+    @property
+    def max_total_tokens(self) -> int:
+        return self.input_tokens + self.max_output_tokens
+
+    def expected_seconds(self) -> float:
+        """청크 분석, 재요약, 위험 발언 분류, 커리큘럼 평가를 차례로 수행할 때의 예상 소요 시간(초)"""
+        options = (Config.OPENAI_MAX_CONCURRENCY, Config.OPENAI_EXPECTED_LATENCY_SECONDS,
+                   Config.OPENAI_REQUESTS_PER_MINUTE, Config.OPENAI_TOKENS_PER_MINUTE)
+        return (stage_seconds(self.chunk_requests, *options) +
+                stage_seconds(self.summary_requests, *options) +
+                stage_seconds(self.risk_requests, *options) +
+                stage_seconds(self.curriculum_requests, *options))
+
+    def max_cost(self) -> float:
+        """응답 토큰을 상한까지 쓴다고 가정한 최대 비용(USD)"""
+        return (self.input_tokens * Config.OPENAI_INPUT_PRICE_PER_1K +
+                self.max_output_tokens * Config.OPENAI_OUTPUT_PRICE_PER_1K) / 1000
+
+    def to_dict(self) -> dict:
+        return {
+            'analysis_type': self.analysis_type,
+            'chunks': self.plan.count,
+            'reused_chunks': self.reused_chunks,
+            'chunk_requests': len(self.chunk_requests),
+            'summary_requests': len(self.summary_requests),
+            'curriculum_requests': len(self.curriculum_requests),
+            'risk_requests': len(self.risk_requests),
+            'requests': self.requests,
+            'input_tokens': self.input_tokens,
+            'max_output_tokens': self.max_output_tokens,
+            'max_total_tokens': self.max_total_tokens,
+            'expected_seconds': round(self.expected_seconds(), 1),
+            'max_cost_usd': round(self.max_cost(), 4),
+            'over_budget': self.over_budget,
+            'degraded': self.degraded,
+            'action': self.action
+        }
+
+def create_job_budget() -> JobBudget:
+    """설정(JOB_MAX_REQUESTS, JOB_MAX_TOKENS)에 맞는 작업 예산"""
+    return JobBudget(Config.JOB_MAX_REQUESTS, Config.JOB_MAX_TOKENS)
+
+def estimate_job(client, analysis_type: str, plan: ChunkPlan, store=None,
+                 curriculum_requests: Optional[List[Tuple[str, int]]] = None,
+                 risk_requests: Optional[List[Tuple[str, int]]] = None) -> JobEstimate:
+    """분할 계획과 커리큘럼 평가/위험 발언 분류 요청 목록으로 작업 예상치 계산
+
+    store에 있는 청크 결과는 재사용으로 계산하고, VTT는 청크 수에 따른 재요약 요청(트리 단계 ×
+    묶음 수)도 포함합니다.
+    """
+    stored = {}
+    if store is not None:
+        stored = store.lookup_chunks(analysis_type, chunk_version(client, analysis_type),
+                                     [chunk_hash(text) for text in plan.texts])
+    chunk_requests = [(chunk.tokens + plan.prompt_tokens, plan.max_output_tokens)
+                      for chunk in plan.chunks if chunk_hash(chunk.text) not in stored]
+    curriculum = [(estimate_tokens(prompt), max_tokens) for prompt, max_tokens in curriculum_requests or []]
+    risk = [(estimate_tokens(prompt), max_tokens) for prompt, max_tokens in risk_requests or []]
+    summary = None
+    if analysis_type == 'vtt':
+        summary = estimate_summary_requests(client, plan.count, max_tokens=Config.SUMMARY_MAX_TOKENS,
+                                            fan_in=Config.SUMMARY_FAN_IN, max_length=Config.SUMMARY_MAX_LENGTH)
+    return JobEstimate(analysis_type, plan, plan.count - len(chunk_requests), chunk_requests, curriculum, risk,
+                       summary)
+
+def plan_job(client, analysis_type: str, content, store=None, curriculum_content=None,
+             budget: Optional[JobBudget] = None) -> Tuple[ChunkPlan, JobEstimate]:
+    """분할 계획과 예상치를 만들고 예산을 넘으면 JOB_BUDGET_MODE에 따라 처리
+
+    degrade면 청크 크기 상한(CHUNK_MAX_TOKENS) 없이 컨텍스트가 허용하는 만큼 큰 청크로
+    다시 나눠 요청 수와 프롬프트 틀 토큰을 줄이고, abort면 estimate.action을 'abort'로
+    표시합니다 (분석 라우트는 이 경우 API를 호출하지 않고 거절). 재요약, 위험 발언 분류와
+    커리큘럼 평가 요청의 예상 몫은 budget.hold로 단계별로 떼어 두므로 분석 라우트는 청크 분석이
+    끝난 뒤(재요약 전)와 위험 발언 분류 전에 budget.release를 호출합니다. API는 호출하지 않습니다.
+    """
+    plan_chunks = plan_vtt_chunks if analysis_type == 'vtt' else plan_chat_chunks
+    curriculum_requests = None
+    if curriculum_content is not None:
+        curriculum_requests = plan_curriculum_requests(
+            client, curriculum_content, transcript_segments(content),
+            batch_size=Config.CURRICULUM_BATCH_SIZE,
+            item_output_tokens=Config.CURRICULUM_ITEM_OUTPUT_TOKENS,
+            top_k=Config.CURRICULUM_TOP_K
+        )
+    risk_requests = None
+    if getattr(client, 'risk_prescreen', False):
+        screen = get_risk_screen()
+        risk_requests = screen.requests(client, screen.screen(content))
+
+    plan = plan_chunks(content, client)
+    estimate = estimate_job(client, analysis_type, plan, store, curriculum_requests, risk_requests)
+    if budget is None:
+        return plan, estimate
+    budget.hold(*estimate.held_stages())
+    estimate.over_budget = budget.over_limits(estimate.requests, estimate.max_total_tokens)
+    if not estimate.over_budget:
+        return plan, estimate
+
+    if Config.JOB_BUDGET_MODE == 'abort':
+        estimate.action = 'abort'
+        logger.warning(f"작업 예산 초과 예상으로 분석을 시작하지 않습니다 ({', '.join(estimate.over_budget)})")
+        return plan, estimate
+
+    coarse_plan = plan_chunks(content, client, coarse=True)
+    if coarse_plan.count < plan.count:
+        plan = coarse_plan
+        estimate = estimate_job(client, analysis_type, plan, store, curriculum_requests, risk_requests)
+        estimate.over_budget = budget.over_limits(estimate.requests, estimate.max_total_tokens)
+        estimate.degraded = True
+        budget.hold(*estimate.held_stages())
+    estimate.action = 'degrade'
+    logger.warning(
+        f"작업 예산 초과 예상 (유형: {analysis_type}, 청크 수: {plan.count}, 요청 수: {estimate.requests}, "
+        f"토큰: {estimate.max_total_tokens}, 큰 청크로 다시 분할: {estimate.degraded}) - "
+        f"예산을 넘는 요청부터는 보내지 않습니다"
+    )
+    return plan, estimate
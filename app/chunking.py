@@ -0,0 +1,170 @@
+import hashlib
+import logging
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 모델별 컨텍스트 길이 (프롬프트 + 응답 토큰)
+MODEL_CONTEXT_TOKENS = {
+    'gpt-3.5-turbo': 16385,
+    'gpt-3.5-turbo-16k': 16385,
+    'gpt-4': 8192,
+    'gpt-4-32k': 32768,
+    'gpt-4-turbo': 128000,
+    'gpt-4o': 128000,
+    'gpt-4o-mini': 128000,
+}
+DEFAULT_CONTEXT_TOKENS = 4096
+
+# 내용 기반 청크 경계: 청크가 예산의 MIN_CHUNK_RATIO 이상 찼을 때, 단위 텍스트 해시가
+# BOUNDARY_DIVISOR로 나누어떨어지는 단위 뒤에서 끊음
+MIN_CHUNK_RATIO = 0.5
+BOUNDARY_DIVISOR = 4
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사치 계산 (한글 등 비ASCII 문자는 1자당 1토큰, ASCII는 4자당 1토큰)"""
+    if not text:
+        return 0
+    ascii_count = sum(1 for ch in text if ord(ch) < 128)
+    return (len(text) - ascii_count) + ascii_count // 4 + 1
+
+def context_tokens_for(model: str) -> int:
+    """모델의 컨텍스트 길이 (모르는 모델이면 보수적인 기본값)"""
+    if model in MODEL_CONTEXT_TOKENS:
+        return MODEL_CONTEXT_TOKENS[model]
+    # gpt-4o-2024-08-06 처럼 날짜가 붙은 모델명은 가장 긴 접두어로 찾음
+    for name in sorted(MODEL_CONTEXT_TOKENS, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_CONTEXT_TOKENS[name]
+    return DEFAULT_CONTEXT_TOKENS
+
+def input_token_budget(context_tokens: int, prompt_tokens: int, max_output_tokens: int,
+                       max_chunk_tokens: Optional[int] = None, safety_ratio: float = 0.05) -> int:
+    """청크 하나에 담을 수 있는 입력 토큰 수
+
+    컨텍스트 길이에서 응답 토큰, 프롬프트 틀, 추정 오차 여유분을 뺀 값이며
+    max_chunk_tokens가 있으면 그 값을 넘지 않습니다.
+    """
+    budget = context_tokens - max_output_tokens - prompt_tokens - int(context_tokens * safety_ratio)
+    if max_chunk_tokens:
+        budget = min(budget, max_chunk_tokens)
+    if budget <= 0:
+        raise ValueError(
+            f"입력에 사용할 토큰이 없습니다 (컨텍스트: {context_tokens}, 응답: {max_output_tokens}, 프롬프트: {prompt_tokens})"
+        )
+    return budget
+
+class TextChunk(NamedTuple):
+    """분석 단위 청크 (원본이 자막이면 시간 범위 포함, 초 단위)"""
+    text: str
+    tokens: int
+    start: float = 0.0
+    end: float = 0.0
+
+class ChunkPlan:
+    """API 호출 전에 확정되는 청크 분할 계획"""
+
+    def __init__(self, chunks: List[TextChunk], budget_tokens: int, prompt_tokens: int, max_output_tokens: int):
+        self.chunks = chunks
+        self.budget_tokens = budget_tokens
+        self.prompt_tokens = prompt_tokens
+        self.max_output_tokens = max_output_tokens
+
+    @property
+    def count(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def texts(self) -> List[str]:
+        return [chunk.text for chunk in self.chunks]
+
+    @property
+    def input_tokens(self) -> int:
+        """프롬프트 틀을 포함한 예상 입력 토큰 합계"""
+        return sum(chunk.tokens for chunk in self.chunks) + self.prompt_tokens * self.count
+
+    @property
+    def max_total_tokens(self) -> int:
+        """응답 토큰 상한까지 포함한 최대 토큰 합계"""
+        return self.input_tokens + self.max_output_tokens * self.count
+
+    def summary(self) -> dict:
+        return {
+            'chunks': self.count,
+            'chunk_tokens': [chunk.tokens for chunk in self.chunks],
+            'budget_tokens': self.budget_tokens,
+            'input_tokens': self.input_tokens,
+            'max_total_tokens': self.max_total_tokens
+        }
+
+def _split_oversized(text: str, budget: int) -> List[str]:
+    """예산을 넘는 한 줄을 단어 단위로, 그래도 넘으면 문자 단위로 분할"""
+    pieces = []
+    current = []
+    current_tokens = 0
+    for word in text.split():
+        word_tokens = estimate_tokens(word)
+        if word_tokens > budget:
+            # 문자 하나는 최대 1토큰이므로 (budget - 1)자씩 자르면 항상 예산 이내
+            if current:
+                pieces.append(' '.join(current))
+                current, current_tokens = [], 0
+            size = max(1, budget - 1)
+            pieces.extend(word[i:i + size] for i in range(0, len(word), size))
+            continue
+        if current and current_tokens + word_tokens > budget:
+            pieces.append(' '.join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(' '.join(current))
+    return pieces
+
+def is_boundary_unit(text: str, divisor: int = BOUNDARY_DIVISOR) -> bool:
+    """이 단위 뒤가 내용 기반 청크 경계인지 확인 (텍스트만으로 결정되므로 앞뒤 내용과 무관)"""
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % divisor == 0
+
+def pack_units(units: Iterable[Tuple[str, float, float]], budget: int, separator: str = '\n',
+               boundary: Optional[Callable[[str], bool]] = None, min_ratio: float = MIN_CHUNK_RATIO) -> List[TextChunk]:
+    """(텍스트, 시작, 끝) 단위를 순서대로 예산 이내의 청크로 채움
+
+    단위 하나가 예산보다 크면 나눠서 담고, 단위 중간에서 청크를 끊지 않습니다. boundary
+    (예: is_boundary_unit)가 있으면 청크가 예산의 min_ratio 이상 찬 뒤 경계 단위를 만날 때 끊고,
+    예산을 넘을 때만 강제로 끊습니다. 경계가 앞쪽 내용과 무관하게 정해지므로 자막 뒤에 내용이
+    추가되면 마지막 청크만, 중간이 수정되면 수정된 부분 근처의 청크만 달라집니다.
+    """
+    min_tokens = int(budget * min_ratio)
+    chunks = []
+    lines = []
+    used = 0
+    start = end = 0.0
+
+    def flush():
+        text = separator.join(lines)
+        chunks.append(TextChunk(text, estimate_tokens(text), start, end))
+
+    for text, unit_start, unit_end in units:
+        text = text.strip()
+        if not text:
+            continue
+        unit_tokens = estimate_tokens(text)
+        pieces = [text] if unit_tokens <= budget else _split_oversized(text, budget)
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece)
+            if lines and used + piece_tokens > budget:
+                flush()
+                lines, used = [], 0
+            if not lines:
+                start = unit_start
+            lines.append(piece)
+            used += piece_tokens
+            end = unit_end
+            if boundary is not None and used >= min_tokens and boundary(piece):
+                flush()
+                lines, used = [], 0
+
+    if lines:
+        flush()
+    return chunks
@@ -8,7 +8,8 @@ class Config:
     # 파일 업로드 설정
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
     ALLOWED_EXTENSIONS = {'txt', 'vtt'}
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    # 업로드 크기 제한 (MB, 업로드는 스트림으로 파싱하므로 여러 시간 분량의 자막도 허용)
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_UPLOAD_MB', 256)) * 1024 * 1024
     
     # 파일 보관 기간
     MAX_AGE_HOURS = 24  # 24시간
@@ -17,4 +18,103 @@ class Config:
     ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY')
     
     # Discord Webhook 설정
-    DISCORD_WEBHOOK_URL = os.environ.get('DISCORD_WEBHOOK_URL') 
\ No newline at end of file
+    DISCORD_WEBHOOK_URL = os.environ.get('DISCORD_WEBHOOK_URL')
+    DISCORD_COALESCE_SECONDS = float(os.environ.get('DISCORD_COALESCE_SECONDS', 1.0))  # 알림을 모아 보내는 대기 시간
+    DISCORD_QUEUE_SIZE = int(os.environ.get('DISCORD_QUEUE_SIZE', 1000))  # 전송 대기 알림 최대 수
+
+    # 준비 상태 확인(/readyz) 설정: API 도달 확인 결과 재사용 시간과 확인 요청 제한 시간
+    READINESS_CACHE_SECONDS = float(os.environ.get('READINESS_CACHE_SECONDS', 30))
+    READINESS_TIMEOUT_SECONDS = float(os.environ.get('READINESS_TIMEOUT_SECONDS', 5))
+    
+    # OpenAI API 동시 처리 및 한도 설정
+    OPENAI_MAX_CONCURRENCY = int(os.environ.get('OPENAI_MAX_CONCURRENCY', 4))
+    OPENAI_REQUESTS_PER_MINUTE = int(os.environ.get('OPENAI_REQUESTS_PER_MINUTE', 3500))
+    OPENAI_TOKENS_PER_MINUTE = int(os.environ.get('OPENAI_TOKENS_PER_MINUTE', 90000))
+    
+    # 작업 하나의 API 사용 예산 (0이면 제한 없음): 요청 수와 토큰 수(입력 + 응답 상한)
+    JOB_MAX_REQUESTS = int(os.environ.get('JOB_MAX_REQUESTS', 100))
+    JOB_MAX_TOKENS = int(os.environ.get('JOB_MAX_TOKENS', 400000))
+    # 예산 초과가 예상될 때: degrade(더 큰 청크로 다시 나눠 진행, 넘는 요청부터 생략), abort(분석하지 않고 거절)
+    JOB_BUDGET_MODE = os.environ.get('JOB_BUDGET_MODE', 'degrade').lower()
+    # 작업 큐 사용 시 Celery 작업들이 Redis로 공유하는 작업별 예산 사용량의 보관 시간
+    JOB_BUDGET_TTL_SECONDS = int(os.environ.get('JOB_BUDGET_TTL_SECONDS', 24 * 3600))
+    # 사전 예상치 계산용: 요청 하나의 평균 응답 시간(초)과 1000토큰당 가격(USD)
+    OPENAI_EXPECTED_LATENCY_SECONDS = float(os.environ.get('OPENAI_EXPECTED_LATENCY_SECONDS', 10))
+    OPENAI_INPUT_PRICE_PER_1K = float(os.environ.get('OPENAI_INPUT_PRICE_PER_1K', 0.0005))
+    OPENAI_OUTPUT_PRICE_PER_1K = float(os.environ.get('OPENAI_OUTPUT_PRICE_PER_1K', 0.0015))
+    
+    # 여러 강의 일괄 분석(/analyze_vtt/batch): 요청 하나의 최대 강의 수와 동시에 분석하는 강의 수
+    BATCH_MAX_LECTURES = int(os.environ.get('BATCH_MAX_LECTURES', 20))
+    BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', 4))
+    
+    # 토큰 예산 기반 청크 분할 설정
+    OPENAI_MAX_OUTPUT_TOKENS = int(os.environ.get('OPENAI_MAX_OUTPUT_TOKENS', 2000))  # 요청당 응답 토큰 상한
+    OPENAI_CONTEXT_TOKENS = int(os.environ.get('OPENAI_CONTEXT_TOKENS', 0)) or None  # 없으면 모델명으로 결정
+    CHUNK_MAX_TOKENS = int(os.environ.get('CHUNK_MAX_TOKENS', 8000))  # 청크 하나의 입력 토큰 상한
+    # 청크 경계를 내용으로 결정 (자막이 늘어나거나 일부 수정되어도 나머지 청크와 저장된 결과를 재사용)
+    CHUNK_CONTENT_DEFINED = os.environ.get('CHUNK_CONTENT_DEFINED', 'true').lower() == 'true'
+    # 함수 호출로 검증된 구조화 결과를 받음 (false면 기존 마크다운 응답을 파싱)
+    OPENAI_STRUCTURED_OUTPUT = os.environ.get('OPENAI_STRUCTURED_OUTPUT', 'true').lower() == 'true'
+    
+    # 커리큘럼 달성도 묶음 평가 설정 (1이면 세부내용마다 개별 요청)
+    CURRICULUM_BATCH_SIZE = int(os.environ.get('CURRICULUM_BATCH_SIZE', 25))
+    CURRICULUM_ITEM_OUTPUT_TOKENS = int(os.environ.get('CURRICULUM_ITEM_OUTPUT_TOKENS', 150))  # 세부내용당 응답 토큰
+    CURRICULUM_TOP_K = int(os.environ.get('CURRICULUM_TOP_K', 5))  # 세부내용마다 보낼 강의 구간 수 (0이면 전체)
+    
+    # 통합 결과 재요약 설정 (주요 내용/분석이 SUMMARY_MAX_TOKENS를 넘으면 SUMMARY_FAN_IN개씩 묶어 계층적으로 재요약)
+    SUMMARY_MAX_TOKENS = int(os.environ.get('SUMMARY_MAX_TOKENS', 1500))  # 주요 내용, 분석 각각의 최대 토큰 수
+    SUMMARY_FAN_IN = int(os.environ.get('SUMMARY_FAN_IN', 8))  # 한 번에 묶어 요약하는 노드 수
+    SUMMARY_MAX_LENGTH = int(os.environ.get('SUMMARY_MAX_LENGTH', 800))  # 묶음 요약 하나의 최대 글자 수
+
+    # 위험 발언 사전 선별 (로컬 어휘/개인정보 형식에 걸린 구간만 전용 프롬프트로 분류, 청크 분석 프롬프트에서는 위험 발언 항목 제외)
+    RISK_PRESCREEN_ENABLED = os.environ.get('RISK_PRESCREEN_ENABLED', 'true').lower() == 'true'
+    RISK_LEXICON_PATH = os.environ.get('RISK_LEXICON_PATH')  # 분류별 어휘/정규식을 바꾸는 JSON 파일 (없으면 기본 어휘)
+    RISK_CONTEXT_LINES = int(os.environ.get('RISK_CONTEXT_LINES', 2))  # 걸린 발화 앞뒤로 함께 보낼 발화 수
+    RISK_MAX_WINDOW_CHARS = int(os.environ.get('RISK_MAX_WINDOW_CHARS', 1500))  # 선별 구간 하나의 최대 글자 수
+    RISK_BATCH_WINDOWS = int(os.environ.get('RISK_BATCH_WINDOWS', 10))  # 한 요청에서 분류할 최대 구간 수
+    RISK_ITEM_OUTPUT_TOKENS = int(os.environ.get('RISK_ITEM_OUTPUT_TOKENS', 150))  # 구간당 응답 토큰
+
+    # Redis 설정
+    REDIS_URL = os.environ.get('REDIS_URL')
+    
+    # Celery 작업 큐 사용 여부 (기본값: REDIS_URL이 설정된 경우 사용)
+    TASK_QUEUE_ENABLED = os.environ.get('TASK_QUEUE_ENABLED', 'true' if REDIS_URL else 'false').lower() == 'true'
+    # Celery 워커의 지표 서버 포트 (0이면 끔, 워커에서 실행된 분석 단계 지표를 Prometheus가 이 포트에서 수집)
+    CELERY_METRICS_PORT = int(os.environ.get('CELERY_METRICS_PORT', 0))
+    
+    # LLM 응답 캐시 설정 (memory, sqlite, redis, none)
+    LLM_CACHE_BACKEND = os.environ.get('LLM_CACHE_BACKEND', 'memory')
+    LLM_CACHE_TTL_SECONDS = int(os.environ.get('LLM_CACHE_TTL_SECONDS', 7 * 24 * 3600))  # 7일
+    LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 10000))
+    LLM_CACHE_PATH = os.environ.get(
+        'LLM_CACHE_PATH',
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'llm_cache.sqlite3')
+    )
+    
+    # 분석 결과 저장소 설정 (sqlite, redis, none)
+    # 작업 큐를 쓰면 웹 서비스와 워커가 결과와 청크 결과를 함께 보도록 기본값이 redis
+    RESULT_STORE_BACKEND = os.environ.get('RESULT_STORE_BACKEND', 'redis' if TASK_QUEUE_ENABLED else 'sqlite')
+    RESULT_STORE_PATH = os.environ.get(
+        'RESULT_STORE_PATH',
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'analysis_results.sqlite3')
+    )
+    
+    # 커리큘럼 등록소 설정 (sqlite, memory) - 올린 커리큘럼을 파일 해시(curriculum_id)로 보관
+    CURRICULUM_REGISTRY_BACKEND = os.environ.get('CURRICULUM_REGISTRY_BACKEND', 'sqlite')
+    CURRICULUM_REGISTRY_PATH = os.environ.get(
+        'CURRICULUM_REGISTRY_PATH',
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'curricula.sqlite3')
+    )
+    CURRICULUM_REGISTRY_CACHE_SIZE = int(os.environ.get('CURRICULUM_REGISTRY_CACHE_SIZE', 32))  # 메모리에 둘 파싱 결과 수
+    
+    # 작업별 진행 상황 채널 설정 (memory, redis)
+    PROGRESS_BACKEND = os.environ.get('PROGRESS_BACKEND', 'redis' if REDIS_URL else 'memory')
+    PROGRESS_BUFFER_SIZE = int(os.environ.get('PROGRESS_BUFFER_SIZE', 100))  # 구독자별 최대 대기 이벤트 수
+    PROGRESS_HISTORY_SIZE = int(os.environ.get('PROGRESS_HISTORY_SIZE', 200))  # 재연결용 보관 이벤트 수
+    PROGRESS_TTL_SECONDS = int(os.environ.get('PROGRESS_TTL_SECONDS', 3600))
+    
+    # 실시간 강의 모드 설정 (세션 저장소: memory, redis)
+    LIVE_BACKEND = os.environ.get('LIVE_BACKEND', 'redis' if REDIS_URL else 'memory')
+    LIVE_WINDOW_MINUTES = float(os.environ.get('LIVE_WINDOW_MINUTES', 5))  # 이 분량의 발화가 쌓일 때마다 분석
+    LIVE_MAX_CONCURRENCY = int(os.environ.get('LIVE_MAX_CONCURRENCY', 2))  # 동시에 분석하는 구간 수
+    LIVE_SESSION_TTL_SECONDS = int(os.environ.get('LIVE_SESSION_TTL_SECONDS', 6 * 3600))
@@ -0,0 +1,283 @@
+"""커리큘럼 등록소
+
+기수의 커리큘럼은 몇 달 동안 바뀌지 않으므로 한 번 올린 커리큘럼 파일의 원본과 파싱 결과를
+원본 해시(curriculum_id)로 보관합니다. 분석 요청은 파일 대신 curriculum_id로 등록된 커리큘럼을
+참조할 수 있고, 파일을 다시 올려도 내용이 같으면 파싱하지 않고 등록된 결과를 사용합니다.
+파서가 바뀌면(CURRICULUM_PARSER_VERSION) 보관한 원본으로 다시 파싱합니다.
+"""
+import io
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.analysis import CURRICULUM_PARSER_VERSION, process_curriculum_file
+
+logger = logging.getLogger(__name__)
+
+class CurriculumNotFoundError(LookupError):
+    """등록되지 않은 curriculum_id"""
+
+    def __init__(self, curriculum_id: str):
+        self.curriculum_id = curriculum_id
+        super().__init__(f"등록된 커리큘럼을 찾을 수 없습니다: {curriculum_id}")
+
+def curriculum_file_id(filename: str, data: bytes) -> str:
+    """파일 형식(확장자)과 원본 바이트의 해시"""
+    ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+    digest = hashlib.sha256(ext.encode('utf-8') + b'\0')
+    digest.update(data)
+    return digest.hexdigest()
+
+def _summary(record: dict) -> dict:
+    return {key: record[key] for key in ('id', 'filename', 'created_at', 'subjects', 'details')}
+
+class BaseCurriculumRegistry:
+    """커리큘럼 등록소 공통 인터페이스
+
+    최근에 사용한 cache_size개의 파싱 결과는 프로세스 메모리에도 두어 저장소를 조회하지 않습니다.
+    반환하는 커리큘럼 목록은 여러 요청이 공유하므로 수정하지 않아야 합니다.
+    """
+
+    backend = 'base'
+
+    def __init__(self, cache_size: int = 32):
+        self.cache_size = max(0, cache_size)
+        self._cache = OrderedDict()  # curriculum_id -> 파싱 결과
+        self._lock = threading.Lock()
+
+    def register(self, filename: str, data: bytes) -> Tuple[dict, bool]:
+        """커리큘럼 파일 등록 ((요약, 새로 등록했는지), 형식이 잘못된 파일은 ValueError)"""
+        record, created = self._load(filename, data)
+        return _summary(record), created
+
+    def parse_upload(self, filename: str, stream) -> list:
+        """업로드한 커리큘럼 파일을 등록하고 파싱 결과 반환 (같은 내용이면 다시 파싱하지 않음)
+
+        등록소를 사용할 수 없으면 경고만 남기고 파일을 바로 파싱합니다.
+        """
+        data = stream.read()
+        cached = self._cached(curriculum_file_id(filename, data))
+        if cached is not None:
+            return cached
+        try:
+            return self._load(filename, data)[0]['content']
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.warning(f"커리큘럼 등록소를 사용할 수 없어 파일을 바로 파싱합니다: {str(e)}")
+            return process_curriculum_file(filename, io.BytesIO(data))
+
+    def get(self, curriculum_id: str) -> list:
+        """등록된 커리큘럼의 파싱 결과 (없으면 CurriculumNotFoundError)"""
+        cached = self._cached(curriculum_id)
+        if cached is not None:
+            return cached
+        record = self._fetch(curriculum_id)
+        if record is None:
+            raise CurriculumNotFoundError(curriculum_id)
+        self._current(record)
+        return record['content']
+
+    def info(self, curriculum_id: str) -> Optional[dict]:
+        """등록된 커리큘럼의 요약과 파싱 결과 (없으면 None)"""
+        record = self._fetch(curriculum_id)
+        if record is None:
+            return None
+        self._current(record)
+        return {**_summary(record), 'curriculum': record['content']}
+
+    def list(self, limit: int = 50, offset: int = 0) -> List[dict]:
+        """등록된 커리큘럼 요약 목록 (최근 등록 순)"""
+        raise NotImplementedError
+
+    def delete(self, curriculum_id: str) -> bool:
+        """등록 삭제 (삭제했으면 True)"""
+        with self._lock:
+            self._cache.pop(curriculum_id, None)
+        return self._delete(curriculum_id)
+
+    def clear_cache(self):
+        """프로세스 메모리의 파싱 결과 비우기"""
+        with self._lock:
+            self._cache.clear()
+
+    def _load(self, filename, data):
+        curriculum_id = curriculum_file_id(filename, data)
+        record = self._fetch(curriculum_id)
+        if record is not None:
+            self._current(record)
+            return record, False
+        record = {'id': curriculum_id, 'filename': filename, 'created_at': time.time(), 'data': data}
+        self._parse(record)
+        logger.info(f"커리큘럼 등록 (id: {curriculum_id[:12]}, 파일: {filename}, "
+                    f"과목 수: {record['subjects']}, 세부내용 수: {record['details']})")
+        return record, True
+
+    def _parse(self, record):
+        content = process_curriculum_file(record['filename'], io.BytesIO(record['data']))
+        record.update(content=content, parser_version=CURRICULUM_PARSER_VERSION, subjects=len(content),
+                      details=sum(len(item.get('세부내용') or []) for item in content))
+        self._store(record)
+        self._remember(record['id'], content)
+
+    def _current(self, record):
+        """파서가 바뀐 뒤 등록된 커리큘럼은 보관한 원본으로 다시 파싱"""
+        if record['parser_version'] != CURRICULUM_PARSER_VERSION:
+            logger.info(f"파서 변경으로 커리큘럼을 다시 파싱합니다 (id: {record['id'][:12]})")
+            self._parse(record)
+        else:
+            self._remember(record['id'], record['content'])
+
+    def _cached(self, curriculum_id):
+        with self._lock:
+            content = self._cache.get(curriculum_id)
+            if content is not None:
+                self._cache.move_to_end(curriculum_id)
+            return content
+
+    def _remember(self, curriculum_id, content):
+        if not self.cache_size:
+            return
+        with self._lock:
+            self._cache[curriculum_id] = content
+            self._cache.move_to_end(curriculum_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _fetch(self, curriculum_id) -> Optional[dict]:
+        raise NotImplementedError
+
+    def _store(self, record: dict):
+        raise NotImplementedError
+
+    def _delete(self, curriculum_id) -> bool:
+        raise NotImplementedError
+
+class MemoryCurriculumRegistry(BaseCurriculumRegistry):
+    """프로세스 내부 등록소 (워커 프로세스끼리 공유하지 않음)"""
+
+    backend = 'memory'
+
+    def __init__(self, cache_size: int = 32):
+        super().__init__(cache_size)
+        self._records = {}
+
+    def list(self, limit=50, offset=0):
+        with self._lock:
+            records = sorted(self._records.values(), key=lambda record: record['created_at'], reverse=True)
+        return [_summary(record) for record in records[offset:offset + limit]]
+
+    def _fetch(self, curriculum_id):
+        with self._lock:
+            record = self._records.get(curriculum_id)
+            return dict(record) if record else None
+
+    def _store(self, record):
+        with self._lock:
+            self._records[record['id']] = dict(record)
+
+    def _delete(self, curriculum_id):
+        with self._lock:
+            return self._records.pop(curriculum_id, None) is not None
+
+class SQLiteCurriculumRegistry(BaseCurriculumRegistry):
+    """로컬 SQLite 파일 등록소 (같은 서버의 웹 프로세스들이 공유)"""
+
+    backend = 'sqlite'
+
+    SUMMARY_COLUMNS = ('id', 'filename', 'created_at', 'subjects', 'details')
+    RECORD_COLUMNS = SUMMARY_COLUMNS + ('parser_version', 'content', 'data')
+
+    def __init__(self, path: str, cache_size: int = 32):
+        super().__init__(cache_size)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS curricula ('
+                ' id TEXT PRIMARY KEY,'
+                ' filename TEXT NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' subjects INTEGER NOT NULL,'
+                ' details INTEGER NOT NULL,'
+                ' parser_version INTEGER NOT NULL,'
+                ' content TEXT NOT NULL,'
+                ' data BLOB NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_curricula_created ON curricula (created_at)')
+
+    def _connect(self):
+        # sqlite3 연결은 스레드마다 따로 사용
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def list(self, limit=50, offset=0):
+        rows = self._connect().execute(
+            f"SELECT {', '.join(self.SUMMARY_COLUMNS)} FROM curricula ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            (limit, offset)
+        ).fetchall()
+        return [dict(zip(self.SUMMARY_COLUMNS, row)) for row in rows]
+
+    def _fetch(self, curriculum_id):
+        row = self._connect().execute(
+            f"SELECT {', '.join(self.RECORD_COLUMNS)} FROM curricula WHERE id = ?", (curriculum_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        record = dict(zip(self.RECORD_COLUMNS, row))
+        record['content'] = json.loads(record['content'])
+        return record
+
+    def _store(self, record):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO curricula ({', '.join(self.RECORD_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (record['id'], record['filename'], record['created_at'], record['subjects'], record['details'],
+                 record['parser_version'], json.dumps(record['content'], ensure_ascii=False),
+                 sqlite3.Binary(record['data']))
+            )
+
+    def _delete(self, curriculum_id):
+        conn = self._connect()
+        with conn:
+            return conn.execute('DELETE FROM curricula WHERE id = ?', (curriculum_id,)).rowcount > 0
+
+def create_curriculum_registry(backend: str, sqlite_path: Optional[str] = None,
+                               cache_size: int = 32) -> BaseCurriculumRegistry:
+    """설정값에 맞는 커리큘럼 등록소 생성"""
+    backend = (backend or 'sqlite').lower()
+    if backend == 'memory':
+        registry = MemoryCurriculumRegistry(cache_size)
+    elif backend == 'sqlite':
+        registry = SQLiteCurriculumRegistry(sqlite_path or 'cache/curricula.sqlite3', cache_size)
+    else:
+        raise ValueError(f"지원하지 않는 커리큘럼 등록소 백엔드입니다: {backend}")
+    logger.info(f"커리큘럼 등록소 초기화 완료 (백엔드: {backend})")
+    return registry
+
+# 프로세스마다 한 번만 생성되는 커리큘럼 등록소
+_registry = None
+
+def get_curriculum_registry() -> BaseCurriculumRegistry:
+    """설정(Config.CURRICULUM_REGISTRY_BACKEND)에 맞는 커리큘럼 등록소 (최초 사용 시 생성)"""
+    global _registry
+    if _registry is None:
+        from app.config import Config
+
+        _registry = create_curriculum_registry(Config.CURRICULUM_REGISTRY_BACKEND, Config.CURRICULUM_REGISTRY_PATH,
+                                               Config.CURRICULUM_REGISTRY_CACHE_SIZE)
+    return _registry
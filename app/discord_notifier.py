@@ -0,0 +1,259 @@
+import time
+import queue
+import atexit
+import logging
+import threading
+from collections import deque
+from typing import List, Optional
+
+from app.vtt_parser import format_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Discord 메시지 제한 (메시지당 임베드 10개, 임베드 전체 6000자, 설명 4096자, 필드 값 1024자)
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_FIELD_LIMIT = 1024
+RISK_COLOR = 0xE74C3C
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+def embed_size(embed: dict) -> int:
+    """Discord가 메시지당 6000자 제한에 세는 임베드 글자 수"""
+    size = len(embed.get('title', '')) + len(embed.get('description', ''))
+    size += len(embed.get('footer', {}).get('text', ''))
+    for field in embed.get('fields', []):
+        size += len(field.get('name', '')) + len(field.get('value', ''))
+    return size
+
+def risk_alert_embed(session_id: str, window: dict) -> dict:
+    """실시간 강의 구간에서 감지된 위험 발언 알림 임베드"""
+    risks = '\n'.join(f"- {risk}" for risk in window['risks'])
+    fields = [
+        {'name': '세션', 'value': session_id, 'inline': True},
+        {'name': '구간', 'value': f"{format_timestamp(window['start'])} ~ {format_timestamp(window['end'])}",
+         'inline': True}
+    ]
+    if window.get('summary'):
+        fields.append({'name': '구간 요약', 'value': _truncate(' '.join(window['summary']), EMBED_FIELD_LIMIT)})
+    return {
+        'title': f"위험 발언 감지 ({window['index']}번째 구간)",
+        'description': _truncate(risks, EMBED_DESCRIPTION_LIMIT),
+        'color': RISK_COLOR,
+        'fields': fields
+    }
+
+def retry_after_seconds(response) -> float:
+    """429 응답의 대기 시간 (본문 retry_after, Retry-After 헤더, X-RateLimit-Reset-After 순)"""
+    try:
+        value = response.json().get('retry_after')
+        if value is not None:
+            return max(0.0, float(value))
+    except (ValueError, AttributeError):
+        pass
+    for header in ('Retry-After', 'X-RateLimit-Reset-After'):
+        try:
+            return max(0.0, float(response.headers[header]))
+        except (KeyError, ValueError):
+            continue
+    return 1.0
+
+class _Notification:
+    __slots__ = ('embed', 'content', 'queued_at')
+
+    def __init__(self, embed: dict, content: Optional[str]):
+        self.embed = embed
+        self.content = content
+        self.queued_at = time.monotonic()
+
+class DiscordNotifier:
+    """Discord 웹훅 전송 큐
+
+    notify는 알림을 큐에 넣고 바로 반환하며(요청 스레드를 막지 않음), 백그라운드 스레드가
+    coalesce_seconds 동안 모인 알림을 임베드 묶음(메시지당 최대 10개) 하나로 보냅니다.
+    429 응답은 retry_after만큼 기다린 뒤 다시 보내고, 남은 요청 수(X-RateLimit-Remaining)가
+    0이면 초기화 시각까지 미리 기다립니다. 네트워크 오류와 5xx는 지수 백오프로 max_attempts번까지
+    재시도하며, 그 밖의 4xx는 재시도해도 성공하지 않으므로 버립니다.
+    """
+
+    def __init__(self, webhook_url: str, timeout: float = 10.0, max_queue_size: int = 1000,
+                 coalesce_seconds: float = 1.0, max_attempts: int = 5, max_backoff: float = 30.0,
+                 max_rate_limit_waits: int = 10):
+        self.webhook_url = webhook_url
+        self.timeout = timeout
+        self.client = None  # 전송 스레드에서 생성 (httpx 가져오기가 기동을 막지 않도록)
+        self.coalesce_seconds = coalesce_seconds
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.max_rate_limit_waits = max_rate_limit_waits
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._carry = None  # 앞 메시지에 담지 못해 다음 메시지로 넘긴 알림 (전송 스레드만 사용)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._latencies = deque(maxlen=500)
+        self._counters = {'queued': 0, 'dropped': 0, 'messages_sent': 0, 'embeds_sent': 0,
+                          'failed': 0, 'retries': 0, 'rate_limited': 0}
+        self._last_error = None
+        self._thread = threading.Thread(target=self._run, name='discord-notifier', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush, 5.0)
+
+    def notify(self, embed: dict, content: Optional[str] = None) -> bool:
+        """알림을 전송 큐에 추가 (큐가 가득 차면 버리고 False 반환)"""
+        try:
+            self._queue.put_nowait(_Notification(embed, content))
+        except queue.Full:
+            self._count('dropped')
+            logger.warning("Discord 알림 큐가 가득 차 알림을 버립니다")
+            return False
+        self._count('queued')
+        return True
+
+    def send_risk_alert(self, session_id: str, window: dict) -> bool:
+        """위험 발언이 감지된 구간 알림 예약"""
+        return self.notify(risk_alert_embed(session_id, window), '⚠️ 강의 중 위험 발언이 감지되었습니다.')
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """큐에 남은 알림이 모두 처리될 때까지 대기 (timeout 안에 끝나면 True)"""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            # unfinished_tasks는 큐에 있거나 전송 중인 알림 수
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(min(remaining, 0.1))
+        return True
+
+    def stats(self) -> dict:
+        """큐 길이, 전송/실패/재시도 횟수, 전송 지연 시간(큐에 넣은 뒤 전송 완료까지, 초)"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self._counters)
+            stats['last_error'] = self._last_error
+        stats['queue_depth'] = self._queue.qsize()
+        if latencies:
+            stats['latency_p50'] = round(latencies[len(latencies) // 2], 3)
+            stats['latency_p95'] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3)
+            stats['latency_max'] = round(latencies[-1], 3)
+        return stats
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _next_batch(self) -> List[_Notification]:
+        """첫 알림을 기다린 뒤 coalesce_seconds 동안 메시지 하나에 담을 수 있는 만큼 모음"""
+        if self._carry is not None:
+            first, self._carry = self._carry, None
+        else:
+            first = self._queue.get()
+        batch = [first]
+        size = embed_size(first.embed)
+        deadline = time.monotonic() + self.coalesce_seconds
+        while len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            item_size = embed_size(item.embed)
+            if size + item_size > MAX_EMBED_CHARS_PER_MESSAGE or item.content != first.content:
+                # 이 메시지에 담을 수 없으면 다음 메시지의 첫 알림으로 넘김
+                self._carry = item
+                break
+            batch.append(item)
+            size += item_size
+        return batch
+
+    def _run(self):
+        import httpx
+
+        self.client = httpx.Client(timeout=self.timeout)
+        while True:
+            batch = self._next_batch()
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                self._record_failure(batch, f"예상치 못한 오류: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                with self._idle:
+                    self._idle.notify_all()
+
+    def _deliver(self, batch: List[_Notification]):
+        """임베드 묶음 하나를 메시지 하나로 전송 (429와 일시적 오류는 재시도)"""
+        import httpx
+
+        payload = {'embeds': [item.embed for item in batch]}
+        if batch[0].content:
+            payload['content'] = batch[0].content
+        attempt = 0
+        rate_limit_waits = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.client.post(self.webhook_url, json=payload)
+            except httpx.HTTPError as e:
+                response, error = None, str(e)
+            else:
+                error = f"HTTP {response.status_code}"
+
+            if response is not None and response.status_code < 300:
+                self._record_delivery(batch)
+                self._wait_for_bucket(response)
+                return
+            if response is not None and response.status_code == 429 and rate_limit_waits < self.max_rate_limit_waits:
+                # 요청 한도 초과는 Discord가 알려준 시간만큼 기다린 뒤 같은 메시지를 다시 보냄
+                rate_limit_waits += 1
+                wait = retry_after_seconds(response)
+                self._count('rate_limited')
+                logger.warning(f"Discord 요청 한도 초과, {wait:.2f}초 후 다시 전송")
+                time.sleep(wait)
+                continue
+            if response is not None and response.status_code < 500:
+                # 그 밖의 4xx(잘못된 웹훅 URL, 형식 오류)와 한도 초과가 계속되는 경우는 버림
+                self._record_failure(batch, f"{error}: {response.text[:200]}")
+                return
+            if attempt >= self.max_attempts:
+                self._record_failure(batch, error)
+                return
+            self._count('retries')
+            backoff = min(self.max_backoff, 2 ** (attempt - 1))
+            logger.warning(f"Discord 알림 전송 실패 ({error}), {backoff}초 후 재시도 ({attempt}/{self.max_attempts})")
+            time.sleep(backoff)
+
+    def _wait_for_bucket(self, response):
+        """남은 요청 수가 0이면 다음 요청이 429를 받지 않도록 한도 초기화까지 대기"""
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            try:
+                time.sleep(max(0.0, float(response.headers.get('X-RateLimit-Reset-After', 0))))
+            except ValueError:
+                pass
+
+    def _record_delivery(self, batch: List[_Notification]):
+        now = time.monotonic()
+        with self._lock:
+            self._counters['messages_sent'] += 1
+            self._counters['embeds_sent'] += len(batch)
+            self._latencies.extend(now - item.queued_at for item in batch)
+
+    def _record_failure(self, batch: List[_Notification], error: str):
+        with self._lock:
+            self._counters['failed'] += len(batch)
+            self._last_error = error
+        logger.error(f"Discord 알림 {len(batch)}건 전송 실패: {error}")
+
+def create_discord_notifier(webhook_url: Optional[str], **options) -> Optional[DiscordNotifier]:
+    """웹훅 URL이 설정된 경우에만 알림 전송 큐 생성"""
+    if not webhook_url:
+        logger.info("DISCORD_WEBHOOK_URL이 설정되지 않아 Discord 알림을 보내지 않습니다")
+        return None
+    notifier = DiscordNotifier(webhook_url, **options)
+    logger.info(f"Discord 알림 전송 큐 초기화 완료 (묶음 대기: {notifier.coalesce_seconds}초)")
+    return notifier
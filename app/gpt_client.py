@@ -2,118 +2,131 @@ import os
 import logging
 import time
 import json
-import httpx
-from typing import List, Optional
-from openai import OpenAI
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, List, Optional, Tuple
 from tenacity import retry, stop_after_attempt, wait_exponential
+from app.rate_limiter import RateLimiter
+from app.llm_cache import BaseLLMCache, make_cache_key
+from app.metrics import (
+    count_retry, observe_stage, record_chunk_failure, record_llm_error, record_usage, timed
+)
+from app.chunking import (
+    ChunkPlan, context_tokens_for, estimate_tokens, input_token_budget, is_boundary_unit, pack_units
+)
+from app.schemas import STRUCTURED_TYPES, without_risks
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
-class GPTAPIClient:
-    def __init__(self, api_key):
-        """GPT API 클라이언트 초기화"""
-        if not api_key:
-            raise ValueError("API 키가 제공되지 않았습니다.")
-            
-        self.logger = logging.getLogger(__name__)
-        self.model = "gpt-3.5-turbo"
-        
-        # httpx 클라이언트 설정
-        http_client = httpx.Client()
-        
-        # OpenAI 클라이언트 초기화
-        self.client = OpenAI(
-            api_key=api_key,
-            http_client=http_client
-        )
-        
-        self.logger.info(f"GPTAPIClient 초기화 완료 (모델: {self.model})")
+def response_options(json_mode: bool = False, function: Optional[dict] = None) -> dict:
+    """chat.completions.create에 넘길 응답 형식 옵션 (함수 호출 강제 또는 JSON 모드)"""
+    if function:
+        return {
+            'tools': [{'type': 'function', 'function': function}],
+            'tool_choice': {'type': 'function', 'function': {'name': function['name']}}
+        }
+    if json_mode:
+        return {'response_format': {'type': 'json_object'}}
+    return {}
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True
-    )
-    def make_request(self, prompt: str, max_tokens: int = 2000) -> Optional[str]:
-        """GPT API 요청 수행"""
-        self.logger.info(f"API 요청 시작 (프롬프트 길이: {len(prompt)} 문자)")
-        
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=max_tokens
-            )
-            
-            if response and response.choices:
-                result = response.choices[0].message.content
-                self.logger.info("API 요청 성공")
-                return result
-            else:
-                self.logger.error("API 응답이 비어있음")
-                raise Exception("API 응답이 비어있습니다")
-                
-        except Exception as e:
-            self.logger.error(f"API 요청 실패: {str(e)}")
-            raise
+def response_text(message, function: Optional[dict] = None) -> Optional[str]:
+    """응답 메시지의 본문 (함수 호출을 요청했으면 호출 인자 JSON)"""
+    if not function:
+        return message.content
+    for tool_call in message.tool_calls or []:
+        if tool_call.function.name == function['name']:
+            return tool_call.function.arguments
+    raise Exception("함수 호출 응답이 없습니다")
+
+def function_cache_format(function: dict, result_type) -> str:
+    """함수 호출 응답의 캐시 키 형식 (기본 스키마가 아니면 스키마 해시를 붙여 기본 스키마의 응답과 구분)"""
+    if function is result_type.FUNCTION:
+        return f"function:{function['name']}"
+    digest = hashlib.sha256(json.dumps(function, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"function:{function['name']}:{digest[:12]}"
+
+class BaseGPTClient:
+    """동기/비동기 클라이언트가 공유하는 청크 분할 및 프롬프트 생성 로직"""
+
+    model = "gpt-3.5-turbo"
+    temperature = 0.7
+
+    def __init__(self, max_output_tokens: int = 2000, context_tokens: Optional[int] = None,
+                 max_chunk_tokens: Optional[int] = None, structured_output: bool = False,
+                 content_defined_chunks: bool = False, risk_prescreen: bool = False):
+        """청크 분할 및 응답 형식 설정
+
+        max_output_tokens: 요청 하나의 응답 토큰 상한
+        context_tokens: 모델 컨텍스트 길이 (없으면 모델명으로 결정)
+        max_chunk_tokens: 청크 하나의 입력 토큰 상한 (없으면 컨텍스트가 허용하는 만큼)
+        structured_output: vtt/chat 청크 분석 결과를 함수 호출로 받아 검증된 객체로 반환할지 여부
+        content_defined_chunks: 청크 경계를 내용으로 정해 자막이 늘어나거나 일부 수정되어도
+            나머지 청크가 그대로 유지되도록 할지 여부 (False면 예산을 채울 때마다 끊음)
+        risk_prescreen: 위험 발언을 로컬 사전 선별(app.risk_screen)과 전용 프롬프트로 분석하고
+            청크 분석 프롬프트와 함수 스키마에서는 위험 발언 항목을 뺄지 여부
+        """
+        self.max_output_tokens = max_output_tokens
+        self.structured_output = structured_output
+        self.context_tokens = context_tokens or context_tokens_for(self.model)
+        self.max_chunk_tokens = max_chunk_tokens
+        self.content_defined_chunks = content_defined_chunks
+        self.risk_prescreen = risk_prescreen
 
-    def split_text(self, text: str, max_chunk_size: int = 2000) -> List[str]:
-        """텍스트를 청크로 분할"""
+    def chunk_function(self, analysis_type: str = 'vtt') -> Optional[dict]:
+        """청크 분석 구조화 응답의 함수 스키마 (risk_prescreen이면 위험 발언 항목 제외)"""
+        result_type = STRUCTURED_TYPES.get(analysis_type)
+        if result_type is None:
+            return None
+        return without_risks(result_type.FUNCTION) if self.risk_prescreen else result_type.FUNCTION
+
+    def chunk_budget(self, analysis_type: str = 'vtt', coarse: bool = False) -> Tuple[int, int]:
+        """(청크 하나의 입력 토큰 예산, 프롬프트 틀 토큰 수)
+
+        coarse면 max_chunk_tokens를 무시하고 컨텍스트가 허용하는 만큼을 예산으로 합니다.
+        """
+        result_type = STRUCTURED_TYPES.get(analysis_type) if self.structured_output else None
+        if result_type:
+            # 함수 정의(JSON 스키마)도 입력 토큰에 포함됨
+            prompt_tokens = (estimate_tokens(self.build_structured_prompt('', analysis_type)) +
+                             estimate_tokens(json.dumps(self.chunk_function(analysis_type), ensure_ascii=False)))
+        else:
+            prompt_tokens = estimate_tokens(self.build_prompt('', analysis_type))
+        budget = input_token_budget(self.context_tokens, prompt_tokens, self.max_output_tokens,
+                                    None if coarse else self.max_chunk_tokens)
+        return budget, prompt_tokens
+
+    def chunk_request_tokens(self, chunk: str, analysis_type: str = 'vtt') -> int:
+        """청크 하나를 분석하는 요청의 예상 토큰 수 (입력 + 응답 상한, 작업 예산 차감용)"""
+        return estimate_tokens(chunk) + self.chunk_budget(analysis_type)[1] + self.max_output_tokens
+
+    def plan_units(self, units: Iterable[Tuple[str, float, float]], analysis_type: str = 'vtt',
+                   coarse: bool = False) -> ChunkPlan:
+        """(텍스트, 시작, 끝) 단위를 토큰 예산에 맞춰 청크로 묶은 분할 계획 (coarse는 chunk_budget 참고)"""
+        budget, prompt_tokens = self.chunk_budget(analysis_type, coarse)
+        chunks = pack_units(units, budget, boundary=is_boundary_unit if self.content_defined_chunks else None)
+        plan = ChunkPlan(chunks, budget, prompt_tokens, self.max_output_tokens)
+        logger.info(
+            f"청크 분할 계획 (유형: {analysis_type}, 청크 수: {plan.count}, "
+            f"예상 입력 토큰: {plan.input_tokens}, 청크당 예산: {budget})"
+        )
+        return plan
+
+    def plan_text(self, text: str, analysis_type: str = 'vtt') -> ChunkPlan:
+        """텍스트를 줄 단위로 토큰 예산에 맞춰 나눈 분할 계획"""
         if not text:
             logger.warning("분할할 텍스트가 비어있음")
-            return []
-            
-        logger.info(f"텍스트 분할 시작 (전체 길이: {len(text)} 문자)")
-        chunks = []
-        sentences = text.replace('\r', '').split('\n')
-        
-        current_chunk = []
-        current_size = 0
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-                
-            sentence_size = len(sentence)
-            if current_size + sentence_size > max_chunk_size:
-                if current_chunk:
-                    chunk_text = '\n'.join(current_chunk)
-                    chunks.append(chunk_text)
-                    logger.debug(f"청크 생성: {len(chunk_text)} 문자")
-                current_chunk = [sentence]
-                current_size = sentence_size
-            else:
-                current_chunk.append(sentence)
-                current_size += sentence_size
-                
-        if current_chunk:
-            chunk_text = '\n'.join(current_chunk)
-            chunks.append(chunk_text)
-            logger.debug(f"마지막 청크 생성: {len(chunk_text)} 문자")
-            
-        logger.info(f"텍스트 분할 완료 (총 {len(chunks)}개 청크)")
-        return chunks
+        lines = (text or '').replace('\r', '').split('\n')
+        return self.plan_units(((line, 0.0, 0.0) for line in lines), analysis_type)
 
-    def analyze_text(self, text: str, analysis_type: str = 'vtt') -> str:
-        """텍스트 분석을 수행"""
-        try:
-            # 텍스트를 청크로 분할
-            logger.info(f"텍스트 분석 시작 (유형: {analysis_type})")
-            chunks = self.split_text(text)
-            
-            # 각 청크별로 분석 수행
-            results = []
-            for i, chunk in enumerate(chunks, 1):
-                logger.info(f"청크 {i}/{len(chunks)} 분석 중")
-                
-                # 분석 유형에 따른 프롬프트 설정
-                if analysis_type == 'vtt':
-                    prompt = f"""
+    def build_prompt(self, chunk: str, analysis_type: str = 'vtt') -> str:
+        """분석 유형에 따른 프롬프트 생성 (risk_prescreen이면 위험 발언 항목 제외)"""
+        if analysis_type == 'vtt':
+            risk_section = '' if self.risk_prescreen else """
+# 위험 발언
+(차별적 발언, 부적절한 표현, 민감한 주제 등이 있다면 구체적으로 명시. 없다면 "위험 발언이 없습니다." 라고 표시)
+"""
+            prompt = f"""
 다음은 강의 내용을 텍스트로 변환한 것입니다. 강의 내용을 분석하여 다음 형식으로 응답해주세요:
 
 [강의 내용]
@@ -128,12 +141,15 @@ class GPTAPIClient:
 
 # 분석
 (강의 내용에 대한 전반적인 분석을 3-4문장으로 작성)
+{risk_section}"""
+        elif analysis_type == 'chat':
+            risk_section = '' if self.risk_prescreen else """# 위험 발언 및 주의사항
+- 부적절한 언어 사용이나 태도
+- 수업 분위기를 해치는 발언
+- 개인정보 노출 위험
 
-# 위험 발언
-(차별적 발언, 부적절한 표현, 민감한 주제 등이 있다면 구체적으로 명시. 없다면 "위험 발언이 없습니다." 라고 표시)
 """
-                elif analysis_type == 'chat':
-                    prompt = f"""다음 채팅 내용을 분석하여 아래 형식으로 응답해주세요.
+            prompt = f"""다음 채팅 내용을 분석하여 아래 형식으로 응답해주세요.
 
 # 주요 대화 주제
 - 채팅에서 다뤄진 주요 주제와 내용을 요약하여 나열
@@ -177,19 +193,14 @@ class GPTAPIClient:
 - 온라인 플랫폼 개선 제안
 - 기술적 문제 해결을 위한 제안
 
-# 위험 발언 및 주의사항
-- 부적절한 언어 사용이나 태도
-- 수업 분위기를 해치는 발언
-- 개인정보 노출 위험
-
-# 종합 제언
+{risk_section}# 종합 제언
 - 전반적인 개선점과 권장사항
 - 향후 수업 운영을 위한 제안사항
 
 채팅 내용:
 {chunk}"""
-                else:
-                    prompt = f"""
+        else:
+            prompt = f"""
 다음 텍스트를 분석하여 주요 내용을 요약해주세요:
 
 [텍스트 내용]
@@ -199,25 +210,327 @@ class GPTAPIClient:
 # 요약
 (주요 내용을 3-4문장으로 요약)
 """
-                
-                try:
-                    result = self.make_request(prompt)
-                    if result:
-                        results.append(result)
-                    else:
-                        results.append(f"[청크 {i} 분석 실패]")
-                except Exception as e:
-                    logger.error(f"청크 {i} 분석 중 오류 발생: {str(e)}")
-                    results.append(f"[청크 {i} 분석 오류: {str(e)}]")
-                
-                # 마지막 청크가 아닌 경우 API 호출 간격 유지
-                if i < len(chunks):
-                    time.sleep(2)
+        return prompt
+
+    def build_structured_prompt(self, chunk: str, analysis_type: str = 'vtt') -> str:
+        """구조화 응답(함수 호출)용 프롬프트 생성 (항목별 작성 기준은 함수 스키마 설명에 포함)"""
+        if analysis_type == 'vtt':
+            guide = '' if self.risk_prescreen else ', 위험 발언이 없다면 빈 목록으로 보고해주세요'
+            return f"""
+다음은 강의 내용을 텍스트로 변환한 것입니다. 강의 내용을 분석하여 결과를 보고해주세요.
+모든 항목은 한국어로 작성하고{guide}.
+
+[강의 내용]
+{chunk}
+"""
+        return f"""다음 채팅 내용을 분석하여 결과를 보고해주세요.
+모든 항목은 한국어로 작성하고, 해당하는 내용이 없는 항목은 빈 목록으로 보고해주세요.
+
+채팅 내용:
+{chunk}"""
+
+    def plan_chunk_jobs(self, texts: List[str], analysis_type: str = 'vtt') -> List[Tuple[int, int, str]]:
+        """(텍스트 번호, 청크 번호, 청크) 목록 생성"""
+        jobs = []
+        for text_index, text in enumerate(texts):
+            for i, chunk in enumerate(self.plan_text(text, analysis_type).texts, 1):
+                jobs.append((text_index, i, chunk))
+        return jobs
+
+    @staticmethod
+    def group_chunk_results(jobs: List[Tuple[int, int, str]], results: List[str], text_count: int) -> List[str]:
+        """청크 결과를 텍스트별로 모아 구분자로 연결 (청크 순서 유지)"""
+        grouped = [[] for _ in range(text_count)]
+        for (text_index, _, _), result in zip(jobs, results):
+            grouped[text_index].append(result)
+        return ["\n\n---\n\n".join(group) for group in grouped]
+
+class GPTAPIClient(BaseGPTClient):
+    def __init__(self, api_key, max_workers: int = 4,
+                 requests_per_minute: int = 3500, tokens_per_minute: int = 90000,
+                 cache: Optional[BaseLLMCache] = None, max_output_tokens: int = 2000,
+                 context_tokens: Optional[int] = None, max_chunk_tokens: Optional[int] = None,
+                 structured_output: bool = False, content_defined_chunks: bool = False,
+                 risk_prescreen: bool = False):
+        """GPT API 클라이언트 초기화
+
+        max_workers: 청크를 동시에 분석할 최대 스레드 수 (1이면 순차 처리)
+        requests_per_minute / tokens_per_minute: 모든 요청이 공유하는 API 한도
+        max_output_tokens / context_tokens / max_chunk_tokens / structured_output /
+        content_defined_chunks / risk_prescreen: BaseGPTClient 참고
+        """
+        if not api_key:
+            raise ValueError("API 키가 제공되지 않았습니다.")
             
-            final_result = "\n\n---\n\n".join(results)
-            logger.info("텍스트 분석 완료")
-            return final_result
+        super().__init__(max_output_tokens, context_tokens, max_chunk_tokens, structured_output,
+                         content_defined_chunks, risk_prescreen)
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.cache = cache
+        
+        # openai/httpx는 가져오는 데 시간이 걸리므로 클라이언트를 만들 때 가져옴
+        import httpx
+        from openai import OpenAI
+
+        # httpx 클라이언트 설정
+        http_client = httpx.Client()
+        
+        # OpenAI 클라이언트 초기화
+        self.client = OpenAI(
+            api_key=api_key,
+            http_client=http_client
+        )
+        
+        self.logger.info(f"GPTAPIClient 초기화 완료 (모델: {self.model}, 동시 작업 수: {self.max_workers})")
+
+    def make_request(self, prompt: str, max_tokens: int = 2000, use_cache: bool = True,
+                     json_mode: bool = False) -> Optional[str]:
+        """GPT API 요청 수행 (캐시에 같은 요청의 응답이 있으면 API를 호출하지 않음)
+
+        json_mode가 True이면 응답을 JSON 객체로 받도록 요청합니다 (프롬프트에 JSON 형식 안내 필요).
+        """
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = make_cache_key(self.model, prompt, self.temperature, max_tokens,
+                                       'json_object' if json_mode else None)
+            cached = self._cache_call(self.cache.get, cache_key)
+            if cached is not None:
+                self.logger.info(f"캐시 적중 (프롬프트 길이: {len(prompt)} 문자)")
+                return cached
+        
+        result = self._request_completion(prompt, max_tokens, json_mode)
+        if cache_key is not None:
+            self._cache_call(self.cache.set, cache_key, result)
+        return result
+
+    def make_structured_request(self, prompt: str, result_type, max_tokens: int = 2000, use_cache: bool = True,
+                                function: Optional[dict] = None):
+        """함수 호출로 구조화된 응답을 받아 result_type 객체로 반환
+
+        모델이 돌려준 인자가 스키마 검증(result_type.from_dict)을 통과하지 못하면 한 번 더
+        요청하며, 검증을 통과한 응답만 캐시에 저장합니다. function이 없으면 result_type.FUNCTION을 사용합니다.
+        """
+        function = function or result_type.FUNCTION
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = make_cache_key(self.model, prompt, self.temperature, max_tokens,
+                                       function_cache_format(function, result_type))
+            cached = self._cache_call(self.cache.get, cache_key)
+            if cached is not None:
+                try:
+                    result = result_type.from_dict(json.loads(cached))
+                    self.logger.info(f"캐시 적중 (프롬프트 길이: {len(prompt)} 문자)")
+                    return result
+                except ValueError:
+                    # 스키마가 바뀌기 전에 저장된 항목은 무시하고 다시 요청
+                    pass
+        
+        for attempt in range(1, 3):
+            raw = self._request_completion(prompt, max_tokens, function=function)
+            try:
+                result = result_type.from_dict(json.loads(raw))
+                break
+            except ValueError as e:
+                if attempt == 2:
+                    raise ValueError(f"구조화 응답 검증 실패: {str(e)}")
+                self.logger.warning(f"구조화 응답 검증 실패, 다시 요청합니다: {str(e)}")
+                count_retry(reason='validation')
+        
+        if cache_key is not None:
+            self._cache_call(self.cache.set, cache_key, raw)
+        return result
+
+    def _cache_call(self, func, *args):
+        """캐시 조회/저장 수행 (캐시 오류는 요청 실패로 이어지지 않음)"""
+        try:
+            return func(*args)
+        except Exception as e:
+            self.logger.warning(f"LLM 캐시 처리 실패: {str(e)}")
+            return None
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=count_retry,
+        reraise=True
+    )
+    def _request_completion(self, prompt: str, max_tokens: int = 2000, json_mode: bool = False,
+                            function: Optional[dict] = None) -> Optional[str]:
+        """GPT API 요청 수행 (function이 있으면 해당 함수 호출을 강제하고 인자 JSON을 반환)"""
+        self.logger.info(f"API 요청 시작 (프롬프트 길이: {len(prompt)} 문자)")
+        
+        # 공유 리미터로 요청 수/토큰 한도 유지 (응답 토큰도 TPM에 포함됨)
+        self.rate_limiter.acquire(estimate_tokens(prompt) + max_tokens)
+        
+        # 응답 형식 지정 (함수 호출 또는 JSON 모드)
+        options = response_options(json_mode, function)
+        
+        try:
+            with observe_stage('make_request'):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    **options
+                )
+            record_usage(response)
             
+            if response and response.choices:
+                result = response_text(response.choices[0].message, function)
+                self.logger.info("API 요청 성공")
+                return result
+            else:
+                self.logger.error("API 응답이 비어있음")
+                raise Exception("API 응답이 비어있습니다")
+                
+        except Exception as e:
+            self.logger.error(f"API 요청 실패: {str(e)}")
+            record_llm_error(e)
+            raise
+
+    @timed('analyze_text')
+    def analyze_chunk(self, chunk: str, index: int, analysis_type: str = 'vtt', structured: Optional[bool] = None,
+                      budget=None):
+        """단일 청크 분석
+
+        구조화 응답을 사용하면(structured가 None이면 structured_output 설정을 따름) VTTAnalysis/
+        ChatAnalysis 객체를, 실패하면 None을 반환합니다. 그 외에는 응답 문자열을, 실패하면
+        자리표시 문자열을 반환합니다. budget(JobBudget)을 넘으면 요청하지 않고 실패로 반환합니다.
+        """
+        if structured is None:
+            structured = self.structured_output
+        result_type = STRUCTURED_TYPES.get(analysis_type) if structured else None
+        if budget is not None and not budget.charge(self.chunk_request_tokens(chunk, analysis_type)):
+            return None if result_type else f"[청크 {index} 분석 생략: 작업 예산 초과]"
+        try:
+            if result_type:
+                return self.make_structured_request(
+                    self.build_structured_prompt(chunk, analysis_type), result_type, max_tokens=self.max_output_tokens,
+                    function=self.chunk_function(analysis_type)
+                )
+            result = self.make_request(self.build_prompt(chunk, analysis_type), max_tokens=self.max_output_tokens)
+            if result:
+                return result
+            record_chunk_failure(analysis_type)
+            return f"[청크 {index} 분석 실패]"
+        except Exception as e:
+            logger.error(f"청크 {index} 분석 중 오류 발생: {str(e)}")
+            record_chunk_failure(analysis_type)
+            if result_type:
+                return None
+            return f"[청크 {index} 분석 오류: {str(e)}]"
+
+    def analyze_texts(self, texts: List[str], analysis_type: str = 'vtt',
+                      progress_callback: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """여러 텍스트를 한 번에 분석
+
+        각 텍스트를 토큰 예산에 맞춰 나눈 뒤 모든 청크를 하나의 작업 풀에서 동시에
+        처리하고, 결과는 텍스트별로 원래 청크 순서대로 합쳐서 반환합니다.
+        progress_callback(완료 수, 전체 수)는 청크 하나가 끝날 때마다 호출됩니다.
+        """
+        logger.info(f"텍스트 분석 시작 (유형: {analysis_type}, 텍스트 수: {len(texts)})")
+        
+        jobs = self.plan_chunk_jobs(texts, analysis_type)
+        # 텍스트별로 응답 문자열을 이어 붙이므로 구조화 응답은 사용하지 않음
+        results = self._run_jobs(jobs, analysis_type, progress_callback, structured=False)
+        
+        logger.info("텍스트 분석 완료")
+        return self.group_chunk_results(jobs, results, len(texts))
+
+    def analyze_chunks(self, chunks: List[str], analysis_type: str = 'vtt',
+                       progress_callback: Optional[Callable[[int, int], None]] = None,
+                       result_callback: Optional[Callable[[int, object], None]] = None, budget=None) -> List[str]:
+        """이미 분할된 청크(ChunkPlan.texts)를 다시 나누지 않고 청크별로 분석
+
+        structured_output 설정 시 결과는 청크별 구조화 객체(실패한 청크는 None) 목록입니다.
+        result_callback은 청크 분석이 끝나는 대로 (청크 번호, 결과)로 호출됩니다.
+        budget(JobBudget)이 있으면 예산을 넘는 청크부터는 요청하지 않고 실패로 남깁니다.
+        """
+        logger.info(f"청크 분석 시작 (유형: {analysis_type}, 청크 수: {len(chunks)})")
+        jobs = [(0, i, chunk) for i, chunk in enumerate(chunks, 1)]
+        results = self._run_jobs(jobs, analysis_type, progress_callback, result_callback=result_callback,
+                                 budget=budget)
+        logger.info("청크 분석 완료")
+        return results
+
+    def _run_jobs(self, jobs, analysis_type, progress_callback, structured=None, result_callback=None, budget=None):
+        """청크 작업 목록을 작업 풀에서 처리 (결과는 작업 순서 유지, 콜백은 호출한 스레드에서 실행)"""
+        total = len(jobs)
+        results = [None] * total
+        completed = 0
+        
+        def run(job_index):
+            text_index, i, chunk = jobs[job_index]
+            logger.info(f"청크 {i} 분석 중 (텍스트 {text_index + 1})")
+            return self.analyze_chunk(chunk, i, analysis_type, structured, budget)
+        
+        if self.max_workers == 1 or total <= 1:
+            for job_index in range(total):
+                results[job_index] = run(job_index)
+                completed += 1
+                if result_callback:
+                    result_callback(jobs[job_index][1], results[job_index])
+                if progress_callback:
+                    progress_callback(completed, total)
+        else:
+            workers = min(self.max_workers, total)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gpt-chunk') as executor:
+                futures = {executor.submit(run, job_index): job_index for job_index in range(total)}
+                for future in as_completed(futures):
+                    job_index = futures[future]
+                    results[job_index] = future.result()
+                    completed += 1
+                    if result_callback:
+                        result_callback(jobs[job_index][1], results[job_index])
+                    if progress_callback:
+                        progress_callback(completed, total)
+        
+        return results
+
+    def complete_prompts(self, requests: List[Tuple[str, int]], json_mode: bool = False, result_type=None,
+                         result_callback: Optional[Callable[[int, object], None]] = None, budget=None) -> list:
+        """완성된 프롬프트 목록을 그대로(분석 틀 없이) 동시에 요청
+
+        requests는 (프롬프트, 응답 토큰 상한) 목록이며, 실패한 요청과 budget(JobBudget)을 넘어
+        보내지 않은 요청의 결과는 None입니다. result_type이 있으면 응답을 함수 호출로 받아
+        검증된 객체로 반환합니다. result_callback은 응답이 도착하는 대로 (요청 순번, 결과)로 호출됩니다.
+        """
+        def run(request):
+            prompt, max_tokens = request
+            if budget is not None and not budget.charge(estimate_tokens(prompt) + max_tokens):
+                return None
+            try:
+                if result_type is not None:
+                    return self.make_structured_request(prompt, result_type, max_tokens=max_tokens)
+                return self.make_request(prompt, max_tokens=max_tokens, json_mode=json_mode)
+            except Exception as e:
+                logger.error(f"프롬프트 요청 실패: {str(e)}")
+                return None
+        
+        results = [None] * len(requests)
+        if self.max_workers == 1 or len(requests) <= 1:
+            for position, request in enumerate(requests):
+                results[position] = run(request)
+                if result_callback:
+                    result_callback(position, results[position])
+            return results
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(requests)), thread_name_prefix='gpt-prompt') as executor:
+            futures = {executor.submit(run, request): position for position, request in enumerate(requests)}
+            for future in as_completed(futures):
+                position = futures[future]
+                results[position] = future.result()
+                if result_callback:
+                    result_callback(position, results[position])
+        return results
+
+    def analyze_text(self, text: str, analysis_type: str = 'vtt') -> str:
+        """텍스트 분석을 수행"""
+        try:
+            return self.analyze_texts([text], analysis_type)[0]
         except Exception as e:
             logger.error(f"분석 중 예상치 못한 오류 발생: {str(e)}")
             return f"분석 중 오류 발생: {str(e)}"
@@ -226,8 +539,12 @@ class GPTAPIClient:
         """API 연결 테스트"""
         try:
             logger.info("API 연결 테스트 시작")
-            result = self.make_request("안녕하세요", max_tokens=10)
+            result = self.make_request("안녕하세요", max_tokens=10, use_cache=False)
             return bool(result)
         except Exception as e:
             logger.error(f"API 연결 테스트 실패: {str(e)}")
-            return False 
\ No newline at end of file
+            return False
+
+    def check_api(self, timeout: float = 5.0):
+        """토큰을 쓰지 않는 API 도달 확인 (모델 정보 조회, 재시도 없음, 실패하면 예외)"""
+        self.client.with_options(timeout=timeout, max_retries=0).models.retrieve(self.model)
@@ -0,0 +1,87 @@
+import logging
+from typing import Callable, List, Optional
+
+from app.result_store import BaseResultStore, chunk_hash, chunk_version
+
+logger = logging.getLogger(__name__)
+
+class ChunkReuse:
+    """청크 분할 계획에서 이전에 분석한 청크를 찾아 재사용하고 새 청크만 분석하도록 나눔
+
+    청크별 분석 결과는 (분석 유형, 프롬프트/모델 버전, 청크 해시)로 결과 저장소에 보관되므로,
+    내용 기반 경계로 나눈 자막이 뒤에 늘어나거나 일부 수정되면 달라진 청크만 missing에 남습니다.
+    """
+
+    def __init__(self, store: BaseResultStore, client, analysis_type: str, texts: List[str]):
+        self.store = store
+        self.analysis_type = analysis_type
+        self.version = chunk_version(client, analysis_type)
+        self.texts = texts
+        self.hashes = [chunk_hash(text) for text in texts]
+        stored = store.lookup_chunks(analysis_type, self.version, self.hashes)
+        self.results = [stored.get(h) for h in self.hashes]
+        self.missing = [i for i, h in enumerate(self.hashes) if h not in stored]
+        if stored:
+            logger.info(f"저장된 청크 분석 결과 재사용 (유형: {analysis_type}, 전체 {len(texts)}개 중 "
+                        f"{len(texts) - len(self.missing)}개 재사용, {len(self.missing)}개 분석)")
+
+    @property
+    def missing_texts(self) -> List[str]:
+        return [self.texts[i] for i in self.missing]
+
+    def replay(self, result_callback: Optional[Callable] = None):
+        """재사용한 청크 결과를 result_callback으로 먼저 전달 (청크 번호는 1부터)"""
+        if not result_callback:
+            return
+        missing = set(self.missing)
+        for i, result in enumerate(self.results):
+            if i not in missing:
+                result_callback(i + 1, result)
+
+    def chunk_number(self, missing_number: int) -> int:
+        """새로 분석한 청크 목록에서의 번호(1부터)를 전체 청크 번호로 변환"""
+        return self.missing[missing_number - 1] + 1
+
+    def fill(self, new_results: list) -> list:
+        """새로 분석한 결과를 채운 전체 청크 결과 (청크 순서 유지)"""
+        results = list(self.results)
+        for i, result in zip(self.missing, new_results):
+            results[i] = result
+        return results
+
+    def save(self, new_results: list) -> int:
+        """새로 분석한 청크 결과 저장 (실패한 청크는 다음 요청에서 다시 분석)"""
+        return self.store.save_chunks(
+            self.analysis_type, self.version,
+            {self.hashes[i]: result for i, result in zip(self.missing, new_results)}
+        )
+
+def analyze_plan_incremental(client, texts: List[str], analysis_type: str, store: BaseResultStore,
+                             result_callback: Optional[Callable] = None, budget=None) -> list:
+    """저장된 청크 결과를 재사용하고 새 청크만 API로 분석한 전체 청크 결과 목록 (budget은 새 청크에만 적용)"""
+    reuse = ChunkReuse(store, client, analysis_type, texts)
+    reuse.replay(result_callback)
+    new_results = []
+    if reuse.missing:
+        callback = (lambda i, result: result_callback(reuse.chunk_number(i), result)) if result_callback else None
+        new_results = client.analyze_chunks(reuse.missing_texts, analysis_type, result_callback=callback,
+                                            budget=budget)
+        reuse.save(new_results)
+    return reuse.fill(new_results)
+
+async def analyze_plan_incremental_async(async_client, texts: List[str], analysis_type: str,
+                                         store: BaseResultStore, result_callback: Optional[Callable] = None,
+                                         budget=None) -> list:
+    """analyze_plan_incremental의 비동기 버전 (저장소 조회/저장과 result_callback은 스레드 풀에서 수행)"""
+    from starlette.concurrency import run_in_threadpool
+
+    reuse = await run_in_threadpool(ChunkReuse, store, async_client, analysis_type, texts)
+    await run_in_threadpool(reuse.replay, result_callback)
+    new_results = []
+    if reuse.missing:
+        callback = (lambda i, result: run_in_threadpool(result_callback, reuse.chunk_number(i), result)) \
+            if result_callback else None
+        new_results = await async_client.analyze_chunks(reuse.missing_texts, analysis_type,
+                                                        result_callback=callback, budget=budget)
+        await run_in_threadpool(reuse.save, new_results)
+    return reuse.fill(new_results)
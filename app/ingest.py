@@ -0,0 +1,51 @@
+import io
+import logging
+from typing import BinaryIO, Optional
+
+from app.metrics import timed
+from app.vtt_parser import Transcript, read_transcript
+
+logger = logging.getLogger(__name__)
+
+# 업로드 스트림을 읽는 단위
+READ_BUFFER_SIZE = 64 * 1024
+
+class UploadTooLargeError(ValueError):
+    """업로드 파일이 허용 크기를 넘음"""
+
+class _LimitedReader(io.RawIOBase):
+    """읽은 바이트 수를 세고 max_bytes를 넘으면 중단하는 읽기 전용 래퍼 (원본 스트림은 닫지 않음)"""
+
+    def __init__(self, stream: BinaryIO, max_bytes: Optional[int] = None):
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        size = len(data)
+        self.bytes_read += size
+        if self.max_bytes and self.bytes_read > self.max_bytes:
+            raise UploadTooLargeError(f"파일 크기가 허용 한도({self.max_bytes // (1024 * 1024)}MB)를 넘습니다.")
+        buffer[:size] = data
+        return size
+
+@timed('ingest_transcript')
+def ingest_transcript(stream: BinaryIO, max_bytes: Optional[int] = None) -> Transcript:
+    """업로드 스트림을 디스크에 다시 저장하거나 전체를 메모리에 올리지 않고 바로 파싱
+
+    Flask(Werkzeug)와 Starlette는 큰 업로드를 이름 없는 임시 파일에 스풀링하므로, 여기서는
+    그 스트림을 줄 단위로 읽어 자막 파서에 넘기고 발화 구간만 남깁니다.
+    """
+    reader = _LimitedReader(stream, max_bytes)
+    text = io.TextIOWrapper(io.BufferedReader(reader, READ_BUFFER_SIZE), encoding='utf-8-sig')
+    transcript = read_transcript(text)
+    transcript.size = reader.bytes_read
+    logger.info(
+        f"업로드 파싱 완료 ({'WEBVTT' if transcript.is_vtt else '텍스트'}, 원문 {transcript.size}바이트 → "
+        f"구간 {len(transcript.cues)}개, 발화 {transcript.spoken_chars}자)"
+    )
+    return transcript
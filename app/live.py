@@ -0,0 +1,327 @@
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from app.analysis import combine_analysis_results
+from app.metrics import timed
+from app.progress import publish_progress
+from app.risk_screen import get_risk_screen
+from app.schemas import is_real_risk
+from app.vtt_parser import Cue, Transcript, iter_cues, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+def _seconds(value) -> float:
+    """숫자(초) 또는 VTT 타임스탬프 문자열을 초 단위로 변환"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return parse_timestamp(str(value))
+
+def parse_cue_batch(payload: Optional[dict] = None, text: Optional[str] = None) -> List[Cue]:
+    """실시간 자막 묶음 파싱
+
+    JSON({"cues": [{"start", "end", "text", "speaker"}]}, 시간은 초 또는 타임스탬프 문자열)이나
+    WEBVTT 조각(헤더 없이 큐만 있어도 됨)을 받습니다.
+    """
+    if payload is not None:
+        items = payload.get('cues') if isinstance(payload, dict) else None
+        if not isinstance(items, list):
+            raise ValueError("cues 목록이 필요합니다.")
+        cues = []
+        for item in items:
+            if not isinstance(item, dict) or not str(item.get('text') or '').strip():
+                continue
+            cues.append(Cue(_seconds(item.get('start', 0)), _seconds(item.get('end', item.get('start', 0))),
+                            str(item['text']).strip(), item.get('speaker') or None))
+        return cues
+    return list(iter_cues((text or '').splitlines()))
+
+def new_session(session_id: str) -> dict:
+    """실시간 세션 상태 (JSON으로 저장할 수 있는 dict)"""
+    now = time.time()
+    return {
+        'session_id': session_id,
+        'created_at': now,
+        'updated_at': now,
+        'pending': [],       # 아직 분석하지 않은 자막 구간 [시작, 끝, 텍스트, 화자]
+        'seen': [],          # 받은 자막 구간의 cue_key 목록 (똑같이 다시 보낸 구간은 무시)
+        'next_window': 1,
+        'windows': [],       # 분석이 끝난 구간 결과
+        'ended': False
+    }
+
+def cut_windows(state: dict, window_seconds: float, final: bool = False) -> List[dict]:
+    """대기 중인 발화가 window_seconds 이상 쌓이면 앞에서부터 분석 구간으로 잘라냄
+
+    final이면 남은 발화를 길이와 관계없이 마지막 구간으로 잘라냅니다.
+    """
+    windows = []
+    pending = state['pending']
+    while pending:
+        window_start = pending[0][0]
+        cut = next((i + 1 for i, cue in enumerate(pending) if cue[1] - window_start >= window_seconds), None)
+        if cut is None:
+            if not final:
+                break
+            cut = len(pending)
+        cues, pending = pending[:cut], pending[cut:]
+        windows.append({'index': state['next_window'], 'start': cues[0][0], 'end': cues[-1][1], 'cues': cues})
+        state['next_window'] += 1
+    state['pending'] = pending
+    return windows
+
+def cue_key(cue) -> str:
+    """같은 자막 구간을 다시 보냈는지 가리는 (시작, 끝, 텍스트) 해시"""
+    return hashlib.sha1(f"{cue[0]:.3f}|{cue[1]:.3f}|{cue[2]}".encode('utf-8')).hexdigest()[:16]
+
+def windows_finished(state: dict) -> bool:
+    """종료된 세션의 구간 분석이 모두 끝났는지 (잘라낸 구간 수와 결과 수 비교)"""
+    return state['ended'] and len(state['windows']) >= state['next_window'] - 1
+
+def pending_seconds(state: dict) -> float:
+    pending = state['pending']
+    return round(pending[-1][1] - pending[0][0], 3) if pending else 0.0
+
+class BaseLiveStore:
+    """실시간 세션 상태 저장소
+
+    update는 세션 상태를 읽어 func(state) → (새 상태, 반환값)을 적용한 뒤 저장하며, 같은
+    세션에 동시에 들어온 요청이 서로의 변경을 덮어쓰지 않도록 원자적으로 처리합니다.
+    """
+
+    def __init__(self, ttl_seconds: int = 6 * 3600):
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, session_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def update(self, session_id: str, func: Callable[[Optional[dict]], Tuple[Optional[dict], object]]):
+        raise NotImplementedError
+
+class MemoryLiveStore(BaseLiveStore):
+    """프로세스 내부 저장소 (웹 워커 프로세스가 하나일 때)"""
+
+    def __init__(self, ttl_seconds: int = 6 * 3600):
+        super().__init__(ttl_seconds)
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        deadline = time.time() - self.ttl_seconds
+        for session_id in [s for s, state in self._sessions.items() if state['updated_at'] < deadline]:
+            del self._sessions[session_id]
+
+    def get(self, session_id):
+        with self._lock:
+            self._expire()
+            state = self._sessions.get(session_id)
+            return json.loads(json.dumps(state)) if state is not None else None
+
+    def update(self, session_id, func):
+        with self._lock:
+            self._expire()
+            state = self._sessions.get(session_id)
+            state, result = func(json.loads(json.dumps(state)) if state is not None else None)
+            if state is not None:
+                state['updated_at'] = time.time()
+                self._sessions[session_id] = state
+            return result
+
+class RedisLiveStore(BaseLiveStore):
+    """Redis 저장소 (여러 웹 워커 프로세스가 같은 세션을 공유, WATCH로 동시 수정 처리)"""
+
+    def __init__(self, url: str, ttl_seconds: int = 6 * 3600, prefix: str = 'live'):
+        super().__init__(ttl_seconds)
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, session_id):
+        return f'{self.prefix}:{session_id}'
+
+    def get(self, session_id):
+        raw = self.client.get(self._key(session_id))
+        return json.loads(raw) if raw else None
+
+    def update(self, session_id, func):
+        key = self._key(session_id)
+
+        def transaction(pipe):
+            raw = pipe.get(key)
+            state, result = func(json.loads(raw) if raw else None)
+            pipe.multi()
+            if state is not None:
+                state['updated_at'] = time.time()
+                pipe.set(key, json.dumps(state, ensure_ascii=False), ex=self.ttl_seconds)
+            return result
+
+        return self.client.transaction(transaction, key, value_from_callable=True)
+
+def create_live_store(backend: str, redis_url: Optional[str] = None, ttl_seconds: int = 6 * 3600) -> BaseLiveStore:
+    """설정값에 맞는 실시간 세션 저장소 생성"""
+    backend = (backend or 'memory').lower()
+    if backend == 'memory':
+        store = MemoryLiveStore(ttl_seconds)
+    elif backend == 'redis':
+        if not redis_url:
+            raise ValueError("Redis 실시간 세션 저장소를 사용하려면 REDIS_URL이 필요합니다.")
+        store = RedisLiveStore(redis_url, ttl_seconds)
+    else:
+        raise ValueError(f"지원하지 않는 실시간 세션 백엔드입니다: {backend}")
+    logger.info(f"실시간 세션 저장소 초기화 완료 (백엔드: {backend})")
+    return store
+
+@timed('live_window')
+def analyze_window(client, window: dict) -> dict:
+    """구간 하나의 요약과 위험 발언 분석 (구간이 청크 예산보다 길면 나눠서 분석 후 통합)
+
+    client.risk_prescreen이면 위험 발언은 청크 분석 대신 사전 선별 구간의 분류 결과를 사용합니다.
+    """
+    transcript = Transcript([Cue(*cue) for cue in window['cues']], True)
+    plan = client.plan_units(transcript.units(), 'vtt')
+    analysis = combine_analysis_results(client.analyze_chunks(plan.texts, 'vtt'))
+    if client.risk_prescreen:
+        screen = get_risk_screen()
+        analysis.risks = screen.classify(client, screen.screen(transcript))
+    return {
+        'index': window['index'],
+        'start': window['start'],
+        'end': window['end'],
+        'cue_count': len(window['cues']),
+        'summary': analysis.summary,
+        'keywords': analysis.keywords,
+        'risks': [risk for risk in analysis.risks if is_real_risk(risk)],
+        'analyzed_at': time.time()
+    }
+
+class LiveMonitor:
+    """강의 중 들어오는 자막을 window_minutes 분량의 발화마다 분석하고 위험 발언을 알림
+
+    구간 분석은 요청 스레드를 막지 않도록 작업 풀에서 수행하며, 구간마다 결과를 세션
+    id의 진행 상황 채널(/analysis-progress/<session_id>)에 발행합니다. notifier가 있으면
+    위험 발언이 감지된 구간을 Discord로 알립니다.
+    """
+
+    def __init__(self, client, store: BaseLiveStore, notifier=None, window_minutes: float = 5,
+                 max_workers: int = 2):
+        self.client = client
+        self.store = store
+        self.notifier = notifier
+        self.window_seconds = window_minutes * 60
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='live-window')
+
+    def ingest(self, session_id: str, cues: List[Cue]) -> dict:
+        """자막 묶음을 세션에 추가하고, 분석할 만큼 쌓인 구간은 작업 풀에 넘김"""
+        def apply(state):
+            state = state or new_session(session_id)
+            if state['ended']:
+                raise ValueError("이미 종료된 세션입니다.")
+            # 클라이언트가 같은 묶음을 다시 보내도 중복 분석하지 않도록 똑같은 구간만 무시
+            # (겹치거나 늦게 도착한 구간은 받아서 시작 시각 순서로 끼워 넣음)
+            seen = set(state.setdefault('seen', []))
+            fresh = []
+            for cue in cues:
+                key = cue_key(cue)
+                if key not in seen:
+                    seen.add(key)
+                    state['seen'].append(key)
+                    fresh.append(list(cue))
+            if fresh:
+                state['pending'] = sorted(state['pending'] + fresh, key=lambda cue: cue[0])
+            windows = cut_windows(state, self.window_seconds)
+            return state, (len(fresh), windows, pending_seconds(state))
+
+        accepted, windows, waiting = self.store.update(session_id, apply)
+        for window in windows:
+            self.executor.submit(self._process_window, session_id, window)
+        logger.info(f"실시간 자막 수신 (세션: {session_id}, 추가 {accepted}개, 분석 시작 구간 {len(windows)}개)")
+        return {
+            'session_id': session_id,
+            'accepted': accepted,
+            'windows_started': [window['index'] for window in windows],
+            'pending_seconds': waiting
+        }
+
+    def end(self, session_id: str) -> Optional[dict]:
+        """세션 종료: 남은 발화를 마지막 구간으로 작업 풀에 넘기고 세션 상태 반환
+
+        종료 이벤트(done)는 앞서 넘긴 구간까지 세션의 모든 구간 분석이 끝난 뒤 발행합니다.
+        마지막 구간을 끝낸 쪽(이 요청 또는 _process_window)이 발행하므로 다른 프로세스에서 분석
+        중인 구간도 기다립니다.
+        """
+        def apply(state):
+            if state is None:
+                return None, None
+            windows = cut_windows(state, self.window_seconds, final=True)
+            state['ended'] = True
+            return state, (windows, windows_finished(state))
+
+        result = self.store.update(session_id, apply)
+        if result is None:
+            return None
+        windows, finished = result
+        for window in windows:
+            self.executor.submit(self._process_window, session_id, window)
+        if finished:
+            publish_progress(session_id, "실시간 분석이 종료되었습니다", done=True)
+        logger.info(f"실시간 세션 종료 (세션: {session_id}, 마지막 분석 구간 {len(windows)}개)")
+        return self.status(session_id)
+
+    def status(self, session_id: str) -> Optional[dict]:
+        """세션 상태 (분석이 끝난 구간 결과는 구간 순서대로)"""
+        state = self.store.get(session_id)
+        if state is None:
+            return None
+        windows = sorted(state['windows'], key=lambda window: window['index'])
+        return {
+            'session_id': session_id,
+            'ended': state['ended'],
+            'pending_seconds': pending_seconds(state),
+            'pending_cues': len(state['pending']),
+            'windows': windows,
+            'windows_started': state['next_window'] - 1,
+            'finished': windows_finished(state),
+            'alerts': sum(1 for window in windows if window.get('alerted'))
+        }
+
+    def _process_window(self, session_id: str, window: dict):
+        """구간 분석 후 결과 저장, 진행 상황 발행, 위험 발언 알림"""
+        try:
+            result = analyze_window(self.client, window)
+        except Exception as e:
+            logger.error(f"실시간 구간 분석 실패 (세션: {session_id}, 구간: {window['index']}): {str(e)}")
+            result = {'index': window['index'], 'start': window['start'], 'end': window['end'],
+                      'cue_count': len(window['cues']), 'error': str(e), 'analyzed_at': time.time()}
+
+        if result.get('risks') and self.notifier is not None:
+            result['alerted'] = self.notifier.send_risk_alert(session_id, result)
+
+        def apply(state):
+            if state is None:
+                return None, False
+            state['windows'].append(result)
+            return state, windows_finished(state)
+
+        finished = self.store.update(session_id, apply)
+        publish_progress(session_id, f"{result['index']}번째 구간 분석 완료", stage='live',
+                         partial={'type': 'live_window', 'window': result})
+        if finished:
+            publish_progress(session_id, "실시간 분석이 종료되었습니다", done=True)
+        return result
+
+# 프로세스마다 한 번만 생성되는 실시간 세션 저장소
+_store = None
+
+def get_live_store() -> BaseLiveStore:
+    """설정(Config.LIVE_BACKEND)에 맞는 실시간 세션 저장소 (최초 사용 시 생성)"""
+    global _store
+    if _store is None:
+        from app.config import Config
+
+        _store = create_live_store(Config.LIVE_BACKEND, Config.REDIS_URL, Config.LIVE_SESSION_TTL_SECONDS)
+    return _store
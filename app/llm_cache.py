@@ -0,0 +1,235 @@
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+def make_cache_key(model: str, prompt: str, temperature: float, max_tokens: int,
+                   response_format: Optional[str] = None) -> str:
+    """모델, 프롬프트, temperature, max_tokens(, 응답 형식)로 캐시 키(SHA-256) 생성"""
+    params = {'model': model, 'prompt': prompt, 'temperature': temperature, 'max_tokens': max_tokens}
+    if response_format:
+        # 응답 형식을 지정하지 않은 요청의 기존 키는 그대로 유지
+        params['response_format'] = response_format
+    payload = json.dumps(params, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class BaseLLMCache:
+    """LLM 응답 캐시 공통 인터페이스
+
+    ttl_seconds가 지난 항목은 조회되지 않으며, 항목 수가 max_entries를 넘으면
+    가장 오래 사용되지 않은 항목부터 제거합니다.
+    """
+
+    backend = 'base'
+
+    def __init__(self, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        if value:
+            self._set(key, value)
+
+    def stats(self) -> dict:
+        """적중/미적중 횟수와 현재 항목 수"""
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'backend': self.backend,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+            'entries': self.size(),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+    def _get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: str):
+        raise NotImplementedError
+
+    def size(self) -> int:
+        raise NotImplementedError
+
+class MemoryLRUCache(BaseLLMCache):
+    """프로세스 내부 LRU 캐시"""
+
+    backend = 'memory'
+
+    def __init__(self, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 10000):
+        super().__init__(ttl_seconds, max_entries)
+        self._entries = OrderedDict()  # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+class SQLiteCache(BaseLLMCache):
+    """로컬 SQLite 파일 캐시 (같은 서버의 여러 워커 프로세스가 공유)"""
+
+    backend = 'sqlite'
+
+    def __init__(self, path: str, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 10000):
+        super().__init__(ttl_seconds, max_entries)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache ('
+                ' key TEXT PRIMARY KEY,'
+                ' value TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL,'
+                ' accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)')
+
+    def _connect(self):
+        # sqlite3 연결은 스레드마다 따로 사용
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute('SELECT value, expires_at FROM llm_cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        with conn:
+            if expires_at < now:
+                conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                return None
+            conn.execute('UPDATE llm_cache SET accessed_at = ? WHERE key = ?', (now, key))
+        return value
+
+    def _set(self, key, value):
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, value, now + self.ttl_seconds, now)
+            )
+            # 만료 항목 정리 후 용량 초과분은 오래 사용되지 않은 순으로 제거
+            conn.execute('DELETE FROM llm_cache WHERE expires_at < ?', (now,))
+            conn.execute(
+                'DELETE FROM llm_cache WHERE key IN ('
+                ' SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def size(self):
+        return self._connect().execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0]
+
+class RedisCache(BaseLLMCache):
+    """Redis 캐시 (여러 웹 인스턴스와 Celery 워커가 공유)
+
+    만료는 Redis TTL로 처리하고, 항목 수 제한은 마지막 사용 시각을 담은
+    정렬 집합(sorted set)으로 관리합니다.
+    """
+
+    backend = 'redis'
+
+    def __init__(self, url: str, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 10000,
+                 prefix: str = 'llm-cache'):
+        super().__init__(ttl_seconds, max_entries)
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.index_key = f'{prefix}:index'
+
+    def _key(self, key):
+        return f'{self.prefix}:{key}'
+
+    def _get(self, key):
+        value = self.client.get(self._key(key))
+        if value is None:
+            self.client.zrem(self.index_key, key)
+            return None
+        self.client.zadd(self.index_key, {key: time.time()})
+        return value.decode('utf-8')
+
+    def _set(self, key, value):
+        pipe = self.client.pipeline()
+        pipe.set(self._key(key), value.encode('utf-8'), ex=self.ttl_seconds)
+        pipe.zadd(self.index_key, {key: time.time()})
+        pipe.zcard(self.index_key)
+        size = pipe.execute()[-1]
+
+        overflow = size - self.max_entries
+        if overflow > 0:
+            evicted = [member for member, _ in self.client.zpopmin(self.index_key, overflow)]
+            if evicted:
+                self.client.delete(*[self._key(m.decode('utf-8')) for m in evicted])
+
+    def size(self):
+        return self.client.zcard(self.index_key)
+
+def create_llm_cache(backend: str, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 10000,
+                     sqlite_path: Optional[str] = None, redis_url: Optional[str] = None) -> Optional[BaseLLMCache]:
+    """설정값에 맞는 캐시 백엔드 생성 (none이면 None 반환)"""
+    backend = (backend or 'none').lower()
+    if backend == 'none':
+        return None
+    if backend == 'memory':
+        cache = MemoryLRUCache(ttl_seconds, max_entries)
+    elif backend == 'sqlite':
+        cache = SQLiteCache(sqlite_path or 'cache/llm_cache.sqlite3', ttl_seconds, max_entries)
+    elif backend == 'redis':
+        if not redis_url:
+            raise ValueError("Redis 캐시를 사용하려면 REDIS_URL이 필요합니다.")
+        cache = RedisCache(redis_url, ttl_seconds, max_entries)
+    else:
+        raise ValueError(f"지원하지 않는 캐시 백엔드입니다: {backend}")
+    logger.info(f"LLM 응답 캐시 초기화 완료 (백엔드: {backend}, 최대 항목 수: {max_entries}, TTL: {ttl_seconds}초)")
+    return cache
@@ -0,0 +1,161 @@
+import os
+import time
+import shutil
+import logging
+import functools
+import inspect
+from contextlib import contextmanager
+from typing import Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+logger = logging.getLogger(__name__)
+
+# gunicorn 워커가 여러 개면 gunicorn_config.py가 PROMETHEUS_MULTIPROC_DIR을 지정하며,
+# 각 워커는 이 디렉터리의 자기 파일에 값을 기록하고 /metrics는 모든 워커의 값을 합쳐 응답합니다.
+MULTIPROC_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+# 단계 이름(stage)은 요청한 지표 이름을 따르며 대부분 함수 이름과 같음. 다른 것은
+# split_vtt_content/split_chat_content(plan_vtt_chunks/plan_chat_chunks), analyze_text(청크 하나의
+# analyze_chunk), make_request(make_request 안의 API 호출 시도 하나, 재시도마다 따로 기록)
+
+# 청크 분석/API 요청은 수 초~수 분, 파싱/포맷은 수 밀리초~수 초 범위
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+STAGE_SECONDS = Histogram(
+    'analysis_stage_seconds', '분석 파이프라인 단계별 소요 시간(초)', ['stage'], buckets=STAGE_BUCKETS
+)
+JOB_SECONDS = Histogram(
+    'analysis_job_seconds', '분석 요청 하나의 전체 처리 시간(초)', ['analysis_type'], buckets=STAGE_BUCKETS
+)
+LLM_RETRIES = Counter('llm_retries', 'OpenAI API 요청 재시도 횟수', ['reason'])
+LLM_ERRORS = Counter('llm_request_errors', '실패한 OpenAI API 요청 시도 수 (예외 종류별)', ['error'])
+LLM_TOKENS = Counter('llm_tokens', 'OpenAI API 사용 토큰 수 (in: 프롬프트, out: 응답)', ['direction'])
+CHUNK_FAILURES = Counter('analysis_chunk_failures', '재시도 후에도 분석하지 못한 청크 수', ['analysis_type'])
+JOBS_IN_FLIGHT = Gauge(
+    'analysis_jobs_in_flight', '처리 중인 분석 요청 수', ['analysis_type'], multiprocess_mode='livesum'
+)
+PROGRESS_QUEUE_DEPTH = Gauge(
+    'progress_queue_depth', '진행 상황 구독자에게 아직 전달하지 않은 이벤트 수', multiprocess_mode='livesum'
+)
+
+# 아직 한 번도 발생하지 않은 값도 0으로 노출 (rate() 계산이 첫 발생 전후로 끊기지 않도록)
+for _reason in ('error', 'validation'):
+    LLM_RETRIES.labels(_reason)
+for _direction in ('in', 'out'):
+    LLM_TOKENS.labels(_direction)
+for _analysis_type in ('vtt', 'chat'):
+    CHUNK_FAILURES.labels(_analysis_type)
+    JOBS_IN_FLIGHT.labels(_analysis_type)
+
+@contextmanager
+def observe_stage(stage: str):
+    """with 블록의 소요 시간을 단계 히스토그램에 기록 (예외가 나도 기록)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+def timed(stage: str):
+    """함수(일반/코루틴) 호출 시간을 단계 히스토그램에 기록하는 데코레이터"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with observe_stage(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with observe_stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def track_job(analysis_type: str):
+    """분석 라우트(일반/코루틴)의 처리 중 요청 수와 전체 처리 시간을 기록하는 데코레이터"""
+    def decorator(func):
+        @contextmanager
+        def tracking():
+            gauge = JOBS_IN_FLIGHT.labels(analysis_type)
+            gauge.inc()
+            started = time.perf_counter()
+            try:
+                yield
+            finally:
+                gauge.dec()
+                JOB_SECONDS.labels(analysis_type).observe(time.perf_counter() - started)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracking():
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracking():
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count_retry(retry_state=None, reason: str = 'error'):
+    """재시도 횟수 기록 (tenacity before_sleep 콜백으로도 사용)"""
+    LLM_RETRIES.labels(reason).inc()
+
+def record_llm_error(error: Exception):
+    LLM_ERRORS.labels(type(error).__name__).inc()
+
+def record_usage(response):
+    """API 응답의 사용 토큰 수 기록 (usage가 없는 응답은 무시)"""
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return
+    LLM_TOKENS.labels('in').inc(usage.prompt_tokens or 0)
+    LLM_TOKENS.labels('out').inc(usage.completion_tokens or 0)
+
+def record_chunk_failure(analysis_type: str):
+    CHUNK_FAILURES.labels(analysis_type).inc()
+
+def progress_queue_changed(delta: int):
+    """진행 상황 구독 버퍼의 대기 이벤트 수 변화 반영"""
+    if delta:
+        PROGRESS_QUEUE_DEPTH.inc(delta)
+
+def _metrics_registry():
+    """응답할 지표 레지스트리 (다중 프로세스 모드면 모든 워커의 값을 합산하는 레지스트리)"""
+    if not os.environ.get(MULTIPROC_DIR_ENV):
+        return REGISTRY
+    from prometheus_client import multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus 텍스트 형식의 지표와 Content-Type (다중 프로세스 모드면 모든 워커의 값을 합산)"""
+    return generate_latest(_metrics_registry()), CONTENT_TYPE_LATEST
+
+def reset_multiproc_dir():
+    """이전 실행의 지표 파일 정리 (다중 프로세스 모드에서 워커를 띄우기 전에 한 번 호출)"""
+    metrics_dir = os.environ.get(MULTIPROC_DIR_ENV)
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+def mark_process_dead(pid: int):
+    """종료된 워커 프로세스의 livesum 게이지 값을 합산에서 제외"""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
+
+def start_metrics_server(port: int):
+    """/metrics와 같은 지표를 port에서 응답하는 HTTP 서버 시작 (웹 라우트가 없는 Celery 워커용)"""
+    from prometheus_client import start_http_server
+
+    start_http_server(port, registry=_metrics_registry())
+    logger.info(f"지표 서버 시작 (포트: {port}, 다중 프로세스: {bool(os.environ.get(MULTIPROC_DIR_ENV))})")
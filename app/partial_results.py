@@ -0,0 +1,65 @@
+import logging
+import threading
+from collections import Counter
+from typing import Optional
+
+from app.analysis import as_vtt_analysis, format_analysis_result
+from app.progress import publish_progress
+
+logger = logging.getLogger(__name__)
+
+# 중간 결과 이벤트에 담는 누적 키워드 수
+KEYWORD_TOTALS_LIMIT = 30
+
+def is_failed_chunk(result) -> bool:
+    """분석에 실패한 청크 결과인지 확인 (구조화 모드는 None, 마크다운 모드는 '[청크 n ...]' 문자열)"""
+    return result is None or (isinstance(result, str) and result.startswith('[청크 '))
+
+def chunk_partial(index: int, total: int, result, analysis_type: str) -> dict:
+    """청크 하나의 분석 결과 이벤트 (HTML 조각과 이 청크의 키워드)
+
+    실패한 청크는 html 없이 보내 브라우저가 진행 표시만 갱신하도록 합니다.
+    """
+    partial = {'type': 'chunk', 'analysis_type': analysis_type, 'index': index, 'total': total,
+               'html': None, 'keywords': []}
+    if is_failed_chunk(result):
+        return partial
+    partial['html'] = format_analysis_result(result, analysis_type)
+    if analysis_type == 'vtt':
+        partial['keywords'] = as_vtt_analysis(result).keywords
+    return partial
+
+class PartialResults:
+    """청크 분석과 과목별 달성도 평가가 끝나는 대로 작업 진행 채널에 중간 결과를 발행
+
+    브라우저는 /analysis-progress/<job_id> 스트림의 partial 이벤트로 최종 응답 전에 청크별
+    분석, 누적 키워드, 과목별 달성도를 먼저 표시합니다. job id가 없으면 아무것도 하지 않습니다.
+    """
+
+    def __init__(self, job_id: Optional[str], analysis_type: str, total: int = 0):
+        self.job_id = job_id
+        self.analysis_type = analysis_type
+        self.total = total
+        self.completed = 0
+        self.keyword_counts = Counter()
+        self._lock = threading.Lock()
+
+    def chunk_done(self, index: int, result):
+        """청크 분석 완료 (analyze_chunks의 result_callback)"""
+        if not self.job_id:
+            return
+        partial = chunk_partial(index, self.total, result, self.analysis_type)
+        with self._lock:
+            self.completed += 1
+            completed = self.completed
+            self.keyword_counts.update(partial['keywords'])
+            partial['keyword_totals'] = self.keyword_counts.most_common(KEYWORD_TOTALS_LIMIT)
+        publish_progress(self.job_id, f"청크 {completed}/{self.total} 분석 완료",
+                         stage='chunks', chunk=index, partial=partial)
+
+    def subject_done(self, subject: dict):
+        """과목 하나의 달성도 평가 완료 (analyze_curriculum_match의 subject_callback)"""
+        if not self.job_id:
+            return
+        publish_progress(self.job_id, f"'{subject['name']}' 달성도 평가 완료",
+                         stage='curriculum', partial={'type': 'subject', 'subject': subject})
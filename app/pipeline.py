@@ -0,0 +1,187 @@
+"""분석 한 건의 파이프라인 (Flask 라우트와 ASGI 라우트가 공유)
+
+VTT: 청크 분석 → 분석 결과 통합(계층적 재요약) → 위험 발언 분류 → 커리큘럼 매칭 → 결과 저장
+채팅: 청크 분석 → 결과 통합 → 위험 발언 분류 → 결과 저장
+
+AnalysisRun은 단계 사이의 진행 상황 발행, 시간 측정, 결과 저장, 응답 구성처럼 API 호출이 아닌
+부분을 맡고, run_*_analysis(동기)와 run_*_analysis_async(비동기)는 API 호출 순서만 정합니다.
+비동기 버전은 Redis 발행, 저장소 접근, 검색 인덱스 생성처럼 막히는 작업을 스레드 풀에서
+수행해 이벤트 루프를 막지 않습니다.
+"""
+import time
+import logging
+from typing import Optional
+
+from app.config import Config
+from app.progress import publish_progress
+from app.partial_results import PartialResults
+from app.result_store import get_result_store
+from app.incremental import analyze_plan_incremental, analyze_plan_incremental_async
+from app.summary_tree import summarize_analysis, summarize_analysis_async
+from app.risk_screen import analyze_risks, analyze_risks_async
+from app.analysis import (
+    combine_chat_results,
+    analyze_curriculum_match,
+    analyze_curriculum_match_async,
+    transcript_segments,
+    format_analysis_result
+)
+
+logger = logging.getLogger(__name__)
+
+def save_result(budget, result_key, *args, **kwargs):
+    """분석 결과 저장 (작업 예산을 넘어 일부만 분석한 결과는 저장하지 않음)"""
+    if budget.exceeded:
+        return None
+    return get_result_store().save(result_key, *args, **kwargs)
+
+def completion_message(budget):
+    if budget.exceeded:
+        return f"작업 예산을 넘어 요청 {budget.skipped_requests}개를 생략하고 분석을 마쳤습니다 (일부 결과)"
+    return "분석이 완료되었습니다"
+
+def batch_completion_message(lectures):
+    """일괄 분석 완료 메시지 (강의별 결과 중 오류가 있으면 실패 수 포함)"""
+    failed = sum(1 for lecture in lectures if 'error' in lecture)
+    return f"강의 {len(lectures)}개 분석이 완료되었습니다" + (f" (실패 {failed}개)" if failed else "")
+
+class AnalysisRun:
+    """분석 한 건의 상태 (분할 계획, 작업 예산, 진행 채널, 단계별 시각)
+
+    job_id가 있으면 단계마다 진행 상황을, 청크별 분석과 과목별 달성도는 끝나는 대로 중간
+    결과로 발행합니다. finish는 결과를 저장하고 완료 메시지를 발행한 뒤 응답 dict를 반환합니다.
+    """
+
+    def __init__(self, analysis_type: str, content, plan, budget, result_key=None, job_id: Optional[str] = None,
+                 filename: Optional[str] = None, started: Optional[float] = None, estimate=None):
+        self.analysis_type = analysis_type
+        self.content = content
+        self.plan = plan
+        self.budget = budget
+        self.result_key = result_key
+        self.job_id = job_id
+        self.filename = filename
+        self.started = started or time.perf_counter()
+        self.estimate = estimate
+        self.partial = PartialResults(job_id, analysis_type, plan.count)
+        self.analyzed_chunks = None
+        self.chunks_done = None
+
+    def progress(self, message: str, done: bool = False, **extra):
+        publish_progress(self.job_id, message, done=done, **extra)
+
+    def start(self):
+        estimate = self.estimate.to_dict() if self.estimate else None
+        if self.analysis_type == 'vtt':
+            self.progress(f"청크 0/{self.plan.count} 분석 중", plan=self.plan.summary(), estimate=estimate)
+        else:
+            self.progress("채팅 내용 분석 중", estimate=estimate)
+
+    def chunks_analyzed(self, analyzed_chunks: list):
+        """청크 분석 결과를 받고 재요약 몫으로 떼어 둔 예산을 돌려받음"""
+        self.analyzed_chunks = analyzed_chunks
+        self.chunks_done = time.perf_counter()
+        self.budget.release()
+        if self.analysis_type == 'vtt':
+            self.progress("분석 결과 통합 중")
+
+    def risk_stage(self, client) -> bool:
+        """위험 발언 분류/커리큘럼 평가 몫으로 떼어 둔 예산을 돌려받고, 위험 발언을 사전 선별 구간으로 따로 분류할지 반환"""
+        self.budget.release()
+        if not client.risk_prescreen:
+            return False
+        self.progress("위험 발언 분석 중")
+        return True
+
+    def curriculum_options(self) -> dict:
+        """커리큘럼 매칭 인자 (원문 자막 검색 구간 포함)"""
+        self.progress("커리큘럼 매칭 분석 중")
+        return {
+            'batch_size': Config.CURRICULUM_BATCH_SIZE,
+            'item_output_tokens': Config.CURRICULUM_ITEM_OUTPUT_TOKENS,
+            'transcript': transcript_segments(self.content),
+            'top_k': Config.CURRICULUM_TOP_K,
+            'subject_callback': self.partial.subject_done,
+            'budget': self.budget
+        }
+
+    def finish(self, combined, curriculum_result=None) -> dict:
+        """결과 저장, 완료 메시지 발행 후 응답 dict"""
+        finished = time.perf_counter()
+        if self.analysis_type == 'vtt':
+            timings = {'chunks_seconds': round(self.chunks_done - self.started, 3),
+                       'curriculum_seconds': round(finished - self.chunks_done, 3),
+                       'total_seconds': round(finished - self.started, 3)}
+            args = (combined, curriculum_result)
+        else:
+            elapsed = round(finished - self.started, 3)
+            timings = {'chunks_seconds': elapsed, 'total_seconds': elapsed}
+            args = (combined,)
+        analysis_id = save_result(self.budget, self.result_key, self.analyzed_chunks, *args,
+                                  timings=timings, filename=self.filename)
+        result = {f'{self.analysis_type}_result': format_analysis_result(combined, self.analysis_type)}
+        if self.analysis_type == 'vtt':
+            result['curriculum_result'] = curriculum_result
+        result.update({'analysis_id': analysis_id, 'budget': self.budget.summary()})
+        self.progress(completion_message(self.budget), done=True)
+        return result
+
+def _summary_options(budget) -> dict:
+    return {'max_tokens': Config.SUMMARY_MAX_TOKENS, 'fan_in': Config.SUMMARY_FAN_IN,
+            'max_length': Config.SUMMARY_MAX_LENGTH, 'budget': budget}
+
+def run_vtt_analysis(client, run: AnalysisRun, curriculum_content) -> dict:
+    """분할 계획(plan_job)대로 VTT 분석 한 건 수행 후 응답 dict 반환
+
+    이전에 분석한 청크는 저장된 결과를 재사용하고 새로 추가되거나 수정된 청크만 분석합니다.
+    """
+    store = get_result_store()
+    run.start()
+    run.chunks_analyzed(analyze_plan_incremental(client, run.plan.texts, 'vtt', store,
+                                                 result_callback=run.partial.chunk_done, budget=run.budget))
+    combined = summarize_analysis(client, run.analyzed_chunks, store, **_summary_options(run.budget))
+    if run.risk_stage(client):
+        combined.risks = analyze_risks(client, run.content, run.budget)
+    curriculum_result = analyze_curriculum_match(client, combined, curriculum_content, **run.curriculum_options())
+    return run.finish(combined, curriculum_result)
+
+async def run_vtt_analysis_async(async_client, run: AnalysisRun, curriculum_content) -> dict:
+    """run_vtt_analysis의 비동기 버전"""
+    from starlette.concurrency import run_in_threadpool
+
+    store = get_result_store()
+    await run_in_threadpool(run.start)
+    analyzed_chunks = await analyze_plan_incremental_async(async_client, run.plan.texts, 'vtt', store,
+                                                           result_callback=run.partial.chunk_done, budget=run.budget)
+    await run_in_threadpool(run.chunks_analyzed, analyzed_chunks)
+    combined = await summarize_analysis_async(async_client, run.analyzed_chunks, store, **_summary_options(run.budget))
+    if await run_in_threadpool(run.risk_stage, async_client):
+        combined.risks = await analyze_risks_async(async_client, run.content, run.budget)
+    options = await run_in_threadpool(run.curriculum_options)
+    curriculum_result = await analyze_curriculum_match_async(async_client, combined, curriculum_content, **options)
+    return await run_in_threadpool(run.finish, combined, curriculum_result)
+
+def run_chat_analysis(client, run: AnalysisRun) -> dict:
+    """분할 계획대로 채팅 분석 한 건 수행 후 응답 dict 반환 (청크 재사용은 run_vtt_analysis와 같음)"""
+    run.start()
+    run.chunks_analyzed(analyze_plan_incremental(client, run.plan.texts, 'chat', get_result_store(),
+                                                 result_callback=run.partial.chunk_done, budget=run.budget))
+    chat_result = combine_chat_results(run.analyzed_chunks)
+    if run.risk_stage(client):
+        chat_result.risks = analyze_risks(client, run.content, run.budget)
+    logger.info("채팅 분석 완료")
+    return run.finish(chat_result)
+
+async def run_chat_analysis_async(async_client, run: AnalysisRun) -> dict:
+    """run_chat_analysis의 비동기 버전"""
+    from starlette.concurrency import run_in_threadpool
+
+    await run_in_threadpool(run.start)
+    analyzed_chunks = await analyze_plan_incremental_async(async_client, run.plan.texts, 'chat', get_result_store(),
+                                                           result_callback=run.partial.chunk_done, budget=run.budget)
+    await run_in_threadpool(run.chunks_analyzed, analyzed_chunks)
+    chat_result = combine_chat_results(run.analyzed_chunks)
+    if await run_in_threadpool(run.risk_stage, async_client):
+        chat_result.risks = await analyze_risks_async(async_client, run.content, run.budget)
+    logger.info("채팅 분석 완료")
+    return await run_in_threadpool(run.finish, chat_result)
@@ -0,0 +1,342 @@
+import re
+import json
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Iterator, Optional, Tuple
+
+from app.metrics import progress_queue_changed
+
+logger = logging.getLogger(__name__)
+
+# 클라이언트가 보내는 job id 형식 (UUID 등)
+JOB_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def is_valid_job_id(job_id) -> bool:
+    return bool(job_id) and bool(JOB_ID_PATTERN.match(job_id))
+
+def parse_last_event_id(value) -> int:
+    """Last-Event-ID 헤더 값을 정수로 변환 (없거나 잘못된 값이면 0)"""
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
+
+def format_sse(event_id: int, data: dict) -> str:
+    """SSE 메시지 형식으로 변환 (id를 포함해 재연결 시 이어받을 수 있도록 함)"""
+    return f"id: {event_id}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+class BaseSubscription:
+    """작업 하나의 진행 상황 구독"""
+
+    def get(self, timeout: float) -> Optional[Tuple[int, dict]]:
+        """다음 이벤트 (timeout 초 동안 없으면 None)"""
+        raise NotImplementedError
+
+    def get_nowait(self) -> Optional[Tuple[int, dict]]:
+        return self.get(0)
+
+    def close(self):
+        pass
+
+class BaseProgressBroker:
+    """작업(job)별 진행 상황 채널
+
+    publish로 보낸 이벤트는 작업마다 1부터 증가하는 id를 가지며, 최근 history_size개는
+    보관되어 Last-Event-ID 이후의 이벤트부터 다시 받을 수 있습니다.
+    """
+
+    def __init__(self, buffer_size: int = 100, history_size: int = 200, ttl_seconds: int = 3600):
+        self.buffer_size = buffer_size
+        self.history_size = history_size
+        self.ttl_seconds = ttl_seconds
+
+    def publish(self, job_id: str, data: dict) -> int:
+        raise NotImplementedError
+
+    def open_subscription(self, job_id: str, last_event_id: int = 0) -> BaseSubscription:
+        raise NotImplementedError
+
+    def subscribe(self, job_id: str, last_event_id: int = 0,
+                  idle_timeout: float = 30) -> Iterator[Tuple[int, dict]]:
+        """이벤트를 차례로 반환 (완료 이벤트를 받거나 idle_timeout 동안 이벤트가 없으면 종료)"""
+        subscription = self.open_subscription(job_id, last_event_id)
+        try:
+            while True:
+                event = subscription.get(timeout=idle_timeout)
+                if event is None:
+                    return
+                yield event
+                if event[1].get('done'):
+                    return
+        finally:
+            subscription.close()
+
+    async def subscribe_async(self, job_id: str, last_event_id: int = 0,
+                              idle_timeout: float = 30, poll_interval: float = 0.2):
+        """subscribe의 비동기 버전
+
+        Redis 구독(SUBSCRIBE, 기록 조회, 메시지 확인)은 블로킹 호출이므로 이벤트 루프를 막지 않도록
+        스레드 풀에서 실행하며, 스레드 하나를 오래 잡지 않도록 poll_interval초씩 나눠 기다립니다.
+        """
+        import anyio
+        from starlette.concurrency import run_in_threadpool
+
+        subscription = await run_in_threadpool(self.open_subscription, job_id, last_event_id)
+        try:
+            idle = 0.0
+            while idle < idle_timeout:
+                event = await run_in_threadpool(subscription.get, poll_interval)
+                if event is None:
+                    idle += poll_interval
+                    continue
+                idle = 0.0
+                yield event
+                if event[1].get('done'):
+                    return
+        finally:
+            # 연결이 끊겨 취소된 뒤에도 구독은 닫도록 취소를 막고 기다림
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(subscription.close)
+
+class _InProcessSubscription(BaseSubscription):
+    def __init__(self, broker, job_id, buffer_size):
+        self.broker = broker
+        self.job_id = job_id
+        self.queue = queue.Queue(maxsize=buffer_size)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def put(self, event):
+        with self._lock:
+            if self._closed:
+                return
+            # 버퍼가 가득 차면 가장 오래된 이벤트를 버림 (느린 구독자가 발행자를 막지 않도록)
+            while True:
+                try:
+                    self.queue.put_nowait(event)
+                    progress_queue_changed(1)
+                    return
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                        progress_queue_changed(-1)
+                    except queue.Empty:
+                        pass
+
+    def get(self, timeout):
+        try:
+            if timeout <= 0:
+                event = self.queue.get_nowait()
+            else:
+                event = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        progress_queue_changed(-1)
+        return event
+
+    def close(self):
+        self.broker._unsubscribe(self)
+        # 전달하지 못한 이벤트는 버리고 대기 이벤트 수에서 제외
+        with self._lock:
+            self._closed = True
+            drained = 0
+            while True:
+                try:
+                    self.queue.get_nowait()
+                    drained += 1
+                except queue.Empty:
+                    break
+        progress_queue_changed(-drained)
+        if self.dropped:
+            logger.warning(f"진행 상황 구독 버퍼 초과로 {self.dropped}개 이벤트 누락 (job: {self.job_id})")
+
+class InProcessProgressBroker(BaseProgressBroker):
+    """프로세스 내부 진행 상황 채널 (단일 프로세스 실행용)"""
+
+    def __init__(self, buffer_size: int = 100, history_size: int = 200, ttl_seconds: int = 3600,
+                 max_jobs: int = 1000):
+        super().__init__(buffer_size, history_size, ttl_seconds)
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()  # job_id -> {'seq', 'history', 'subscribers', 'updated_at'}
+        self._lock = threading.Lock()
+
+    def _job(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = {'seq': 0, 'history': deque(maxlen=self.history_size), 'subscribers': set(), 'updated_at': time.time()}
+            self._jobs[job_id] = job
+            self._evict()
+        self._jobs.move_to_end(job_id)
+        return job
+
+    def _evict(self):
+        # 구독자가 없는 오래된 작업부터 정리
+        now = time.time()
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs and now - self._jobs[job_id]['updated_at'] < self.ttl_seconds:
+                break
+            if not self._jobs[job_id]['subscribers']:
+                del self._jobs[job_id]
+
+    def publish(self, job_id, data):
+        with self._lock:
+            job = self._job(job_id)
+            job['seq'] += 1
+            event = (job['seq'], data)
+            job['history'].append(event)
+            job['updated_at'] = time.time()
+            subscribers = list(job['subscribers'])
+        for subscription in subscribers:
+            subscription.put(event)
+        return event[0]
+
+    def open_subscription(self, job_id, last_event_id=0):
+        subscription = _InProcessSubscription(self, job_id, self.buffer_size)
+        with self._lock:
+            job = self._job(job_id)
+            # 놓친 이벤트부터 다시 전달
+            for event in job['history']:
+                if event[0] > last_event_id:
+                    subscription.put(event)
+            job['subscribers'].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            job = self._jobs.get(subscription.job_id)
+            if job is not None:
+                job['subscribers'].discard(subscription)
+
+class _RedisSubscription(BaseSubscription):
+    def __init__(self, broker, job_id, last_event_id):
+        self.broker = broker
+        self.last_event_id = last_event_id
+        self.buffer = deque(maxlen=broker.buffer_size)
+        self.pubsub = broker.client.pubsub(ignore_subscribe_messages=True)
+        # 기록을 읽기 전에 먼저 구독해야 그 사이에 발행된 이벤트를 놓치지 않음
+        self.pubsub.subscribe(broker._channel(job_id))
+        for raw in broker.client.lrange(broker._history_key(job_id), 0, -1):
+            event = json.loads(raw)
+            if event['id'] > last_event_id:
+                self._buffer((event['id'], event['data']))
+
+    def _buffer(self, event):
+        # 가득 찬 버퍼에 추가하면 가장 오래된 이벤트가 빠지므로 대기 이벤트 수는 그대로
+        if len(self.buffer) < self.buffer.maxlen:
+            progress_queue_changed(1)
+        self.buffer.append(event)
+
+    def get(self, timeout):
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            if self.buffer:
+                event = self.buffer.popleft()
+                progress_queue_changed(-1)
+                if event[0] > self.last_event_id:
+                    self.last_event_id = event[0]
+                    return event
+                continue
+            remaining = deadline - time.monotonic()
+            message = self.pubsub.get_message(timeout=max(0.0, remaining))
+            if message is not None and message.get('type') == 'message':
+                event = json.loads(message['data'])
+                self._buffer((event['id'], event['data']))
+                continue
+            if remaining <= 0:
+                return None
+
+    def close(self):
+        progress_queue_changed(-len(self.buffer))
+        self.buffer.clear()
+        try:
+            self.pubsub.close()
+        except Exception as e:
+            logger.warning(f"진행 상황 구독 종료 실패: {str(e)}")
+
+class RedisProgressBroker(BaseProgressBroker):
+    """Redis pub/sub 진행 상황 채널 (여러 워커 프로세스/웹 인스턴스/Celery 워커가 공유)
+
+    실시간 전달은 pub/sub으로, 재연결 시 이어받기는 작업별 기록 리스트로 처리합니다.
+    """
+
+    def __init__(self, url: str, buffer_size: int = 100, history_size: int = 200, ttl_seconds: int = 3600,
+                 prefix: str = 'progress'):
+        super().__init__(buffer_size, history_size, ttl_seconds)
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _channel(self, job_id):
+        return f'{self.prefix}:{job_id}:channel'
+
+    def _history_key(self, job_id):
+        return f'{self.prefix}:{job_id}:history'
+
+    def _seq_key(self, job_id):
+        return f'{self.prefix}:{job_id}:seq'
+
+    def publish(self, job_id, data):
+        event_id = self.client.incr(self._seq_key(job_id))
+        payload = json.dumps({'id': event_id, 'data': data}, ensure_ascii=False)
+        pipe = self.client.pipeline()
+        pipe.rpush(self._history_key(job_id), payload)
+        pipe.ltrim(self._history_key(job_id), -self.history_size, -1)
+        pipe.expire(self._history_key(job_id), self.ttl_seconds)
+        pipe.expire(self._seq_key(job_id), self.ttl_seconds)
+        pipe.publish(self._channel(job_id), payload)
+        pipe.execute()
+        return event_id
+
+    def open_subscription(self, job_id, last_event_id=0):
+        return _RedisSubscription(self, job_id, last_event_id)
+
+def create_progress_broker(backend: str, redis_url: Optional[str] = None, buffer_size: int = 100,
+                           history_size: int = 200, ttl_seconds: int = 3600) -> BaseProgressBroker:
+    """설정값에 맞는 진행 상황 채널 생성"""
+    backend = (backend or 'memory').lower()
+    if backend == 'memory':
+        broker = InProcessProgressBroker(buffer_size, history_size, ttl_seconds)
+    elif backend == 'redis':
+        if not redis_url:
+            raise ValueError("Redis 진행 상황 채널을 사용하려면 REDIS_URL이 필요합니다.")
+        broker = RedisProgressBroker(redis_url, buffer_size, history_size, ttl_seconds)
+    else:
+        raise ValueError(f"지원하지 않는 진행 상황 백엔드입니다: {backend}")
+    logger.info(f"진행 상황 채널 초기화 완료 (백엔드: {backend})")
+    return broker
+
+# 프로세스마다 한 번만 생성되는 진행 상황 채널
+_broker = None
+
+def get_progress_broker() -> BaseProgressBroker:
+    """설정(Config.PROGRESS_BACKEND)에 맞는 진행 상황 채널 (최초 사용 시 생성)"""
+    global _broker
+    if _broker is None:
+        from app.config import Config
+
+        _broker = create_progress_broker(
+            Config.PROGRESS_BACKEND,
+            redis_url=Config.REDIS_URL,
+            buffer_size=Config.PROGRESS_BUFFER_SIZE,
+            history_size=Config.PROGRESS_HISTORY_SIZE,
+            ttl_seconds=Config.PROGRESS_TTL_SECONDS
+        )
+    return _broker
+
+def publish_progress(job_id: Optional[str], message: str, done: bool = False, **extra):
+    """작업 진행 상황 발행 (job id가 없으면 무시, 발행 실패는 분석을 중단시키지 않음)"""
+    if not job_id:
+        return
+    data = {'message': message, **extra}
+    if done:
+        data['done'] = True
+    try:
+        get_progress_broker().publish(job_id, data)
+    except Exception as e:
+        logger.warning(f"진행 상황 발행 실패 (job: {job_id}): {str(e)}")
@@ -0,0 +1,79 @@
+import time
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """분당 허용량을 기준으로 채워지는 토큰 버킷"""
+
+    def __init__(self, per_minute: float):
+        if per_minute <= 0:
+            raise ValueError("분당 허용량은 0보다 커야 합니다.")
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0  # 초당 충전량
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        """경과 시간만큼 토큰 충전"""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """amount 만큼 소비하기 위해 기다려야 하는 시간(초, 앞선 예약으로 잔량이 음수일 수 있음)"""
+        # 버킷 용량보다 큰 요청은 용량만큼만 요구 (영원히 대기하지 않도록)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        """amount 만큼 차감 (잔량이 모자라면 음수로 남겨 뒤따르는 예약이 그만큼 더 기다림)"""
+        self.tokens -= min(amount, self.capacity)
+
+class RateLimiter:
+    """요청 수(RPM)와 토큰 수(TPM) 한도를 함께 적용하는 스레드 안전 리미터
+
+    여러 워커 스레드가 하나의 리미터를 공유합니다. 요청마다 두 버킷에서 허용량을 먼저
+    차감(예약)하고 여유가 생길 때까지 기다리므로, 먼저 예약한 요청이 먼저 통과하고 큰
+    요청도 뒤에 온 작은 요청에 밀려 계속 기다리지 않습니다.
+    """
+
+    def __init__(self, requests_per_minute: int = 3500, tokens_per_minute: int = 90000):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        """허용량을 예약(차감)하고 호출자가 기다려야 하는 시간(초)을 반환
+
+        대기가 필요 없으면 0을 반환합니다. 반환한 시간만큼 기다린 뒤에는 다시 예약하지 않고
+        요청을 보내면 됩니다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.request_bucket.refill(now)
+            self.token_bucket.refill(now)
+
+            delay = max(self.request_bucket.wait_time(1), self.token_bucket.wait_time(tokens))
+            self.request_bucket.consume(1)
+            self.token_bucket.consume(tokens)
+            return delay
+
+    def acquire(self, tokens: int = 0):
+        """허용량을 예약하고 통과할 차례까지 대기"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            logger.debug(f"요청 한도 대기: {delay:.2f}초 (예상 토큰: {tokens})")
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int = 0):
+        """acquire의 비동기 버전 (이벤트 루프를 막지 않고 대기)"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            logger.debug(f"요청 한도 대기: {delay:.2f}초 (예상 토큰: {tokens})")
+            await asyncio.sleep(delay)
@@ -0,0 +1,65 @@
+"""분석 결과 HTML 렌더링
+
+분석 결과(VTTAnalysis, ChatAnalysis)를 한 번만 훑어 화면용 모델(섹션별 항목 목록, 순서를 유지한
+중복 제거, 실제 위험 발언만 남긴 목록)을 만들고, 처음 사용할 때 한 번 컴파일해 두는 Jinja
+템플릿(templates/partials)으로 렌더링합니다. 출력의 class 이름과 구조는 style.css와 화면
+스크립트가 사용하는 기존 형식을 유지하며, 분석 결과 문장은 HTML 이스케이프합니다.
+"""
+import os
+from typing import Iterable, List
+
+from app.schemas import CHAT_SUBSECTIONS, ChatAnalysis, VTTAnalysis, is_real_risk, unique_items
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+
+# 처음 렌더링할 때 만드는 템플릿 환경과 컴파일된 템플릿
+_environment = None
+_templates = {}
+
+def get_template(name: str):
+    """컴파일된 결과 템플릿 (프로세스마다 한 번만 읽고 컴파일, 파일 변경은 다시 확인하지 않음)"""
+    global _environment
+    template = _templates.get(name)
+    if template is None:
+        if _environment is None:
+            from jinja2 import Environment, FileSystemLoader
+
+            _environment = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=True,
+                                       trim_blocks=True, lstrip_blocks=True, auto_reload=False)
+        template = _templates[name] = _environment.get_template(name)
+    return template
+
+def real_risks(risks: Iterable[str]) -> List[str]:
+    """위험 발언이 없다는 내용의 문장을 뺀 실제 위험 발언 (중복 제거)"""
+    return [risk for risk in unique_items(risks) if is_real_risk(risk)]
+
+def vtt_view(analysis: VTTAnalysis) -> dict:
+    """VTT 분석 결과 화면 모델"""
+    return {
+        'summary': unique_items(analysis.summary),
+        'keywords': unique_items(analysis.keywords),
+        'analysis': unique_items(analysis.analysis),
+        'risks': real_risks(analysis.risks)
+    }
+
+def chat_view(analysis: ChatAnalysis) -> dict:
+    """채팅 분석 결과 화면 모델 (sections는 내용이 있는 하위 항목만 담은 [(섹션 제목, [(하위 제목, 항목)])])"""
+    sections = []
+    for name, (title, subsections) in CHAT_SUBSECTIONS.items():
+        section = getattr(analysis, name)
+        items = [(subtitle, unique_items(section.get(key) or [])) for key, subtitle in subsections]
+        items = [(subtitle, values) for subtitle, values in items if values]
+        if items:
+            sections.append((title, items))
+    return {
+        'topics': unique_items(analysis.topics),
+        'sections': sections,
+        'risks': real_risks(analysis.risks),
+        'recommendations': unique_items(analysis.recommendations)
+    }
+
+def render_vtt_analysis(analysis: VTTAnalysis) -> str:
+    return get_template('partials/vtt_result.html').render(vtt_view(analysis))
+
+def render_chat_analysis(analysis: ChatAnalysis) -> str:
+    return get_template('partials/chat_result.html').render(chat_view(analysis))
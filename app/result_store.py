@@ -0,0 +1,512 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from app.analysis import (
+    as_transcript,
+    as_vtt_analysis,
+    as_chat_analysis,
+    build_curriculum_prompt,
+    build_curriculum_batch_prompt,
+    build_summary_prompt,
+    format_analysis_result
+)
+from app.partial_results import is_failed_chunk
+
+logger = logging.getLogger(__name__)
+
+class ResultKey(NamedTuple):
+    """저장된 분석 결과를 찾는 키 (같은 자막, 같은 커리큘럼, 같은 프롬프트/모델 설정이면 같은 결과)"""
+    analysis_type: str
+    transcript_hash: str
+    curriculum_hash: str
+    version: str
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def transcript_hash(content) -> str:
+    """자막/채팅 내용(문자열 또는 Transcript)의 해시
+
+    원문 바이트가 아니라 파싱된 발화 구간으로 계산하므로 BOM, 줄바꿈, 큐 번호만 다른
+    파일은 같은 해시가 됩니다.
+    """
+    transcript = as_transcript(content)
+    digest = hashlib.sha256(b'vtt' if transcript.is_vtt else b'text')
+    for cue in transcript.cues:
+        digest.update(f"\n{cue.start:.3f}|{cue.end:.3f}|{cue.speaker or ''}|{cue.text}".encode('utf-8'))
+    return digest.hexdigest()
+
+def curriculum_hash(curriculum_content) -> str:
+    """파싱된 커리큘럼의 해시 (커리큘럼이 없으면 빈 문자열)"""
+    if not curriculum_content:
+        return ''
+    return _sha256(json.dumps(curriculum_content, ensure_ascii=False, sort_keys=True))
+
+def _prompt_settings(client, analysis_type: str) -> dict:
+    """청크 분석 응답에 영향을 주는 모델 설정과 프롬프트 틀"""
+    return {
+        'model': client.model,
+        'temperature': client.temperature,
+        'structured': client.structured_output,
+        'max_output_tokens': client.max_output_tokens,
+        'prompt': client.build_prompt('', analysis_type),
+        'structured_prompt': client.build_structured_prompt('', analysis_type),
+        'function': client.chunk_function(analysis_type)
+    }
+
+def _version(model: str, payload: dict) -> str:
+    return f"{model}:{_sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True))[:16]}"
+
+def chunk_version(client, analysis_type: str) -> str:
+    """청크 하나의 분석 결과에 영향을 주는 프롬프트와 모델 설정의 해시 (청크 분할 설정과는 무관)"""
+    return _version(client.model, _prompt_settings(client, analysis_type))
+
+def summary_version(client, max_length: int) -> str:
+    """재요약 요청 하나의 결과에 영향을 주는 프롬프트와 모델 설정의 해시 (요약 트리의 중간 요약 키)"""
+    return _version(client.model, {
+        'temperature': client.temperature,
+        'max_output_tokens': client.max_output_tokens,
+        'prompt': build_summary_prompt([], max_length)
+    })
+
+def analysis_version(client, analysis_type: str, **settings) -> str:
+    """결과에 영향을 주는 프롬프트와 모델 설정의 해시
+
+    모델명, temperature, 청크 분할 설정, 프롬프트 틀, 함수 스키마, 위험 발언 사전 선별 설정과
+    settings(커리큘럼 묶음 크기, 검색 구간 수 등)로 계산하므로 이 중 하나라도 바뀌면 이전 결과를
+    쓰지 않습니다.
+    """
+    payload = {
+        **_prompt_settings(client, analysis_type),
+        'context_tokens': client.context_tokens,
+        'max_chunk_tokens': client.max_chunk_tokens,
+        'content_defined_chunks': client.content_defined_chunks,
+        'settings': settings
+    }
+    if analysis_type == 'vtt':
+        payload['curriculum_prompts'] = [build_curriculum_prompt('', ''), build_curriculum_batch_prompt([], '')]
+        payload['summary'] = summary_settings()
+    if client.risk_prescreen:
+        from app.risk_screen import risk_settings
+
+        payload['risk_screen'] = risk_settings()
+    return _version(client.model, payload)
+
+def chunk_hash(text: str) -> str:
+    """청크 본문의 해시 (청크별 분석 결과를 찾는 키)"""
+    return _sha256(text)
+
+def make_result_key(client, analysis_type: str, content, curriculum_content=None, **settings) -> ResultKey:
+    """분석 요청의 결과 키 생성"""
+    return ResultKey(
+        analysis_type,
+        transcript_hash(content),
+        curriculum_hash(curriculum_content),
+        analysis_version(client, analysis_type, **settings)
+    )
+
+def serialize_chunks(analyzed_chunks) -> list:
+    """청크 분석 결과 목록을 JSON으로 저장할 수 있는 형태로 변환"""
+    return [chunk.to_dict() if hasattr(chunk, 'to_dict') else chunk for chunk in analyzed_chunks]
+
+def render_result(record: dict) -> dict:
+    """저장된 결과를 분석 라우트의 응답 형식으로 변환"""
+    if record['analysis_type'] == 'vtt':
+        response = {
+            'vtt_result': format_analysis_result(as_vtt_analysis(record['combined']), 'vtt'),
+            'curriculum_result': record['curriculum']
+        }
+    else:
+        response = {'chat_result': format_analysis_result(as_chat_analysis(record['combined']), 'chat')}
+    response['analysis_id'] = record['id']
+    return response
+
+class BaseResultStore:
+    """분석 결과 저장소 공통 인터페이스
+
+    (분석 유형, 자막 해시, 커리큘럼 해시, 프롬프트/모델 버전)을 키로 청크별 분석 결과,
+    통합 결과, 커리큘럼 달성도, 단계별 소요 시간을 보관합니다. 같은 키로 다시 저장하면
+    기존 결과를 덮어씁니다.
+    """
+
+    backend = 'base'
+
+    SUMMARY_COLUMNS = ('id', 'analysis_type', 'transcript_hash', 'curriculum_hash', 'version',
+                       'filename', 'created_at', 'timings')
+    RECORD_COLUMNS = SUMMARY_COLUMNS + ('chunks', 'combined', 'curriculum')
+
+    def lookup(self, key: ResultKey) -> Optional[dict]:
+        """키에 해당하는 저장된 결과 (없으면 None, 조회 실패는 분석을 중단시키지 않음)"""
+        try:
+            record = self._lookup(key)
+        except Exception as e:
+            logger.warning(f"분석 결과 조회 실패: {str(e)}")
+            return None
+        if record is not None:
+            logger.info(f"저장된 분석 결과 사용 (id: {record['id']}, 유형: {key.analysis_type})")
+        return record
+
+    def save(self, key: ResultKey, analyzed_chunks, combined, curriculum=None, timings=None,
+             filename: Optional[str] = None) -> Optional[int]:
+        """분석 결과 저장 후 id 반환
+
+        실패한 청크가 있는 결과는 다음 요청에서 다시 분석하도록 저장하지 않으며, 저장 실패도
+        분석 응답에는 영향을 주지 않습니다.
+        """
+        chunks = serialize_chunks(analyzed_chunks)
+        if any(is_failed_chunk(chunk) for chunk in chunks):
+            logger.info("실패한 청크가 있어 분석 결과를 저장하지 않습니다")
+            return None
+        record = {
+            'filename': filename,
+            'chunks': chunks,
+            'combined': combined.to_dict() if hasattr(combined, 'to_dict') else combined,
+            'curriculum': curriculum,
+            'timings': timings or {}
+        }
+        try:
+            result_id = self._save(key, record)
+        except Exception as e:
+            logger.warning(f"분석 결과 저장 실패: {str(e)}")
+            return None
+        logger.info(f"분석 결과 저장 완료 (id: {result_id}, 유형: {key.analysis_type}, 청크 수: {len(chunks)})")
+        return result_id
+
+    def lookup_chunks(self, analysis_type: str, version: str, hashes: Iterable[str]) -> Dict[str, object]:
+        """청크 해시별로 저장된 청크 분석 결과 (없는 해시는 제외, 조회 실패 시 빈 dict)"""
+        hashes = list(dict.fromkeys(hashes))
+        if not hashes:
+            return {}
+        try:
+            return self._lookup_chunks(analysis_type, version, hashes)
+        except Exception as e:
+            logger.warning(f"청크 분석 결과 조회 실패: {str(e)}")
+            return {}
+
+    def save_chunks(self, analysis_type: str, version: str, results: Dict[str, object]) -> int:
+        """청크 해시별 분석 결과 저장 후 저장한 개수 반환 (실패한 청크는 저장하지 않음)"""
+        results = {h: result.to_dict() if hasattr(result, 'to_dict') else result
+                   for h, result in results.items() if not is_failed_chunk(result)}
+        if not results:
+            return 0
+        try:
+            self._save_chunks(analysis_type, version, results)
+        except Exception as e:
+            logger.warning(f"청크 분석 결과 저장 실패: {str(e)}")
+            return 0
+        return len(results)
+
+    def get(self, result_id: int) -> Optional[dict]:
+        """id로 저장된 결과 전체 조회"""
+        raise NotImplementedError
+
+    def list(self, analysis_type: Optional[str] = None, limit: int = 50, offset: int = 0) -> List[dict]:
+        """최근 저장된 결과 요약 목록 (청크별 결과와 통합 결과는 제외)"""
+        raise NotImplementedError
+
+    def _lookup(self, key: ResultKey) -> Optional[dict]:
+        raise NotImplementedError
+
+    def _save(self, key: ResultKey, record: dict) -> int:
+        raise NotImplementedError
+
+    def _lookup_chunks(self, analysis_type: str, version: str, hashes: List[str]) -> Dict[str, object]:
+        raise NotImplementedError
+
+    def _save_chunks(self, analysis_type: str, version: str, results: Dict[str, object]):
+        raise NotImplementedError
+
+class NullResultStore(BaseResultStore):
+    """결과를 저장하지 않는 저장소 (RESULT_STORE_BACKEND=none)"""
+
+    backend = 'none'
+
+    def save(self, key, analyzed_chunks, combined, curriculum=None, timings=None, filename=None):
+        return None
+
+    def get(self, result_id):
+        return None
+
+    def list(self, analysis_type=None, limit=50, offset=0):
+        return []
+
+    def save_chunks(self, analysis_type, version, results):
+        return 0
+
+    def _lookup(self, key):
+        return None
+
+    def _lookup_chunks(self, analysis_type, version, hashes):
+        return {}
+
+class SQLiteResultStore(BaseResultStore):
+    """로컬 SQLite 파일 저장소 (같은 서버의 웹 프로세스와 Celery 워커가 공유)
+
+    웹 서비스와 워커가 다른 서버(디스크)에서 돌면 서로의 결과를 볼 수 없으므로 그때는
+    RedisResultStore를 사용합니다.
+    """
+
+    backend = 'sqlite'
+
+    JSON_COLUMNS = ('timings', 'chunks', 'combined', 'curriculum')
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS analysis_results ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+                ' analysis_type TEXT NOT NULL,'
+                ' transcript_hash TEXT NOT NULL,'
+                ' curriculum_hash TEXT NOT NULL,'
+                ' version TEXT NOT NULL,'
+                ' filename TEXT,'
+                ' created_at REAL NOT NULL,'
+                ' timings TEXT NOT NULL,'
+                ' chunks TEXT NOT NULL,'
+                ' combined TEXT NOT NULL,'
+                ' curriculum TEXT,'
+                ' UNIQUE (analysis_type, transcript_hash, curriculum_hash, version))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_analysis_results_created ON analysis_results (created_at)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS chunk_results ('
+                ' analysis_type TEXT NOT NULL,'
+                ' version TEXT NOT NULL,'
+                ' chunk_hash TEXT NOT NULL,'
+                ' result TEXT NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' PRIMARY KEY (analysis_type, version, chunk_hash))'
+            )
+
+    def _connect(self):
+        # sqlite3 연결은 스레드마다 따로 사용
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _row_to_dict(self, columns, row) -> dict:
+        record = dict(zip(columns, row))
+        for column in self.JSON_COLUMNS:
+            if column in record and record[column] is not None:
+                record[column] = json.loads(record[column])
+        return record
+
+    def _lookup(self, key):
+        row = self._connect().execute(
+            f"SELECT {', '.join(self.RECORD_COLUMNS)} FROM analysis_results"
+            ' WHERE analysis_type = ? AND transcript_hash = ? AND curriculum_hash = ? AND version = ?',
+            tuple(key)
+        ).fetchone()
+        return self._row_to_dict(self.RECORD_COLUMNS, row) if row else None
+
+    def _save(self, key, record):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT INTO analysis_results (analysis_type, transcript_hash, curriculum_hash, version,'
+                ' filename, created_at, timings, chunks, combined, curriculum)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT (analysis_type, transcript_hash, curriculum_hash, version) DO UPDATE SET'
+                ' filename = excluded.filename, created_at = excluded.created_at, timings = excluded.timings,'
+                ' chunks = excluded.chunks, combined = excluded.combined, curriculum = excluded.curriculum',
+                tuple(key) + (
+                    record['filename'], time.time(),
+                    json.dumps(record['timings'], ensure_ascii=False),
+                    json.dumps(record['chunks'], ensure_ascii=False),
+                    json.dumps(record['combined'], ensure_ascii=False),
+                    json.dumps(record['curriculum'], ensure_ascii=False) if record['curriculum'] is not None else None
+                )
+            )
+            row = conn.execute(
+                'SELECT id FROM analysis_results'
+                ' WHERE analysis_type = ? AND transcript_hash = ? AND curriculum_hash = ? AND version = ?',
+                tuple(key)
+            ).fetchone()
+        return row[0]
+
+    def _lookup_chunks(self, analysis_type, version, hashes):
+        conn = self._connect()
+        found = {}
+        # SQLite 바인딩 변수 수 제한을 넘지 않도록 나눠서 조회
+        for i in range(0, len(hashes), 500):
+            batch = hashes[i:i + 500]
+            rows = conn.execute(
+                'SELECT chunk_hash, result FROM chunk_results WHERE analysis_type = ? AND version = ?'
+                f" AND chunk_hash IN ({', '.join('?' * len(batch))})",
+                [analysis_type, version] + batch
+            ).fetchall()
+            found.update((h, json.loads(result)) for h, result in rows)
+        return found
+
+    def _save_chunks(self, analysis_type, version, results):
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO chunk_results (analysis_type, version, chunk_hash, result, created_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                [(analysis_type, version, h, json.dumps(result, ensure_ascii=False), now)
+                 for h, result in results.items()]
+            )
+
+    def get(self, result_id):
+        row = self._connect().execute(
+            f"SELECT {', '.join(self.RECORD_COLUMNS)} FROM analysis_results WHERE id = ?", (result_id,)
+        ).fetchone()
+        return self._row_to_dict(self.RECORD_COLUMNS, row) if row else None
+
+    def list(self, analysis_type=None, limit=50, offset=0):
+        query = f"SELECT {', '.join(self.SUMMARY_COLUMNS)} FROM analysis_results"
+        params = []
+        if analysis_type:
+            query += ' WHERE analysis_type = ?'
+            params.append(analysis_type)
+        query += ' ORDER BY created_at DESC LIMIT ? OFFSET ?'
+        params.extend([limit, offset])
+        rows = self._connect().execute(query, params).fetchall()
+        return [self._row_to_dict(self.SUMMARY_COLUMNS, row) for row in rows]
+
+class RedisResultStore(BaseResultStore):
+    """Redis 저장소 (다른 서버에서 도는 웹 인스턴스와 Celery 워커가 공유)
+
+    결과마다 열 이름을 필드로 하는 해시(값은 JSON)에 보관하고, 결과 키에서 id로의 색인과
+    최근 저장 순서(정렬 집합, 전체와 분석 유형별)를 따로 둡니다. 청크별 결과는 (분석 유형,
+    버전)마다 청크 해시를 필드로 하는 해시 하나에 보관합니다.
+    """
+
+    backend = 'redis'
+
+    def __init__(self, url: str, prefix: str = 'analysis-results'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _record_key(self, result_id) -> str:
+        return f'{self.prefix}:record:{result_id}'
+
+    def _index_key(self, key: ResultKey) -> str:
+        return f"{self.prefix}:key:{':'.join(key)}"
+
+    def _recent_key(self, analysis_type: Optional[str] = None) -> str:
+        return f'{self.prefix}:recent:{analysis_type}' if analysis_type else f'{self.prefix}:recent'
+
+    def _chunks_key(self, analysis_type: str, version: str) -> str:
+        return f'{self.prefix}:chunks:{analysis_type}:{version}'
+
+    def _decode(self, columns, values) -> Optional[dict]:
+        if values[0] is None:
+            return None
+        return {column: json.loads(value) if value is not None else None for column, value in zip(columns, values)}
+
+    def _lookup(self, key):
+        result_id = self.client.get(self._index_key(key))
+        return self.get(int(result_id)) if result_id is not None else None
+
+    def _save(self, key, record):
+        index_key = self._index_key(key)
+        result_id = self.client.get(index_key)
+        if result_id is None:
+            # 같은 키를 동시에 처음 저장하면 먼저 색인을 만든 쪽의 id를 함께 씀
+            result_id = self.client.incr(f'{self.prefix}:next-id')
+            if not self.client.set(index_key, result_id, nx=True):
+                result_id = self.client.get(index_key)
+        result_id = int(result_id)
+        now = time.time()
+        values = dict(zip(ResultKey._fields, key), id=result_id, created_at=now, **record)
+        pipe = self.client.pipeline()
+        pipe.hset(self._record_key(result_id), mapping={
+            column: json.dumps(values[column], ensure_ascii=False) for column in self.RECORD_COLUMNS
+        })
+        pipe.zadd(self._recent_key(), {result_id: now})
+        pipe.zadd(self._recent_key(key.analysis_type), {result_id: now})
+        pipe.execute()
+        return result_id
+
+    def _lookup_chunks(self, analysis_type, version, hashes):
+        values = self.client.hmget(self._chunks_key(analysis_type, version), hashes)
+        return {h: json.loads(value) for h, value in zip(hashes, values) if value is not None}
+
+    def _save_chunks(self, analysis_type, version, results):
+        self.client.hset(self._chunks_key(analysis_type, version), mapping={
+            h: json.dumps(result, ensure_ascii=False) for h, result in results.items()
+        })
+
+    def get(self, result_id):
+        return self._decode(self.RECORD_COLUMNS, self.client.hmget(self._record_key(result_id), self.RECORD_COLUMNS))
+
+    def list(self, analysis_type=None, limit=50, offset=0):
+        ids = self.client.zrevrange(self._recent_key(analysis_type), offset, offset + limit - 1)
+        pipe = self.client.pipeline()
+        for result_id in ids:
+            pipe.hmget(self._record_key(int(result_id)), self.SUMMARY_COLUMNS)
+        records = [self._decode(self.SUMMARY_COLUMNS, values) for values in pipe.execute()]
+        return [record for record in records if record is not None]
+
+def create_result_store(backend: str, sqlite_path: Optional[str] = None,
+                        redis_url: Optional[str] = None) -> BaseResultStore:
+    """설정값에 맞는 결과 저장소 생성 (none이면 아무것도 저장하지 않는 저장소)"""
+    backend = (backend or 'none').lower()
+    if backend == 'none':
+        return NullResultStore()
+    if backend == 'sqlite':
+        store = SQLiteResultStore(sqlite_path or 'cache/analysis_results.sqlite3')
+    elif backend == 'redis':
+        if not redis_url:
+            raise ValueError("Redis 결과 저장소를 사용하려면 REDIS_URL이 필요합니다.")
+        store = RedisResultStore(redis_url)
+    else:
+        raise ValueError(f"지원하지 않는 결과 저장소 백엔드입니다: {backend}")
+    logger.info(f"분석 결과 저장소 초기화 완료 (백엔드: {backend})")
+    return store
+
+# 프로세스마다 한 번만 생성되는 결과 저장소
+_store = None
+
+def get_result_store() -> BaseResultStore:
+    """설정(Config.RESULT_STORE_BACKEND)에 맞는 결과 저장소 (최초 사용 시 생성)"""
+    global _store
+    if _store is None:
+        from app.config import Config
+
+        _store = create_result_store(Config.RESULT_STORE_BACKEND, Config.RESULT_STORE_PATH, Config.REDIS_URL)
+        if Config.TASK_QUEUE_ENABLED and _store.backend == 'sqlite':
+            # 웹 서비스가 찾은 청크 결과와 워커가 저장한 청크 결과가 서로 다른 파일에 쌓임
+            logger.warning("작업 큐를 sqlite 결과 저장소와 함께 사용합니다. 웹 서비스와 워커가 다른 서버면 "
+                           "결과 조회와 청크 재사용이 공유되지 않으므로 RESULT_STORE_BACKEND=redis를 사용하세요")
+    return _store
+
+def summary_settings() -> dict:
+    """VTT 결과 버전에 포함하는 통합 결과 재요약 설정"""
+    from app.config import Config
+
+    return {
+        'max_tokens': Config.SUMMARY_MAX_TOKENS,
+        'fan_in': Config.SUMMARY_FAN_IN,
+        'max_length': Config.SUMMARY_MAX_LENGTH,
+        'prompt': build_summary_prompt([], Config.SUMMARY_MAX_LENGTH)
+    }
+
+def curriculum_settings() -> dict:
+    """결과 버전에 포함하는 커리큘럼 평가 설정"""
+    from app.config import Config
+
+    return {
+        'batch_size': Config.CURRICULUM_BATCH_SIZE,
+        'item_output_tokens': Config.CURRICULUM_ITEM_OUTPUT_TOKENS,
+        'top_k': Config.CURRICULUM_TOP_K
+    }
@@ -0,0 +1,99 @@
+import re
+import math
+import logging
+from collections import Counter, defaultdict
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 한글 음절 / 영문·숫자 단어
+WORD_PATTERN = re.compile(r'[가-힣]+|[a-z0-9]+(?:[+#.][a-z0-9]+)*[+#]*')
+
+def tokenize(text: str) -> List[str]:
+    """검색용 토큰 목록
+
+    한글은 조사/어미가 붙어도 겹치도록 단어 안의 음절 2-gram으로, 영문·숫자는 단어
+    그대로 사용합니다 (예: "리스트를" → 리스, 스트, 트를 / "Python3" → python3).
+    """
+    tokens = []
+    for word in WORD_PATTERN.findall((text or '').lower()):
+        if word[0] < '가':
+            tokens.append(word)
+        elif len(word) == 1:
+            # 한 글자 단어는 조사/대명사가 대부분이라 제외
+            continue
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+class LectureIndex:
+    """강의 구간(segment)에 대한 BM25 검색 인덱스 (작업마다 한 번 생성해 모든 세부내용에 재사용)
+
+    term마다 (구간 번호, BM25 가중치) 배열을 미리 계산해 두므로 질의 하나는 질의 term
+    수만큼의 NumPy 덧셈으로 끝납니다.
+    """
+
+    def __init__(self, segments: List[str], k1: float = 1.5, b: float = 0.75):
+        import numpy as np
+
+        self.segments = segments
+        self.doc_count = len(segments)
+        self._postings = {}  # term -> (구간 번호 배열, BM25 가중치 배열)
+        self._idf = {}
+
+        doc_terms = [Counter(tokenize(segment)) for segment in segments]
+        lengths = np.array([sum(terms.values()) for terms in doc_terms], dtype=np.float32)
+        avg_length = float(lengths.mean()) if self.doc_count and lengths.sum() else 1.0
+
+        postings = defaultdict(list)
+        for doc_id, terms in enumerate(doc_terms):
+            for term, tf in terms.items():
+                postings[term].append((doc_id, tf))
+
+        for term, entries in postings.items():
+            df = len(entries)
+            # 대부분의 구간에 나오는 term(예: "니다")은 IDF가 0에 가까워 점수에 거의 영향이 없음
+            idf = math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+            doc_ids = np.array([doc_id for doc_id, _ in entries], dtype=np.int32)
+            tfs = np.array([tf for _, tf in entries], dtype=np.float32)
+            norm = k1 * (1 - b + b * lengths[doc_ids] / avg_length)
+            self._postings[term] = (doc_ids, idf * tfs * (k1 + 1) / (tfs + norm))
+            self._idf[term] = idf
+
+        logger.info(f"강의 검색 인덱스 생성 완료 (구간 {self.doc_count}개, term {len(self._postings)}개)")
+
+    def search(self, query: str, top_k: int = 3, min_coverage: float = 0.0) -> Tuple[List[int], float]:
+        """질의와 관련된 상위 구간 번호(원래 순서)와 최고 겹침 비율
+
+        겹침 비율은 질의 term의 IDF 합 중 구간에 나타난 term의 IDF 합이 차지하는 비율입니다.
+        질의 term이 어느 구간에도 없거나 상위 구간의 겹침 비율이 모두 min_coverage 이하이면
+        관련 구간이 없는 것으로 보고 빈 목록을 반환합니다.
+        """
+        terms = set(tokenize(query))
+        known = [term for term in terms if term in self._postings]
+        if not self.doc_count or not known:
+            return [], 0.0
+
+        # 인덱스에 없는 term은 어느 구간과도 겹치지 않으므로 분모에만 최대 IDF로 반영
+        unknown_idf = math.log(1 + (self.doc_count + 0.5) / 0.5)
+        total_idf = sum(self._idf.get(term, unknown_idf) for term in terms)
+
+        import numpy as np
+
+        scores = np.zeros(self.doc_count, dtype=np.float32)
+        matched_idf = np.zeros(self.doc_count, dtype=np.float32)
+        for term in known:
+            doc_ids, weights = self._postings[term]
+            scores[doc_ids] += weights
+            matched_idf[doc_ids] += self._idf[term]
+
+        top_k = min(top_k, self.doc_count)
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        coverage = matched_idf[candidates] / total_idf
+        best = float(coverage.max())
+        if best <= min_coverage:
+            return [], best
+
+        selected = [int(doc_id) for doc_id, ratio in zip(candidates, coverage)
+                    if scores[doc_id] > 0 and ratio > min_coverage]
+        return sorted(selected), best
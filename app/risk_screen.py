@@ -0,0 +1,386 @@
+"""위험 발언 로컬 사전 선별
+
+자막/채팅의 발화 줄 전체를 위험 어휘(차별/비하, 욕설/모욕, 민감한 주제)와 개인정보 형식
+(전화번호, 이메일, 주민등록번호, 카드 번호)을 하나로 합친 정규식으로 한 번만 훑고, 걸린 발화와
+앞뒤 context_lines개 발화를 묶은 구간만 위험 발언 분류 프롬프트로 보냅니다. 대부분의 강의
+내용은 어휘에 걸리지 않으므로, 청크 분석 프롬프트는 위험 발언 항목 없이 요청합니다
+(BaseGPTClient.risk_prescreen). 어휘에 걸렸더라도 실제 위험 발언인지는 분류 프롬프트가
+판단하므로 어휘는 놓치지 않는 쪽(넓게)으로 유지합니다.
+"""
+import re
+import json
+import bisect
+import hashlib
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.analysis import as_transcript
+from app.chunking import estimate_tokens, input_token_budget
+from app.metrics import timed
+from app.schemas import RiskFinding, RiskFindings
+from app.vtt_parser import cue_line, format_timestamp
+
+logger = logging.getLogger(__name__)
+
+# 분류 이름 → 분류 프롬프트에 표시하는 선별 사유
+RISK_CATEGORIES = {
+    'discrimination': '차별/비하 표현',
+    'abuse': '욕설/모욕',
+    'sensitive': '민감한 주제',
+    'pii': '개인정보'
+}
+
+# 분류별 기본 위험 어휘 (부분 문자열로 찾음, 영문 단어는 단어 경계 기준)
+DEFAULT_RISK_TERMS = {
+    'discrimination': [
+        '틀딱', '급식충', '맘충', '한남충', '김치녀', '된장녀', '짱깨', '쪽바리', '조선족', '흑형', '깜둥이',
+        '애자', '장애인 같', '여자가 무슨', '여자라서', '남자라서', '여자들은', '남자들은', '출신들',
+        '지역 사람들은', '외국인들은', '나이 먹고', 'retard', 'retarded'
+    ],
+    'abuse': [
+        '씨발', '시발', 'ㅅㅂ', 'ㅆㅂ', '병신', '븅신', 'ㅂㅅ', '개새끼', '새끼', '좆', '존나', '지랄',
+        '닥쳐', '꺼져', '미친놈', '미친년', '또라이', '멍청이', '엿먹', 'fuck', 'fucking', 'shit', 'bitch',
+        'asshole', 'bastard', 'idiot', 'stupid'
+    ],
+    'sensitive': [
+        '자살', '자해', '성희롱', '성추행', '성폭행', '마약', '불법 도박', '테러', '혐오'
+    ]
+}
+
+# 분류별 기본 정규식 (개인정보 형식)
+DEFAULT_RISK_PATTERNS = {
+    'pii': [
+        r'(?<!\d)(?:\+82[- ]?1|01)[016789][- .]?\d{3,4}[- .]?\d{4}(?!\d)',           # 휴대전화
+        r'(?<!\d)0(?:2|[3-6]\d)[- .]\d{3,4}[- .]\d{4}(?!\d)',                        # 유선 전화
+        r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}',                           # 이메일
+        r'(?<!\d)\d{2}(?:0[1-9]|1[0-2])(?:0[1-9]|[12]\d|3[01])[- ]?[1-8]\d{6}(?!\d)',  # 주민등록번호
+        r'(?<!\d)\d{4}[- ]\d{4}[- ]\d{4}[- ]\d{4}(?!\d)'                              # 카드 번호
+    ]
+}
+
+# 분류 응답에 담긴 개인정보를 가리는 문자열
+MASK = '[개인정보]'
+
+class RiskMatch(NamedTuple):
+    """어휘/형식에 걸린 위치 (line은 발화 줄 번호, start/end는 이어 붙인 전체 텍스트 기준)"""
+    line: int
+    category: str
+    start: int
+    end: int
+
+def load_lexicon(path: Optional[str] = None) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """기본 어휘와 형식에 어휘 파일(JSON)을 반영한 (분류별 어휘, 분류별 정규식)
+
+    파일 형식은 {"terms": {"분류": ["어휘", ...]}, "patterns": {"분류": ["정규식", ...]}}이며,
+    파일에 있는 분류는 기본값을 대체하고(빈 목록이면 그 분류를 끔) 나머지 분류는 기본값을
+    사용합니다. 형식이 잘못된 파일은 ValueError입니다.
+    """
+    terms = {category: list(items) for category, items in DEFAULT_RISK_TERMS.items()}
+    patterns = {category: list(items) for category, items in DEFAULT_RISK_PATTERNS.items()}
+    if not path:
+        return terms, patterns
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"위험 어휘 파일을 읽을 수 없습니다 ({path}): {str(e)}")
+    for key, target in (('terms', terms), ('patterns', patterns)):
+        section = data.get(key) or {}
+        if not isinstance(section, dict) or not all(
+                isinstance(items, list) and all(isinstance(item, str) for item in items) for items in section.values()):
+            raise ValueError(f"위험 어휘 파일의 '{key}'는 분류별 문자열 목록이어야 합니다 ({path})")
+        target.update(section)
+    return terms, patterns
+
+def _term_pattern(term: str) -> str:
+    """어휘 하나의 정규식 (영문 단어는 다른 영문자 사이에 낀 경우 제외)"""
+    escaped = re.escape(term)
+    if re.fullmatch(r'[A-Za-z][A-Za-z ]*', term):
+        return rf'(?<![A-Za-z]){escaped}(?![A-Za-z])'
+    return escaped
+
+def risk_statement(window: dict, finding: RiskFinding, mask=None) -> str:
+    """분류 결과 한 항목의 위험 발언 문장 (자막 구간이면 시작 시각, mask로 개인정보를 가림)"""
+    text = f"{finding.statement} ({finding.reason})" if finding.reason else finding.statement
+    if mask is not None:
+        text = mask(text)
+    if window.get('start') is not None:
+        text = f"[{format_timestamp(window['start'])}] {text}"
+    return text
+
+def parse_risk_findings(response) -> List[RiskFinding]:
+    """분류 응답(RiskFindings 또는 JSON 문자열)의 위험 발언 목록 (응답이 없거나 잘못되면 빈 목록)"""
+    if not response:
+        return []
+    if isinstance(response, RiskFindings):
+        return response.items
+    try:
+        data = json.loads(response)
+    except ValueError:
+        # JSON 앞뒤에 설명이 붙은 경우 가장 바깥 객체만 파싱
+        match = re.search(r'\{.*\}', response, re.DOTALL)
+        try:
+            data = json.loads(match.group()) if match else None
+        except ValueError:
+            data = None
+    try:
+        return RiskFindings.from_dict(data).items
+    except ValueError as e:
+        logger.error(f"위험 발언 분류 응답을 해석할 수 없습니다: {str(e)}")
+        return []
+
+def build_risk_prompt(windows: List[dict]) -> str:
+    """사전 선별 구간 묶음의 위험 발언 분류 프롬프트 (JSON 응답)"""
+    items = []
+    for i, window in enumerate(windows, 1):
+        labels = ', '.join(RISK_CATEGORIES.get(category, category) for category in window['categories'])
+        when = f" {format_timestamp(window['start'])}-{format_timestamp(window['end'])}" if window.get('start') is not None else ''
+        items.append(f"[{i}]{when} (선별 사유: {labels})\n{window['text']}")
+    sections = '\n\n'.join(items)
+    return f"""
+다음은 강의 자막 또는 수업 채팅에서 위험한 표현이 있을 수 있어 골라낸 구간입니다.
+각 구간에 실제로 문제가 되는 발언이 있는지 판단해주세요.
+
+판단 기준:
+- 지역, 성별, 나이, 장애, 국적, 외모 등에 대한 차별적 발언이나 비하, 일반화
+- 욕설, 모욕, 수업 분위기를 해치는 부적절한 표현
+- 민감한 주제에 대한 부적절한 언급
+- 전화번호, 이메일, 주민등록번호, 카드 번호 등 개인정보 노출
+- 수업 내용을 설명하기 위한 인용이나 예시, 문제가 없는 일상 표현은 위험 발언이 아닙니다
+
+[구간]
+{sections}
+
+위험 발언이 있는 구간만 다음 JSON 형식으로 보고하고, 없으면 빈 목록으로 보고해주세요
+(id는 위 구간 번호, statement는 문제가 되는 발언, reason은 판단 이유 1문장):
+{{"items": [{{"id": 1, "statement": "", "reason": ""}}]}}
+"""
+
+def _response_options(client) -> dict:
+    """분류 응답 형식 (구조화 출력 클라이언트는 함수 호출, 그 외는 JSON 모드)"""
+    if getattr(client, 'structured_output', False):
+        return {'result_type': RiskFindings}
+    return {'json_mode': True}
+
+def _line_starts(lines: List[str]) -> List[int]:
+    """줄을 이어 붙인 텍스트에서 각 줄이 시작하는 위치"""
+    starts = [0]
+    for line in lines[:-1]:
+        starts.append(starts[-1] + len(line) + 1)
+    return starts
+
+class RiskScreen:
+    """위험 어휘와 개인정보 형식을 하나로 합친 정규식 사전 선별기와 선별 구간 분류
+
+    분류마다 어휘(긴 것부터)와 정규식을 이름 있는 그룹 하나로 묶어 전체 텍스트를 finditer로
+    한 번만 훑고, 맞은 그룹 이름(lastgroup)으로 분류를 알아냅니다. 선별 구간은 batch_size개씩
+    (컨텍스트에 들어가는 만큼) 한 요청으로 분류합니다.
+    """
+
+    def __init__(self, terms: Dict[str, List[str]], patterns: Dict[str, List[str]], context_lines: int = 2,
+                 max_window_chars: int = 1500, batch_size: int = 10, item_output_tokens: int = 150):
+        self.context_lines = max(0, context_lines)
+        self.max_window_chars = max(1, max_window_chars)
+        self.batch_size = max(1, batch_size)
+        self.item_output_tokens = item_output_tokens
+        self.categories = {}
+        groups = []
+        for category in sorted(set(terms) | set(patterns)):
+            alternatives = [_term_pattern(term) for term in sorted(set(terms.get(category) or []),
+                                                                      key=lambda term: (-len(term), term))
+                            if term.strip()]
+            alternatives.extend(f'(?:{pattern})' for pattern in patterns.get(category) or [])
+            if alternatives:
+                name = f'c{len(self.categories)}'
+                self.categories[name] = category
+                groups.append(f"(?P<{name}>{'|'.join(alternatives)})")
+        self.pattern = re.compile('|'.join(groups), re.IGNORECASE) if groups else None
+        self.pii_pattern = re.compile('|'.join(f'(?:{p})' for p in patterns.get('pii') or [])) if patterns.get('pii') else None
+        self.lexicon_hash = hashlib.sha256(
+            json.dumps([terms, patterns], ensure_ascii=False, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:16]
+
+    def settings(self) -> dict:
+        """결과 버전에 포함하는 사전 선별/분류 설정"""
+        return {
+            'lexicon': self.lexicon_hash,
+            'context_lines': self.context_lines,
+            'max_window_chars': self.max_window_chars,
+            'batch_size': self.batch_size,
+            'item_output_tokens': self.item_output_tokens,
+            'prompt': build_risk_prompt([])
+        }
+
+    def scan(self, lines: List[str]) -> List[RiskMatch]:
+        """발화 줄 목록에서 어휘/형식에 걸린 위치 (줄을 이어 붙인 텍스트를 한 번만 훑음)"""
+        if self.pattern is None or not lines:
+            return []
+        starts = _line_starts(lines)
+        matches = []
+        for match in self.pattern.finditer('\n'.join(lines)):
+            line = bisect.bisect_right(starts, match.start()) - 1
+            matches.append(RiskMatch(line, self.categories[match.lastgroup], match.start(), match.end()))
+        return matches
+
+    def windows(self, lines: List[str], times: Optional[List[Tuple[float, float]]] = None) -> List[dict]:
+        """걸린 발화와 앞뒤 context_lines개 발화를 묶은 선별 구간 목록
+
+        겹치거나 맞닿은 구간은 max_window_chars자까지 하나로 합칩니다. 구간은
+        {'lines': [시작 줄, 끝 줄), 'start', 'end'(자막이 아니면 None), 'text', 'categories'}입니다.
+        """
+        flagged, spots = {}, {}
+        starts = _line_starts(lines)
+        for match in self.scan(lines):
+            flagged.setdefault(match.line, set()).add(match.category)
+            spots.setdefault(match.line, match.start - starts[match.line])
+        spans = []
+        for line in sorted(flagged):
+            first, last = max(0, line - self.context_lines), min(len(lines), line + self.context_lines + 1)
+            if spans and first <= spans[-1][1] and \
+                    sum(len(text) + 1 for text in lines[spans[-1][0]:last]) <= self.max_window_chars:
+                spans[-1][1] = last
+                spans[-1][2].update(flagged[line])
+            else:
+                spans.append([first, last, set(flagged[line])])
+        return [{
+            'lines': [first, last],
+            'start': times[first][0] if times else None,
+            'end': times[last - 1][1] if times else None,
+            'text': self._window_text(lines, first, last, spots),
+            'categories': sorted(categories)
+        } for first, last, categories in spans]
+
+    def _window_text(self, lines: List[str], first: int, last: int, spots: Dict[int, int]) -> str:
+        """선별 구간의 텍스트 (max_window_chars자를 넘으면 걸린 발화는 남기고 앞뒤 발화를 줄임)
+
+        spots는 걸린 줄마다 처음 걸린 위치(줄 안의 글자 위치)입니다. 걸린 발화만으로도 한도를
+        넘으면 걸린 발화마다 걸린 위치를 가운데 둔 같은 길이만큼 남깁니다.
+        """
+        text = '\n'.join(lines[first:last])
+        if len(text) <= self.max_window_chars:
+            return text
+        hits = [i for i in range(first, last) if i in spots]
+        context = [i for i in range(first, last) if i not in spots]
+        room = self.max_window_chars - sum(len(lines[i]) + 1 for i in hits)
+        # 앞뒤 발화는 줄마다 같은 몫만큼 앞부분(화자 포함)을 남기고, 몫이 없으면 뺌
+        share = room // len(context) - 1 if context else 0
+        if room >= 0:
+            return '\n'.join(lines[i] if i in spots else lines[i][:share]
+                             for i in range(first, last) if i in spots or share > 0)
+        share = max(1, self.max_window_chars // len(hits) - 1)
+        parts = []
+        for i in hits:
+            start = max(0, min(spots[i] - share // 2, len(lines[i]) - share))
+            parts.append(lines[i][start:start + share])
+        return '\n'.join(parts)[:self.max_window_chars]
+
+    @timed('screen_risks')
+    def screen(self, content) -> List[dict]:
+        """자막/채팅(문자열 또는 Transcript)의 선별 구간 목록 (API 호출 없음)"""
+        transcript = as_transcript(content)
+        lines = [cue_line(cue) for cue in transcript.cues]
+        windows = self.windows(lines, [(cue.start, cue.end) for cue in transcript.cues] if transcript.is_vtt else None)
+        logger.info(f"위험 발언 사전 선별 완료 (발화 {len(lines)}줄 중 선별 구간 {len(windows)}개, "
+                    f"{sum(window['lines'][1] - window['lines'][0] for window in windows)}줄)")
+        return windows
+
+    def mask(self, text: str) -> str:
+        """개인정보 형식에 맞는 부분을 가림 (분류 응답이 개인정보를 그대로 인용해도 결과와 알림에 남지 않도록)"""
+        return self.pii_pattern.sub(MASK, text) if self.pii_pattern is not None else text
+
+    def batches(self, client, windows: List[dict]) -> List[List[int]]:
+        """선별 구간을 batch_size개씩, 컨텍스트에 들어가는 만큼 나눈 구간 번호 묶음"""
+        max_output = self.item_output_tokens * self.batch_size + 50
+        available = input_token_budget(client.context_tokens, estimate_tokens(build_risk_prompt([])), max_output,
+                                       client.max_chunk_tokens)
+        batches, used = [], 0
+        for i, window in enumerate(windows):
+            # 번호, 시각, 선별 사유 줄 포함
+            tokens = estimate_tokens(window['text']) + 20
+            if batches and len(batches[-1]) < self.batch_size and used + tokens <= available:
+                batches[-1].append(i)
+                used += tokens
+            else:
+                batches.append([i])
+                used = tokens
+        return batches
+
+    def requests(self, client, windows: List[dict], batches: Optional[List[List[int]]] = None) -> List[Tuple[str, int]]:
+        """분류 요청 ((프롬프트, 응답 토큰 상한) 목록, 묶음 순서)"""
+        batches = self.batches(client, windows) if batches is None else batches
+        return [(build_risk_prompt([windows[i] for i in batch]), self.item_output_tokens * len(batch) + 50)
+                for batch in batches]
+
+    def collect(self, windows: List[dict], batches: List[List[int]], responses: list) -> List[str]:
+        """묶음별 분류 응답을 구간 순서의 위험 발언 문장 목록으로 변환 (중복 제거)"""
+        risks = []
+        for batch, response in zip(batches, responses):
+            for finding in parse_risk_findings(response):
+                if 1 <= finding.id <= len(batch):
+                    risks.append((batch[finding.id - 1], risk_statement(windows[batch[finding.id - 1]], finding, self.mask)))
+        failed = sum(1 for response in responses if response is None)
+        logger.info(f"위험 발언 분류 완료 (선별 구간 {len(windows)}개, 요청 {len(batches)}개, "
+                    f"위험 발언 {len(risks)}개, 실패 {failed}개)")
+        return list(dict.fromkeys(text for _, text in sorted(risks, key=lambda item: item[0])))
+
+    @timed('classify_risks')
+    def classify(self, client, windows: List[dict], budget=None) -> List[str]:
+        """선별 구간만 분류 프롬프트로 보내 위험 발언 문장 목록 반환 (구간이 없으면 API를 호출하지 않음)
+
+        budget(JobBudget)을 넘어 보내지 않은 묶음의 구간은 위험 발언이 없는 것으로 처리됩니다.
+        """
+        if not windows:
+            return []
+        batches = self.batches(client, windows)
+        responses = client.complete_prompts(self.requests(client, windows, batches), budget=budget,
+                                            **_response_options(client))
+        return self.collect(windows, batches, responses)
+
+    @timed('classify_risks')
+    async def classify_async(self, async_client, windows: List[dict], budget=None) -> List[str]:
+        """classify의 비동기 버전 (AsyncGPTAPIClient 사용)"""
+        if not windows:
+            return []
+        batches = self.batches(async_client, windows)
+        responses = await async_client.complete_prompts(self.requests(async_client, windows, batches), budget=budget,
+                                                        **_response_options(async_client))
+        return self.collect(windows, batches, responses)
+
+def create_risk_screen(lexicon_path: Optional[str] = None, context_lines: int = 2, max_window_chars: int = 1500,
+                       batch_size: int = 10, item_output_tokens: int = 150) -> RiskScreen:
+    """설정값에 맞는 사전 선별기 생성 (어휘 파일 형식이 잘못되면 ValueError)"""
+    terms, patterns = load_lexicon(lexicon_path)
+    screen = RiskScreen(terms, patterns, context_lines, max_window_chars, batch_size, item_output_tokens)
+    logger.info(f"위험 발언 사전 선별기 초기화 완료 (어휘 {sum(len(items) for items in terms.values())}개, "
+                f"정규식 {sum(len(items) for items in patterns.values())}개, 어휘 파일: {lexicon_path or '없음'})")
+    return screen
+
+# 프로세스마다 한 번만 생성되는 사전 선별기
+_screen = None
+
+def get_risk_screen() -> RiskScreen:
+    """설정(Config.RISK_*)에 맞는 사전 선별기 (최초 사용 시 생성)"""
+    global _screen
+    if _screen is None:
+        from app.config import Config
+
+        _screen = create_risk_screen(Config.RISK_LEXICON_PATH, Config.RISK_CONTEXT_LINES, Config.RISK_MAX_WINDOW_CHARS,
+                                     Config.RISK_BATCH_WINDOWS, Config.RISK_ITEM_OUTPUT_TOKENS)
+    return _screen
+
+def risk_settings() -> dict:
+    """결과 버전에 포함하는 위험 발언 사전 선별 설정"""
+    return get_risk_screen().settings()
+
+def analyze_risks(client, content, budget=None) -> List[str]:
+    """자막/채팅(문자열 또는 Transcript)을 사전 선별하고 선별 구간만 분류한 위험 발언 문장 목록"""
+    screen = get_risk_screen()
+    return screen.classify(client, screen.screen(content), budget)
+
+async def analyze_risks_async(async_client, content, budget=None) -> List[str]:
+    """analyze_risks의 비동기 버전 (사전 선별은 스레드 풀에서 수행)"""
+    from starlette.concurrency import run_in_threadpool
+
+    screen = get_risk_screen()
+    windows = await run_in_threadpool(screen.screen, content)
+    return await screen.classify_async(async_client, windows, budget)
@@ -0,0 +1,330 @@
+"""구조화된 분석 결과 형식
+
+각 클래스의 FUNCTION은 OpenAI 함수 호출(tools)에 넘기는 JSON 스키마이고, from_dict는
+모델이 돌려준 인자를 검증해 객체로 변환합니다. 객체는 to_dict()로 JSON 직렬화할 수
+있어 Celery 작업 사이에서도 문자열로 다시 파싱하지 않고 그대로 전달됩니다.
+"""
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List
+
+# 위험 발언이 없다는 뜻의 문장 (모델이 빈 목록 대신 문장으로 답한 경우 제외)
+NO_RISK_PHRASES = (
+    '발견되지 않', '확인되지 않', '포함되어 있지 않', '위험한 내용이 없', '특별한 위험', '부적절한 내용이 없'
+)
+
+def is_real_risk(text: str) -> bool:
+    """실제 위험 발언 항목인지 확인"""
+    return bool(text and
+                not text.endswith('없습니다.') and
+                not text.startswith('특별한 주의사항이 없') and
+                not any(phrase in text for phrase in NO_RISK_PHRASES))
+
+def _string_list(data: dict, key: str) -> List[str]:
+    """문자열 목록 필드 검증 (문자열 하나는 목록으로 감싸고 빈 항목은 제거)"""
+    value = data.get(key, [])
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(item, (str, int, float)) for item in value):
+        raise ValueError(f"'{key}' 필드는 문자열 목록이어야 합니다")
+    return [str(item).strip() for item in value if str(item).strip()]
+
+def _string_array(description: str) -> dict:
+    return {'type': 'array', 'items': {'type': 'string'}, 'description': description}
+
+def unique_items(items: Iterable[str]) -> List[str]:
+    """순서를 유지한 중복 제거"""
+    return list(dict.fromkeys(items))
+
+def without_risks(function: dict) -> dict:
+    """위험 발언(risks) 항목을 뺀 함수 스키마 (위험 발언을 사전 선별과 전용 프롬프트로 분석할 때)"""
+    parameters = function['parameters']
+    return {
+        **function,
+        'parameters': {
+            **parameters,
+            'properties': {key: value for key, value in parameters['properties'].items() if key != 'risks'},
+            'required': [key for key in parameters['required'] if key != 'risks']
+        }
+    }
+
+@dataclass
+class VTTAnalysis:
+    """강의 자막 청크 분석 결과"""
+    summary: List[str] = field(default_factory=list)
+    keywords: List[str] = field(default_factory=list)
+    analysis: List[str] = field(default_factory=list)
+    risks: List[str] = field(default_factory=list)
+
+    FUNCTION = {
+        'name': 'report_lecture_analysis',
+        'description': '강의 내용 분석 결과를 보고합니다.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'summary': _string_array('이 부분의 주요 내용을 요약한 2-3개의 문장'),
+                'keywords': _string_array('주요 키워드'),
+                'analysis': _string_array('강의 내용에 대한 전반적인 분석 3-4문장'),
+                'risks': _string_array('차별적 발언, 부적절한 표현, 민감한 주제 등 구체적인 위험 발언 (없으면 빈 목록)')
+            },
+            'required': ['summary', 'keywords', 'analysis', 'risks']
+        }
+    }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'VTTAnalysis':
+        if not isinstance(data, dict):
+            raise ValueError("강의 분석 결과는 객체여야 합니다")
+        return cls(
+            summary=_string_list(data, 'summary'),
+            keywords=_string_list(data, 'keywords'),
+            analysis=_string_list(data, 'analysis'),
+            risks=_string_list(data, 'risks')
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def merge(cls, analyses: List['VTTAnalysis']) -> 'VTTAnalysis':
+        """청크별 결과 통합 (키워드는 중복 제거 후 정렬)"""
+        merged = cls()
+        for analysis in analyses:
+            merged.summary.extend(analysis.summary)
+            merged.keywords.extend(analysis.keywords)
+            merged.analysis.extend(analysis.analysis)
+            merged.risks.extend(analysis.risks)
+        merged.keywords = sorted(set(merged.keywords))
+        return merged
+
+# 채팅 분석의 하위 항목 (필드명 → (섹션 제목, [(키, 하위 제목)]))
+CHAT_SUBSECTIONS = {
+    'sentiment': ('수강생 감정/태도 분석', [
+        ('positive', '1. 긍정적 반응'),
+        ('negative', '2. 부정적 반응'),
+        ('questions', '3. 질문/요청사항')
+    ]),
+    'difficulties': ('어려움/불만 상세 분석', [
+        ('learning', '1. 학습적 어려움'),
+        ('progress', '2. 수업 진행 관련 문제'),
+        ('technical', '3. 기술적 문제')
+    ]),
+    'suggestions': ('개선 제안', [
+        ('content', '1. 학습 내용 개선'),
+        ('method', '2. 수업 방식 개선'),
+        ('technical', '3. 기술적 지원 강화')
+    ])
+}
+
+_CHAT_SUBSECTION_DESCRIPTIONS = {
+    'sentiment': {
+        'positive': '수업 내용에 대한 이해와 만족, 적극적인 참여와 긍정적인 피드백',
+        'negative': '수업 내용이나 진행에 대한 불만이나 어려움, 부정적인 감정이나 태도',
+        'questions': '수업 내용에 대한 질문과 수업 진행 방식에 대한 요청사항'
+    },
+    'difficulties': {
+        'learning': '수업 내용의 난이도나 이해 문제, 학습 진도나 과제 관련 어려움',
+        'progress': '수업 속도나 시간 배분, 강의 방식이나 상호작용 관련 문제',
+        'technical': '온라인 플랫폼 사용의 어려움, 음질/화질 등 기술적 문제'
+    },
+    'suggestions': {
+        'content': '수업 내용의 난이도 조정, 추가 학습 자료나 예제 제안',
+        'method': '수업 진행 방식과 상호작용 방식 개선 제안',
+        'technical': '온라인 플랫폼 개선과 기술적 문제 해결을 위한 제안'
+    }
+}
+
+@dataclass
+class ChatAnalysis:
+    """채팅 분석 결과"""
+    topics: List[str] = field(default_factory=list)
+    sentiment: Dict[str, List[str]] = field(default_factory=dict)
+    difficulties: Dict[str, List[str]] = field(default_factory=dict)
+    suggestions: Dict[str, List[str]] = field(default_factory=dict)
+    risks: List[str] = field(default_factory=list)
+    recommendations: List[str] = field(default_factory=list)
+
+    FUNCTION = {
+        'name': 'report_chat_analysis',
+        'description': '수업 채팅 분석 결과를 보고합니다.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'topics': _string_array('채팅에서 다뤄진 주요 주제와 내용 요약'),
+                **{
+                    name: {
+                        'type': 'object',
+                        'description': title,
+                        'properties': {
+                            key: _string_array(_CHAT_SUBSECTION_DESCRIPTIONS[name][key])
+                            for key, _ in subsections
+                        },
+                        'required': [key for key, _ in subsections]
+                    }
+                    for name, (title, subsections) in CHAT_SUBSECTIONS.items()
+                },
+                'risks': _string_array('부적절한 언어 사용이나 태도, 수업 분위기를 해치는 발언, 개인정보 노출 위험 (없으면 빈 목록)'),
+                'recommendations': _string_array('전반적인 개선점과 향후 수업 운영을 위한 제안사항')
+            },
+            'required': ['topics', 'sentiment', 'difficulties', 'suggestions', 'risks', 'recommendations']
+        }
+    }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ChatAnalysis':
+        if not isinstance(data, dict):
+            raise ValueError("채팅 분석 결과는 객체여야 합니다")
+        sections = {}
+        for name, (_, subsections) in CHAT_SUBSECTIONS.items():
+            value = data.get(name) or {}
+            if not isinstance(value, dict):
+                raise ValueError(f"'{name}' 필드는 객체여야 합니다")
+            sections[name] = {key: _string_list(value, key) for key, _ in subsections}
+        return cls(
+            topics=_string_list(data, 'topics'),
+            risks=_string_list(data, 'risks'),
+            recommendations=_string_list(data, 'recommendations'),
+            **sections
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def merge(cls, analyses: List['ChatAnalysis']) -> 'ChatAnalysis':
+        """청크별 결과 통합 (같은 항목은 한 번만 포함)"""
+        merged = cls.from_dict({})
+        for analysis in analyses:
+            merged.topics.extend(analysis.topics)
+            merged.risks.extend(analysis.risks)
+            merged.recommendations.extend(analysis.recommendations)
+            for name, (_, subsections) in CHAT_SUBSECTIONS.items():
+                for key, _ in subsections:
+                    getattr(merged, name)[key].extend(getattr(analysis, name).get(key, []))
+        merged.topics = unique_items(merged.topics)
+        merged.risks = unique_items(merged.risks)
+        merged.recommendations = unique_items(merged.recommendations)
+        for name in CHAT_SUBSECTIONS:
+            section = getattr(merged, name)
+            for key in section:
+                section[key] = unique_items(section[key])
+        return merged
+
+@dataclass
+class CurriculumScore:
+    """세부내용 하나의 달성도 평가"""
+    id: int
+    score: int
+    rationale: str = ''
+
+@dataclass
+class CurriculumScores:
+    """세부내용 묶음의 달성도 평가 결과"""
+    items: List[CurriculumScore] = field(default_factory=list)
+
+    FUNCTION = {
+        'name': 'report_curriculum_scores',
+        'description': '교과 세부내용별 달성도 평가 결과를 보고합니다.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'items': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {
+                            'id': {'type': 'integer', 'description': '세부내용 번호'},
+                            'score': {'type': 'integer', 'minimum': 0, 'maximum': 100, 'description': '달성도 (0-100)'},
+                            'rationale': {'type': 'string', 'description': '판단 근거 1-2문장'}
+                        },
+                        'required': ['id', 'score', 'rationale']
+                    }
+                }
+            },
+            'required': ['items']
+        }
+    }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CurriculumScores':
+        if isinstance(data, list):
+            data = {'items': data}
+        if not isinstance(data, dict) or not isinstance(data.get('items'), list):
+            raise ValueError("'items' 필드는 목록이어야 합니다")
+        items = []
+        for item in data['items']:
+            # 잘못된 항목은 건너뛰고 누락으로 처리 (호출한 쪽에서 개별 평가)
+            if not isinstance(item, dict):
+                continue
+            try:
+                score = min(100, max(0, int(float(item.get('score')))))
+                items.append(CurriculumScore(int(item.get('id')), score, str(item.get('rationale') or '')))
+            except (TypeError, ValueError):
+                continue
+        return cls(items)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+@dataclass
+class RiskFinding:
+    """사전 선별 구간 하나에서 확인된 위험 발언"""
+    id: int
+    statement: str
+    reason: str = ''
+
+@dataclass
+class RiskFindings:
+    """사전 선별 구간 묶음의 위험 발언 분류 결과 (위험 발언이 없는 구간은 포함하지 않음)"""
+    items: List[RiskFinding] = field(default_factory=list)
+
+    FUNCTION = {
+        'name': 'report_risk_statements',
+        'description': '사전 선별된 구간에서 확인된 위험 발언을 보고합니다.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'items': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {
+                            'id': {'type': 'integer', 'description': '구간 번호'},
+                            'statement': {'type': 'string', 'description': '문제가 되는 발언'},
+                            'reason': {'type': 'string', 'description': '위험 발언으로 판단한 이유 1문장'}
+                        },
+                        'required': ['id', 'statement', 'reason']
+                    }
+                }
+            },
+            'required': ['items']
+        }
+    }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RiskFindings':
+        if isinstance(data, list):
+            data = {'items': data}
+        if not isinstance(data, dict) or not isinstance(data.get('items'), list):
+            raise ValueError("'items' 필드는 목록이어야 합니다")
+        items = []
+        for item in data['items']:
+            # 잘못된 항목과 발언이 비어 있는 항목은 건너뜀
+            if not isinstance(item, dict) or not str(item.get('statement') or '').strip():
+                continue
+            try:
+                items.append(RiskFinding(int(item.get('id')), str(item['statement']).strip(),
+                                         str(item.get('reason') or '').strip()))
+            except (TypeError, ValueError):
+                continue
+        return cls(items)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+# 분석 유형별 구조화 결과 클래스
+STRUCTURED_TYPES = {
+    'vtt': VTTAnalysis,
+    'chat': ChatAnalysis
+}
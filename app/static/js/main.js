@@ -49,11 +49,15 @@ function handleFileUpload(formId, endpoint, onSuccess, onError) {
 }
 
 // 상태 확인 함수
-async function checkStatus(taskId, onSuccess, onError) {
+async function checkStatus(taskId, onSuccess, onError, onProgress) {
     try {
         const response = await fetch(`/status/${taskId}`);
         const data = await response.json();
         
+        if (onProgress && data.stages) {
+            onProgress(data.stages);
+        }
+        
         if (data.state === 'SUCCESS') {
             if (onSuccess) {
                 onSuccess(data.result);
@@ -76,9 +80,9 @@ async function checkStatus(taskId, onSuccess, onError) {
 }
 
 // 주기적 상태 확인 함수
-function pollStatus(taskId, interval, onSuccess, onError) {
+function pollStatus(taskId, interval, onSuccess, onError, onProgress) {
     const check = async () => {
-        const shouldStop = await checkStatus(taskId, onSuccess, onError);
+        const shouldStop = await checkStatus(taskId, onSuccess, onError, onProgress);
         if (!shouldStop) {
             setTimeout(check, interval);
         }
@@ -87,6 +91,92 @@ function pollStatus(taskId, interval, onSuccess, onError) {
     check();
 }
 
+// 작업 완료까지 기다리는 Promise 버전
+function waitForTask(taskId, onProgress, interval = 1000) {
+    return new Promise((resolve, reject) => {
+        pollStatus(taskId, interval, resolve, reject, onProgress);
+    });
+}
+
+// 단계별 진행 상황을 문자열로 변환
+function formatStages(stages) {
+    const labels = { chunks: '청크 분석', combine: '결과 통합', curriculum: '커리큘럼 매칭' };
+    return stages.map(stage => {
+        const label = labels[stage.name] || stage.name;
+        if (stage.total !== undefined) {
+            return `${label} ${stage.completed}/${stage.total}`;
+        }
+        return `${label} ${stage.state === 'SUCCESS' ? '완료' : '대기'}`;
+    }).join(' · ');
+}
+
+// 진행 채널의 중간 결과(partial 이벤트)를 화면에 누적 표시
+// (최종 응답이 오면 각 페이지에서 최종 결과로 교체)
+class PartialResultView {
+    constructor(chunkContainer, keywordContainer) {
+        this.chunkContainer = chunkContainer;
+        this.keywordContainer = keywordContainer;
+        this.keywordCounts = {};
+        this.subjects = [];
+    }
+
+    reset() {
+        this.keywordCounts = {};
+        this.subjects = [];
+        if (this.chunkContainer) this.chunkContainer.innerHTML = '';
+        if (this.keywordContainer) this.keywordContainer.innerHTML = '';
+    }
+
+    // 청크 분석 결과를 청크 순서대로 끼워 넣음
+    addChunk(partial) {
+        // 작업 큐 모드는 누적 키워드가 없으므로 청크별 키워드로 직접 집계
+        let totals = partial.keyword_totals;
+        if (!totals) {
+            (partial.keywords || []).forEach(keyword => {
+                this.keywordCounts[keyword] = (this.keywordCounts[keyword] || 0) + 1;
+            });
+            totals = Object.entries(this.keywordCounts).sort((a, b) => b[1] - a[1]).slice(0, 30);
+        }
+        this.renderKeywords(totals);
+
+        if (!partial.html || !this.chunkContainer) return;
+        const section = document.createElement('div');
+        section.className = 'partial-chunk';
+        section.dataset.index = partial.index;
+        section.innerHTML = `<h3 class="subsection-title">청크 ${partial.index}/${partial.total}</h3>${partial.html}`;
+        const next = Array.from(this.chunkContainer.children)
+            .find(child => Number(child.dataset.index) > partial.index);
+        this.chunkContainer.insertBefore(section, next || null);
+    }
+
+    renderKeywords(totals) {
+        if (!this.keywordContainer || !totals.length) return;
+        this.keywordContainer.innerHTML = `
+            <div class="category-section">
+                <h2 class="category-title">키워드 (분석 중)</h2>
+                <div class="main-topics">
+                    <ul class="keyword-list">
+                        ${totals.map(([keyword, count]) => `<li>${keyword} ${count}</li>`).join('')}
+                    </ul>
+                </div>
+            </div>
+        `;
+    }
+
+    // 과목별 달성도를 최종 응답(curriculum_result)과 같은 형식으로 누적
+    addSubject(subject) {
+        this.subjects.push(subject);
+        const detailsMatches = {};
+        this.subjects.forEach(item => {
+            detailsMatches[item.name] = { matches: item.matches, detail_texts: item.detail_texts };
+        });
+        return {
+            matched_subjects: this.subjects.map(item => ({ name: item.name, achievement_rate: item.achievement_rate })),
+            details_matches: detailsMatches
+        };
+    }
+}
+
 // 결과 표시 함수
 function displayResults(containerId, results) {
     const container = document.getElementById(containerId);
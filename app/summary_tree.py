@@ -0,0 +1,193 @@
+"""긴 강의 분석 결과의 계층적 재요약 (트리 리듀스)
+
+청크별 주요 내용/분석 문장을 fan_in개 청크씩 묶어 동시에 재요약(summarize_content와 같은
+프롬프트)하고, 합친 결과가 max_tokens 이하가 될 때까지 묶음 요약을 다시 묶어 요약합니다.
+단계마다 요청은 API 작업 풀에서 동시에 처리되고, 강의 길이가 늘어도 단계 수는 로그 규모로만
+늘어납니다. 통합 결과(화면, 저장 결과, 커리큘럼 평가의 강의 구간)의 크기는 강의 길이와
+무관하게 제한됩니다.
+
+묶음은 항상 청크 순서대로 앞에서부터 나누고 묶음별 요약은 결과 저장소에 (입력 문장 해시)로
+보관하므로, 자막 뒤쪽만 바뀐 재분석에서는 앞쪽 묶음의 중간 요약을 API 호출 없이 재사용합니다.
+"""
+import math
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from app.analysis import as_vtt_analysis, build_summary_prompt, parse_summary_lines
+from app.chunking import estimate_tokens
+from app.metrics import timed
+from app.partial_results import is_failed_chunk
+from app.result_store import BaseResultStore, chunk_hash, summary_version
+from app.schemas import VTTAnalysis
+
+logger = logging.getLogger(__name__)
+
+# 결과 저장소에서 중간 요약을 보관하는 분석 유형
+SUMMARY_TYPE = 'vtt_summary'
+
+class SummaryTree:
+    """필드(주요 내용, 분석)별 요약 노드 목록을 단계마다 묶어 줄여 가는 상태
+
+    노드는 문장 목록이며 처음에는 청크 하나의 결과입니다. 한 단계는 next_level로 묶음을 만들고
+    lookup(저장된 중간 요약) → requests(API 요청) → apply(응답 반영) 순서로 진행합니다.
+    요약에 실패한 묶음은 원래 문장을 그대로 두고, 단계를 다 거친 뒤에도 크기를 넘으면 앞에서부터
+    max_tokens만큼만 남깁니다.
+    """
+
+    FIELDS = ('summary', 'analysis')
+
+    def __init__(self, client, store: BaseResultStore, analyzed_chunks: list, max_tokens: int = 1500,
+                 fan_in: int = 8, max_length: int = 800):
+        analyses = [as_vtt_analysis(result) for result in analyzed_chunks if not is_failed_chunk(result)]
+        self.merged = VTTAnalysis.merge(analyses)
+        self.nodes = {field: [getattr(a, field) for a in analyses if getattr(a, field)] for field in self.FIELDS}
+        self.store = store
+        self.max_tokens = max(1, max_tokens)
+        self.fan_in = max(2, fan_in)
+        self.max_length = max_length
+        self.output_tokens = client.max_output_tokens
+        self.version = summary_version(client, max_length)
+        # 단일 노드까지 줄인 뒤 한 번 더 요약할 수 있도록 단계 수 제한
+        largest = max([len(nodes) for nodes in self.nodes.values()] + [1])
+        self.max_levels = math.ceil(math.log(largest, self.fan_in)) + 1 if largest > 1 else 1
+        self.level = 0
+        self.requested = 0
+        self.reused = 0
+
+    def _tokens(self, nodes: List[List[str]]) -> int:
+        return sum(estimate_tokens('\n'.join(node)) for node in nodes)
+
+    def next_level(self) -> Optional[List[tuple]]:
+        """다음 단계의 묶음 목록 [(필드, 묶음 문장, 요약할지)] (모든 필드가 크기 이하이거나 단계를 다 거쳤으면 None)
+
+        노드 하나뿐인 묶음은 필드의 노드가 하나뿐일 때만 요약하고 그 외에는 그대로 넘깁니다.
+        """
+        if self.level >= self.max_levels:
+            return None
+        groups = []
+        for field, nodes in self.nodes.items():
+            if self._tokens(nodes) <= self.max_tokens:
+                continue
+            for start in range(0, len(nodes), self.fan_in):
+                members = nodes[start:start + self.fan_in]
+                lines = [line for node in members for line in node]
+                groups.append((field, lines, len(members) > 1 or len(nodes) == 1))
+        if not groups:
+            return None
+        self.level += 1
+        return groups
+
+    def lookup(self, groups: List[tuple]) -> Dict[str, list]:
+        """이전에 요약한 묶음의 저장된 중간 요약 (묶음 문장 해시별)"""
+        hashes = [chunk_hash('\n'.join(lines)) for _, lines, summarize in groups if summarize]
+        return self.store.lookup_chunks(SUMMARY_TYPE, self.version, hashes)
+
+    def requests(self, groups: List[tuple], stored: Dict[str, list]) -> list:
+        """저장된 중간 요약이 없는 묶음의 재요약 요청 ((프롬프트, 응답 토큰 상한) 목록, 묶음 순서)"""
+        return [(build_summary_prompt(lines, self.max_length), self.output_tokens)
+                for _, lines, summarize in groups
+                if summarize and chunk_hash('\n'.join(lines)) not in stored]
+
+    def apply(self, groups: List[tuple], stored: Dict[str, list], responses: list):
+        """응답과 저장된 중간 요약으로 다음 단계 노드를 만들고 새 중간 요약 저장"""
+        responses = iter(responses)
+        nodes = {field: [] for field in self.nodes if any(group[0] == field for group in groups)}
+        new_summaries = {}
+        requested = reused = 0
+        for field, lines, summarize in groups:
+            node = lines
+            if summarize:
+                key = chunk_hash('\n'.join(lines))
+                if key in stored:
+                    node = stored[key]
+                    reused += 1
+                else:
+                    requested += 1
+                    response = next(responses)
+                    summarized = parse_summary_lines(response) if response else []
+                    if summarized:
+                        node = new_summaries[key] = summarized
+            nodes[field].append(node)
+        before = {field: len(self.nodes[field]) for field in nodes}
+        self.nodes.update(nodes)
+        self.store.save_chunks(SUMMARY_TYPE, self.version, new_summaries)
+        self.requested += requested
+        self.reused += reused
+        logger.info(
+            f"요약 {self.level}단계 완료 (" +
+            ', '.join(f"{field}: 노드 {before[field]}개 → {len(nodes[field])}개" for field in nodes) +
+            f", 요청 {requested}개, 저장된 중간 요약 재사용 {reused}개, 요약 실패 {requested - len(new_summaries)}개)"
+        )
+
+    def result(self) -> VTTAnalysis:
+        """재요약한 주요 내용/분석과 원래 키워드/위험 발언을 합친 통합 결과"""
+        combined = VTTAnalysis(keywords=self.merged.keywords, risks=self.merged.risks)
+        for field, nodes in self.nodes.items():
+            lines = [line for node in nodes for line in node]
+            if self._tokens(nodes) > self.max_tokens:
+                kept, used = [], 0
+                for line in lines:
+                    used += estimate_tokens(line)
+                    if used > self.max_tokens:
+                        break
+                    kept.append(line)
+                logger.warning(f"재요약 후에도 크기를 넘어 앞부분만 사용합니다 ({field}: 문장 {len(lines)}개 중 {len(kept)}개)")
+                lines = kept
+            setattr(combined, field, lines)
+        return combined
+
+def estimate_summary_requests(client, chunk_count: int, max_tokens: int = 1500, fan_in: int = 8,
+                              max_length: int = 800) -> List[Tuple[int, int]]:
+    """청크 chunk_count개의 재요약 요청 근사치 ((입력 토큰, 응답 토큰 상한) 목록, API 호출 없음)
+
+    청크 결과와 묶음 요약의 필드 하나를 max_length자 요약 하나의 크기로 가정하고, SummaryTree와
+    같은 규칙으로 단계마다 묶음 수만큼의 요청을 필드 수만큼 셉니다. 저장된 중간 요약의 재사용은
+    계산하지 않습니다.
+    """
+    max_tokens, fan_in = max(1, max_tokens), max(2, fan_in)
+    node_tokens = estimate_tokens('가' * max_length)
+    prompt_tokens = estimate_tokens(build_summary_prompt([], max_length))
+    max_levels = math.ceil(math.log(chunk_count, fan_in)) + 1 if chunk_count > 1 else 1
+    requests, nodes, level = [], chunk_count, 0
+    while nodes and nodes * node_tokens > max_tokens and level < max_levels:
+        groups = [min(fan_in, nodes - start) for start in range(0, nodes, fan_in)]
+        requests.extend((prompt_tokens + members * node_tokens, client.max_output_tokens)
+                        for members in groups if members > 1 or nodes == 1)
+        nodes, level = len(groups), level + 1
+    return requests * len(SummaryTree.FIELDS)
+
+@timed('summarize_analysis')
+def summarize_analysis(client, analyzed_chunks: list, store: BaseResultStore, max_tokens: int = 1500,
+                       fan_in: int = 8, max_length: int = 800, budget=None) -> VTTAnalysis:
+    """청크별 VTT 분석 결과를 통합하고, 주요 내용/분석이 max_tokens를 넘으면 계층적으로 재요약
+
+    결과가 크기 이하면 API를 호출하지 않고 combine_analysis_results와 같은 결과를 반환합니다.
+    budget(JobBudget)을 넘어 보내지 않은 재요약 요청의 묶음은 요약하지 않은 것으로 처리됩니다.
+    """
+    tree = SummaryTree(client, store, analyzed_chunks, max_tokens, fan_in, max_length)
+    while True:
+        groups = tree.next_level()
+        if groups is None:
+            break
+        stored = tree.lookup(groups)
+        requests = tree.requests(groups, stored)
+        tree.apply(groups, stored, client.complete_prompts(requests, budget=budget) if requests else [])
+    return tree.result()
+
+@timed('summarize_analysis')
+async def summarize_analysis_async(async_client, analyzed_chunks: list, store: BaseResultStore,
+                                   max_tokens: int = 1500, fan_in: int = 8, max_length: int = 800,
+                                   budget=None) -> VTTAnalysis:
+    """summarize_analysis의 비동기 버전 (저장소 조회/저장은 스레드 풀에서 수행)"""
+    from starlette.concurrency import run_in_threadpool
+
+    tree = SummaryTree(async_client, store, analyzed_chunks, max_tokens, fan_in, max_length)
+    while True:
+        groups = tree.next_level()
+        if groups is None:
+            break
+        stored = await run_in_threadpool(tree.lookup, groups)
+        requests = tree.requests(groups, stored)
+        responses = await async_client.complete_prompts(requests, budget=budget) if requests else []
+        await run_in_threadpool(tree.apply, groups, stored, responses)
+    return tree.result()
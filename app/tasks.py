@@ -0,0 +1,407 @@
+import os
+import time
+import uuid
+import logging
+from celery import Celery, chord, group
+from celery.signals import worker_init, worker_process_shutdown, worker_ready
+from celery.result import GroupResult
+from app.config import Config
+from app.gpt_client import BaseGPTClient, GPTAPIClient
+from app.llm_cache import create_llm_cache
+from app.progress import publish_progress
+from app.partial_results import PartialResults, chunk_partial
+from app.result_store import ResultKey, get_result_store, chunk_hash, chunk_version
+from app.incremental import ChunkReuse
+from app.summary_tree import summarize_analysis
+from app.risk_screen import get_risk_screen
+from app.analysis import (
+    plan_vtt_chunks,
+    plan_chat_chunks,
+    transcript_segments,
+    combine_chat_results,
+    analyze_curriculum_match,
+    curriculum_coverage_matrix,
+    format_analysis_result
+)
+from app.budget import JobBudget, RedisJobBudget, create_job_budget
+from app.pipeline import batch_completion_message, completion_message
+from app.metrics import mark_process_dead, reset_multiproc_dir, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+# Celery 앱 초기화 (render.yaml: celery -A app.tasks worker)
+celery_app = Celery('app')
+celery_app.config_from_object('app.celery_config')
+
+# 워커 지표: 풀 프로세스마다 PROMETHEUS_MULTIPROC_DIR에 기록하고 메인 프로세스가 합산해 응답
+@worker_init.connect
+def _reset_worker_metrics(**kwargs):
+    reset_multiproc_dir()
+
+@worker_ready.connect
+def _start_worker_metrics(**kwargs):
+    if Config.CELERY_METRICS_PORT:
+        start_metrics_server(Config.CELERY_METRICS_PORT)
+
+@worker_process_shutdown.connect
+def _mark_worker_metrics_dead(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
+
+# 워커 프로세스마다 한 번만 생성되는 API 클라이언트
+_api_client = None
+
+def get_api_client():
+    """워커용 GPT API 클라이언트 (최초 사용 시 생성)"""
+    global _api_client
+    if _api_client is None:
+        _api_client = GPTAPIClient(
+            os.getenv('OPENAI_API_KEY'),
+            max_workers=Config.OPENAI_MAX_CONCURRENCY,
+            requests_per_minute=Config.OPENAI_REQUESTS_PER_MINUTE,
+            tokens_per_minute=Config.OPENAI_TOKENS_PER_MINUTE,
+            cache=create_llm_cache(
+                Config.LLM_CACHE_BACKEND,
+                ttl_seconds=Config.LLM_CACHE_TTL_SECONDS,
+                max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+                sqlite_path=Config.LLM_CACHE_PATH,
+                redis_url=Config.REDIS_URL
+            ),
+            **chunking_options()
+        )
+    return _api_client
+
+# 워크플로우 작업들이 작업 예산 사용량을 공유하는 Redis 클라이언트 (브로커와 같은 Redis)
+_budget_client = None
+
+def get_budget_client():
+    global _budget_client
+    if _budget_client is None:
+        import redis
+
+        _budget_client = redis.Redis.from_url(celery_app.conf.broker_url)
+    return _budget_client
+
+def _budget_info(job_id, budget=None):
+    """워크플로우 작업 인자로 넘기는 작업 예산 (웹 프로세스가 단계별로 떼어 둔 몫 포함, 없으면 설정값 예산)
+
+    사용량은 job_id로 Redis에서 공유하므로 청크 작업이 어느 워커에서 실행되든 한 예산에서 차감됩니다.
+    """
+    budget = budget or create_job_budget()
+    return {'job_id': job_id, 'max_requests': budget.max_requests, 'max_tokens': budget.max_tokens,
+            'held': [list(stage) for stage in budget.held]}
+
+def _job_budget(info, stage=0):
+    """작업 인자의 예산 정보로 만든 공유 작업 예산 (stage는 이 작업 전에 풀린 떼어 둔 몫의 수)
+
+    청크 분석은 0, 결과 통합은 1(재요약 몫이 풀림), 커리큘럼 매칭은 2입니다. 예산 정보가 없는
+    작업(예산 도입 전에 등록된 작업)은 제한 없는 예산을 사용합니다.
+    """
+    if not info:
+        return JobBudget()
+    return RedisJobBudget(get_budget_client(), info['job_id'], info['max_requests'], info['max_tokens'],
+                          info['held'][stage:], Config.JOB_BUDGET_TTL_SECONDS)
+
+def chunking_options():
+    """Config의 청크 분할/프롬프트 설정 (웹 프로세스와 워커가 같은 분할 계획과 결과 버전을 만들도록 공유)"""
+    return {
+        'max_output_tokens': Config.OPENAI_MAX_OUTPUT_TOKENS,
+        'context_tokens': Config.OPENAI_CONTEXT_TOKENS,
+        'max_chunk_tokens': Config.CHUNK_MAX_TOKENS,
+        'structured_output': Config.OPENAI_STRUCTURED_OUTPUT,
+        'content_defined_chunks': Config.CHUNK_CONTENT_DEFINED,
+        'risk_prescreen': Config.RISK_PRESCREEN_ENABLED
+    }
+
+def _store_info(result_key, filename):
+    """결과 저장에 필요한 정보 (Celery 작업 인자로 넘길 수 있도록 JSON 형태로 구성)"""
+    if result_key is None:
+        return None
+    return {'key': list(result_key), 'filename': filename, 'started_at': time.time()}
+
+def _save_result(store, budget, analyzed_chunks, combined, curriculum=None):
+    """워크플로우 결과를 결과 저장소에 저장 (작업 등록부터 완료까지의 시간 포함, 예산을 넘은 일부 결과는 저장하지 않음)"""
+    if not store or budget.exceeded:
+        return None
+    return get_result_store().save(
+        ResultKey(*store['key']), analyzed_chunks, combined, curriculum,
+        timings={'total_seconds': round(time.time() - store['started_at'], 3)},
+        filename=store.get('filename')
+    )
+
+@celery_app.task(name='app.tasks.analyze_chunk')
+def analyze_chunk_task(chunk, index, analysis_type, total=None, progress_job_id=None, budget=None):
+    """청크 하나 분석 (chord 헤더, budget은 _budget_info이며 예산을 넘으면 요청하지 않고 실패로 남김)"""
+    logger.info(f"청크 {index} 분석 작업 시작 (유형: {analysis_type})")
+    # 청크는 작업 등록 시 토큰 예산에 맞춰 분할되었으므로 다시 나누지 않음
+    client = get_api_client()
+    result = client.analyze_chunk(chunk, index, analysis_type, budget=_job_budget(budget))
+    # 다음에 같은 청크가 오면 다시 분석하지 않도록 청크 결과 저장
+    get_result_store().save_chunks(analysis_type, chunk_version(client, analysis_type), {chunk_hash(chunk): result})
+    # 워커끼리 상태를 공유하지 않으므로 누적 키워드는 브라우저가 청크별 키워드로 계산
+    partial = chunk_partial(index, total, result, analysis_type) if progress_job_id else None
+    publish_progress(progress_job_id, f"청크 {index}/{total} 분석 완료", stage='chunks', chunk=index, partial=partial)
+    # 구조화 결과는 Celery 결과 백엔드(JSON)로 넘기기 위해 dict로 변환
+    return result.to_dict() if hasattr(result, 'to_dict') else result
+
+def _fill_reused(analyzed_chunks, reused):
+    """새로 분석한 청크 결과를 재사용한 청크 결과 사이에 채워 전체 청크 순서로 복원"""
+    if not reused:
+        return analyzed_chunks
+    results = list(reused['results'])
+    for i, result in zip(reused['missing'], analyzed_chunks):
+        results[i] = result
+    return results
+
+def _risk_windows(content):
+    """위험 발언 사전 선별 구간 (웹 프로세스에서 계산해 작업 인자로 넘김, 사전 선별을 쓰지 않으면 None)"""
+    return get_risk_screen().screen(content) if Config.RISK_PRESCREEN_ENABLED else None
+
+@celery_app.task(name='app.tasks.combine_vtt')
+def combine_vtt_task(analyzed_chunks, progress_job_id=None, store=None, reused=None, risk_windows=None, budget=None):
+    """VTT 청크 분석 결과 통합 (chord 본문 1단계)
+
+    reused가 있으면 저장된 청크 결과와 합쳐 통합하고(긴 강의는 계층적으로 재요약), 결과를
+    저장할 때는 청크별 결과도 다음 단계로 넘깁니다. risk_windows가 있으면 사전 선별 구간만
+    분류해 위험 발언을 채웁니다. 재요약과 위험 발언 분류 요청은 공유 작업 예산(budget)에서 차감합니다.
+    """
+    analyzed_chunks = _fill_reused(analyzed_chunks, reused)
+    logger.info(f"VTT 분석 결과 통합 시작 ({len(analyzed_chunks)}개 청크)")
+    publish_progress(progress_job_id, "분석 결과 통합 중", stage='summary')
+    client = get_api_client()
+    job_budget = _job_budget(budget, stage=1)
+    combined = summarize_analysis(client, analyzed_chunks, get_result_store(),
+                                  max_tokens=Config.SUMMARY_MAX_TOKENS, fan_in=Config.SUMMARY_FAN_IN,
+                                  max_length=Config.SUMMARY_MAX_LENGTH, budget=job_budget)
+    job_budget.release()
+    if risk_windows is not None:
+        publish_progress(progress_job_id, "위험 발언 분석 중", stage='risks')
+        combined.risks = get_risk_screen().classify(client, risk_windows, job_budget)
+    publish_progress(progress_job_id, "커리큘럼 매칭 분석 중", stage='curriculum')
+    return {
+        'combined': combined.to_dict(),
+        'chunks': analyzed_chunks if store else None
+    }
+
+@celery_app.task(name='app.tasks.match_curriculum')
+def match_curriculum_task(combine_output, curriculum_content, progress_job_id=None, transcript=None, store=None,
+                          lecture=None, budget=None):
+    """커리큘럼 매칭 후 최종 응답 생성 (chord 본문 2단계)
+
+    transcript는 세부내용별 관련 구간 검색에 쓰는 원문 자막 구간 목록입니다. lecture는 일괄
+    분석에서의 강의 순서이며, 이때는 완료 이벤트 대신 강의별 완료 진행 상황을 발행합니다
+    (진행 채널은 batch_coverage_task가 닫음).
+    """
+    logger.info("커리큘럼 매칭 작업 시작")
+    job_budget = _job_budget(budget, stage=2)
+    combined_result = combine_output['combined']
+    curriculum_result = analyze_curriculum_match(
+        get_api_client(), combined_result, curriculum_content,
+        batch_size=Config.CURRICULUM_BATCH_SIZE,
+        item_output_tokens=Config.CURRICULUM_ITEM_OUTPUT_TOKENS,
+        transcript=transcript,
+        top_k=Config.CURRICULUM_TOP_K,
+        subject_callback=PartialResults(progress_job_id, 'vtt').subject_done,
+        budget=job_budget
+    )
+    analysis_id = _save_result(store, job_budget, combine_output['chunks'], combined_result, curriculum_result)
+    if lecture is None:
+        publish_progress(progress_job_id, completion_message(job_budget), done=True)
+    else:
+        publish_progress(progress_job_id, f"강의 {lecture + 1} 분석 완료", stage='lectures', lecture=lecture)
+    return {
+        'vtt_result': format_analysis_result(combined_result, 'vtt'),
+        'curriculum_result': curriculum_result,
+        'analysis_id': analysis_id,
+        'budget': job_budget.summary()
+    }
+
+@celery_app.task(name='app.tasks.batch_coverage')
+def batch_coverage_task(lecture_results, lectures, progress_job_id=None):
+    """강의별 VTT 워크플로우 결과를 모아 과목 × 날짜 달성도 표 생성 (일괄 분석 chord 본문)
+
+    lecture_results는 작업 큐로 분석한 강의의 결과(등록 순서), lectures는 업로드 순서의 강의
+    목록이며 작업 큐로 분석한 강의는 task_id만, 웹 프로세스에서 이미 결과를 얻은 강의는 그 결과를 담고 있습니다.
+    """
+    results = iter(lecture_results)
+    lectures = [{**lecture, **next(results)} if 'task_id' in lecture else lecture for lecture in lectures]
+    logger.info(f"일괄 분석 달성도 집계 시작 ({len(lectures)}개 강의)")
+    coverage = curriculum_coverage_matrix([(lecture['day'], lecture.get('curriculum_result')) for lecture in lectures])
+    publish_progress(progress_job_id, batch_completion_message(lectures), done=True)
+    return {'lectures': lectures, 'coverage': coverage}
+
+@celery_app.task(name='app.tasks.combine_chat')
+def combine_chat_task(analyzed_chunks, progress_job_id=None, store=None, reused=None, risk_windows=None, budget=None):
+    """채팅 청크 분석 결과를 합쳐 최종 응답 생성 (chord 본문, reused, risk_windows, budget은 combine_vtt_task 참고)"""
+    analyzed_chunks = _fill_reused(analyzed_chunks, reused)
+    logger.info(f"채팅 분석 결과 통합 시작 ({len(analyzed_chunks)}개 청크)")
+    job_budget = _job_budget(budget, stage=2)
+    chat_result = combine_chat_results(analyzed_chunks)
+    if risk_windows is not None:
+        chat_result.risks = get_risk_screen().classify(get_api_client(), risk_windows, job_budget)
+    analysis_id = _save_result(store, job_budget, analyzed_chunks, chat_result)
+    publish_progress(progress_job_id, completion_message(job_budget), done=True)
+    return {
+        'chat_result': format_analysis_result(chat_result, 'chat'),
+        'analysis_id': analysis_id,
+        'budget': job_budget.summary()
+    }
+
+def _save_job_stages(job_id, chunk_ids, stage_ids):
+    """상태 조회용으로 작업 단계별 task id를 결과 백엔드에 저장"""
+    GroupResult(f'{job_id}-chunks', [celery_app.AsyncResult(tid) for tid in chunk_ids], app=celery_app).save()
+    GroupResult(f'{job_id}-stages', [celery_app.AsyncResult(tid) for tid in stage_ids], app=celery_app).save()
+
+def _chunk_header(job_id, plan, analysis_type, progress_job_id=None, budget=None):
+    """저장된 청크 결과를 재사용하고 나머지 청크만 분석 작업으로 구성
+
+    (청크 작업 목록, 청크 task id 목록, 재사용 정보)를 반환합니다. 재사용한 청크는 바로
+    중간 결과로 발행하며, 재사용 정보는 결과 통합 단계에서 전체 청크 순서를 복원하는 데 씁니다.
+    웹 프로세스에서 찾는 청크 결과는 워커의 analyze_chunk_task가 저장하므로 두 프로세스가 같은
+    결과 저장소(작업 큐 사용 시 기본값 redis)를 써야 재사용됩니다.
+    """
+    planner = BaseGPTClient(**chunking_options())
+    reuse = ChunkReuse(get_result_store(), planner, analysis_type, plan.texts)
+    total = plan.count
+    if progress_job_id:
+        reuse.replay(lambda i, result: publish_progress(
+            progress_job_id, f"청크 {i}/{total} 저장된 결과 사용", stage='chunks', chunk=i,
+            partial=chunk_partial(i, total, result, analysis_type)
+        ))
+
+    chunk_ids = [f'{job_id}-chunk-{i + 1}' for i in reuse.missing]
+    tasks = [
+        analyze_chunk_task.s(plan.texts[i], i + 1, analysis_type, total, progress_job_id, budget).set(task_id=chunk_id)
+        for i, chunk_id in zip(reuse.missing, chunk_ids)
+    ]
+    reused = {'results': reuse.results, 'missing': reuse.missing} if len(reuse.missing) < total else None
+    return tasks, chunk_ids, reused
+
+def _chord(tasks, body):
+    """작업 목록을 chord 서명으로 구성 (작업이 없으면, 예를 들어 모든 청크를 재사용했으면 빈 결과 목록을 받는 본문만 실행)"""
+    if tasks:
+        return chord(group(tasks), body)
+    return body.clone(args=([],))
+
+def _start_chord(tasks, body):
+    """_chord로 구성한 작업 실행"""
+    _chord(tasks, body).apply_async()
+
+def _vtt_workflow(vtt_content, curriculum_content, progress_job_id=None, result_key=None, filename=None,
+                  plan=None, budget=None, lecture=None):
+    """VTT 분석 워크플로우 서명과 job id (인자는 start_vtt_workflow, lecture는 match_curriculum_task 참고)"""
+    job_id = str(uuid.uuid4())
+    store = _store_info(result_key, filename)
+    budget = _budget_info(job_id, budget)
+    plan = plan or plan_vtt_chunks(vtt_content, BaseGPTClient(**chunking_options()))
+    chunks = plan.texts
+
+    publish_progress(progress_job_id, f"청크 0/{len(chunks)} 분석 중", stage='chunks', plan=plan.summary())
+    tasks, chunk_ids, reused = _chunk_header(job_id, plan, 'vtt', progress_job_id, budget)
+    body = (
+        combine_vtt_task.s(progress_job_id, store, reused, _risk_windows(vtt_content), budget).set(
+            task_id=f'{job_id}-combine') |
+        match_curriculum_task.s(
+            curriculum_content, progress_job_id, transcript_segments(vtt_content), store, lecture, budget
+        ).set(task_id=job_id)
+    )
+
+    _save_job_stages(job_id, chunk_ids, [f'{job_id}-combine', job_id])
+    logger.info(f"VTT 분석 작업 등록 (job: {job_id}, 청크 수: {len(chunks)}, 분석할 청크 수: {len(tasks)})")
+    return job_id, _chord(tasks, body)
+
+def start_vtt_workflow(vtt_content, curriculum_content, progress_job_id=None, result_key=None, filename=None,
+                       plan=None, budget=None):
+    """VTT 분석 워크플로우 시작: 청크 분석(chord) → 결과 통합/위험 발언 분류 → 커리큘럼 매칭
+
+    vtt_content는 문자열 또는 업로드 스트림에서 읽은 Transcript이며, 워커에는 분할된
+    청크와 검색용 구간만 전달됩니다. result_key가 있으면 마지막 단계에서 결과를 결과
+    저장소에 저장합니다. plan과 budget은 웹 프로세스가 작업 예산 확인(plan_job) 때 만든 분할
+    계획과 작업 예산이며 없으면 여기서 나누고 설정값 예산을 씁니다. 예산의 사용량은 작업들이 Redis로
+    공유하며, 예산을 넘은 요청은 보내지 않고 그때까지의 결과로 마치고(일부 결과, 저장하지 않음)
+    응답의 budget에 사용량을 표시합니다. 반환값인 job id는 마지막 단계의 task id이며
+    /status/<task_id>로 조회합니다.
+    """
+    job_id, workflow = _vtt_workflow(vtt_content, curriculum_content, progress_job_id, result_key, filename, plan,
+                                     budget)
+    workflow.apply_async()
+    return job_id
+
+def start_vtt_batch_workflow(lectures, curriculum_content, progress_job_id=None):
+    """여러 강의 VTT 분석 워크플로우 시작: 강의별 워크플로우(chord 헤더) → 과목 × 날짜 달성도 표
+
+    lectures는 업로드 순서의 강의 목록(filename, day 포함)이며, 작업 큐로 분석할 강의는
+    queued에 자막 내용(content), result_key, 분할 계획(plan), 작업 예산(budget)을 담고 나머지는 웹 프로세스에서
+    얻은 결과(저장된 결과, 예산 초과 오류)를 담습니다. 강의별 진행 상황은 progress_job_id로
+    발행됩니다. 반환값인 job id로 /status/<task_id>에서 강의별 결과와 coverage를 조회합니다.
+    """
+    batch_id = str(uuid.uuid4())
+    entries, lecture_ids, workflows = [], [], []
+    for i, lecture in enumerate(lectures):
+        queued = lecture.get('queued')
+        if queued is None:
+            entries.append(lecture)
+            continue
+        job_id, workflow = _vtt_workflow(queued['content'], curriculum_content, progress_job_id, queued['result_key'],
+                                         lecture['filename'], queued['plan'], queued.get('budget'), lecture=i)
+        entries.append({'filename': lecture['filename'], 'day': lecture['day'], 'task_id': job_id})
+        lecture_ids.append(job_id)
+        workflows.append(workflow)
+
+    GroupResult(f'{batch_id}-lectures', [celery_app.AsyncResult(tid) for tid in lecture_ids], app=celery_app).save()
+    _start_chord(workflows, batch_coverage_task.s(entries, progress_job_id).set(task_id=batch_id))
+    logger.info(f"VTT 일괄 분석 작업 등록 완료 (job: {batch_id}, 강의 수: {len(lectures)}, "
+                f"분석할 강의 수: {len(workflows)})")
+    return batch_id
+
+def start_chat_workflow(chat_content, progress_job_id=None, result_key=None, filename=None, plan=None, budget=None):
+    """채팅 분석 워크플로우 시작: 청크 분석(chord) → 결과 통합 (result_key, plan, budget은 start_vtt_workflow 참고)"""
+    job_id = str(uuid.uuid4())
+    store = _store_info(result_key, filename)
+    budget = _budget_info(job_id, budget)
+    plan = plan or plan_chat_chunks(chat_content, BaseGPTClient(**chunking_options()))
+    chunks = plan.texts
+
+    publish_progress(progress_job_id, f"청크 0/{len(chunks)} 분석 중", stage='chunks', plan=plan.summary())
+    tasks, chunk_ids, reused = _chunk_header(job_id, plan, 'chat', progress_job_id, budget)
+
+    _save_job_stages(job_id, chunk_ids, [job_id])
+    _start_chord(tasks, combine_chat_task.s(progress_job_id, store, reused, _risk_windows(chat_content), budget).set(
+        task_id=job_id))
+    logger.info(f"채팅 분석 작업 등록 완료 (job: {job_id}, 청크 수: {len(chunks)}, 분석할 청크 수: {len(tasks)})")
+    return job_id
+
+def get_job_status(job_id):
+    """작업 상태와 단계별 진행 상황 조회"""
+    result = celery_app.AsyncResult(job_id)
+    status = {'task_id': job_id, 'state': result.state, 'stages': []}
+
+    chunk_group = GroupResult.restore(f'{job_id}-chunks', app=celery_app)
+    if chunk_group is not None:
+        total = len(chunk_group.results)
+        status['stages'].append({
+            'name': 'chunks',
+            'completed': chunk_group.completed_count(),
+            'started': sum(1 for r in chunk_group.results if r.state == 'STARTED'),
+            'total': total
+        })
+
+    lecture_group = GroupResult.restore(f'{job_id}-lectures', app=celery_app)
+    if lecture_group is not None:
+        status['stages'].append({
+            'name': 'lectures',
+            'completed': lecture_group.completed_count(),
+            'total': len(lecture_group.results)
+        })
+
+    stage_group = GroupResult.restore(f'{job_id}-stages', app=celery_app)
+    if stage_group is not None:
+        names = ['combine', 'curriculum'] if len(stage_group.results) > 1 else ['combine']
+        for name, stage in zip(names, stage_group.results):
+            status['stages'].append({'name': name, 'state': stage.state})
+
+    if result.state == 'SUCCESS':
+        status['result'] = result.result
+    elif result.state == 'FAILURE':
+        status['error'] = str(result.result)
+
+    return status
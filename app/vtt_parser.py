@@ -0,0 +1,173 @@
+import re
+import logging
+from itertools import chain
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 00:00:01.000 또는 00:01.000 형식 (SRT식 쉼표 구분자도 허용)
+TIMESTAMP_PATTERN = re.compile(r'(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{1,3})')
+VOICE_TAG_PATTERN = re.compile(r'<v(?:\.[^ >]*)?\s+([^>]+)>')
+TAG_PATTERN = re.compile(r'</?[^>]+>')
+# Zoom 자막의 "이름: 발화" 형식
+SPEAKER_PATTERN = re.compile(r'^([^:]{1,40}?):\s+(.+)$')
+# 헤더 이후 빈 줄까지 건너뛰는 블록
+SKIPPED_BLOCKS = ('NOTE', 'STYLE', 'REGION')
+
+class Cue(NamedTuple):
+    """자막 한 구간 (시간은 초 단위)"""
+    start: float
+    end: float
+    text: str
+    speaker: Optional[str] = None
+
+def parse_timestamp(value: str) -> float:
+    """VTT 타임스탬프를 초 단위로 변환"""
+    match = TIMESTAMP_PATTERN.search(value)
+    if not match:
+        raise ValueError(f"잘못된 타임스탬프입니다: {value}")
+    hours, minutes, seconds, millis = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(millis.ljust(3, '0')) / 1000
+
+def format_timestamp(seconds: float) -> str:
+    """초를 HH:MM:SS 형식으로 변환"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def is_vtt_content(content: str) -> bool:
+    """WEBVTT 헤더로 시작하는지 확인"""
+    return content.lstrip('\ufeff \t\r\n').startswith('WEBVTT')
+
+def _build_cue(start, end, lines) -> Optional[Cue]:
+    raw = ' '.join(line.strip() for line in lines if line.strip())
+    if not raw:
+        return None
+
+    speaker = None
+    voice = VOICE_TAG_PATTERN.search(raw)
+    if voice:
+        speaker = voice.group(1).strip()
+    text = TAG_PATTERN.sub('', raw).strip()
+
+    if speaker is None:
+        match = SPEAKER_PATTERN.match(text)
+        if match:
+            speaker, text = match.group(1).strip(), match.group(2).strip()
+
+    if not text:
+        return None
+    return Cue(start, end, text, speaker)
+
+def iter_cues(lines: Iterable[str]) -> Iterator[Cue]:
+    """VTT 줄 스트림에서 자막 구간을 순서대로 생성
+
+    WEBVTT 헤더, NOTE/STYLE/REGION 블록, 큐 번호, 타임스탬프 줄은 결과 텍스트에
+    포함되지 않습니다. 파일 객체처럼 줄 단위로 읽는 입력을 그대로 받을 수 있어 전체
+    내용을 메모리에 올리지 않아도 됩니다.
+    """
+    skipping = False
+    cue_start = cue_end = None
+    cue_lines = []
+    first_line = True
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if first_line:
+            line = line.lstrip('\ufeff')
+            first_line = False
+        stripped = line.strip()
+
+        if skipping:
+            if not stripped:
+                skipping = False
+            continue
+
+        if cue_start is not None:
+            if stripped:
+                cue_lines.append(stripped)
+                continue
+            cue = _build_cue(cue_start, cue_end, cue_lines)
+            if cue:
+                yield cue
+            cue_start = cue_end = None
+            cue_lines = []
+            continue
+
+        if not stripped:
+            continue
+        if '-->' in stripped:
+            start_text, end_text = stripped.split('-->', 1)
+            try:
+                cue_start = parse_timestamp(start_text)
+                cue_end = parse_timestamp(end_text)
+            except ValueError as e:
+                logger.warning(f"타임스탬프 파싱 실패, 구간 건너뜀: {str(e)}")
+                skipping = True
+            continue
+        if stripped.startswith('WEBVTT') or stripped.split(' ', 1)[0] in SKIPPED_BLOCKS:
+            skipping = True
+        # 그 외 줄은 큐 번호(식별자)이므로 무시
+
+    if cue_start is not None:
+        cue = _build_cue(cue_start, cue_end, cue_lines)
+        if cue:
+            yield cue
+
+def merge_speaker_cues(cues: Iterable[Cue], max_gap: float = 5.0, max_chars: int = 1000) -> Iterator[Cue]:
+    """같은 화자의 연속된 구간을 하나로 병합"""
+    current = None
+    for cue in cues:
+        if (current is not None and
+                cue.speaker == current.speaker and
+                cue.start - current.end <= max_gap and
+                len(current.text) + len(cue.text) + 1 <= max_chars):
+            current = Cue(current.start, cue.end, f"{current.text} {cue.text}", current.speaker)
+            continue
+        if current is not None:
+            yield current
+        current = cue
+    if current is not None:
+        yield current
+
+def cue_line(cue: Cue) -> str:
+    """모델에 전달할 발화 한 줄 (화자가 있으면 이름만 앞에 붙임)"""
+    return f"{cue.speaker}: {cue.text}" if cue.speaker else cue.text
+
+class Transcript:
+    """한 번 읽어 들인 자막/텍스트 (원문 대신 발화 구간만 보관)
+
+    WEBVTT가 아닌 텍스트(채팅 기록 등)는 비어 있지 않은 줄마다 시간 정보 없는 구간 하나로
+    보관합니다. size는 원문 크기(바이트)입니다.
+    """
+
+    def __init__(self, cues: List[Cue], is_vtt: bool, size: int = 0):
+        self.cues = cues
+        self.is_vtt = is_vtt
+        self.size = size
+
+    @property
+    def spoken_chars(self) -> int:
+        return sum(len(cue.text) for cue in self.cues)
+
+    def units(self, max_chars: int = 1000) -> Iterator[Tuple[str, float, float]]:
+        """청크 분할/검색용 (텍스트, 시작, 끝) 단위 (자막은 화자별로 max_chars자까지 병합)"""
+        if not self.is_vtt:
+            for cue in self.cues:
+                yield cue.text, cue.start, cue.end
+            return
+        for cue in merge_speaker_cues(self.cues, max_chars=max_chars):
+            yield cue_line(cue), cue.start, cue.end
+
+def read_transcript(lines: Iterable[str], size: int = 0) -> Transcript:
+    """줄 스트림을 한 번만 읽어 Transcript 생성 (첫 내용 줄이 WEBVTT이면 자막으로 파싱)"""
+    lines = iter(lines)
+    head = []
+    for line in lines:
+        head.append(line)
+        if line.strip('\ufeff \t\r\n'):
+            break
+    stream = chain(head, lines)
+
+    if head and is_vtt_content(head[-1]):
+        return Transcript(list(iter_cues(stream)), True, size)
+    return Transcript([Cue(0.0, 0.0, line.strip()) for line in stream if line.strip()], False, size)
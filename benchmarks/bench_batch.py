@@ -0,0 +1,97 @@
+"""여러 강의 일괄 분석(/analyze_vtt/batch) 벤치마크 (로컬 OpenAI 대역 서버 사용, API 비용 없음)
+
+같은 합성 강의 --lectures개를 다음 방식으로 분석하고 전체 소요 시간을 비교합니다.
+
+1. 강의마다 /analyze_vtt로 차례로 업로드 (강의마다 커리큘럼 다시 파싱)
+2. /analyze_vtt/batch 한 번에 업로드 (동시에 분석하는 강의 수 BATCH_MAX_CONCURRENCY를 바꿔가며)
+
+LLM 캐시와 결과 저장소는 끄고, 앱의 API 한도(OPENAI_TOKENS_PER_MINUTE)는 한도 대기가 결과를
+가리지 않도록 기본값보다 크게 설정합니다 (환경 변수로 지정하면 그 값을 사용).
+
+사용법:
+    python benchmarks/bench_batch.py
+    python benchmarks/bench_batch.py --lectures 10 --minutes 60 --latency 1.0 --concurrency 1,2,5,10
+"""
+import io
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_openai import start_mock_openai
+from benchmarks.synthetic import curriculum_file, synthetic_curriculum, synthetic_vtt
+
+def main():
+    parser = argparse.ArgumentParser(description='여러 강의 일괄 분석 벤치마크')
+    parser.add_argument('--lectures', type=int, default=8, help='강의 수')
+    parser.add_argument('--minutes', type=int, default=30, help='강의 하나의 길이(분)')
+    parser.add_argument('--latency', type=float, default=0.5, help='대역 응답 지연(초)')
+    parser.add_argument('--concurrency', default='1,2,4,8', help='BATCH_MAX_CONCURRENCY 목록')
+    parser.add_argument('--curriculum-format', default='json', choices=['json', 'xlsx'], help='커리큘럼 파일 형식')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    mock = start_mock_openai(latency=args.latency, seed=args.seed)
+    os.environ.update({
+        'OPENAI_API_KEY': 'bench-batch',
+        'OPENAI_BASE_URL': f'http://127.0.0.1:{mock.server_address[1]}/v1',
+        'LLM_CACHE_BACKEND': 'none',
+        'RESULT_STORE_BACKEND': 'none',
+        'TASK_QUEUE_ENABLED': 'false',
+    })
+    os.environ.setdefault('OPENAI_TOKENS_PER_MINUTE', '5000000')
+    os.environ.pop('REDIS_URL', None)
+    os.environ.pop('DISCORD_WEBHOOK_URL', None)
+
+    import logging
+    logging.disable(logging.WARNING)
+    from app.app import app
+    from app.config import Config
+
+    # 강의마다 다른 내용과 날짜가 있는 파일명
+    lectures = [(f'GMT202403{i + 4:02d}-090000_Recording.transcript.vtt',
+                 synthetic_vtt(args.minutes, args.seed + i).encode('utf-8')) for i in range(args.lectures)]
+    name, curriculum = curriculum_file(synthetic_curriculum(seed=args.seed), args.curriculum_format)
+    client = app.test_client()
+
+    mock.reset()
+    started = time.perf_counter()
+    for filename, content in lectures:
+        response = client.post('/analyze_vtt', content_type='multipart/form-data', data={
+            'vtt_file': (io.BytesIO(content), filename), 'curriculum_file': (io.BytesIO(curriculum), name)
+        })
+        assert response.status_code == 200, response.json
+    sequential = time.perf_counter() - started
+    print(f"강의 {args.lectures}개 ({args.minutes}분), API 지연 {args.latency:g}초, "
+          f"강의당 API 요청 {mock.snapshot()['requests'] / args.lectures:g}개")
+    print(f"\n{'방식':<28} {'소요 시간(s)':>12} {'강의/s':>8}")
+    print(f"{'/analyze_vtt 차례로 업로드':<28} {sequential:>12.2f} {args.lectures / sequential:>8.2f}")
+
+    coverage = None
+    for level in [int(value) for value in args.concurrency.split(',')]:
+        Config.BATCH_MAX_CONCURRENCY = level
+        started = time.perf_counter()
+        response = client.post('/analyze_vtt/batch', content_type='multipart/form-data', data={
+            'vtt_files': [(io.BytesIO(content), filename) for filename, content in lectures],
+            'curriculum_file': (io.BytesIO(curriculum), name)
+        })
+        elapsed = time.perf_counter() - started
+        assert response.status_code == 200, response.json
+        failed = sum(1 for lecture in response.json['lectures'] if 'error' in lecture)
+        coverage = response.json['coverage']
+        label = f"/analyze_vtt/batch (동시 {level})"
+        print(f"{label:<28} {elapsed:>12.2f} {args.lectures / elapsed:>8.2f}" + (f"  실패 {failed}" if failed else ''))
+    mock.shutdown()
+
+    if coverage:
+        print(f"\n과목 × 날짜 달성도 (%) / 주간 세부내용 달성 비율")
+        print(f"{'':<12}" + ''.join(f"{day[5:]:>7}" for day in coverage['days']) + f"{'주간':>7}")
+        for subject, row in zip(coverage['subjects'], coverage['matrix']):
+            cells = ''.join(f"{'-' if rate is None else rate:>7}" for rate in row)
+            print(f"{subject[:10]:<12}{cells}{coverage['coverage'].get(subject, 0):>7}")
+
+if __name__ == '__main__':
+    main()
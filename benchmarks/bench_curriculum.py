@@ -0,0 +1,120 @@
+"""커리큘럼 엑셀 파싱 벤치마크: 행 단위 순회(기존 방식)와 열 단위 연산, 등록소(해시 캐시) 재사용 비교
+
+합성 커리큘럼 시트(과목마다 첫 행에 과목명과 세부내용, 이후 행은 세부내용만, 빈 행과 헤더 포함)를
+만들어 같은 결과가 나오는지 확인하고 파싱 시간을 측정합니다. 엑셀 파일 읽기(read_excel) 시간은
+두 방식이 같으므로 따로 표시합니다.
+
+사용법:
+    python benchmarks/bench_curriculum.py
+    python benchmarks/bench_curriculum.py --rows 1000 10000 50000 --repeat 5
+"""
+import io
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analysis import CURRICULUM_HEADER_KEYWORDS, parse_curriculum_sheet
+from app.curriculum_registry import create_curriculum_registry
+from benchmarks.synthetic import SUBJECTS
+
+def parse_rows(df):
+    """기존 방식: df.iterrows()로 행마다 셀을 문자열로 변환"""
+    result = []
+    current_subject = None
+    current_details = []
+    for _, row in df.iterrows():
+        row_values = [str(cell).strip() for cell in row if str(cell).strip() != 'nan']
+        if not row_values:
+            continue
+        first_cell = str(row[0]).strip()
+        if first_cell != 'nan' and first_cell:
+            if any(keyword.lower() in first_cell.lower() for keyword in CURRICULUM_HEADER_KEYWORDS):
+                continue
+            if current_subject and current_details:
+                result.append({'과목명': current_subject, '세부내용': current_details})
+            current_subject = first_cell
+            current_details = []
+            if len(row_values) > 1:
+                current_details.extend(row_values[1:])
+        else:
+            if current_subject and row_values:
+                current_details.extend(row_values)
+    if current_subject and current_details:
+        result.append({'과목명': current_subject, '세부내용': current_details})
+    return result
+
+def synthetic_sheet(rows, seed=42):
+    """rows행짜리 커리큘럼 시트 DataFrame (header=None으로 읽은 것과 같은 형태)"""
+    import numpy as np
+    import pandas as pd
+
+    rng = random.Random(seed)
+    names = list(SUBJECTS)
+    data = [['교과목명', '세부내용', '비고']]
+    subject = 0
+    while len(data) < rows:
+        pool = SUBJECTS[names[subject % len(names)]]
+        data.append([f"{names[subject % len(names)]} {subject + 1}", pool[0], np.nan])
+        for j in range(rng.randint(3, 12)):
+            if rng.random() < 0.05:
+                data.append([np.nan, np.nan, np.nan])
+            else:
+                data.append([np.nan, f"{pool[j % len(pool)]} {j}", '실습' if rng.random() < 0.2 else np.nan])
+        subject += 1
+    return pd.DataFrame(data[:rows])
+
+def best_of(repeat, func, *args):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+def main():
+    parser = argparse.ArgumentParser(description='커리큘럼 엑셀 파싱 벤치마크')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000], help='시트 행 수')
+    parser.add_argument('--repeat', type=int, default=3, help='반복 횟수 (가장 빠른 값 사용)')
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    print(f"{'행 수':>8} {'read_excel(ms)':>15} {'행 순회(ms)':>12} {'열 연산(ms)':>12} {'배속':>6} "
+          f"{'등록(ms)':>9} {'SQLite 재사용':>13} {'메모리 재사용':>13} {'과목 수':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        registry = create_curriculum_registry('sqlite', os.path.join(directory, 'curricula.sqlite3'))
+        for rows in args.rows:
+            df = synthetic_sheet(rows)
+            buffer = io.BytesIO()
+            df.to_excel(buffer, header=False, index=False)
+            data = buffer.getvalue()
+
+            read_seconds, sheet = best_of(args.repeat, lambda: pd.read_excel(io.BytesIO(data), header=None))
+            row_seconds, expected = best_of(args.repeat, parse_rows, sheet)
+            column_seconds, result = best_of(args.repeat, parse_curriculum_sheet, sheet)
+            assert result == expected, '열 연산 파싱 결과가 기존 방식과 다릅니다'
+
+            started = time.perf_counter()
+            registry.parse_upload('curriculum.xlsx', io.BytesIO(data))
+            register_seconds = time.perf_counter() - started
+
+            def reuse(cached):
+                if not cached:
+                    registry.clear_cache()  # 다른 워커 프로세스처럼 메모리 캐시 없이 SQLite에서 조회
+                return registry.parse_upload('curriculum.xlsx', io.BytesIO(data))
+            stored_seconds, _ = best_of(args.repeat, reuse, False)
+            cached_seconds, cached = best_of(args.repeat, reuse, True)
+            assert cached == expected
+
+            print(f"{rows:>8} {read_seconds * 1000:>15.1f} {row_seconds * 1000:>12.1f} {column_seconds * 1000:>12.1f} "
+                  f"{row_seconds / column_seconds:>5.1f}x {register_seconds * 1000:>9.1f} {stored_seconds * 1000:>13.2f} "
+                  f"{cached_seconds * 1000:>13.3f} "
+                  f"{len(result):>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Discord 알림 전송 큐 벤치마크: 요청 한도가 있는 로컬 웹훅 대역으로 알림 폭주 처리 확인
+
+로컬 웹훅 대역 서버는 Discord처럼 window초마다 limit개 요청만 받고, 넘으면 429와 retry_after를
+돌려줍니다(--error-rate 비율로 500도 반환). 같은 알림 폭주를 다음 두 방식으로 보냅니다.
+
+- 직접 전송: 알림마다 바로 POST (재시도 없음, 요청 스레드에서 전송)
+- 전송 큐: DiscordNotifier.notify (임베드 묶음, 429 대기, 백오프 재시도)
+
+사용법:
+    python benchmarks/bench_discord_notifier.py --alerts 100 --threads 8
+    python benchmarks/bench_discord_notifier.py --alerts 300 --limit 5 --window 2 --error-rate 0.1
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.discord_notifier import DiscordNotifier, risk_alert_embed
+from benchmarks.load_test import free_port
+
+def start_webhook_stub(limit, window, error_rate, seed=7):
+    """요청 한도가 있는 Discord 웹훅 대역 서버 (server.stats에 수신 결과 기록)"""
+    lock = threading.Lock()
+    rng = random.Random(seed)
+    bucket = {'reset_at': 0.0, 'remaining': limit}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            stats = self.server.stats
+            with lock:
+                now = time.monotonic()
+                if now >= bucket['reset_at']:
+                    bucket['reset_at'], bucket['remaining'] = now + window, limit
+                reset_after = bucket['reset_at'] - now
+                if bucket['remaining'] <= 0:
+                    stats['rate_limited'] += 1
+                    status = 429
+                elif rng.random() < error_rate:
+                    bucket['remaining'] -= 1
+                    stats['errors'] += 1
+                    status = 500
+                else:
+                    bucket['remaining'] -= 1
+                    stats['messages'] += 1
+                    stats['embeds'] += len(payload.get('embeds', []))
+                    status = 204
+                remaining = bucket['remaining']
+
+            body = json.dumps({'message': 'You are being rate limited.', 'retry_after': round(reset_after, 3),
+                               'global': False}).encode('utf-8') if status == 429 else b''
+            self.send_response(status)
+            self.send_header('X-RateLimit-Limit', str(limit))
+            self.send_header('X-RateLimit-Remaining', str(max(0, remaining)))
+            self.send_header('X-RateLimit-Reset-After', f"{reset_after:.3f}")
+            if status == 429:
+                self.send_header('Retry-After', f"{reset_after:.3f}")
+                self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', free_port()), Handler)
+    server.stats = {'messages': 0, 'embeds': 0, 'rate_limited': 0, 'errors': 0}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def sample_windows(count):
+    return [{'index': i, 'start': i * 300.0, 'end': i * 300.0 + 300.0, 'summary': [f'{i}번째 구간 요약'],
+             'risks': [f'{i}번째 구간의 부적절한 표현']} for i in range(1, count + 1)]
+
+def run_direct(url, windows, threads):
+    """알림마다 요청 스레드에서 바로 전송 (호출 시간 목록 반환)"""
+    client = httpx.Client(timeout=10.0)
+    durations = []
+
+    def send(window):
+        started = time.perf_counter()
+        try:
+            client.post(url, json={'embeds': [risk_alert_embed('bench', window)]})
+        except httpx.HTTPError:
+            pass
+        durations.append(time.perf_counter() - started)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(send, windows))
+    client.close()
+    return durations
+
+def run_queue(url, windows, threads, coalesce):
+    """전송 큐에 넣기만 하고 반환 (호출 시간 목록, 전체 전송 완료까지 걸린 시간, 통계)"""
+    notifier = DiscordNotifier(url, coalesce_seconds=coalesce, max_backoff=2.0)
+    durations = []
+    started = time.perf_counter()
+
+    def send(window):
+        call_started = time.perf_counter()
+        notifier.send_risk_alert('bench', window)
+        durations.append(time.perf_counter() - call_started)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(send, windows))
+    notifier.flush(timeout=300)
+    return durations, time.perf_counter() - started, notifier.stats()
+
+def report_calls(durations):
+    durations = sorted(durations)
+    return (f"호출 시간 평균 {sum(durations) / len(durations) * 1000:.2f}ms, "
+            f"최대 {durations[-1] * 1000:.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='Discord 알림 전송 큐 벤치마크')
+    parser.add_argument('--alerts', type=int, default=100, help='보낼 알림 수')
+    parser.add_argument('--threads', type=int, default=8, help='알림을 보내는 요청 스레드 수')
+    parser.add_argument('--limit', type=int, default=5, help='대역 서버의 window초당 허용 요청 수')
+    parser.add_argument('--window', type=float, default=2.0, help='대역 서버의 요청 한도 초기화 주기(초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='대역 서버의 500 응답 비율')
+    parser.add_argument('--coalesce', type=float, default=1.0, help='알림을 모아 보내는 대기 시간(초)')
+    args = parser.parse_args()
+
+    windows = sample_windows(args.alerts)
+    print(f"알림 {args.alerts}건, 요청 스레드 {args.threads}개, 웹훅 한도 {args.window:g}초당 {args.limit}건, "
+          f"500 비율 {args.error_rate:g}")
+
+    server = start_webhook_stub(args.limit, args.window, args.error_rate)
+    url = f"http://127.0.0.1:{server.server_address[1]}/webhook"
+    durations = run_direct(url, windows, args.threads)
+    stats = server.stats
+    print(f"\n[직접 전송] 전달 {stats['embeds']}/{args.alerts}건, 429 {stats['rate_limited']}회, "
+          f"500 {stats['errors']}회, {report_calls(durations)}")
+    server.shutdown()
+
+    time.sleep(args.window)
+    server = start_webhook_stub(args.limit, args.window, args.error_rate)
+    url = f"http://127.0.0.1:{server.server_address[1]}/webhook"
+    durations, elapsed, notifier_stats = run_queue(url, windows, args.threads, args.coalesce)
+    stats = server.stats
+    print(f"[전송 큐]   전달 {stats['embeds']}/{args.alerts}건 (메시지 {stats['messages']}개), "
+          f"429 {stats['rate_limited']}회, 500 {stats['errors']}회, {report_calls(durations)}")
+    print(f"            전체 전송 {elapsed:.2f}초, 전송 지연 p50 {notifier_stats.get('latency_p50', 0):.2f}초 / "
+          f"p95 {notifier_stats.get('latency_p95', 0):.2f}초, 재시도 {notifier_stats['retries']}회, "
+          f"실패 {notifier_stats['failed']}건")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
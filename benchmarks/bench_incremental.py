@@ -0,0 +1,62 @@
+"""증분 재분석 벤치마크: 자막이 늘어나거나 일부 수정되었을 때 다시 분석해야 하는 청크 비교
+
+예산을 채울 때마다 끊는 기존 분할과 내용 기반 경계 분할(CHUNK_CONTENT_DEFINED)로 각각
+원본 자막을 나눈 뒤, 수정본에서 원본에 없던 청크(= 새로 API로 보낼 청크) 수와 토큰 수를
+계산합니다. API는 호출하지 않습니다.
+
+사용법:
+    python benchmarks/bench_incremental.py                    # 합성 자막 60분 → 70분, 중간 수정
+    python benchmarks/bench_incremental.py --minutes 180 --added 10 --max-chunk-tokens 4000
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analysis import plan_vtt_chunks
+from app.gpt_client import BaseGPTClient
+from benchmarks.bench_vtt_parser import synthetic_vtt
+
+def edit_middle(content):
+    """자막 중간의 발화 하나를 고친 수정본"""
+    lines = content.split('\n')
+    cue_lines = [i for i, line in enumerate(lines) if line.startswith(('강사:', '수강생'))]
+    target = cue_lines[len(cue_lines) // 2]
+    lines[target] = lines[target] + ' (정정: 앞의 설명을 보충합니다)'
+    return '\n'.join(lines)
+
+def reanalysis_cost(original, revised, planner):
+    """(수정본 청크 수, 새로 분석할 청크 수, 수정본 입력 토큰, 새로 분석할 입력 토큰)"""
+    known = set(plan_vtt_chunks(original, planner).texts)
+    plan = plan_vtt_chunks(revised, planner)
+    new_chunks = [chunk for chunk in plan.chunks if chunk.text not in known]
+    total_tokens = sum(chunk.tokens for chunk in plan.chunks) + plan.prompt_tokens * plan.count
+    new_tokens = sum(chunk.tokens for chunk in new_chunks) + plan.prompt_tokens * len(new_chunks)
+    return plan.count, len(new_chunks), total_tokens, new_tokens
+
+def main():
+    parser = argparse.ArgumentParser(description='증분 재분석 비용 벤치마크')
+    parser.add_argument('--minutes', type=int, default=60, help='원본 합성 자막 길이(분)')
+    parser.add_argument('--added', type=int, default=10, help='뒤에 추가되는 자막 길이(분)')
+    parser.add_argument('--max-chunk-tokens', type=int, default=8000, help='청크 하나의 입력 토큰 상한')
+    args = parser.parse_args()
+
+    # 같은 시드의 합성 자막은 앞부분이 같으므로 길이만 늘리면 뒤에 내용이 추가된 자막이 됨
+    original = synthetic_vtt(args.minutes)
+    scenarios = [
+        (f"{args.added}분 추가", synthetic_vtt(args.minutes + args.added)),
+        ("중간 발화 1개 수정", edit_middle(original)),
+    ]
+
+    print(f"원본 합성 자막 {args.minutes}분, 청크 입력 상한 {args.max_chunk_tokens}토큰")
+    for name, revised in scenarios:
+        print(f"\n[{name}]")
+        for label, content_defined in (('예산 채움 분할', False), ('내용 기반 분할', True)):
+            planner = BaseGPTClient(max_chunk_tokens=args.max_chunk_tokens, content_defined_chunks=content_defined)
+            count, new_count, total_tokens, new_tokens = reanalysis_cost(original, revised, planner)
+            print(f"  {label}: 청크 {count}개 중 {new_count}개 재분석, "
+                  f"입력 토큰 {new_tokens}/{total_tokens} ({new_tokens / total_tokens * 100:.1f}%)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""업로드 수집 벤치마크: 저장 후 전체 읽기(기존 방식)와 스트림 파싱의 최대 메모리(peak RSS) 비교
+
+측정마다 별도 프로세스를 띄워 모듈 로드 직후와 처리 후의 최대 RSS 차이, 처리 중 Python
+할당 최대치(tracemalloc)를 비교합니다. RSS는 최고 수위라서 모듈 로드 때보다 적게 쓰면
+0으로 보이므로 두 값을 함께 봅니다. 두 방식 모두 청크 분할 계획과 검색용 구간 생성까지
+수행합니다.
+
+사용법:
+    python benchmarks/bench_ingest.py                 # 합성 자막 1시간, 4시간, 8시간
+    python benchmarks/bench_ingest.py --hours 1 4 8 24
+    python benchmarks/bench_ingest.py lecture.vtt
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def peak_rss_kb():
+    # Linux의 ru_maxrss 단위는 KB (macOS는 바이트)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def run_child(mode, path):
+    """한 가지 방식으로 파일을 처리하고 결과를 JSON으로 출력 (자식 프로세스)"""
+    from app.analysis import plan_vtt_chunks, transcript_segments
+    from app.gpt_client import BaseGPTClient
+    from app.ingest import ingest_transcript
+
+    planner = BaseGPTClient()
+    baseline = peak_rss_kb()
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    if mode == 'legacy':
+        # 기존 방식: uploads/에 저장한 뒤 전체를 다시 읽어 문자열로 처리
+        saved = path + '.saved'
+        shutil.copyfile(path, saved)
+        try:
+            with open(saved, 'r', encoding='utf-8') as f:
+                content = f.read()
+        finally:
+            os.remove(saved)
+    else:
+        with open(path, 'rb') as f:
+            content = ingest_transcript(f)
+
+    plan = plan_vtt_chunks(content, planner)
+    segments = transcript_segments(content)
+    elapsed = time.perf_counter() - started
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(json.dumps({
+        'peak_kb': peak_rss_kb() - baseline,
+        'heap_peak_kb': heap_peak // 1024,
+        'seconds': elapsed,
+        'chunks': plan.count,
+        'segments': len(segments)
+    }))
+
+def measure(path):
+    results = {}
+    for mode in ('legacy', 'stream'):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', mode, path],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+    return results
+
+def report(name, size, results):
+    legacy, stream = results['legacy'], results['stream']
+    print(f"\n[{name}] 파일 {size / (1024 * 1024):.1f}MB")
+    for label, result in (('저장 후 전체 읽기', legacy), ('스트림 파싱     ', stream)):
+        print(f"  {label}: peak RSS +{result['peak_kb'] / 1024:6.1f}MB, 할당 최대 {result['heap_peak_kb'] / 1024:6.1f}MB, "
+              f"{result['seconds'] * 1000:8.1f}ms (청크 {result['chunks']}개, 검색 구간 {result['segments']}개)")
+    if legacy['heap_peak_kb']:
+        print(f"  할당 최대치 {(1 - stream['heap_peak_kb'] / legacy['heap_peak_kb']) * 100:.1f}% 감소")
+
+def main():
+    parser = argparse.ArgumentParser(description='업로드 수집 방식별 peak RSS 벤치마크')
+    parser.add_argument('files', nargs='*', help='측정할 VTT 파일')
+    parser.add_argument('--hours', type=float, nargs='+', default=[1, 4, 8], help='합성 자막 길이(시간)')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    if args.files:
+        for path in args.files:
+            report(os.path.basename(path), os.path.getsize(path), measure(os.path.abspath(path)))
+        return
+
+    from benchmarks.bench_vtt_parser import synthetic_vtt
+
+    with tempfile.TemporaryDirectory() as directory:
+        for hours in args.hours:
+            path = os.path.join(directory, f'synthetic_{hours:g}h.vtt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(synthetic_vtt(int(hours * 60)))
+            report(f"합성 자막 {hours:g}시간", os.path.getsize(path), measure(path))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""분석 결과 렌더링 벤치마크: 문자열 조립(기존 방식)과 화면 모델 + 컴파일된 Jinja 템플릿 비교
+
+청크 --chunks개의 합성 분석 결과(구조화 dict, 같은 문장이 여러 청크에 반복됨)를 통합한 뒤 HTML로
+변환하는 시간을 측정하고, 두 방식의 출력이 같은 class 이름을 사용하는지 확인합니다. 템플릿
+컴파일은 프로세스마다 처음 한 번만 하므로 첫 호출 시간은 따로 표시합니다.
+
+사용법:
+    python benchmarks/bench_render.py
+    python benchmarks/bench_render.py --chunks 1000 5000 --repeat 20
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rendering import render_chat_analysis, render_vtt_analysis
+from app.schemas import CHAT_SUBSECTIONS, ChatAnalysis, VTTAnalysis, is_real_risk
+
+SENTENCES = [
+    "리스트와 딕셔너리의 차이를 예제로 설명했습니다",
+    "반복문과 조건문을 함께 사용하는 방법을 다뤘습니다",
+    "함수의 인자와 반환값을 실습했습니다",
+    "예외 처리 구문을 소개했습니다",
+    "클래스와 인스턴스의 관계를 설명했습니다",
+    "파일 입출력 예제를 함께 실행했습니다",
+]
+KEYWORDS = ["파이썬", "리스트", "딕셔너리", "함수", "클래스", "예외", "파일", "반복문", "조건문", "모듈"]
+RISKS = ["위험 발언이 발견되지 않았습니다.", "특별한 위험 발언은 없습니다.", "수강생 이름과 전화번호가 언급되었습니다 <주의>"]
+
+def legacy_vtt_html(analysis):
+    """기존 방식: 섹션마다 문자열 목록을 이어 붙여 조립"""
+    html = ['<div class="analysis-result">']
+    if analysis.summary:
+        html.extend(['<div class="category-section">', '    <h2 class="category-title">주요 내용</h2>',
+                     '    <div class="main-topics">', f'        <p>{". ".join(analysis.summary)}</p>', '    </div>', '</div>'])
+    if analysis.keywords:
+        html.extend(['<div class="category-section">', '    <h2 class="category-title">키워드</h2>',
+                     '    <div class="main-topics">', '        <ul class="keyword-list">'])
+        html.extend(f'            <li>{keyword}</li>' for keyword in analysis.keywords)
+        html.extend(['        </ul>', '    </div>', '</div>'])
+    if analysis.analysis:
+        html.extend(['<div class="category-section">', '    <h2 class="category-title">분석</h2>',
+                     '    <div class="main-topics">', f'        <p>{". ".join(analysis.analysis)}</p>', '    </div>', '</div>'])
+    risks = [risk for risk in analysis.risks if is_real_risk(risk)]
+    html.extend(['<div class="category-section risk-section' + (' has-risks' if risks else ' no-risks') + '">',
+                 '    <h2 class="category-title">위험 발언</h2>', '    <div class="risk-summary">',
+                 '        <div class="risk-icon">' + ('⚠️' if risks else '✅') + '</div>',
+                 '        <p>' + ('다음과 같은 위험 발언이 감지되었습니다.' if risks else '위험 발언이 감지되지 않았습니다.') + '</p>',
+                 '    </div>'])
+    if risks:
+        html.append('    <ul class="risk-list">')
+        html.extend(f'        <li>{risk}</li>' for risk in risks)
+        html.append('    </ul>')
+    html.extend(['</div>', '</div>'])
+    return '\n'.join(html)
+
+def legacy_chat_html(analysis):
+    """기존 방식: 섹션마다 문자열 목록을 이어 붙여 조립"""
+    html = ['<div class="analysis-result">']
+    if analysis.topics:
+        html.extend(['<div class="category-section">', '    <h2 class="category-title">주요 대화 주제</h2>',
+                     '    <div class="main-topics">', f'        <p>{". ".join(analysis.topics)}</p>', '    </div>', '</div>'])
+    for name, (title, subsections) in CHAT_SUBSECTIONS.items():
+        section = getattr(analysis, name)
+        if not any(section.values()):
+            continue
+        html.extend(['<div class="category-section">', f'    <h2 class="category-title">{title}</h2>'])
+        for key, subtitle in subsections:
+            if section.get(key):
+                html.extend(['    <div class="subsection">', f'        <h3 class="subsection-title">{subtitle}</h3>',
+                             '        <ul class="analysis-list">'])
+                html.extend(f'            <li>{item}</li>' for item in section[key])
+                html.extend(['        </ul>', '    </div>'])
+        html.append('</div>')
+    risks = [item for item in analysis.risks if is_real_risk(item)]
+    if risks:
+        html.extend(['<div class="category-section risk-section">', '    <h2 class="category-title">위험 발언 및 주의사항</h2>',
+                     '    <div class="risk-summary">', '        <div class="risk-icon">⚠️</div>',
+                     '        <p>채팅에서 다음과 같은 위험 발언이 감지되었습니다.</p>', '    </div>', '    <ul class="risk-list">'])
+        html.extend(f'        <li>{item}</li>' for item in risks)
+        html.extend(['    </ul>', '</div>'])
+    elif analysis.topics or any(any(getattr(analysis, name).values()) for name in CHAT_SUBSECTIONS) \
+            or analysis.recommendations:
+        html.extend(['<div class="category-section risk-section safe">', '    <h2 class="category-title">위험 발언 및 주의사항</h2>',
+                     '    <div class="risk-summary">', '        <div class="risk-icon">✅</div>',
+                     '        <p>채팅에서 특별한 위험 발언이 감지되지 않았습니다.</p>', '    </div>', '</div>'])
+    if analysis.recommendations:
+        html.extend(['<div class="category-section">', '    <h2 class="category-title">종합 제언</h2>',
+                     '    <div class="main-topics">', f'        <p>{". ".join(analysis.recommendations)}</p>', '    </div>', '</div>'])
+    html.append('</div>')
+    return '\n'.join(html)
+
+def synthetic_results(chunks, seed=42):
+    """청크별 VTT/채팅 분석 결과 dict (문장은 작은 목록에서 골라 청크 사이에 반복됨)"""
+    rng = random.Random(seed)
+    vtt, chat = [], []
+    for i in range(chunks):
+        vtt.append({'summary': rng.sample(SENTENCES, 3), 'keywords': rng.sample(KEYWORDS, 4),
+                    'analysis': [f"{rng.choice(SENTENCES)} ({i % 50}구간)"] + rng.sample(SENTENCES, 2),
+                    'risks': [rng.choice(RISKS)]})
+        chat.append({'topics': rng.sample(SENTENCES, 2), 'risks': [rng.choice(RISKS)],
+                     'recommendations': [rng.choice(SENTENCES)],
+                     **{name: {key: [f"{rng.choice(SENTENCES)} ({i % 30})"] for key, _ in subsections}
+                        for name, (_, subsections) in CHAT_SUBSECTIONS.items()}})
+    return vtt, chat
+
+def best_of(repeat, func):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+def classes(html):
+    return {name for value in re.findall(r'class="([^"]+)"', html) for name in value.split()}
+
+def main():
+    parser = argparse.ArgumentParser(description='분석 결과 렌더링 벤치마크')
+    parser.add_argument('--chunks', type=int, nargs='+', default=[1000], help='청크 수')
+    parser.add_argument('--repeat', type=int, default=10, help='반복 횟수 (가장 빠른 값 사용)')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    render_vtt_analysis(VTTAnalysis())
+    render_chat_analysis(ChatAnalysis.from_dict({}))
+    print(f"템플릿 첫 컴파일: {(time.perf_counter() - started) * 1000:.1f}ms (프로세스마다 한 번)\n")
+
+    print(f"{'청크 수':>8} {'유형':>5} {'통합(ms)':>9} {'문자열 조립(ms)':>15} {'템플릿(ms)':>11} "
+          f"{'기존 HTML(KB)':>14} {'새 HTML(KB)':>12}")
+    for chunks in args.chunks:
+        vtt_results, chat_results = synthetic_results(chunks)
+        cases = [
+            ('vtt', lambda: VTTAnalysis.merge([VTTAnalysis.from_dict(r) for r in vtt_results]),
+             legacy_vtt_html, render_vtt_analysis),
+            ('chat', lambda: ChatAnalysis.merge([ChatAnalysis.from_dict(r) for r in chat_results]),
+             legacy_chat_html, render_chat_analysis),
+        ]
+        for name, merge, legacy, render in cases:
+            merge_seconds, analysis = best_of(args.repeat, merge)
+            legacy_seconds, legacy_html = best_of(args.repeat, lambda: legacy(analysis))
+            render_seconds, html = best_of(args.repeat, lambda: render(analysis))
+            assert classes(html) == classes(legacy_html), 'class 이름이 기존 출력과 다릅니다'
+            print(f"{chunks:>8} {name:>5} {merge_seconds * 1000:>9.2f} {legacy_seconds * 1000:>15.2f} "
+                  f"{render_seconds * 1000:>11.2f} {len(legacy_html.encode()) / 1024:>14.1f} {len(html.encode()) / 1024:>12.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""위험 발언 사전 선별 벤치마크: 로컬 선별 시간과 청크 프롬프트에서 줄어든 토큰 대 분류 요청 토큰
+
+합성 강의 자막(--minutes 분량)에 위험 문장(비하 표현, 욕설, 개인정보)을 시간당 --risks-per-hour개
+섞은 뒤 사전 선별 시간(한 시간 분량당), 선별 구간 수와 구간에 담긴 발화 줄 수를 측정합니다. 청크 분석
+프롬프트(구조화 출력이면 함수 정의 포함)에서 위험 발언 항목을 뺀 만큼 줄어드는 입력 토큰 ×
+청크 수와, 선별 구간 분류 요청에 새로 드는 입력 토큰을 비교합니다 (API 호출 없음).
+
+사용법:
+    python benchmarks/bench_risk_screen.py
+    python benchmarks/bench_risk_screen.py --minutes 60 180 --risks-per-hour 20 --repeat 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analysis import plan_vtt_chunks
+from app.chunking import estimate_tokens
+from app.gpt_client import BaseGPTClient
+from app.risk_screen import create_risk_screen
+from benchmarks.bench_vtt_parser import synthetic_vtt
+
+RISKY_SENTENCES = [
+    "이건 특정 지역 출신들이 원래 못하는 거예요",
+    "아 진짜 존나 어렵네요 이거",
+    "제 번호 010-1234-5678로 연락 주세요",
+    "과제는 student01@example.com으로 보내 주세요",
+]
+
+def risky_vtt(minutes, risks_per_hour, seed=42):
+    """위험 문장을 섞은 합성 강의 자막과 섞은 문장 수"""
+    rng = random.Random(seed)
+    lines = synthetic_vtt(minutes, seed).split('\n')
+    speech = [i for i, line in enumerate(lines) if ': ' in line and '-->' not in line]
+    count = min(len(speech), round(risks_per_hour * minutes / 60))
+    for i in rng.sample(speech, count):
+        speaker = lines[i].split(': ', 1)[0]
+        lines[i] = f"{speaker}: {rng.choice(RISKY_SENTENCES)}"
+    return '\n'.join(lines), count
+
+def best_of(repeat, func):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+def main():
+    parser = argparse.ArgumentParser(description='위험 발언 사전 선별 벤치마크')
+    parser.add_argument('--minutes', type=int, nargs='+', default=[60, 180], help='합성 강의 길이(분)')
+    parser.add_argument('--risks-per-hour', type=float, default=10, help='한 시간에 섞는 위험 문장 수')
+    parser.add_argument('--max-chunk-tokens', type=int, default=8000, help='청크 하나의 입력 토큰 상한')
+    parser.add_argument('--plain', action='store_true', help='구조화 출력 대신 마크다운 프롬프트 기준으로 비교')
+    parser.add_argument('--repeat', type=int, default=5, help='반복 횟수 (가장 빠른 값 사용)')
+    args = parser.parse_args()
+
+    screen = create_risk_screen()
+    options = {'max_chunk_tokens': args.max_chunk_tokens, 'structured_output': not args.plain}
+    full, prescreened = BaseGPTClient(**options), BaseGPTClient(risk_prescreen=True, **options)
+    saved_per_chunk = full.chunk_budget('vtt')[1] - prescreened.chunk_budget('vtt')[1]
+    print(f"청크 프롬프트 틀: {full.chunk_budget('vtt')[1]} → {prescreened.chunk_budget('vtt')[1]} 토큰 "
+          f"(청크당 {saved_per_chunk} 토큰 감소)\n")
+
+    print(f"{'길이(분)':>8} {'발화 줄':>8} {'위험 문장':>9} {'선별(ms)':>9} {'시간당(ms)':>10} {'구간 줄':>7} "
+          f"{'선별 구간':>9} {'청크':>5} {'줄어든 토큰':>11} {'분류 요청':>9} {'분류 토큰':>9} {'차이':>8}")
+    for minutes in args.minutes:
+        content, injected = risky_vtt(minutes, args.risks_per_hour)
+        transcript_lines = sum(1 for line in content.split('\n') if ': ' in line and '-->' not in line)
+        seconds, windows = best_of(args.repeat, lambda: screen.screen(content))
+        flagged = sum(window['lines'][1] - window['lines'][0] for window in windows)
+        chunks = len(plan_vtt_chunks(content, prescreened).chunks)
+        requests = screen.requests(prescreened, windows)
+        saved = saved_per_chunk * chunks
+        added = sum(estimate_tokens(prompt) for prompt, _ in requests)
+        print(f"{minutes:>8} {transcript_lines:>8} {injected:>9} {seconds * 1000:>9.2f} "
+              f"{seconds * 1000 * 60 / minutes:>10.2f} {flagged:>7} {len(windows):>9} {chunks:>5} "
+              f"{saved:>11} {len(requests):>9} {added:>9} {saved - added:>8}")
+
+if __name__ == '__main__':
+    main()
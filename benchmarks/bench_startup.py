@@ -0,0 +1,164 @@
+"""웹 워커 기동 벤치마크: 모듈 가져오기 시간과 기동부터 첫 요청 응답까지의 시간
+
+1. 새 프로세스에서 app.app을 가져오는 시간(--runs번 중앙값)과 그때 함께 올라온 무거운 모듈
+2. 로컬 OpenAI 대역 서버(응답 지연 --latency초)로 웹 서버(워커 1개)를 기동해
+   프로세스 시작 → 첫 요청(--probe) 200 응답, 첫 /readyz, 캐시된 /readyz까지의 시간
+3. OpenAI API에 닿지 않을 때(닫힌 포트)도 워커가 기동되어 /healthz는 200, /readyz는 503인지 확인
+
+사용법:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --latency 3 --runs 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.load_test import free_port
+
+HEAVY_MODULES = ('openai', 'httpx', 'numpy', 'pandas', 'openpyxl', 'redis', 'celery')
+
+def start_stub_openai(latency):
+    """모델 조회와 chat.completions에 latency 초 후 응답하는 대역 서버"""
+    def respond(handler, body):
+        time.sleep(latency)
+        body = json.dumps(body).encode('utf-8')
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            respond(self, {'id': self.path.rsplit('/', 1)[-1], 'object': 'model', 'created': 0, 'owned_by': 'stub'})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            respond(self, {
+                'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': int(time.time()),
+                'model': 'gpt-3.5-turbo',
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': '네'}}],
+                'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+            })
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', free_port()), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def app_env(openai_base_url, port=None):
+    env = dict(os.environ)
+    env.pop('REDIS_URL', None)
+    env.update({
+        'SERVER_MODE': 'sync',
+        'OPENAI_API_KEY': 'bench-startup',
+        'OPENAI_BASE_URL': openai_base_url,
+        'LLM_CACHE_BACKEND': 'none',
+        'RESULT_STORE_BACKEND': 'none',
+        'TASK_QUEUE_ENABLED': 'false',
+        'READINESS_TIMEOUT_SECONDS': '2',
+    })
+    env.pop('DISCORD_WEBHOOK_URL', None)
+    if port is not None:
+        env['PORT'] = str(port)
+    return env
+
+def measure_import(openai_base_url, runs):
+    """새 프로세스에서 app.app 가져오기 시간(초) 중앙값과 함께 올라온 무거운 모듈"""
+    code = ("import sys, time, logging; logging.disable(logging.CRITICAL); started = time.perf_counter(); "
+            "import app.app; elapsed = time.perf_counter() - started; "
+            f"print(elapsed); print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    durations, loaded = [], ''
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=app_env(openai_base_url),
+                                capture_output=True, text=True, timeout=120)
+        if output.returncode != 0:
+            raise RuntimeError(f"app.app 가져오기 실패:\n{output.stderr[-2000:]}")
+        lines = output.stdout.strip().splitlines()
+        durations.append(float(lines[-2]))
+        loaded = lines[-1]
+    return statistics.median(durations), loaded
+
+def start_app_server(port, openai_base_url):
+    cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', '-w', '1']
+    return subprocess.Popen(cmd, cwd=ROOT, env=app_env(openai_base_url, port),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_for(base_url, path, timeout=120):
+    """path가 200을 돌려줄 때까지 대기"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(base_url + path, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+    raise RuntimeError(f"{timeout}초 안에 {path}가 응답하지 않았습니다")
+
+def timed_get(base_url, path):
+    started = time.perf_counter()
+    response = httpx.get(base_url + path, timeout=30.0)
+    return response.status_code, time.perf_counter() - started
+
+def measure_boot(openai_base_url, probe):
+    """(첫 요청까지 시간, (/readyz 상태, 시간), (캐시된 /readyz 상태, 시간), /healthz 상태)"""
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    started = time.perf_counter()
+    server = start_app_server(port, openai_base_url)
+    try:
+        wait_for(base_url, probe)
+        first_request = time.perf_counter() - started
+        ready = timed_get(base_url, '/readyz')
+        cached = timed_get(base_url, '/readyz')
+        health = httpx.get(base_url + '/healthz', timeout=5.0).status_code
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return first_request, ready, cached, health
+
+def main():
+    parser = argparse.ArgumentParser(description='웹 워커 기동 벤치마크')
+    parser.add_argument('--latency', type=float, default=1.0, help='OpenAI 대역 응답 지연(초)')
+    parser.add_argument('--runs', type=int, default=3, help='가져오기 시간 측정 횟수')
+    parser.add_argument('--probe', default='/healthz', help='첫 요청으로 보낼 경로')
+    args = parser.parse_args()
+
+    stub = start_stub_openai(args.latency)
+    stub_url = f'http://127.0.0.1:{stub.server_address[1]}/v1'
+    unreachable_url = f'http://127.0.0.1:{free_port()}/v1'
+
+    try:
+        import_time, loaded = measure_import(stub_url, args.runs)
+        print(f"app.app 가져오기: {import_time * 1000:.0f}ms (중앙값 {args.runs}회), "
+              f"함께 올라온 무거운 모듈: {loaded or '없음'}")
+
+        first_request, ready, cached, _ = measure_boot(stub_url, args.probe)
+        print(f"\n[OpenAI 대역, 응답 지연 {args.latency:g}초]")
+        print(f"  프로세스 시작 → 첫 요청({args.probe}) 응답: {first_request:.2f}초")
+        print(f"  첫 /readyz: HTTP {ready[0]}, {ready[1]:.2f}초 / 캐시된 /readyz: HTTP {cached[0]}, {cached[1] * 1000:.0f}ms")
+
+        first_request, ready, cached, health = measure_boot(unreachable_url, args.probe)
+        print("\n[OpenAI API에 닿지 않음]")
+        print(f"  프로세스 시작 → 첫 요청({args.probe}) 응답: {first_request:.2f}초")
+        print(f"  /healthz: HTTP {health}, 첫 /readyz: HTTP {ready[0]} ({ready[1]:.2f}초), "
+              f"캐시된 /readyz: HTTP {cached[0]} ({cached[1] * 1000:.0f}ms)")
+    finally:
+        stub.shutdown()
+
+if __name__ == '__main__':
+    main()
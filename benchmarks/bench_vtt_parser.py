@@ -0,0 +1,91 @@
+"""VTT 파서 벤치마크: 원문 단어 분할(기존 방식)과 자막 파싱 + 토큰 예산 분할의 토큰/청크 수 비교
+
+사용법:
+    python benchmarks/bench_vtt_parser.py lecture1.vtt lecture2.vtt
+    python benchmarks/bench_vtt_parser.py --minutes 180   # 파일이 없으면 합성 Zoom 자막 사용
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analysis import plan_vtt_chunks
+from app.chunking import estimate_tokens
+from app.gpt_client import BaseGPTClient
+from app.vtt_parser import format_timestamp
+
+SENTENCES = [
+    "오늘은 파이썬의 리스트와 딕셔너리에 대해 알아보겠습니다",
+    "이 부분은 시험에 자주 나오니까 꼭 기억해 두세요",
+    "예제 코드를 같이 실행해 보면서 결과를 확인해 봅시다",
+    "질문 있으시면 채팅창에 남겨 주세요",
+    "함수를 정의할 때는 def 키워드를 사용합니다",
+]
+
+def synthetic_vtt(minutes, seed=42):
+    """Zoom 형식의 합성 강의 자막 (약 4초마다 한 구간)"""
+    rng = random.Random(seed)
+    lines = ["WEBVTT", ""]
+    t = 0.0
+    cue_id = 1
+    while t < minutes * 60:
+        duration = rng.uniform(2.0, 6.0)
+        speaker = "강사" if rng.random() < 0.85 else f"수강생{rng.randint(1, 20)}"
+        start = f"{format_timestamp(t)}.{int(t * 1000) % 1000:03d}"
+        end = f"{format_timestamp(t + duration)}.{int((t + duration) * 1000) % 1000:03d}"
+        lines += [str(cue_id), f"{start} --> {end}", f"{speaker}: {rng.choice(SENTENCES)}", ""]
+        t += duration + rng.uniform(0.0, 1.0)
+        cue_id += 1
+    return "\n".join(lines)
+
+def legacy_split(content, chunk_size=5000):
+    """기존 방식: 타임스탬프를 포함한 원문을 공백 단위로 chunk_size자씩 분할"""
+    chunks, current, size = [], [], 0
+    for word in content.split():
+        if current and size + len(word) + 1 > chunk_size:
+            chunks.append(' '.join(current))
+            current, size = [], 0
+        current.append(word)
+        size += len(word) + 1
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+def measure(name, content, max_chunk_tokens):
+    started = time.perf_counter()
+    legacy = legacy_split(content)
+    legacy_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    plan = plan_vtt_chunks(content, BaseGPTClient(max_chunk_tokens=max_chunk_tokens))
+    parse_time = time.perf_counter() - started
+    chunks = plan.chunks
+
+    legacy_tokens = sum(estimate_tokens(c) for c in legacy)
+    new_tokens = sum(c.tokens for c in chunks)
+    reduction = (1 - new_tokens / legacy_tokens) * 100 if legacy_tokens else 0.0
+
+    print(f"\n[{name}] 원문 {len(content):,}자")
+    print(f"  기존(단어 분할): 청크 {len(legacy):>4}개, 예상 토큰 {legacy_tokens:>9,}, 분할 {legacy_time * 1000:7.1f}ms")
+    print(f"  자막 파싱     : 청크 {len(chunks):>4}개, 예상 토큰 {new_tokens:>9,}, 파싱 {parse_time * 1000:7.1f}ms")
+    print(f"  입력 토큰 {reduction:.1f}% 감소, API 호출 {len(legacy) - len(chunks)}회 감소")
+
+def main():
+    parser = argparse.ArgumentParser(description='VTT 파서 토큰/청크 수 벤치마크')
+    parser.add_argument('files', nargs='*', help='측정할 VTT 파일')
+    parser.add_argument('--minutes', type=int, default=180, help='합성 자막 길이(분)')
+    parser.add_argument('--max-chunk-tokens', type=int, default=8000, help='청크 하나의 입력 토큰 상한')
+    args = parser.parse_args()
+
+    if args.files:
+        for path in args.files:
+            with open(path, 'r', encoding='utf-8') as f:
+                measure(os.path.basename(path), f.read(), args.max_chunk_tokens)
+    else:
+        measure(f"합성 자막 {args.minutes}분", synthetic_vtt(args.minutes), args.max_chunk_tokens)
+
+if __name__ == '__main__':
+    main()
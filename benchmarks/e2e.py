@@ -0,0 +1,263 @@
+"""분석 파이프라인 종단 간 벤치마크 (로컬 OpenAI 대역 서버 사용, API 비용 없음)
+
+OpenAI 호환 대역 서버(benchmarks/mock_openai.py)와 웹 서버(gunicorn)를 띄운 뒤, 합성 강의
+자막(30분~8시간)·채팅 기록·커리큘럼으로 /analyze_vtt, /analyze_chat을 동시 요청 수별로 보내고
+다음을 측정합니다.
+
+- 요청 지연 p50/p95, 처리량(강의/초)
+- 강의 하나당 대역 서버로 보낸 요청 수(재시도 포함)와 종류별 요청 수, 429/500 응답 수, 토큰 수
+
+LLM 캐시와 결과 저장소는 끄고 실행하므로 같은 입력을 반복해도 매번 전체 분석을 수행합니다.
+앱의 API 한도(OPENAI_TOKENS_PER_MINUTE 기본값 90000)도 그대로 적용되므로 긴 강의는 한도 대기가
+지연 시간 대부분을 차지합니다. 한도 밖의 처리 성능을 보려면 --server-env로 서버 설정을 바꿉니다.
+합성 데이터와 대역 서버의 지연/오류는 --seed로 고정되며, --output으로 결과(설정, 커밋 포함)를
+JSON으로 저장하고 --compare로 이전 결과와 비교합니다.
+
+사용법:
+    python benchmarks/e2e.py                                         # 기본 시나리오, 동시 요청 1, 4
+    python benchmarks/e2e.py --scenarios vtt-30m,vtt-8h --concurrency 1,2,8 --latency 2
+    python benchmarks/e2e.py --error-rate 0.05 --rpm 300 --output results/e2e.json
+    python benchmarks/e2e.py --compare results/e2e.json
+    python benchmarks/e2e.py --scenarios vtt-8h --server-env OPENAI_TOKENS_PER_MINUTE=2000000
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import subprocess
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.load_test import free_port, wait_until_ready
+from benchmarks.mock_openai import add_mock_arguments, mock_settings, start_mock_openai
+from benchmarks.synthetic import curriculum_file, synthetic_chat, synthetic_curriculum, synthetic_vtt
+
+# 이름 → (분석 유형, 길이(분))
+SCENARIOS = {
+    'vtt-30m': ('vtt', 30),
+    'vtt-2h': ('vtt', 120),
+    'vtt-8h': ('vtt', 480),
+    'chat-1h': ('chat', 60),
+    'chat-3h': ('chat', 180),
+}
+DEFAULT_SCENARIOS = 'vtt-30m,vtt-2h,chat-1h'
+
+# 결과에 함께 기록하는 서버 설정 (결과 비교 시 조건이 같은지 확인용)
+RECORDED_ENV_PREFIXES = ('OPENAI_', 'CHUNK_', 'CURRICULUM_', 'WEB_CONCURRENCY')
+
+def percentile(values, q):
+    """최근접 순위 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+def build_payload(scenario, seed, curriculum_format, subjects):
+    """(라우트, multipart files) - 같은 시나리오와 시드면 항상 같은 내용"""
+    analysis_type, minutes = SCENARIOS[scenario]
+    if analysis_type == 'chat':
+        return '/analyze_chat', {'file': ('meeting_saved_chat.txt', synthetic_chat(minutes, seed).encode('utf-8'),
+                                          'text/plain')}
+    name, content = curriculum_file(synthetic_curriculum(subjects, seed=seed), curriculum_format)
+    return '/analyze_vtt', {
+        'vtt_file': ('lecture.vtt', synthetic_vtt(minutes, seed).encode('utf-8'), 'text/vtt'),
+        'curriculum_file': (name, content, 'application/octet-stream')
+    }
+
+def start_app_server(mode, port, openai_port, workers=None, overrides=None):
+    env = dict(os.environ)
+    env.pop('REDIS_URL', None)
+    env.pop('DISCORD_WEBHOOK_URL', None)
+    env.update({
+        'SERVER_MODE': mode,
+        'PORT': str(port),
+        'OPENAI_API_KEY': 'e2e-benchmark',
+        'OPENAI_BASE_URL': f'http://127.0.0.1:{openai_port}/v1',
+        'LLM_CACHE_BACKEND': 'none',
+        'RESULT_STORE_BACKEND': 'none',
+        'TASK_QUEUE_ENABLED': 'false',
+    })
+    env.update(overrides or {})
+    cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py']
+    if workers:
+        cmd += ['-w', str(workers)]
+    return subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+async def run_requests(base_url, route, files, concurrency, total):
+    """total개 요청을 최대 concurrency개씩 동시에 보내고 (성공 지연 목록, 실패 수, 전체 시간)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(client):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post(route, files=files)
+                ok = response.status_code == 200 and 'error' not in response.json()
+            except (httpx.HTTPError, ValueError):
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                failures += 1
+
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=900.0) as client:
+        await asyncio.gather(*(one(client) for _ in range(total)))
+    return latencies, failures, time.perf_counter() - started
+
+def run_scenario(base_url, mock, scenario, concurrency, total, args):
+    route, files = build_payload(scenario, args.seed, args.curriculum_format, args.subjects)
+    mock.reset()
+    latencies, failures, elapsed = asyncio.run(run_requests(base_url, route, files, concurrency, total))
+    stats = mock.snapshot()
+    lectures = max(1, len(latencies) + failures)
+    return {
+        'scenario': scenario,
+        'concurrency': concurrency,
+        'requests': total,
+        'completed': len(latencies),
+        'failures': failures,
+        'elapsed': round(elapsed, 3),
+        'p50': round(percentile(latencies, 50), 3) if latencies else None,
+        'p95': round(percentile(latencies, 95), 3) if latencies else None,
+        'throughput': round(len(latencies) / elapsed, 4) if elapsed else 0.0,
+        'api_requests_per_lecture': round(stats['requests'] / lectures, 2),
+        'api_requests_by_kind': {kind: round(count / lectures, 2) for kind, count in sorted(stats['kinds'].items())},
+        'api_status': stats['status'],
+        'prompt_tokens_per_lecture': round(stats['prompt_tokens'] / lectures),
+        'completion_tokens_per_lecture': round(stats['completion_tokens'] / lectures),
+    }
+
+def environment(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'args': vars(args),
+        'env': {key: value for key, value in sorted(os.environ.items()) if key.startswith(RECORDED_ENV_PREFIXES)
+                and key != 'OPENAI_API_KEY'},
+        'server_env': parse_overrides(args.server_env),
+    }
+
+def parse_overrides(values):
+    """--server-env KEY=VALUE 목록을 dict로 변환"""
+    overrides = {}
+    for value in values or []:
+        key, sep, setting = value.partition('=')
+        if not sep or not key:
+            raise ValueError(f"--server-env는 KEY=VALUE 형식이어야 합니다: {value}")
+        overrides[key] = setting
+    return overrides
+
+def print_results(results):
+    print(f"\n{'시나리오':<9} {'동시':>4} {'완료':>4} {'실패':>4} {'p50(s)':>8} {'p95(s)':>8} {'강의/s':>8} "
+          f"{'API 요청/강의':>13} {'429':>5} {'5xx':>5} {'입력 토큰/강의':>14}")
+    for r in results:
+        status = r['api_status']
+        errors = sum(count for code, count in status.items() if code.startswith('5'))
+        print(f"{r['scenario']:<9} {r['concurrency']:>4} {r['completed']:>4} {r['failures']:>4} "
+              f"{_fmt(r['p50']):>8} {_fmt(r['p95']):>8} {r['throughput']:>8.3f} {r['api_requests_per_lecture']:>13} "
+              f"{status.get('429', 0):>5} {errors:>5} {r['prompt_tokens_per_lecture']:>14}")
+        print(f"{'':<14}요청 종류/강의: " + ', '.join(f"{k} {v}" for k, v in r['api_requests_by_kind'].items()))
+
+def _fmt(value):
+    return '-' if value is None else f"{value:.2f}"
+
+def print_comparison(results, baseline):
+    """이전 결과 파일과 같은 (시나리오, 동시 요청 수)끼리 비교"""
+    previous = {(r['scenario'], r['concurrency']): r for r in baseline['results']}
+    print(f"\n이전 결과와 비교 (커밋 {baseline['environment'].get('commit')} → 현재)")
+    print(f"{'시나리오':<9} {'동시':>4} {'p50':>16} {'p95':>16} {'강의/s':>18} {'API 요청/강의':>16}")
+    matched = 0
+    for r in results:
+        old = previous.get((r['scenario'], r['concurrency']))
+        if old is None:
+            continue
+        matched += 1
+        print(f"{r['scenario']:<9} {r['concurrency']:>4} {_change(old['p50'], r['p50']):>16} "
+              f"{_change(old['p95'], r['p95']):>16} {_change(old['throughput'], r['throughput']):>18} "
+              f"{_change(old['api_requests_per_lecture'], r['api_requests_per_lecture']):>16}")
+    if not matched:
+        print("  같은 시나리오·동시 요청 수 조합이 없습니다")
+
+def _change(old, new):
+    if old is None or new is None:
+        return '-'
+    if not old:
+        return f"{old:g}→{new:g}"
+    return f"{old:g}→{new:g} ({(new - old) / old * 100:+.0f}%)"
+
+def main():
+    parser = argparse.ArgumentParser(description='분석 파이프라인 종단 간 벤치마크')
+    parser.add_argument('--scenarios', default=DEFAULT_SCENARIOS, help=f"시나리오 목록 ({', '.join(SCENARIOS)})")
+    parser.add_argument('--concurrency', default='1,4', help='동시 요청 수 목록')
+    parser.add_argument('--requests', type=int, default=0, help='동시 요청 수마다 보낼 요청 수 (기본값: 동시 요청 수 × 2)')
+    parser.add_argument('--mode', default='sync', choices=['sync', 'asgi'], help='서버 모드')
+    parser.add_argument('--workers', type=int, default=0, help='gunicorn 워커 수 (기본값: gunicorn_config.py)')
+    parser.add_argument('--curriculum-format', default='json', choices=['json', 'xlsx'], help='커리큘럼 파일 형식')
+    parser.add_argument('--subjects', type=int, default=6, help='합성 커리큘럼 과목 수 (과목당 세부내용 4개)')
+    parser.add_argument('--server-env', action='append', metavar='KEY=VALUE',
+                        help='웹 서버 환경 변수 설정 (여러 번 지정 가능, 예: OPENAI_MAX_CONCURRENCY=8)')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON 파일')
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)}")
+    levels = [int(level) for level in args.concurrency.split(',')]
+    try:
+        overrides = parse_overrides(args.server_env)
+    except ValueError as e:
+        parser.error(str(e))
+
+    mock = start_mock_openai(mock_settings(args))
+    port = free_port()
+    server = start_app_server(args.mode, port, mock.server_address[1], args.workers or None, overrides)
+    base_url = f'http://127.0.0.1:{port}'
+    results = []
+    try:
+        wait_until_ready(base_url)
+        for scenario in scenarios:
+            for concurrency in levels:
+                total = args.requests or concurrency * 2
+                print(f"[{scenario}] 동시 요청 {concurrency}개, 요청 {total}개 실행 중...", flush=True)
+                results.append(run_scenario(base_url, mock, scenario, concurrency, total, args))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        mock.shutdown()
+
+    print(f"\n서버 모드 {args.mode}, API 지연 {args.latency:g}±{args.jitter:g}초, 500 비율 {args.error_rate:g}, "
+          f"분당 한도 {args.rpm or '없음'}, 임의 429 비율 {args.rate_limit_rate:g}, 시드 {args.seed}")
+    print_results(results)
+
+    report = {'environment': environment(args), 'results': results}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print_comparison(results, json.load(f))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+if __name__ == '__main__':
+    main()
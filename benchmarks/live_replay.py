@@ -0,0 +1,173 @@
+"""실시간 강의 모드 재생 테스트: 로컬 Discord 웹훅 대역으로 위험 발언 알림 지연 측정
+
+로컬 OpenAI 대역 서버(특정 문장이 있으면 위험 발언을 보고)와 Discord 웹훅 대역 서버를 띄우고,
+웹 서버(워커 1개)를 기동한 뒤 합성 강의 자막을 /live/<session_id>/cues로 묶음 단위 전송합니다.
+위험 문장이 담긴 묶음을 보낸 시점부터 웹훅 대역이 알림을 받기까지의 시간을 출력합니다.
+
+사용법:
+    python benchmarks/live_replay.py                           # 30분 강의, 5분 구간, 20분 지점 위험 발언
+    python benchmarks/live_replay.py --minutes 60 --window 2 --risk-at 45 --speed 60
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.vtt_parser import iter_cues
+from benchmarks.bench_vtt_parser import synthetic_vtt
+from benchmarks.load_test import free_port, wait_until_ready
+
+RISK_SENTENCE = '이건 특정 지역 출신들이 원래 못하는 거예요'
+
+def start_stub_openai(latency):
+    """강의 분석/위험 발언 분류 함수 호출에 응답하는 대역 서버 (RISK_SENTENCE가 있으면 위험 발언 보고)"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            time.sleep(latency)
+            prompt = request['messages'][-1]['content']
+            arguments = {'summary': ['재생 테스트 구간'], 'keywords': ['재생 테스트']}
+            if RISK_SENTENCE in prompt:
+                arguments['risks'] = [f"지역 비하 발언: \"{RISK_SENTENCE}\""]
+            message = {'role': 'assistant', 'content': '# 주요 내용\n재생 테스트'}
+            if request.get('tools'):
+                name = request['tool_choice']['function']['name']
+                if name == 'report_risk_statements':
+                    # 재생 자막에서 선별되는 구간은 RISK_SENTENCE가 담긴 구간 하나뿐이므로 1번 구간으로 보고
+                    arguments = {'items': [{'id': 1, 'statement': RISK_SENTENCE, 'reason': '지역 비하 발언'}]
+                                 if RISK_SENTENCE in prompt else []}
+                message = {'role': 'assistant', 'content': None, 'tool_calls': [{
+                    'id': 'call-stub', 'type': 'function',
+                    'function': {'name': name, 'arguments': json.dumps(arguments, ensure_ascii=False)}
+                }]}
+            body = json.dumps({
+                'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': int(time.time()),
+                'model': 'gpt-3.5-turbo',
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': message}],
+                'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', free_port()), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def start_webhook_stub():
+    """Discord 웹훅 대역 서버 (받은 메시지와 수신 시각을 server.received에 기록)"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            self.server.received.append((time.perf_counter(), payload))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', free_port()), Handler)
+    server.received = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def start_app_server(port, openai_port, webhook_port, window_minutes):
+    import subprocess
+
+    env = dict(os.environ)
+    env.pop('REDIS_URL', None)
+    env.update({
+        'PORT': str(port),
+        'SERVER_MODE': 'sync',
+        'OPENAI_API_KEY': 'live-replay',
+        'OPENAI_BASE_URL': f'http://127.0.0.1:{openai_port}/v1',
+        'DISCORD_WEBHOOK_URL': f'http://127.0.0.1:{webhook_port}/webhook',
+        'LIVE_WINDOW_MINUTES': str(window_minutes),
+        'LIVE_BACKEND': 'memory',
+        'LLM_CACHE_BACKEND': 'none',
+        'RESULT_STORE_BACKEND': 'none',
+        'TASK_QUEUE_ENABLED': 'false',
+    })
+    # 메모리 세션 저장소는 프로세스 안에서만 공유되므로 워커 1개로 실행
+    cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', '-w', '1']
+    return subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def lecture_cues(minutes, risk_at):
+    """합성 강의 자막 구간 목록 (risk_at분 지점의 발화 하나를 위험 문장으로 교체)"""
+    cues = list(iter_cues(synthetic_vtt(minutes).splitlines()))
+    target = next(i for i, cue in enumerate(cues) if cue.start >= risk_at * 60)
+    cues[target] = cues[target]._replace(text=RISK_SENTENCE)
+    return cues, cues[target].start
+
+def main():
+    parser = argparse.ArgumentParser(description='실시간 강의 모드 재생 테스트')
+    parser.add_argument('--minutes', type=int, default=30, help='합성 강의 길이(분)')
+    parser.add_argument('--window', type=float, default=5, help='LIVE_WINDOW_MINUTES')
+    parser.add_argument('--risk-at', type=float, default=20, help='위험 발언 위치(분)')
+    parser.add_argument('--batch', type=float, default=30, help='한 번에 보내는 자막 분량(초)')
+    parser.add_argument('--speed', type=float, default=120, help='재생 배속 (강의 시간 대비)')
+    parser.add_argument('--latency', type=float, default=1.0, help='OpenAI 대역 응답 지연(초)')
+    args = parser.parse_args()
+
+    cues, risk_time = lecture_cues(args.minutes, args.risk_at)
+    openai_stub = start_stub_openai(args.latency)
+    webhook_stub = start_webhook_stub()
+    port = free_port()
+    server = start_app_server(port, openai_stub.server_address[1], webhook_stub.server_address[1], args.window)
+    base_url = f'http://127.0.0.1:{port}'
+    session_id = uuid.uuid4().hex
+    risk_sent_at = None
+
+    try:
+        wait_until_ready(base_url)
+        with httpx.Client(base_url=base_url, timeout=60.0) as client:
+            batch_start = 0.0
+            while batch_start < args.minutes * 60:
+                batch_end = batch_start + args.batch
+                batch = [cue for cue in cues if batch_start <= cue.start < batch_end]
+                response = client.post(f'/live/{session_id}/cues', json={'cues': [
+                    {'start': cue.start, 'end': cue.end, 'text': cue.text, 'speaker': cue.speaker} for cue in batch
+                ]})
+                response.raise_for_status()
+                if risk_sent_at is None and batch_start <= risk_time < batch_end:
+                    risk_sent_at = time.perf_counter()
+                time.sleep(args.batch / args.speed)
+                batch_start = batch_end
+            status = client.post(f'/live/{session_id}/end').json()
+            # 종료 요청은 마지막 구간을 넘기고 바로 돌아오므로 모든 구간 분석이 끝날 때까지 확인
+            while not status['finished']:
+                time.sleep(0.2)
+                status = client.get(f'/live/{session_id}').json()
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        openai_stub.shutdown()
+        webhook_stub.shutdown()
+
+    alerts = webhook_stub.received
+    print(f"\n강의 {args.minutes}분, 구간 {args.window:g}분, 묶음 {args.batch:g}초, {args.speed:g}배속 재생")
+    print(f"  분석 구간 {len(status['windows'])}개, 위험 발언 구간 "
+          f"{sum(1 for w in status['windows'] if w.get('risks'))}개, 웹훅 수신 {len(alerts)}건")
+    if alerts and risk_sent_at is not None:
+        delay = alerts[0][0] - risk_sent_at
+        print(f"  위험 문장 전송 → 알림 수신: {delay:.2f}초 (강의 시간 기준 약 {delay * args.speed / 60:.1f}분)")
+        print(f"  알림 제목: {alerts[0][1]['embeds'][0]['title']}")
+    else:
+        print("  알림을 받지 못했습니다")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""동시 요청 처리 능력 부하 테스트
+
+로컬 OpenAI 대역 서버(지연 시간 조절 가능)를 띄운 뒤, 같은 조건에서 sync(Flask WSGI)와
+asgi(app.asgi:application) 서버 모드를 차례로 기동하여 다음을 측정합니다.
+
+- 동시에 보낸 /analyze_chat 요청의 완료 수, 지연 시간(p50/p95), 처리량
+- 분석이 진행되는 동안 다른 라우트(/)의 최대 응답 시간
+
+사용법:
+    python benchmarks/load_test.py --concurrency 8 --latency 2.0
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import statistics
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+# 함수 호출 응답으로 돌려줄 인자
+STUB_ARGUMENTS = {
+    'report_chat_analysis': {'topics': ['부하 테스트']},
+    'report_lecture_analysis': {'summary': ['부하 테스트'], 'keywords': ['부하 테스트']},
+    'report_curriculum_scores': {'items': []}
+}
+
+def start_stub_openai(latency):
+    """chat.completions 요청에 latency 초 후 고정 응답을 돌려주는 대역 서버"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            time.sleep(latency)
+            message = {'role': 'assistant', 'content': '# 주요 대화 주제\n- 부하 테스트'}
+            if request.get('tools'):
+                # 구조화 출력 모드: 강제된 함수의 인자를 돌려줌
+                name = request['tool_choice']['function']['name']
+                message = {'role': 'assistant', 'content': None, 'tool_calls': [{
+                    'id': 'call-stub',
+                    'type': 'function',
+                    'function': {'name': name, 'arguments': json.dumps(STUB_ARGUMENTS.get(name, {}), ensure_ascii=False)}
+                }]}
+            body = json.dumps({
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': 'gpt-3.5-turbo',
+                'choices': [{
+                    'index': 0,
+                    'finish_reason': 'stop',
+                    'message': message
+                }],
+                'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', free_port()), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def start_app_server(mode, port, openai_port):
+    env = dict(os.environ)
+    env.update({
+        'SERVER_MODE': mode,
+        'PORT': str(port),
+        'OPENAI_API_KEY': 'load-test',
+        'OPENAI_BASE_URL': f'http://127.0.0.1:{openai_port}/v1',
+    })
+    cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py']
+    return subprocess.Popen(cmd, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_until_ready(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(base_url + '/', timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"서버가 {timeout}초 안에 준비되지 않았습니다: {base_url}")
+
+async def run_load(base_url, concurrency, chat_content):
+    latencies = []
+    probe_latencies = []
+    failures = 0
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=600.0) as client:
+        async def one_request():
+            nonlocal failures
+            started = time.perf_counter()
+            files = {'file': ('meeting_saved_chat.txt', chat_content.encode('utf-8'), 'text/plain')}
+            try:
+                response = await client.post('/analyze_chat', files=files)
+                if response.status_code != 200:
+                    failures += 1
+                    return
+            except httpx.HTTPError:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+        async def probe():
+            # 분석이 진행되는 동안 다른 라우트가 응답하는지 확인
+            while not done.is_set():
+                started = time.perf_counter()
+                try:
+                    await client.get('/', timeout=60.0)
+                except httpx.HTTPError:
+                    pass
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.5)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        'completed': len(latencies),
+        'failures': failures,
+        'elapsed': elapsed,
+        'p50': statistics.median(latencies) if latencies else float('nan'),
+        'p95': sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)] if latencies else float('nan'),
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'probe_max': max(probe_latencies) if probe_latencies else float('nan'),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='sync/asgi 서버 모드 동시 처리 부하 테스트')
+    parser.add_argument('--concurrency', type=int, default=8, help='동시에 보낼 분석 요청 수')
+    parser.add_argument('--latency', type=float, default=2.0, help='대역 서버 응답 지연(초)')
+    parser.add_argument('--chunks', type=int, default=3, help='요청당 청크 수 (API 호출 수)')
+    parser.add_argument('--modes', default='sync,asgi', help='측정할 서버 모드 목록')
+    args = parser.parse_args()
+
+    # 청크 하나(2000자)를 꽉 채우는 채팅 줄을 chunks 개만큼 생성
+    line = '10:00:00 From 수강생 to Everyone: 질문 있습니다 ' * 10
+    chat_content = '\n'.join([line] * (args.chunks * 2000 // len(line) + 1))
+
+    stub = start_stub_openai(args.latency)
+    openai_port = stub.server_address[1]
+    results = {}
+
+    try:
+        for mode in args.modes.split(','):
+            port = free_port()
+            server = start_app_server(mode, port, openai_port)
+            base_url = f'http://127.0.0.1:{port}'
+            try:
+                wait_until_ready(base_url)
+                results[mode] = asyncio.run(run_load(base_url, args.concurrency, chat_content))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+    finally:
+        stub.shutdown()
+
+    print(f"\n동시 요청 {args.concurrency}개, API 지연 {args.latency}초")
+    print(f"{'mode':<6} {'완료':>5} {'실패':>5} {'총 시간(s)':>10} {'p50(s)':>8} {'p95(s)':>8} {'req/s':>7} {'/ 최대(s)':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['completed']:>5} {r['failures']:>5} {r['elapsed']:>10.2f} "
+              f"{r['p50']:>8.2f} {r['p95']:>8.2f} {r['throughput']:>7.2f} {r['probe_max']:>10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""OpenAI 호환 로컬 대역 서버 (실제 API 비용 없이 분석 파이프라인 벤치마크용)
+
+chat.completions와 모델 조회에 응답하며 다음을 설정할 수 있습니다.
+
+- 응답 지연: latency ± jitter 초, 응답 토큰당 지연(per_token_latency)
+- 오류: error_rate 비율로 500 응답
+- 요청 한도: rpm(분당 요청 수)을 넘으면 429와 retry-after 헤더, rate_limit_rate 비율로 임의 429
+
+지연과 오류 여부는 (seed, 프롬프트, 같은 프롬프트의 시도 횟수)로 정해지므로 동시 요청 순서가
+달라도 같은 입력이면 같은 결과가 나옵니다. 받은 요청 수, 상태 코드, 토큰 수는 server.stats와
+GET /__stats로 확인하고 POST /__reset으로 초기화합니다.
+
+단독 실행:
+    python benchmarks/mock_openai.py --port 8089 --latency 1.0 --error-rate 0.02 --rpm 600
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python app.py
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.chunking import estimate_tokens
+from app.schemas import CHAT_SUBSECTIONS
+from benchmarks.load_test import free_port
+
+# 커리큘럼 평가 프롬프트의 세부내용 줄 ("1. 세부내용")
+DETAIL_PATTERN = re.compile(r'^(\d+)\. (.*)$')
+# 위험 발언 분류 프롬프트에만 있는 문구 (JSON 모드 요청 구분용)
+RISK_PROMPT_MARKER = '골라낸 구간'
+
+class MockSettings:
+    def __init__(self, latency=1.0, jitter=0.0, per_token_latency=0.0, error_rate=0.0, rpm=0,
+                 rate_limit_rate=0.0, retry_after=1.0, seed=42):
+        self.latency = latency
+        self.jitter = jitter
+        self.per_token_latency = per_token_latency
+        self.error_rate = error_rate
+        self.rpm = rpm
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.seed = seed
+
+def _prompt_text(request):
+    return '\n'.join(str(message.get('content') or '') for message in request.get('messages', []))
+
+def _request_kind(request, prompt):
+    """요청 종류 (통계 분류용)"""
+    if request.get('tools'):
+        name = request['tool_choice']['function']['name']
+        return {'report_lecture_analysis': 'vtt_chunk', 'report_chat_analysis': 'chat_chunk',
+                'report_curriculum_scores': 'curriculum_batch',
+                'report_risk_statements': 'risk_batch'}.get(name, name)
+    if request.get('response_format', {}).get('type') == 'json_object':
+        return 'risk_batch' if RISK_PROMPT_MARKER in prompt else 'curriculum_batch'
+    if '[분석할 교과 세부내용]' in prompt:
+        return 'curriculum_single'
+    return 'text'
+
+def _score(seed, text):
+    """세부내용마다 고정된 0-100 점수"""
+    return int(hashlib.sha256(f'{seed}:{text}'.encode('utf-8')).hexdigest()[:8], 16) % 101
+
+def _curriculum_items(seed, prompt):
+    section = prompt.split('[분석할 교과 세부내용]', 1)[-1].split('[강의 내용]', 1)[0]
+    matches = (DETAIL_PATTERN.match(line.strip()) for line in section.splitlines())
+    return [{'id': int(m.group(1)), 'score': _score(seed, m.group(2)), 'rationale': '합성 평가 근거'}
+            for m in matches if m]
+
+def _chat_arguments():
+    arguments = {'topics': ['파이썬 자료구조 질의응답'], 'risks': [], 'recommendations': ['예제 코드 공유']}
+    for name, (_, subsections) in CHAT_SUBSECTIONS.items():
+        arguments[name] = {key: [f'합성 {key}'] for key, _ in subsections}
+    return arguments
+
+def build_message(request, prompt, seed):
+    """요청 형식에 맞는 assistant 메시지"""
+    if request.get('tools'):
+        name = request['tool_choice']['function']['name']
+        if name == 'report_curriculum_scores':
+            arguments = {'items': _curriculum_items(seed, prompt)}
+        elif name == 'report_chat_analysis':
+            arguments = _chat_arguments()
+        elif name == 'report_risk_statements':
+            arguments = {'items': []}
+        else:
+            arguments = {'summary': ['리스트와 딕셔너리 사용법 설명'], 'keywords': ['파이썬', '리스트', '딕셔너리'],
+                         'analysis': ['예제 중심으로 진행된 강의입니다'], 'risks': []}
+        return {'role': 'assistant', 'content': None, 'tool_calls': [{
+            'id': 'call-mock', 'type': 'function',
+            'function': {'name': name, 'arguments': json.dumps(arguments, ensure_ascii=False)}
+        }]}
+    if request.get('response_format', {}).get('type') == 'json_object':
+        items = [] if RISK_PROMPT_MARKER in prompt else _curriculum_items(seed, prompt)
+        content = json.dumps({'items': items}, ensure_ascii=False)
+    elif '[분석할 교과 세부내용]' in prompt:
+        content = f"1. 달성도 (0-100): {_score(seed, prompt)}\n2. 판단 근거: 합성 평가 근거"
+    else:
+        content = ("# 주요 내용\n- 리스트와 딕셔너리 사용법 설명\n# 키워드\n- 파이썬\n"
+                   "# 분석\n- 예제 중심으로 진행된 강의입니다\n# 위험 발언\n- 없음")
+    return {'role': 'assistant', 'content': content}
+
+def start_mock_openai(settings=None, port=None, **options):
+    """대역 서버를 백그라운드 스레드에서 시작 (settings 대신 MockSettings 인자를 바로 줄 수도 있음)"""
+    settings = settings or MockSettings(**options)
+    lock = threading.Lock()
+    window = deque()          # 최근 60초 동안 받아들인 요청 시각 (rpm 한도)
+    attempts = Counter()      # 프롬프트별 시도 횟수
+
+    def new_stats():
+        return {'requests': 0, 'status': Counter(), 'kinds': Counter(), 'prompt_tokens': 0, 'completion_tokens': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status, body, headers=None):
+            body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/__stats':
+                return self._send(200, self.server.snapshot())
+            # 모델 조회 (/readyz)
+            self._send(200, {'id': self.path.rsplit('/', 1)[-1], 'object': 'model', 'created': 0, 'owned_by': 'mock'})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path.rstrip('/') == '/__reset':
+                self.server.reset()
+                return self._send(200, {'ok': True})
+            request = json.loads(body or b'{}')
+            prompt = _prompt_text(request)
+            kind = _request_kind(request, prompt)
+            digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+            with lock:
+                attempts[digest] += 1
+                rng = random.Random(f'{settings.seed}:{digest}:{attempts[digest]}')
+                stats = self.server.stats
+                stats['requests'] += 1
+                stats['kinds'][kind] += 1
+                now = time.monotonic()
+                while window and now - window[0] >= 60:
+                    window.popleft()
+                limited = bool(settings.rpm) and len(window) >= settings.rpm
+                if limited:
+                    retry_after = max(0.05, 60 - (now - window[0]))
+                elif rng.random() < settings.rate_limit_rate:
+                    limited, retry_after = True, settings.retry_after
+                failed = not limited and rng.random() < settings.error_rate
+                if not limited:
+                    window.append(now)
+
+            if limited:
+                self._record(429)
+                return self._send(429, {'error': {'message': 'Rate limit reached (mock)', 'type': 'requests',
+                                                  'code': 'rate_limit_exceeded'}},
+                                  {'retry-after': f'{retry_after:.3f}', 'retry-after-ms': str(int(retry_after * 1000))})
+
+            delay = settings.latency + rng.uniform(-settings.jitter, settings.jitter)
+            message = build_message(request, prompt, settings.seed)
+            completion_tokens = estimate_tokens(message.get('content') or
+                                                message['tool_calls'][0]['function']['arguments'])
+            time.sleep(max(0.0, delay + settings.per_token_latency * completion_tokens))
+            if failed:
+                self._record(500)
+                return self._send(500, {'error': {'message': 'Internal server error (mock)', 'type': 'server_error'}})
+
+            prompt_tokens = estimate_tokens(prompt)
+            self._record(200, prompt_tokens, completion_tokens)
+            self._send(200, {
+                'id': f'chatcmpl-mock-{digest[:12]}', 'object': 'chat.completion', 'created': int(time.time()),
+                'model': request.get('model', 'gpt-3.5-turbo'),
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': message}],
+                'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                          'total_tokens': prompt_tokens + completion_tokens}
+            })
+
+        def _record(self, status, prompt_tokens=0, completion_tokens=0):
+            with lock:
+                stats = self.server.stats
+                stats['status'][status] += 1
+                stats['prompt_tokens'] += prompt_tokens
+                stats['completion_tokens'] += completion_tokens
+
+        def log_message(self, *args):
+            pass
+
+    class MockServer(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def snapshot(self):
+            with lock:
+                return {'requests': self.stats['requests'], 'status': {str(k): v for k, v in self.stats['status'].items()},
+                        'kinds': dict(self.stats['kinds']), 'prompt_tokens': self.stats['prompt_tokens'],
+                        'completion_tokens': self.stats['completion_tokens']}
+
+        def reset(self):
+            with lock:
+                self.stats = new_stats()
+                attempts.clear()
+                window.clear()
+
+    server = MockServer(('127.0.0.1', port or free_port()), Handler)
+    server.stats = new_stats()
+    server.settings = settings
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def add_mock_arguments(parser):
+    """대역 서버 설정 인자 (벤치마크 스크립트에서 공유)"""
+    parser.add_argument('--latency', type=float, default=1.0, help='대역 응답 지연(초)')
+    parser.add_argument('--jitter', type=float, default=0.2, help='응답 지연 편차(± 초)')
+    parser.add_argument('--per-token-latency', type=float, default=0.0, help='응답 토큰당 추가 지연(초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='500 응답 비율')
+    parser.add_argument('--rpm', type=int, default=0, help='분당 요청 한도 (넘으면 429, 0이면 제한 없음)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='임의 429 응답 비율')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='임의 429 응답의 retry-after(초)')
+    parser.add_argument('--seed', type=int, default=42, help='지연/오류 결정과 합성 데이터 시드')
+
+def mock_settings(args):
+    return MockSettings(args.latency, args.jitter, args.per_token_latency, args.error_rate, args.rpm,
+                        args.rate_limit_rate, args.retry_after, args.seed)
+
+def main():
+    parser = argparse.ArgumentParser(description='OpenAI 호환 로컬 대역 서버')
+    parser.add_argument('--port', type=int, default=8089)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_mock_openai(mock_settings(args), port=args.port)
+    print(f"OpenAI 대역 서버 실행 중: http://127.0.0.1:{args.port}/v1 (통계: /__stats, 초기화: POST /__reset)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
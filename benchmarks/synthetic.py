@@ -0,0 +1,78 @@
+"""벤치마크용 합성 입력: 강의 자막(VTT), Zoom 채팅 기록, 커리큘럼(엑셀/JSON)
+
+같은 인자와 시드로 만들면 항상 같은 내용이 나오므로 벤치마크 결과를 시점 간 비교할 수 있습니다.
+"""
+import io
+import os
+import sys
+import json
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_vtt_parser import synthetic_vtt
+
+CHAT_MESSAGES = [
+    "질문 있습니다 리스트 컴프리헨션은 언제 쓰나요",
+    "딕셔너리 키가 없으면 어떻게 되나요",
+    "예제 코드 한 번 더 보여주실 수 있나요",
+    "소리가 잘 안 들려요",
+    "이해했습니다 감사합니다",
+    "과제 제출 기한이 언제인가요",
+    "에러가 나는데 들여쓰기 문제일까요",
+    "화면 공유가 멈춘 것 같아요",
+]
+
+SUBJECTS = {
+    "파이썬 기초": ["변수와 자료형", "조건문과 반복문", "함수 정의와 호출", "모듈과 패키지"],
+    "자료구조": ["리스트와 튜플", "딕셔너리와 집합", "스택과 큐", "정렬과 탐색"],
+    "객체지향 프로그래밍": ["클래스와 인스턴스", "상속과 다형성", "캡슐화", "특수 메서드"],
+    "파일 입출력": ["텍스트 파일 읽기와 쓰기", "CSV 처리", "JSON 직렬화", "예외 처리"],
+    "웹 기초": ["HTTP 요청과 응답", "HTML 구조", "REST API 호출", "Flask 라우팅"],
+    "데이터 분석": ["NumPy 배열 연산", "pandas 데이터프레임", "데이터 시각화", "결측치 처리"],
+}
+
+def synthetic_chat(minutes, seed=42, messages_per_minute=2.0):
+    """Zoom 채팅 저장 형식의 합성 채팅 기록 ("HH:MM:SS From 이름 to Everyone: 내용")"""
+    rng = random.Random(seed)
+    lines = []
+    t = 0.0
+    while t < minutes * 60:
+        hours, rest = divmod(int(t) + 9 * 3600, 3600)
+        sender = f"수강생{rng.randint(1, 30)}" if rng.random() < 0.9 else "강사"
+        lines.append(f"{hours:02d}:{rest // 60:02d}:{rest % 60:02d} From {sender} to Everyone: "
+                     f"{rng.choice(CHAT_MESSAGES)}")
+        t += rng.expovariate(messages_per_minute / 60)
+    return '\n'.join(lines) + '\n'
+
+def synthetic_curriculum(subjects=6, details_per_subject=4, seed=42):
+    """[{'과목명', '세부내용'}] 형식의 합성 커리큘럼 (세부내용이 모자라면 번호를 붙여 늘림)"""
+    rng = random.Random(seed)
+    names = list(SUBJECTS)
+    curriculum = []
+    for i in range(subjects):
+        name = names[i % len(names)] + (f" {i // len(names) + 1}" if i >= len(names) else "")
+        pool = SUBJECTS[names[i % len(names)]]
+        details = [pool[j % len(pool)] + (f" 심화 {j // len(pool)}" if j >= len(pool) else "")
+                   for j in range(details_per_subject)]
+        rng.shuffle(details)
+        curriculum.append({'과목명': name, '세부내용': details})
+    return curriculum
+
+def curriculum_file(curriculum, fmt='json'):
+    """업로드용 커리큘럼 파일 (파일명, 바이트). xlsx는 첫 열 과목명, 둘째 열 세부내용 형식"""
+    if fmt == 'json':
+        return 'curriculum.json', json.dumps(curriculum, ensure_ascii=False).encode('utf-8')
+    if fmt != 'xlsx':
+        raise ValueError(f"지원하지 않는 커리큘럼 형식입니다: {fmt}")
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['교과목명', '세부내용'])
+    for item in curriculum:
+        for i, detail in enumerate(item['세부내용']):
+            sheet.append([item['과목명'] if i == 0 else None, detail])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return 'curriculum.xlsx', buffer.getvalue()
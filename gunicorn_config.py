@@ -1,9 +1,22 @@
 import os
+import shutil
+import tempfile
 import multiprocessing
 
+# 서버 모드 (sync: Flask WSGI, asgi: app.asgi:application 비동기 서빙)
+# 실행할 앱은 wsgi_app으로 정하므로 명령줄에 앱을 넘기지 않음 (gunicorn -c gunicorn_config.py)
+server_mode = os.environ.get("SERVER_MODE", "sync")
+
 # 워커 설정
-workers = 2
-worker_class = "sync"  # gevent에서 sync로 변경
+if server_mode == "asgi":
+    # 이벤트 루프 하나가 여러 분석 요청과 SSE 스트림을 동시에 처리
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+    worker_class = "uvicorn.workers.UvicornWorker"
+    wsgi_app = "app.asgi:application"
+else:
+    workers = 2
+    worker_class = "sync"  # gevent에서 sync로 변경
+    wsgi_app = "app.app:app"
 worker_connections = 1000
 timeout = 300
 keepalive = 2
@@ -19,4 +32,19 @@ bind = f"0.0.0.0:{port}"
 # 로깅 설정
 accesslog = "-"
 errorlog = "-"
-loglevel = "info" 
\ No newline at end of file
+loglevel = "info" 
+# Prometheus 다중 프로세스 모드: 워커마다 이 디렉터리에 지표 파일을 쓰고 /metrics가 합산
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "zoomdiscord_metrics")
+)
+
+def on_starting(server):
+    # 이전 실행의 지표 파일이 남아 있으면 합산 값이 섞이므로 마스터 기동 시 비움
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    # 종료된 워커(max_requests 재시작 포함)의 livesum 게이지 값은 합산에서 제외
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,129 @@
+"""작업 예산 테스트: 단계별로 떼어 둔 몫, 예산 차감, 사전 예상치와 예산 초과 시 처리(degrade/abort)"""
+import threading
+
+import pytest
+
+from app.budget import JobBudget, plan_job
+from app.config import Config
+from app.gpt_client import BaseGPTClient
+from app.summary_tree import estimate_summary_requests
+
+def lecture_vtt(cues):
+    """(cues)개 구간의 VTT 자막 (구간마다 다른 발화)"""
+    lines = ["WEBVTT", ""]
+    for i in range(cues):
+        start, end = i * 5, i * 5 + 4
+        lines += [str(i + 1), f"00:{start // 60:02d}:{start % 60:02d}.000 --> 00:{end // 60:02d}:{end % 60:02d}.000",
+                  f"강사: {i}번째 설명입니다 리스트와 딕셔너리, 함수와 클래스를 차례로 살펴봅니다", ""]
+    return '\n'.join(lines)
+
+@pytest.fixture
+def client():
+    return BaseGPTClient(max_chunk_tokens=500)
+
+def test_charge_stops_at_request_limit():
+    budget = JobBudget(max_requests=3)
+    assert [budget.charge(10) for _ in range(5)] == [True, True, True, False, False]
+    assert budget.exceeded
+    assert budget.summary() == {'max_requests': 3, 'max_tokens': 0, 'used_requests': 3, 'used_tokens': 30,
+                                'skipped_requests': 2, 'exceeded': True}
+
+def test_charge_stops_at_token_limit():
+    budget = JobBudget(max_tokens=100)
+    assert budget.charge(60)
+    assert not budget.charge(60)
+    # 남은 몫에 맞는 작은 요청은 계속 보냄
+    assert budget.charge(40)
+    assert budget.used_tokens == 100
+
+def test_zero_limits_are_unlimited():
+    budget = JobBudget()
+    assert all(budget.charge(100000) for _ in range(1000))
+    assert not budget.exceeded
+
+def test_held_stages_are_released_in_order():
+    budget = JobBudget(max_requests=6)
+    budget.hold((2, 0), (1, 0))
+    assert [budget.charge(1) for _ in range(4)] == [True, True, True, False]
+    # 재요약 몫을 풀면 재요약 요청만큼, 다음 몫을 풀면 나머지를 쓸 수 있음
+    budget.release()
+    assert [budget.charge(1) for _ in range(3)] == [True, True, False]
+    budget.release()
+    assert [budget.charge(1) for _ in range(2)] == [True, False]
+    assert budget.used_requests == 6
+    budget.release()
+    assert budget.held == []
+
+def test_held_tokens_count_against_limit():
+    budget = JobBudget(max_tokens=1000)
+    budget.hold((1, 700))
+    assert budget.charge(300)
+    assert not budget.charge(1)
+    budget.release()
+    assert budget.charge(700)
+
+def test_charge_is_shared_between_threads():
+    budget = JobBudget(max_requests=100)
+    results = []
+
+    def worker():
+        results.extend(budget.charge(1) for _ in range(50))
+
+    threads = [threading.Thread(target=worker) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 100
+    assert budget.used_requests == 100
+    assert budget.skipped_requests == 400
+
+def test_summary_estimate_grows_with_tree_levels(client):
+    assert estimate_summary_requests(client, 1) == []
+    counts = [len(estimate_summary_requests(client, chunks, max_tokens=1500, fan_in=8, max_length=800))
+              for chunks in (2, 9, 64, 65)]
+    # 필드 2개 × 단계별 묶음 수 (노드 하나뿐인 묶음은 요약하지 않고 넘김)
+    assert counts == [2, 2 * (1 + 1), 2 * (8 + 1), 2 * (8 + 1 + 1)]
+    assert all(output == client.max_output_tokens for _, output in estimate_summary_requests(client, 9))
+
+def test_plan_job_holds_summary_and_later_stages(client):
+    budget = JobBudget()
+    plan, estimate = plan_job(client, 'vtt', lecture_vtt(300), budget=budget)
+    assert plan.count > 1
+    assert estimate.action == 'run'
+    assert estimate.summary_requests == estimate_summary_requests(
+        client, plan.count, max_tokens=Config.SUMMARY_MAX_TOKENS, fan_in=Config.SUMMARY_FAN_IN,
+        max_length=Config.SUMMARY_MAX_LENGTH)
+    assert estimate.summary_requests
+    assert estimate.requests == len(estimate.chunk_requests) + len(estimate.summary_requests)
+    assert estimate.to_dict()['summary_requests'] == len(estimate.summary_requests)
+    assert budget.held == [(len(estimate.summary_requests), sum(map(sum, estimate.summary_requests))), (0, 0)]
+
+def test_chat_has_no_summary_requests(client):
+    _, estimate = plan_job(client, 'chat', lecture_vtt(300), budget=JobBudget())
+    assert estimate.summary_requests == []
+
+def test_plan_job_degrades_to_larger_chunks(client, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_BUDGET_MODE', 'degrade')
+    fine_plan, _ = plan_job(client, 'vtt', lecture_vtt(300))
+    budget = JobBudget(max_requests=fine_plan.count)
+    plan, estimate = plan_job(client, 'vtt', lecture_vtt(300), budget=budget)
+    assert estimate.action == 'degrade'
+    assert estimate.degraded
+    assert plan.count < fine_plan.count
+    # 다시 나눈 계획의 재요약 몫을 떼어 둠
+    assert budget.held[0][0] == len(estimate.summary_requests)
+
+def test_plan_job_aborts_over_budget(client, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_BUDGET_MODE', 'abort')
+    plan, estimate = plan_job(client, 'vtt', lecture_vtt(300), budget=JobBudget(max_requests=1))
+    assert estimate.action == 'abort'
+    assert estimate.over_budget
+    assert not estimate.degraded
+
+def test_plan_job_counts_summary_requests_against_budget(client, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_BUDGET_MODE', 'abort')
+    plan, _ = plan_job(client, 'vtt', lecture_vtt(300))
+    # 청크 요청만으로는 예산 안이지만 재요약 요청까지 더하면 넘음
+    _, estimate = plan_job(client, 'vtt', lecture_vtt(300), budget=JobBudget(max_requests=plan.count))
+    assert estimate.action == 'abort'
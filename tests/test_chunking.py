@@ -0,0 +1,65 @@
+"""내용 기반 청크 경계(pack_units의 boundary) 테스트: 자막 뒤 추가와 중간 수정 시 청크 안정성"""
+import random
+
+from app.chunking import estimate_tokens, is_boundary_unit, pack_units
+
+WORDS = ["리스트", "딕셔너리", "함수", "클래스", "반복문", "조건문", "예외", "모듈", "파일", "인덱스", "정렬", "검색"]
+BUDGET = 300
+
+def lecture_units(count, seed=42):
+    """(텍스트, 시작, 끝) 발화 단위 (발화마다 번호가 있어 모두 다른 텍스트)"""
+    rng = random.Random(seed)
+    return [(f"강사: {i}번째 설명 " + ' '.join(rng.choices(WORDS, k=rng.randint(4, 12))), i * 5.0, i * 5.0 + 4)
+            for i in range(count)]
+
+def texts(units, boundary=is_boundary_unit):
+    return [chunk.text for chunk in pack_units(units, BUDGET, boundary=boundary)]
+
+def test_chunks_stay_within_budget():
+    for boundary in (None, is_boundary_unit):
+        chunks = pack_units(lecture_units(500), BUDGET, boundary=boundary)
+        assert chunks
+        assert all(chunk.tokens <= BUDGET for chunk in chunks)
+
+def test_boundary_cuts_before_budget_is_full():
+    fixed = texts(lecture_units(500), boundary=None)
+    content_defined = texts(lecture_units(500))
+    assert len(content_defined) > len(fixed)
+    # 마지막 청크를 빼면 예산의 절반(MIN_CHUNK_RATIO) 이상 찬 뒤에만 끊음
+    assert all(sum(estimate_tokens(line) for line in text.split('\n')) >= BUDGET // 2
+               for text in content_defined[:-1])
+
+def test_appended_text_keeps_earlier_boundaries():
+    units = lecture_units(800)
+    before = texts(units[:600])
+    after = texts(units)
+    # 마지막 청크(추가된 내용과 합쳐질 수 있음)를 뺀 모든 청크가 그대로 유지됨
+    assert after[:len(before) - 1] == before[:-1]
+    assert len(after) > len(before)
+
+def changed_chunks(units, edited, boundary=is_boundary_unit):
+    """수정 후 새로 분석해야 하는 청크 수 (수정 전 청크와 텍스트가 같으면 저장된 결과 재사용)"""
+    before = set(texts(units, boundary))
+    return sum(1 for text in texts(edited, boundary) if text not in before)
+
+QUESTION = ("수강생: 질문이 있습니다 " + "리스트 정렬 " * 10, 0.0, 0.0)
+
+def test_local_edit_invalidates_only_nearby_chunks():
+    units = lecture_units(800)
+    for position in (10, 400, 790):
+        edited = list(units)
+        text, start, end = edited[position]
+        edited[position] = (text + " 그리고 정렬 예제를 하나 더 봅시다", start, end)
+        assert 1 <= changed_chunks(units, edited) <= 2
+
+def test_inserted_utterance_invalidates_only_nearby_chunks():
+    units = lecture_units(800)
+    for position in (10, 100, 400):
+        edited = units[:position] + [QUESTION] + units[position:]
+        assert 1 <= changed_chunks(units, edited) <= 3
+
+def test_fixed_size_packing_shifts_later_chunks():
+    # 비교 기준: 경계 없이 예산까지 채우면 앞쪽에 끼워 넣은 발화가 뒤의 청크 경계를 연이어 밀어냄
+    units = lecture_units(800)
+    edited = units[:10] + [QUESTION] + units[10:]
+    assert changed_chunks(units, edited, boundary=None) > 10 * changed_chunks(units, edited)
@@ -0,0 +1,78 @@
+"""요청 한도 테스트: 예약 대기 시간, 음수 잔량, 큰 요청 처리, 스레드 간 선착순"""
+import threading
+
+import pytest
+
+from app import rate_limiter
+from app.rate_limiter import RateLimiter, TokenBucket
+
+class Clock:
+    """테스트에서 직접 움직이는 time.monotonic 대용"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', clock)
+    return clock
+
+def test_bucket_rejects_zero_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+def test_reserve_queues_requests_in_order(clock):
+    limiter = RateLimiter(600, 600)
+    # 초당 10토큰: 300토큰 요청 두 개는 바로, 나머지는 앞선 예약 뒤로 30초씩 밀림
+    assert [limiter.reserve(300) for _ in range(4)] == [0, 0, 30, 60]
+    assert limiter.token_bucket.tokens == -600
+
+def test_reserve_waits_for_refill(clock):
+    limiter = RateLimiter(600, 600)
+    limiter.reserve(600)
+    clock.now += 30
+    assert limiter.reserve(300) == 0
+    assert limiter.reserve(300) == 30
+
+def test_refill_stops_at_capacity(clock):
+    limiter = RateLimiter(600, 600)
+    clock.now += 3600
+    assert limiter.reserve(0) == 0
+    assert limiter.token_bucket.tokens == 600
+
+def test_request_limit_applies_without_tokens(clock):
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=600)
+    assert [limiter.reserve(0) for _ in range(3)] == [0, 0, 30]
+
+def test_request_larger_than_capacity_is_capped(clock):
+    limiter = RateLimiter(600, 600)
+    # 용량보다 큰 요청도 용량만큼만 기다리고 차감 (영원히 기다리지 않음)
+    assert limiter.reserve(5000) == 0
+    assert limiter.token_bucket.tokens == 0
+    assert limiter.reserve(5000) == 60
+    assert limiter.token_bucket.tokens == -600
+
+def test_reserve_is_first_come_first_served_across_threads(clock):
+    limiter = RateLimiter(6000, 600)
+    delays = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(10)
+
+    def worker():
+        barrier.wait()
+        delay = limiter.reserve(100)
+        with lock:
+            delays.append(delay)
+
+    threads = [threading.Thread(target=worker) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 예약 순서대로 정확히 10초씩 늦어지고, 같은 차례를 두 번 받는 스레드가 없음
+    assert sorted(delays) == [0] * 6 + [10, 20, 30, 40]
+    assert limiter.token_bucket.tokens == -400
@@ -0,0 +1,227 @@
+"""위험 발언 사전 선별 테스트: 어휘 파일 반영, 개인정보 형식, 선별 구간 묶기, 분류 응답 해석"""
+import json
+
+import pytest
+
+from app.risk_screen import (
+    DEFAULT_RISK_PATTERNS,
+    DEFAULT_RISK_TERMS,
+    MASK,
+    create_risk_screen,
+    load_lexicon,
+    parse_risk_findings,
+    risk_statement
+)
+from app.schemas import RiskFinding, RiskFindings
+
+NEUTRAL = "강사: 오늘은 리스트와 딕셔너리를 배워 보겠습니다"
+
+def lexicon_file(tmp_path, data):
+    path = tmp_path / 'lexicon.json'
+    path.write_text(data if isinstance(data, str) else json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+def categories(screen, line):
+    return {match.category for match in screen.scan([line])}
+
+def test_lexicon_defaults_without_file():
+    terms, patterns = load_lexicon()
+    assert terms == DEFAULT_RISK_TERMS
+    assert patterns == DEFAULT_RISK_PATTERNS
+    # 기본값을 복사해 반환하므로 고쳐도 기본값은 그대로
+    terms['abuse'].append('바보')
+    assert '바보' not in DEFAULT_RISK_TERMS['abuse']
+
+def test_lexicon_file_replaces_only_listed_categories(tmp_path):
+    path = lexicon_file(tmp_path, {'terms': {'abuse': ['바보']}, 'patterns': {'pii': []}})
+    terms, patterns = load_lexicon(path)
+    assert terms['abuse'] == ['바보']
+    assert terms['discrimination'] == DEFAULT_RISK_TERMS['discrimination']
+    assert patterns['pii'] == []
+
+    screen = create_risk_screen(path)
+    assert categories(screen, "학생: 이 바보야") == {'abuse'}
+    assert categories(screen, "학생: 아 씨발 어렵네") == set()
+    assert categories(screen, "학생: 틀딱이라서 그래요") == {'discrimination'}
+    # 빈 목록이면 그 분류를 끔 (개인정보 형식을 찾지도 가리지도 않음)
+    assert categories(screen, "학생: 010-1234-5678") == set()
+    assert screen.pii_pattern is None
+    assert screen.mask("010-1234-5678") == "010-1234-5678"
+
+def test_lexicon_file_changes_screen_version(tmp_path):
+    path = lexicon_file(tmp_path, {'terms': {'abuse': ['바보']}})
+    assert create_risk_screen(path).settings()['lexicon'] != create_risk_screen().settings()['lexicon']
+
+@pytest.mark.parametrize('data', [
+    '{"terms": ',
+    {'terms': ['바보']},
+    {'terms': {'abuse': '바보'}},
+    {'patterns': {'pii': [1, 2]}}
+])
+def test_invalid_lexicon_file(tmp_path, data):
+    with pytest.raises(ValueError):
+        load_lexicon(lexicon_file(tmp_path, data))
+
+def test_missing_lexicon_file(tmp_path):
+    with pytest.raises(ValueError):
+        load_lexicon(str(tmp_path / 'missing.json'))
+
+@pytest.mark.parametrize('text', [
+    "제 번호 010-1234-5678로 연락 주세요",
+    "01012345678",
+    "010.1234.5678",
+    "+82 10-1234-5678",
+    "+821012345678",
+    "사무실 02-123-4567",
+    "031-1234-5678",
+    "과제는 student01@example.com으로 보내 주세요",
+    "주민번호 900101-1234567",
+    "9001011234567",
+    "카드 1234-5678-9012-3456",
+    "1234 5678 9012 3456"
+])
+def test_pii_patterns_match(text):
+    screen = create_risk_screen()
+    assert categories(screen, f"학생: {text}") == {'pii'}
+    assert MASK in screen.mask(text)
+
+@pytest.mark.parametrize('text', [
+    "00:10:00.000 --> 00:10:05.000",
+    "[14:05:33] 학생: 네 알겠습니다",
+    "주문 번호 20240101123456789 확인 부탁드려요",
+    "사용자 ID 123456789012345",
+    "01012345678901",
+    "1234-5678-9012",
+    "12345678901234567890",
+    "2024-01-15 수업 자료",
+    "버전 3.10.12 설치",
+    "user@localhost"
+])
+def test_pii_patterns_skip_timestamps_and_ids(text):
+    screen = create_risk_screen()
+    assert categories(screen, text) == set()
+    assert screen.mask(text) == text
+
+def test_mask_hides_every_pii_match():
+    screen = create_risk_screen()
+    masked = screen.mask("010-1234-5678 또는 a.b@example.co.kr, 900101-1234567")
+    assert masked == f"{MASK} 또는 {MASK}, {MASK}"
+
+def test_scan_reports_line_and_offsets():
+    screen = create_risk_screen()
+    lines = [NEUTRAL, "학생: 아 존나 어렵네", NEUTRAL, "학생: 010-1234-5678"]
+    matches = screen.scan(lines)
+    text = '\n'.join(lines)
+    assert [(match.line, match.category) for match in matches] == [(1, 'abuse'), (3, 'pii')]
+    assert [text[match.start:match.end] for match in matches] == ['존나', '010-1234-5678']
+
+def test_english_terms_need_word_boundaries():
+    screen = create_risk_screen()
+    assert categories(screen, "강사: don't be stupid") == {'abuse'}
+    assert categories(screen, "강사: shitake 버섯 예제") == set()
+
+def transcript(flagged, count=12):
+    return ["학생: 아 존나 어렵네" if i in flagged else NEUTRAL for i in range(count)]
+
+def test_windows_include_context_lines():
+    screen = create_risk_screen(context_lines=1)
+    windows = screen.windows(transcript({5}))
+    assert [window['lines'] for window in windows] == [[4, 7]]
+    assert windows[0]['categories'] == ['abuse']
+    assert windows[0]['start'] is None and windows[0]['end'] is None
+    assert windows[0]['text'] == '\n'.join(transcript({5})[4:7])
+
+def test_windows_clip_context_at_edges():
+    screen = create_risk_screen(context_lines=2)
+    assert [window['lines'] for window in screen.windows(transcript({0, 11}))] == [[0, 3], [9, 12]]
+
+def test_touching_windows_merge():
+    screen = create_risk_screen(context_lines=1)
+    # [1, 4)와 [3, 6)은 겹치고, [5, 8)과도 맞닿아 하나로 합침
+    assert [window['lines'] for window in screen.windows(transcript({2, 4, 6}))] == [[1, 8]]
+    # 사이에 발화가 하나라도 남으면 따로 둠
+    assert [window['lines'] for window in screen.windows(transcript({2, 6}))] == [[1, 4], [5, 8]]
+
+def test_windows_merge_categories():
+    screen = create_risk_screen(context_lines=1)
+    lines = transcript({2})
+    lines[3] = "학생: 제 메일은 a@example.com 입니다"
+    windows = screen.windows(lines)
+    assert [window['lines'] for window in windows] == [[1, 5]]
+    assert windows[0]['categories'] == ['abuse', 'pii']
+
+def test_windows_stop_merging_at_max_window_chars():
+    lines = transcript({2, 4})
+    merged = len('\n'.join(lines[1:6])) + 1
+    assert len(create_risk_screen(context_lines=1, max_window_chars=merged).windows(lines)) == 1
+    windows = create_risk_screen(context_lines=1, max_window_chars=merged - 1).windows(lines)
+    assert [window['lines'] for window in windows] == [[1, 4], [3, 6]]
+    assert all(len(window['text']) <= merged - 1 for window in windows)
+
+def test_windows_carry_cue_times():
+    screen = create_risk_screen(context_lines=1)
+    times = [(i * 5.0, i * 5.0 + 4) for i in range(12)]
+    window, = screen.windows(transcript({5}), times)
+    assert (window['start'], window['end']) == (20.0, 34.0)
+
+def test_parse_structured_response():
+    findings = RiskFindings([RiskFinding(1, '발언', '이유')])
+    assert parse_risk_findings(findings) == findings.items
+
+def test_parse_json_response():
+    response = json.dumps({'items': [{'id': 2, 'statement': ' 발언 ', 'reason': '이유'}]}, ensure_ascii=False)
+    assert parse_risk_findings(response) == [RiskFinding(2, '발언', '이유')]
+
+def test_parse_json_list_response():
+    assert parse_risk_findings('[{"id": 1, "statement": "발언"}]') == [RiskFinding(1, '발언', '')]
+
+def test_parse_json_wrapped_in_text():
+    response = '분류 결과입니다.\n```json\n{"items": [{"id": 1, "statement": "발언", "reason": "이유"}]}\n```\n이상입니다.'
+    assert parse_risk_findings(response) == [RiskFinding(1, '발언', '이유')]
+
+@pytest.mark.parametrize('response', [
+    None,
+    '',
+    '위험 발언이 없습니다',
+    '{"items": [',
+    '앞 {not json} 뒤',
+    '{"items": "없음"}',
+    '{"result": []}',
+    '"items"',
+    '42'
+])
+def test_parse_malformed_response(response):
+    assert parse_risk_findings(response) == []
+
+def test_parse_skips_invalid_items():
+    response = json.dumps({'items': [
+        {'id': 1, 'statement': '발언', 'reason': '이유'},
+        {'id': 'x', 'statement': '번호가 잘못됨'},
+        {'id': 3, 'statement': '  '},
+        {'id': 4},
+        '문자열 항목',
+        None,
+        {'id': '5', 'statement': '문자열 번호', 'reason': None}
+    ]}, ensure_ascii=False)
+    assert parse_risk_findings(response) == [RiskFinding(1, '발언', '이유'), RiskFinding(5, '문자열 번호', '')]
+
+def test_risk_statement_masks_and_adds_start_time():
+    screen = create_risk_screen()
+    finding = RiskFinding(1, '010-1234-5678로 연락하라고 함', '전화번호 노출')
+    assert risk_statement({'start': 65.5}, finding, screen.mask) == f"[00:01:05] {MASK}로 연락하라고 함 (전화번호 노출)"
+    assert risk_statement({'start': None}, RiskFinding(1, '발언')) == '발언'
+
+def test_long_context_does_not_cut_flagged_line():
+    screen = create_risk_screen(context_lines=2, max_window_chars=1500)
+    window, = screen.windows(['가' * 1000, '나' * 1000, '이 병신아'])
+    assert window['lines'] == [0, 3]
+    # 앞 발화를 줄이고 걸린 발화는 통째로 남김
+    assert window['text'].endswith('\n이 병신아')
+    assert window['text'].startswith('가')
+    assert len(window['text']) <= 1500
+
+def test_long_flagged_line_keeps_matched_words():
+    screen = create_risk_screen(context_lines=1, max_window_chars=100)
+    window, = screen.windows([NEUTRAL, '가' * 500 + ' 병신아 ' + '나' * 500, NEUTRAL])
+    assert '병신' in window['text']
+    assert len(window['text']) <= 100